@@ -5,36 +5,8 @@ from config import Config
 from datetime import timedelta
 import os
 import logging
-from logging.handlers import RotatingFileHandler
-import json
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-import pytz
 from app.extensions import db, migrate
-from app.scheduler import send_daily_reports
-
-# Configure logging
-def setup_logging(app):
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.mkdir('logs')
-
-    # Set up file handler
-    file_handler = RotatingFileHandler('logs/app.log', maxBytes=10240, backupCount=10)
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-    ))
-    file_handler.setLevel(logging.INFO)
-    app.logger.addHandler(file_handler)
-
-    # Set up console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    console_handler.setLevel(logging.INFO)
-    app.logger.addHandler(console_handler)
-
-    app.logger.setLevel(logging.INFO)
-    app.logger.info('Ticketing System startup')
+from app.logging_setup import setup_logging, register_request_logging
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -55,8 +27,8 @@ CORS(app, resources={
             "https://ticketing-system-6f4u.onrender.com"
         ],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-        "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Credentials", "X-Requested-With"],
-        "expose_headers": ["Content-Type", "Authorization"],
+        "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Credentials", "X-Requested-With", "If-Match", "Last-Event-ID"],
+        "expose_headers": ["Content-Type", "Authorization", "ETag"],
         "supports_credentials": True,
         "max_age": 600
     }
@@ -66,6 +38,14 @@ CORS(app, resources={
 db.init_app(app)
 migrate.init_app(app, db)
 
+# Prometheus metrics for requests, queries and the connection pool
+from app.metrics import init_metrics
+from app.slow_query_log import init_slow_query_log
+with app.app_context():
+    init_metrics(app, db.engine)
+    # Opt-in via SLOW_QUERY_LOG_ENABLED
+    init_slow_query_log(app, db.engine)
+
 # Configure JWT settings
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-this')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
@@ -120,23 +100,47 @@ def revoked_token_callback(jwt_header, jwt_payload):
         'error': 'token_revoked'
     }), 401
 
-# Request logging middleware
-@app.before_request
-def log_request_info():
-    app.logger.info('Request Headers: %s', dict(request.headers))
-    app.logger.info('Request URL: %s %s', request.method, request.url)
-    if request.get_json(silent=True):
-        app.logger.info('Request Body: %s', json.dumps(request.get_json()))
-    app.logger.info('Request Args: %s', dict(request.args))
-
-@app.after_request
-def log_response_info(response):
-    app.logger.info('Response Status: %s', response.status)
-    app.logger.info('Response Headers: %s', dict(response.headers))
-    return response
+# Structured per-request logging, sampled and redacted
+register_request_logging(app)
 
 # Import routes and models after initializing extensions
-from app import routes, models
+from app import routes, models, routes_sla, routes_worker_activity, routes_profiling, routes_events
+
+# Persist completion scores and worker leaderboard buckets as tasks complete
+from app.services.leaderboard_service import register_leaderboard_hooks
+register_leaderboard_hooks()
+
+# Evict cached identities when users or their property links change
+from app.services.identity_cache import register_identity_cache_hooks
+register_identity_cache_hooks()
+
+# Re-route tickets once managers or their property links change
+from app.services.ticket_routing import register_routing_cache_hooks
+register_routing_cache_hooks()
+
+# Send notifications queued during a request only after its transaction commits
+from app.services.commit_hooks import register_commit_hooks
+register_commit_hooks()
+
+# Record ticket, task, service request and room changes for the /events streams
+from app.services.change_stream import register_change_stream_hooks
+register_change_stream_hooks()
+
+# Bump the shared settings version so every worker reloads edited settings
+from app.services.settings_cache import register_settings_cache_hooks, settings_cache
+register_settings_cache_hooks()
+
+# Push due dates committed in this process into the reminder heap
+from app.services.due_date_engine import register_due_date_hooks
+register_due_date_hooks()
+
+# Remember the row versions each flush expects, to report which rows a conflict was about
+from app.services.concurrency import register_concurrency_hooks
+register_concurrency_hooks()
+
+# Run requests sent with X-Profile: 1 by a super admin under cProfile
+from app.profiling import init_profiling
+init_profiling(app)
 
 # Global error handler for unhandled database errors
 @app.errorhandler(Exception)
@@ -153,27 +157,17 @@ def handle_unhandled_exception(e):
     
     return jsonify({'message': 'Internal server error'}), 500
 
-# Create database tables
-with app.app_context():
+def init_database(app):
+    """Create missing tables and the default email settings row"""
     db.create_all()
     app.logger.info('Database tables created')
-    
-    # Initialize the scheduler
-    try:
-        from app.scheduler import init_scheduler
-        init_scheduler()
-        app.logger.info('Scheduler initialized successfully')
-    except Exception as e:
-        app.logger.error(f'Failed to initialize scheduler: {str(e)}')
-        app.logger.warning('Application will continue without automated reports')
-    
+
     # Verify the email settings exist, create default if not
     try:
         from app.models import EmailSettings
         settings = EmailSettings.query.first()
         if not settings:
             app.logger.warning('No email settings found, creating default settings')
-            from app.models import EmailSettings
             settings = EmailSettings(
                 smtp_server='',
                 smtp_port=587,
@@ -190,4 +184,71 @@ with app.app_context():
             db.session.commit()
             app.logger.info('Default email settings created')
     except Exception as e:
-        app.logger.error(f'Failed to setup email settings: {str(e)}')
\ No newline at end of file
+        db.session.rollback()
+        app.logger.error(f'Failed to setup email settings: {str(e)}')
+
+def create_app():
+    """Run the startup work for this process and return the app.
+
+    Importing the package configures Flask and registers the engine and
+    session hooks; it opens no database connections, and the only thread it
+    starts is the log listener, which every process starts for itself on
+    first use. Servers call this once per process: it creates the schema
+    (AUTO_CREATE_SCHEMA), warms the settings cache and starts the scheduler
+    (START_SCHEDULER). Calling it again is a no-op.
+
+    Under gunicorn --preload this runs in the master; gunicorn.conf.py then
+    calls before_fork() and after_fork() so each worker gets its own
+    connections and scheduler.
+    """
+    if app.extensions.get('startup_complete'):
+        return app
+
+    with app.app_context():
+        if app.config.get('AUTO_CREATE_SCHEMA', True):
+            init_database(app)
+
+        # Load every settings row into this worker's cache
+        try:
+            settings_cache.load()
+        except Exception as e:
+            app.logger.error(f'Failed to load settings cache: {str(e)}')
+
+        if app.config.get('START_SCHEDULER', True):
+            try:
+                from app.scheduler import init_scheduler
+                init_scheduler()
+                app.logger.info('Scheduler initialized successfully')
+            except Exception as e:
+                app.logger.error(f'Failed to initialize scheduler: {str(e)}')
+                app.logger.warning('Application will continue without automated reports')
+
+    app.extensions['startup_complete'] = True
+    return app
+
+def _dispose_engines(close):
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+def before_fork():
+    """Stop the scheduler and close the pooled connections in a master about to fork workers"""
+    if app.extensions.get('startup_complete') and app.config.get('START_SCHEDULER', True):
+        from app.scheduler import shutdown_scheduler
+        shutdown_scheduler()
+    _dispose_engines(close=True)
+
+def after_fork():
+    """Give a worker forked from a started master its own connections and scheduler.
+
+    Connections inherited from the master are dropped without closing them, as
+    the master and other workers may share the sockets; the log listener and
+    slow query writer start themselves per process.
+    """
+    _dispose_engines(close=False)
+    if app.extensions.get('startup_complete') and app.config.get('START_SCHEDULER', True):
+        from app.scheduler import init_scheduler, shutdown_scheduler
+        with app.app_context():
+            # A master forked without before_fork leaves a copy that looks running but has no threads
+            shutdown_scheduler()
+            init_scheduler()
@@ -1,5 +1,35 @@
+from sqlalchemy import insert
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
 
-db = SQLAlchemy()
-migrate = Migrate() 
\ No newline at end of file
+# Bind key of the optional read replica (see SQLALCHEMY_BINDS in config.py)
+REPLICA_BIND_KEY = 'replica'
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to the read replica while use_replica() is active.
+
+    Flushes and any other statement always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('use_replica') and not self._flushing \
+                and getattr(clause, 'is_select', False):
+            engine = self._db.engines.get(REPLICA_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+
+def insert_ignoring_duplicates(table):
+    """INSERT that skips rows violating a unique constraint, so concurrent writers stay idempotent"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table)
+    return dialect_insert(table).on_conflict_do_nothing()
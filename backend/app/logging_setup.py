@@ -0,0 +1,174 @@
+"""
+Structured Logging
+JSON log lines written by a background QueueListener, plus sampled per-request logging with secret redaction
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from flask import request, g
+
+# Header, argument and body keys whose values never reach the log
+REDACTED_KEYS = (
+    'authorization', 'cookie', 'set-cookie', 'password', 'new_password', 'current_password',
+    'smtp_password', 'token', 'jwt', 'access_token', 'refresh_token', 'auth_token', 'secret',
+    's3_secret_key', 'azure_account_key', 'api_key', 'x-api-key'
+)
+REDACTED = '[REDACTED]'
+
+# LogRecord attributes that are not user supplied fields
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+def redact(value, keys=REDACTED_KEYS):
+    """Return a copy of dicts/lists with the values of secret keys replaced"""
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if str(k).lower() in keys else redact(v, keys)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v, keys) for v in value]
+    return value
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including any `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class LogPipeline:
+    """The queue behind app.logger and the listener thread writing it out.
+
+    Threads do not survive a fork, so the queue and listener belong to one process: a
+    worker forked from a preloaded master starts its own the first time it logs, rather
+    than queueing records nothing will ever write.
+    """
+
+    def __init__(self, handlers):
+        self._handlers = tuple(handlers)
+        self._queue = None
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def handlers(self):
+        return self._handlers
+
+    @handlers.setter
+    def handlers(self, handlers):
+        self._handlers = tuple(handlers)
+        if self._listener:
+            self._listener.handlers = self._handlers
+
+    def queue(self):
+        """This process's queue, starting its listener on first use"""
+        if self._pid == os.getpid():
+            return self._queue
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(-1)
+                self._listener = QueueListener(self._queue, *self._handlers, respect_handler_level=True)
+                self._listener.start()
+                self._pid = os.getpid()
+        return self._queue
+
+    def flush(self):
+        """Write out every queued record, e.g. in tests"""
+        if self._pid == os.getpid():
+            # Stopping drains the queue through the listener thread
+            self._listener.stop()
+            self._listener = QueueListener(self._queue, *self._handlers, respect_handler_level=True)
+            self._listener.start()
+
+    def stop(self):
+        if self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+
+class PipelineHandler(QueueHandler):
+    """A QueueHandler that looks up its queue per process"""
+
+    def __init__(self, pipeline):
+        super().__init__(None)
+        self.pipeline = pipeline
+
+    def enqueue(self, record):
+        self.pipeline.queue().put_nowait(record)
+
+def setup_logging(app):
+    """Send app.logger through a queue so handlers write on a background thread"""
+    level = getattr(logging, str(app.config.get('LOG_LEVEL', 'INFO')).upper(), logging.INFO)
+    formatter = JsonFormatter()
+
+    handlers = []
+    log_file = app.config.get('LOG_FILE', 'logs/app.log')
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=app.config.get('LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=app.config.get('LOG_BACKUP_COUNT', 10)
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers.append(console_handler)
+
+    pipeline = LogPipeline(handlers)
+    atexit.register(pipeline.stop)
+
+    app.logger.handlers = [PipelineHandler(pipeline)]
+    app.logger.setLevel(level)
+    app.logger.propagate = False
+    app.extensions['log_pipeline'] = pipeline
+    app.logger.info('Ticketing System startup')
+    return pipeline
+
+def register_request_logging(app):
+    """Log one structured line per request, with headers and body for a sample of requests"""
+
+    @app.before_request
+    def start_request_log():
+        g.request_started_at = time.perf_counter()
+        g.log_request_detail = random.random() < app.config.get('LOG_SAMPLE_RATE', 0.01)
+
+    @app.after_request
+    def log_request(response):
+        started_at = g.pop('request_started_at', None)
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started_at) * 1000, 2) if started_at else None,
+            'remote_addr': request.remote_addr
+        }
+        if g.pop('log_request_detail', False):
+            fields['args'] = redact(request.args.to_dict())
+            fields['headers'] = redact({k.lower(): v for k, v in request.headers.items()})
+            body = request.get_json(silent=True)
+            if body is not None:
+                fields['body'] = redact(body)
+        app.logger.info('request', extra={'request': fields})
+        return response
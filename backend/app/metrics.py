@@ -0,0 +1,193 @@
+"""
+Metrics
+Prometheus instrumentation for requests, database access, notifications and scheduler jobs
+
+When PROMETHEUS_MULTIPROC_DIR is set (see start.sh and gunicorn.conf.py) every
+worker writes its samples to that directory and /metrics aggregates them, so
+any worker can answer a scrape for the whole server.
+"""
+import hmac
+import os
+import time
+from functools import wraps
+from flask import request, g, Response, has_request_context
+from sqlalchemy import event
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+)
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ['method', 'endpoint']
+)
+REQUEST_COUNT = Counter(
+    'http_requests_total', 'Requests by route and status code',
+    ['method', 'endpoint', 'status']
+)
+DB_QUERY_COUNT = Counter(
+    'db_queries_total', 'SQL statements executed, by route',
+    ['endpoint']
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'SQL statement execution time, by route',
+    ['endpoint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 20)
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Connections currently checked out of the pool',
+    multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Connections open beyond pool_size',
+    multiprocess_mode='livesum'
+)
+NOTIFICATIONS_IN_FLIGHT = Gauge(
+    'notifications_in_flight', 'Notification sends queued or running in background threads',
+    ['channel'],
+    multiprocess_mode='livesum'
+)
+NOTIFICATION_LATENCY = Histogram(
+    'notification_send_duration_seconds', 'Time to hand a single notification to the provider',
+    ['channel', 'outcome'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+JOB_DURATION = Histogram(
+    'scheduler_job_duration_seconds', 'Scheduler job run time',
+    ['job', 'outcome'],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+)
+
+def _endpoint_label():
+    """The URL rule of the current request, which keeps label cardinality bounded"""
+    if not has_request_context():
+        return 'background'
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+def _update_pool_gauges(pool):
+    if hasattr(pool, 'checkedout'):
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+    if hasattr(pool, 'overflow'):
+        DB_POOL_OVERFLOW.set(max(0, pool.overflow()))
+
+def _time_pool_connect(pool):
+    """Wrap pool.connect so the wait for a free connection is observed"""
+    connect = pool.connect
+    if getattr(connect, '_metrics_timed', False):
+        return
+
+    @wraps(connect)
+    def timed_connect():
+        started_at = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started_at)
+
+    timed_connect._metrics_timed = True
+    pool.connect = timed_connect
+
+def instrument_engine(engine):
+    """Count statements and time them, and track pool usage"""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('query_started_at')
+        if not started:
+            return
+        endpoint = _endpoint_label()
+        DB_QUERY_COUNT.labels(endpoint).inc()
+        DB_QUERY_DURATION.labels(endpoint).observe(time.perf_counter() - started.pop())
+
+    def on_pool_change(*args):
+        _update_pool_gauges(engine.pool)
+
+    def on_engine_disposed(conn):
+        # dispose() replaces the pool, so time the new one as well
+        _time_pool_connect(engine.pool)
+
+    if event.contains(engine, 'before_cursor_execute', before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(engine, 'engine_disposed', on_engine_disposed)
+    event.listen(engine.pool, 'checkout', on_pool_change)
+    event.listen(engine.pool, 'checkin', on_pool_change)
+    _time_pool_connect(engine.pool)
+
+def track_notification(channel):
+    """Decorator recording the latency and outcome of a notification send"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = f(*args, **kwargs)
+                outcome = 'sent' if result else 'failed'
+                return result
+            finally:
+                NOTIFICATION_LATENCY.labels(channel, outcome).observe(time.perf_counter() - started_at)
+        return decorated_function
+    return decorator
+
+def track_job(name):
+    """Decorator recording how long a scheduler job takes"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = f(*args, **kwargs)
+                outcome = 'success'
+                return result
+            finally:
+                JOB_DURATION.labels(name, outcome).observe(time.perf_counter() - started_at)
+        return decorated_function
+    return decorator
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def init_metrics(app, engine):
+    """Instrument requests and the database engine and expose /metrics"""
+    instrument_engine(engine)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started_at = g.pop('metrics_started_at', None)
+        endpoint = _endpoint_label()
+        if started_at is not None:
+            REQUEST_LATENCY.labels(request.method, endpoint).observe(time.perf_counter() - started_at)
+        REQUEST_COUNT.labels(request.method, endpoint, str(response.status_code)).inc()
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus text exposition, protected by METRICS_AUTH_TOKEN.
+
+        Without a token the endpoint stays closed, unless METRICS_ALLOW_UNAUTHENTICATED
+        says it is only reachable from an internal listener.
+        """
+        token = app.config.get('METRICS_AUTH_TOKEN')
+        if not token:
+            if not app.config.get('METRICS_ALLOW_UNAUTHENTICATED'):
+                return Response('Metrics are disabled until METRICS_AUTH_TOKEN is set\n', status=403, mimetype='text/plain')
+        elif not hmac.compare_digest(request.headers.get('Authorization', '').encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
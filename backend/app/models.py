@@ -129,6 +129,7 @@ class Property(db.Model):
     description = db.Column(db.Text)
     subscription_plan = db.Column(db.String(20), default='basic')  # 'basic' or 'premium'
     has_attachments = db.Column(db.Boolean, default=False)
+    timezone = db.Column(db.String(50))  # Local timezone for daily reports; the email settings timezone when unset
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     rooms = db.relationship('Room', backref='property', lazy=True)
@@ -147,6 +148,7 @@ class Property(db.Model):
             'description': self.description,
             'subscription_plan': self.subscription_plan,
             'has_attachments': self.has_attachments,
+            'timezone': self.timezone,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -194,7 +196,7 @@ class Ticket(db.Model):
     property_id = db.Column(db.Integer, db.ForeignKey('properties.property_id'))
     room_id = db.Column(db.Integer, db.ForeignKey('rooms.room_id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     completed_at = db.Column(db.DateTime)  # When the ticket was completed
 
     # Incident Report fields
@@ -209,11 +211,15 @@ class Ticket(db.Model):
     insurance_claim_filed = db.Column(db.Boolean, default=False)
     claim_number = db.Column(db.String(100))
     follow_up_required = db.Column(db.Boolean, default=True)
-    follow_up_date = db.Column(db.DateTime)
+    follow_up_date = db.Column(db.DateTime, index=True)  # Range-scanned by the due-date reminder engine
+    # Row version, checked on every UPDATE and exposed to clients as the ETag
+    version = db.Column(db.Integer, nullable=False, default=1)
 
     # Add relationship to attachments
     attachments = db.relationship('TicketAttachment', backref='ticket', lazy=True)
 
+    __mapper_args__ = {'version_id_col': version}
+
     def to_dict(self):
         """Convert ticket object to dictionary"""
         creator = User.query.get(self.user_id)
@@ -248,6 +254,7 @@ class Ticket(db.Model):
             'claim_number': self.claim_number,
             'follow_up_required': self.follow_up_required,
             'follow_up_date': self.follow_up_date.isoformat() if self.follow_up_date else None,
+            'version': self.version,
             'attachments': [attachment.to_dict() for attachment in self.attachments]
         }
 
@@ -281,7 +288,7 @@ class TaskAssignment(db.Model):
     __tablename__ = 'task_assignments'
     task_id = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.ticket_id'), nullable=False)
-    assigned_to_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    assigned_to_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))  # None once the task is unassigned
     status = db.Column(db.String(50), default='Pending')
 
     # Boolean column (defaults to False, meaning it's a Ticket)
@@ -307,17 +314,21 @@ class Task(db.Model):
     description = db.Column(db.Text)
     status = db.Column(db.String(20), default='pending')
     priority = db.Column(db.String(20), default='Low')
-    due_date = db.Column(db.DateTime)
+    due_date = db.Column(db.DateTime, index=True)  # Range-scanned by the due-date reminder engine
     property_id = db.Column(db.Integer, db.ForeignKey('properties.property_id'))
     assigned_to_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     completed_at = db.Column(db.DateTime)  # When the task was completed
     time_spent = db.Column(db.Float)  # Time spent in hours
     cost = db.Column(db.Float)  # Cost in dollars
+    completion_score = db.Column(db.Float)  # Persisted when the task is completed
+    # Row version, checked on every UPDATE and exposed to clients as the ETag
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
 
-    @property
-    def completion_score(self):
+    def calculate_completion_score(self):
         """Calculate a score based on completion time and due date"""
         if not self.completed_at or not self.created_at:
             return None
@@ -374,7 +385,45 @@ class Task(db.Model):
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'time_spent': self.time_spent,
             'cost': self.cost,
-            'completion_score': self.completion_score
+            'completion_score': self.completion_score,
+            'version': self.version
+        }
+
+class WorkerLeaderboard(db.Model):
+    __tablename__ = 'worker_leaderboard'
+    id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.property_id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    period_date = db.Column(db.Date, nullable=False)  # Day the tasks were completed (UTC)
+    tasks_completed = db.Column(db.Integer, default=0, nullable=False)
+    score_total = db.Column(db.Float, default=0, nullable=False)
+    time_spent_total = db.Column(db.Float, default=0, nullable=False)
+    cost_total = db.Column(db.Float, default=0, nullable=False)
+    last_completed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = db.relationship('User')
+
+    __table_args__ = (
+        db.UniqueConstraint('property_id', 'user_id', 'period_date', name='uq_worker_leaderboard_bucket'),
+        db.Index('ix_worker_leaderboard_tasks', 'property_id', 'period_date', 'tasks_completed'),
+        db.Index('ix_worker_leaderboard_score', 'property_id', 'period_date', 'score_total'),
+        db.Index('ix_worker_leaderboard_user', 'user_id', 'period_date'),
+    )
+
+    def to_dict(self):
+        """Convert leaderboard bucket to dictionary"""
+        return {
+            'property_id': self.property_id,
+            'user_id': self.user_id,
+            'username': self.user.username if self.user else None,
+            'period_date': self.period_date.isoformat() if self.period_date else None,
+            'tasks_completed': self.tasks_completed,
+            'score_total': self.score_total,
+            'avg_score': round(self.score_total / self.tasks_completed, 1) if self.tasks_completed else None,
+            'time_spent_total': self.time_spent_total,
+            'cost_total': self.cost_total,
+            'last_completed_at': self.last_completed_at.isoformat() if self.last_completed_at else None
         }
 
 class PropertyManager(db.Model):
@@ -458,6 +507,8 @@ class ServiceRequest(db.Model):
     completed_at = db.Column(db.DateTime)
     created_by_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     assigned_task_id = db.Column(db.Integer, db.ForeignKey('tasks.task_id'))
+    # Row version, checked on every UPDATE and exposed to clients as the ETag
+    version = db.Column(db.Integer, nullable=False, default=1)
 
     # Relationships
     room = db.relationship('Room', backref='service_requests')
@@ -465,6 +516,8 @@ class ServiceRequest(db.Model):
     created_by = db.relationship('User', foreign_keys=[created_by_id], backref='created_requests')
     assigned_task = db.relationship('Task', backref='service_request')
 
+    __mapper_args__ = {'version_id_col': version}
+
     def to_dict(self):
         return {
             'request_id': self.request_id,
@@ -484,7 +537,8 @@ class ServiceRequest(db.Model):
             'room_number': self.room.name if self.room else None,
             'property_name': self.property.name if self.property else None,
             'created_by_name': self.created_by.username if self.created_by else None,
-            'task_status': self.assigned_task.status if self.assigned_task else None
+            'task_status': self.assigned_task.status if self.assigned_task else None,
+            'version': self.version
         }
 
 class History(db.Model):
@@ -517,9 +571,9 @@ class History(db.Model):
         }
 
     @classmethod
-    def create_entry(cls, entity_type, entity_id, action, user_id, field_name=None, old_value=None, new_value=None):
-        """Helper method to create a history entry"""
-        entry = cls(
+    def build(cls, entity_type, entity_id, action, user_id, field_name=None, old_value=None, new_value=None):
+        """Build a history entry without adding or committing it"""
+        return cls(
             entity_type=entity_type,
             entity_id=entity_id,
             action=action,
@@ -528,10 +582,78 @@ class History(db.Model):
             old_value=str(old_value) if old_value is not None else None,
             new_value=str(new_value) if new_value is not None else None
         )
+
+    @classmethod
+    def create_entry(cls, entity_type, entity_id, action, user_id, field_name=None, old_value=None, new_value=None):
+        """Helper method to create a history entry"""
+        entry = cls.build(entity_type, entity_id, action, user_id, field_name, old_value, new_value)
         db.session.add(entry)
         db.session.commit()
         return entry
 
+class SlaRecord(db.Model):
+    __tablename__ = 'sla_records'
+    record_id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(20), nullable=False)  # 'ticket', 'task' or 'service_request'
+    entity_id = db.Column(db.Integer, nullable=False)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.property_id'))
+    priority = db.Column(db.String(20))
+    opened_at = db.Column(db.DateTime, nullable=False)
+    assigned_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    # Targets derived from the priority at the time the record was last updated
+    assign_due_at = db.Column(db.DateTime)
+    start_due_at = db.Column(db.DateTime)
+    complete_due_at = db.Column(db.DateTime)
+    # Intervals in seconds, stored so reports can aggregate them in SQL
+    time_to_assign = db.Column(db.Float)
+    time_to_start = db.Column(db.Float)
+    time_to_complete = db.Column(db.Float)
+    assign_breached = db.Column(db.Boolean, default=False, nullable=False)
+    start_breached = db.Column(db.Boolean, default=False, nullable=False)
+    complete_breached = db.Column(db.Boolean, default=False, nullable=False)
+    breached = db.Column(db.Boolean, default=False, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('entity_type', 'entity_id', name='uq_sla_records_entity'),
+        db.Index('ix_sla_records_property_opened', 'property_id', 'opened_at'),
+        db.Index('ix_sla_records_breach', 'property_id', 'breached', 'opened_at'),
+        db.Index('ix_sla_records_open_due', 'completed_at', 'complete_due_at'),
+    )
+
+    def to_dict(self):
+        """Convert SLA record to dictionary"""
+        return {
+            'record_id': self.record_id,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'property_id': self.property_id,
+            'priority': self.priority,
+            'opened_at': self.opened_at.isoformat() if self.opened_at else None,
+            'assigned_at': self.assigned_at.isoformat() if self.assigned_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'assign_due_at': self.assign_due_at.isoformat() if self.assign_due_at else None,
+            'start_due_at': self.start_due_at.isoformat() if self.start_due_at else None,
+            'complete_due_at': self.complete_due_at.isoformat() if self.complete_due_at else None,
+            'time_to_assign': self.time_to_assign,
+            'time_to_start': self.time_to_start,
+            'time_to_complete': self.time_to_complete,
+            'assign_breached': self.assign_breached,
+            'start_breached': self.start_breached,
+            'complete_breached': self.complete_breached,
+            'breached': self.breached
+        }
+
+class SlaSyncState(db.Model):
+    __tablename__ = 'sla_sync_state'
+    id = db.Column(db.Integer, primary_key=True)
+    last_history_id = db.Column(db.Integer, default=0, nullable=False)  # Highest History row already applied
+    gaps = db.Column(db.JSON)  # {history_id: first seen} for IDs below the watermark not yet committed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class AttachmentSettings(db.Model):
     __tablename__ = 'attachment_settings'
     id = db.Column(db.Integer, primary_key=True)
@@ -629,6 +751,104 @@ class SecuritySettings(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class SettingsVersion(db.Model):
+    __tablename__ = 'settings_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)  # Bumped whenever any settings row changes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SlowQuery(db.Model):
+    __tablename__ = 'slow_queries'
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(40), nullable=False, unique=True)  # sha1 of the normalized statement
+    statement = db.Column(db.Text, nullable=False)
+    sample_parameters = db.Column(db.Text)
+    route = db.Column(db.String(255))
+    source = db.Column(db.String(255))  # Application frame that issued the statement
+    explain_plan = db.Column(db.Text)
+    count = db.Column(db.Integer, default=0, nullable=False)
+    total_ms = db.Column(db.Float, default=0, nullable=False)
+    max_ms = db.Column(db.Float, default=0, nullable=False)
+    first_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert slow query object to dictionary"""
+        return {
+            'id': self.id,
+            'fingerprint': self.fingerprint,
+            'statement': self.statement,
+            'sample_parameters': self.sample_parameters,
+            'route': self.route,
+            'source': self.source,
+            'explain_plan': self.explain_plan,
+            'count': self.count,
+            'total_ms': round(self.total_ms or 0, 2),
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else None,
+            'max_ms': round(self.max_ms or 0, 2),
+            'first_seen': self.first_seen.isoformat() if self.first_seen else None,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None
+        }
+
+class ReplicaHeartbeat(db.Model):
+    __tablename__ = 'replica_heartbeat'
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.DateTime, nullable=False)  # Written on the primary; read on the replica to measure lag
+
+class DueNotification(db.Model):
+    __tablename__ = 'due_notifications'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)  # task_reminder, task_overdue, ticket_follow_up
+    entity_id = db.Column(db.Integer, nullable=False)  # Task or ticket ID, depending on kind
+    due_at = db.Column(db.DateTime, nullable=False)  # The due or follow-up date the notification was for
+    sent_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'entity_id', 'due_at', name='uq_due_notifications_event'),
+    )
+
+class SchedulerLease(db.Model):
+    __tablename__ = 'scheduler_lease'
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(255), nullable=False)  # host:pid:nonce of the process that runs scheduled jobs
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    renewed_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)  # Any process may take over once this has passed
+
+    def to_dict(self):
+        """Convert scheduler lease object to dictionary"""
+        return {
+            'name': self.name,
+            'holder': self.holder,
+            'acquired_at': self.acquired_at.isoformat() if self.acquired_at else None,
+            'renewed_at': self.renewed_at.isoformat() if self.renewed_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+class SchedulerJobRun(db.Model):
+    __tablename__ = 'scheduler_job_runs'
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(50), nullable=False, index=True)
+    holder = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, success, error
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Float)
+    error = db.Column(db.Text)
+
+    def to_dict(self):
+        """Convert scheduler job run object to dictionary"""
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'holder': self.holder,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': round(self.duration_ms, 2) if self.duration_ms is not None else None,
+            'error': self.error
+        }
+
 class Checklist(db.Model):
     __tablename__ = 'checklists'
     checklist_id = db.Column(db.Integer, primary_key=True)
@@ -711,4 +931,119 @@ class ChecklistCompletion(db.Model):
             'property_id': self.property_id,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'completion_notes': self.completion_notes
-        }
\ No newline at end of file
+        }
+
+class ChecklistInstance(db.Model):
+    __tablename__ = 'checklist_instances'
+    instance_id = db.Column(db.Integer, primary_key=True)
+    checklist_id = db.Column(db.Integer, db.ForeignKey('checklists.checklist_id'), nullable=False)
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.property_id'), nullable=False)
+    department = db.Column(db.String(50))
+    period_start = db.Column(db.Date, nullable=False)  # First day of the daily, weekly or monthly period
+    due_at = db.Column(db.DateTime, nullable=False)  # End of the period
+    status = db.Column(db.String(20), default='open', nullable=False)  # open, completed, missed
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.task_id'))  # Optional task generated with the instance
+    completion_id = db.Column(db.Integer, db.ForeignKey('checklist_completions.completion_id'))
+    completed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    checklist = db.relationship('Checklist', backref=db.backref('instances', lazy='dynamic'))
+
+    __table_args__ = (
+        db.UniqueConstraint('checklist_id', 'property_id', 'period_start', name='uq_checklist_instances_period'),
+        db.Index('ix_checklist_instances_property_status', 'property_id', 'status', 'due_at'),
+    )
+
+    def to_dict(self):
+        """Convert checklist instance object to dictionary"""
+        return {
+            'instance_id': self.instance_id,
+            'checklist_id': self.checklist_id,
+            'title': self.checklist.title if self.checklist else None,
+            'checklist_type': self.checklist.checklist_type if self.checklist else None,
+            'property_id': self.property_id,
+            'department': self.department,
+            'period_start': self.period_start.isoformat() if self.period_start else None,
+            'due_at': self.due_at.isoformat() if self.due_at else None,
+            'status': self.status,
+            'task_id': self.task_id,
+            'completion_id': self.completion_id,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class PropertyDeletion(db.Model):
+    __tablename__ = 'property_deletions'
+    deletion_id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, nullable=False, index=True)  # No foreign key, the job outlives the property
+    property_name = db.Column(db.String(100))
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, running, completed, failed
+    step = db.Column(db.String(50))  # Table currently being cleared
+    steps_done = db.Column(db.Integer, default=0, nullable=False)
+    steps_total = db.Column(db.Integer, default=0, nullable=False)
+    rows_deleted = db.Column(db.Integer, default=0, nullable=False)
+    files_deleted = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text)
+    requested_by_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        """Convert property deletion object to dictionary"""
+        return {
+            'deletion_id': self.deletion_id,
+            'property_id': self.property_id,
+            'property_name': self.property_name,
+            'status': self.status,
+            'step': self.step,
+            'steps_done': self.steps_done,
+            'steps_total': self.steps_total,
+            'rows_deleted': self.rows_deleted,
+            'files_deleted': self.files_deleted,
+            'error': self.error,
+            'requested_by_id': self.requested_by_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)  # Idempotency-Key header sent by the client
+    request_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the method, path and body
+    status_code = db.Column(db.Integer)  # Null while the first request is still running
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),
+    )
+
+class ChangeEvent(db.Model):
+    __tablename__ = 'change_events'
+    event_id = db.Column(db.Integer, primary_key=True)  # Sent to clients as the SSE id and resumed from with Last-Event-ID
+    property_id = db.Column(db.Integer, nullable=False)  # No foreign key, so events outlive a deleted property
+    entity_type = db.Column(db.String(20), nullable=False)  # 'ticket', 'task', 'service_request' or 'room'
+    entity_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(20), nullable=False)  # 'created', 'updated' or 'deleted'
+    version = db.Column(db.Integer)  # Row version after the change, when the model is versioned and it is known
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('ix_change_events_property_event', 'property_id', 'event_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'event_id': self.event_id,
+            'property_id': self.property_id,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'action': self.action,
+            'version': self.version,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
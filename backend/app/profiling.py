@@ -0,0 +1,121 @@
+"""
+Request Profiling
+Runs a request under cProfile when a super admin sends `X-Profile: 1` and stores the result as a pstats file
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+from flask import request, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from app.services.identity_cache import get_cached_user
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+def _profile_dir(app):
+    path = os.path.abspath(app.config.get('PROFILE_DIR', 'profiles'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _requested_by_super_admin():
+    """True when the request carries a valid token for a super admin"""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return False
+    if not identity:
+        return False
+    user = get_cached_user(identity.get('user_id'))
+    return bool(user and user.role == 'super_admin')
+
+def _profile_name(duration_ms):
+    endpoint = (request.url_rule.rule if request.url_rule else request.path).strip('/') or 'root'
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', endpoint).strip('-')[:60]
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    return f'{stamp}_{request.method}_{slug}_{int(duration_ms)}ms'
+
+def _prune(directory, keep):
+    files = sorted(f for f in os.listdir(directory) if f.endswith('.prof'))
+    for name in files[:max(0, len(files) - keep)]:
+        os.remove(os.path.join(directory, name))
+
+def list_profiles(app):
+    """Stored profiles, newest first"""
+    directory = _profile_dir(app)
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.prof'):
+            continue
+        profile_id = name[:-len('.prof')]
+        stamp, method, endpoint, duration = (profile_id.split('_', 3) + ['', '', ''])[:4]
+        stat = os.stat(os.path.join(directory, name))
+        profiles.append({
+            'profile_id': profile_id,
+            'method': method,
+            'endpoint': endpoint,
+            'duration_ms': int(duration.rstrip('ms')) if duration.rstrip('ms').isdigit() else None,
+            'created_at': datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+            'size': stat.st_size
+        })
+    return profiles
+
+def get_profile_path(app, profile_id):
+    """Path of a stored profile, or None for unknown or malformed IDs"""
+    if not PROFILE_ID_PATTERN.match(profile_id or ''):
+        return None
+    path = os.path.join(_profile_dir(app), f'{profile_id}.prof')
+    return path if os.path.isfile(path) else None
+
+def render_profile(path, sort='cumulative', limit=50):
+    """Plain-text pstats summary of a stored profile"""
+    stream = io.StringIO()
+    stats = pstats.Stats(path, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+def init_profiling(app):
+    """Profile requests that ask for it with the X-Profile header"""
+
+    @app.before_request
+    def start_profiler():
+        if request.headers.get(PROFILE_HEADER) != '1' or not app.config.get('ENABLE_REQUEST_PROFILING', True):
+            return
+        if not _requested_by_super_admin():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+        g.profiler = profiler
+        g.profiler_started_at = time.perf_counter()
+
+    @app.after_request
+    def save_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        duration_ms = (time.perf_counter() - g.pop('profiler_started_at')) * 1000
+        try:
+            directory = _profile_dir(app)
+            profile_id = _profile_name(duration_ms)
+            profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+            _prune(directory, app.config.get('PROFILE_MAX_FILES', 100))
+            response.headers['X-Profile-Id'] = profile_id
+        except Exception as e:
+            app.logger.error(f"Error saving request profile: {str(e)}")
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        # after_request is skipped when a request fails hard; never leave the profiler running
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
@@ -1,7 +1,7 @@
 from flask import request, jsonify
 from app import app
 from app.extensions import db
-from app.models import User, Ticket, Property, TaskAssignment, Room, UserProperty, Task, PropertyManager, EmailSettings, ServiceRequest, TicketAttachment, History, SMSSettings, AttachmentSettings, GeneralSettings, SecuritySettings, Checklist, ChecklistItem, ChecklistCompletion
+from app.models import User, Ticket, Property, TaskAssignment, Room, UserProperty, Task, PropertyManager, EmailSettings, ServiceRequest, TicketAttachment, History, SMSSettings, AttachmentSettings, GeneralSettings, SecuritySettings, Checklist, ChecklistItem, ChecklistCompletion, ChecklistInstance, PropertyDeletion
 from app.services import EmailService, EmailTestService
 import os
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
@@ -12,10 +12,26 @@ from app.middleware import handle_errors
 from app.decorators import handle_errors
 import logging
 import secrets
-from sqlalchemy import or_
+from sqlalchemy import or_, select
+from sqlalchemy.orm.exc import StaleDataError
 from app.services.sms_service import SMSService
 from werkzeug.utils import secure_filename
 from app.services.file_storage_service import FileStorageService
+from app.services.identity_cache import get_cached_user, get_assigned_property_ids
+from app.services.access_scope import get_access_scope
+from app.services.settings_cache import get_settings
+from app.services.read_replica import read_replica
+from app.services.room_import import RoomImporter, RoomImportError
+from app.services.ticket_routing import TicketRouter
+from app.services.commit_hooks import run_after_commit
+from app.services.background_tasks import notify_ticket_created_async, send_service_request_notification_async
+from app.services.bulk_create import BulkCreateService, BulkCreateError, parse_rows
+from app.services.bulk_update import BulkUpdateService, BulkUpdateError, parse_updates
+from app.services.property_deletion import (
+    active_deletion, start_property_deletion, deleting_response, deleting_property_ids, visible_property_clause, DELETING_STATUS
+)
+from app.services.idempotency import idempotent
+from app.services.concurrency import check_if_match, with_etag, stale_response, stale_rows_response
 import io
 import pytz
 from html import escape
@@ -25,7 +41,7 @@ def get_user_from_jwt():
     identity = get_jwt_identity()
     if not identity or 'user_id' not in identity:
         return None
-    return User.query.get(identity['user_id'])
+    return get_cached_user(identity['user_id'])
 
 def generate_password_reset_token():
     """Generate a secure token for password reset"""
@@ -56,7 +72,7 @@ def verify_token():
         if not identity or 'user_id' not in identity:
             return jsonify({"valid": False, "msg": "Invalid token format"}), 401
             
-        current_user = User.query.get(identity['user_id'])
+        current_user = get_cached_user(identity['user_id'])
         if not current_user:
             return jsonify({"valid": False, "msg": "User not found"}), 401
             
@@ -191,6 +207,7 @@ def login():
 
 @app.route('/tickets', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_ticket():
     try:
         data = request.get_json()
@@ -206,6 +223,10 @@ def create_ticket():
         if not current_user:
             return jsonify({'msg': 'User not found'}), 404
 
+        deleting = deleting_response(data['property_id'])
+        if deleting:
+            return deleting
+
         # Create new ticket
         new_ticket = Ticket(
             title=data['title'],
@@ -228,7 +249,8 @@ def create_ticket():
             insurance_claim_filed=data.get('insurance_claim_filed', False),
             claim_number=data.get('claim_number'),
             follow_up_required=data.get('follow_up_required', True),
-            follow_up_date=datetime.fromisoformat(data['follow_up_date']) if data.get('follow_up_date') else None
+            follow_up_date=datetime.fromisoformat(data['follow_up_date']) if data.get('follow_up_date') else None,
+            attachments=[]  # Nothing to lazy-load when the response is serialized
         )
 
         # If room_id is provided, validate it exists and belongs to the property
@@ -249,61 +271,17 @@ def create_ticket():
             elif room.status == 'Available':  # Only change if room is available
                 room.status = 'Out of Order'
 
+        # Route the ticket to the category's group manager, or the property's executive manager
+        category = data['category']
+        assigned_manager = TicketRouter([data['property_id']]).assignee(data['property_id'], category)
+
         try:
             db.session.add(new_ticket)
-            db.session.commit()
+            db.session.flush()  # Populates ticket_id for the task title
 
-            # Enhanced category to group mapping for task assignment
-            category = data['category']
-            
-            # Map category to group name
-            group_mapping = {
-                'Maintenance': 'Engineering',
-                'Housekeeping': 'Housekeeping',
-                'Front Desk': 'Front Desk',
-                'General': 'Front Desk',
-                'IT': 'IT',
-                'Security': 'Security',
-                'Food & Beverage': 'Food & Beverage',
-                'Accounting': 'Accounting',
-                'Incident Report': 'Management'  # Add incident report mapping
-                # Add more mappings as needed
-            }
-            
-            # Get the appropriate group for this category
-            assigned_group = group_mapping.get(category)
-            assigned_manager = None
-            
-            if assigned_group:
-                # First try to find a manager with the specific group for this property
-                assigned_manager = User.query.filter_by(
-                    group=assigned_group,
-                    is_active=True
-                ).join(PropertyManager).filter(
-                    PropertyManager.property_id == data['property_id']
-                ).first()
-                
-                # If no specific manager found, assign to Executive Manager
-                if not assigned_manager and category not in ['Maintenance', 'Housekeeping', 'Front Desk']:
-                    assigned_manager = User.query.filter_by(
-                        group='Executive',
-                        is_active=True
-                    ).join(PropertyManager).filter(
-                        PropertyManager.property_id == data['property_id']
-                    ).first()
-            
-            # If still no manager found, try to find any Executive Manager for this property
-            if not assigned_manager:
-                assigned_manager = User.query.filter_by(
-                    group='Executive',
-                    is_active=True
-                ).join(PropertyManager).filter(
-                    PropertyManager.property_id == data['property_id']
-                ).first()
-            
-            # Create and assign a task if we found a manager
+            history = [History.build('ticket', new_ticket.ticket_id, 'created', current_user.user_id)]
+            task = None
             if assigned_manager:
-                # Create and assign a task
                 task = Task(
                     title=f"Task for Ticket #{new_ticket.ticket_id}: {data['title']}",
                     description=f"Auto-generated task for ticket. Category: {category}\nDescription: {data['description']}",
@@ -313,73 +291,32 @@ def create_ticket():
                     assigned_to_id=assigned_manager.user_id
                 )
                 db.session.add(task)
-                db.session.flush()  # This will populate the task_id
-                
-                # Create task assignment
-                task_assignment = TaskAssignment(
+                db.session.flush()  # Populates task_id
+                db.session.add(TaskAssignment(
                     task_id=task.task_id,
                     ticket_id=new_ticket.ticket_id,
                     assigned_to_user_id=assigned_manager.user_id,
                     status='Pending'
-                )
-                db.session.add(task_assignment)
-                
-                # Log the assignment
-                app.logger.info(f"Auto-assigned task for ticket #{new_ticket.ticket_id} to {assigned_manager.username} (Group: {assigned_manager.group})")
-                
-                # Send email notification to the assigned manager
-                try:
-                    property_name = "Unknown Property"
-                    property_obj = Property.query.get(data['property_id'])
-                    if property_obj:
-                        property_name = property_obj.name
-                        
-                    from app.services.email_service import EmailService
-                    email_service = EmailService()
-                    email_service.send_task_assignment_notification(assigned_manager, task, property_name)
-                except Exception as e:
-                    app.logger.error(f"Failed to send task assignment email: {str(e)}")
-                
-                db.session.commit()
-
-            # Get property managers and super admins for notifications
-            property_managers = User.query.join(PropertyManager).filter(
-                PropertyManager.property_id == data['property_id'],
-                User.is_active == True
-            ).all()
-            super_admins = User.query.filter_by(role='super_admin').all()
-            
-            # Get general managers assigned to this property
-            general_managers = User.query.filter_by(
-                role='general_manager',
-                is_active=True
-            ).join(PropertyManager).filter(
-                PropertyManager.property_id == data['property_id']
-            ).all()
-            
-            # Combine recipients and remove duplicates
-            recipients = list(set(property_managers + general_managers + super_admins))
-            
-            # Get property name for notification
-            property_name = Property.query.get(data['property_id']).name
-
-            # Send notifications
-            from app.services.email_service import EmailService
-            email_service = EmailService()
-            notifications_sent = email_service.send_ticket_notification(
-                new_ticket,
-                property_name,
-                recipients,
-                notification_type="new"
-            )
-
+                ))
+                history += [
+                    History.build('task', task.task_id, 'created', current_user.user_id),
+                    History.build('task', task.task_id, 'assigned', current_user.user_id,
+                                  field_name='assigned_to', old_value='None', new_value=assigned_manager.username)
+                ]
+            db.session.add_all(history)
+
+            # Emails go out from a background thread once the ticket is committed
+            ticket_id, task_id = new_ticket.ticket_id, task.task_id if task else None
+            run_after_commit(lambda: notify_ticket_created_async(ticket_id, task_id))
             response_data = {
                 'msg': 'Ticket created successfully',
                 'ticket': new_ticket.to_dict(),
-                'notifications_sent': notifications_sent > 0
+                'notifications_sent': app.config.get('ENABLE_EMAIL_NOTIFICATIONS', True)
             }
-            
+            db.session.commit()
+
             if assigned_manager:
+                app.logger.info(f"Auto-assigned task for ticket #{ticket_id} to {assigned_manager.username} (Group: {assigned_manager.group})")
                 response_data['task_created'] = True
                 response_data['assigned_to'] = {
                     'user_id': assigned_manager.user_id,
@@ -387,31 +324,6 @@ def create_ticket():
                     'group': assigned_manager.group
                 }
 
-            # Record history for ticket creation
-            History.create_entry(
-                entity_type='ticket',
-                entity_id=new_ticket.ticket_id,
-                action='created',
-                user_id=current_user.user_id
-            )
-
-            
-            History.create_entry(
-                entity_type='task',
-                entity_id=task.task_id,
-                action='created',
-                user_id=current_user.user_id
-                )
-            History.create_entry(
-                entity_type='task',
-                entity_id=task.task_id,
-                action='assigned',
-                field_name='assigned_to',
-                old_value='None',
-                new_value=assigned_manager.username,
-                user_id=current_user.user_id
-                )
-
             return jsonify(response_data), 201
 
         except Exception as e:
@@ -423,6 +335,67 @@ def create_ticket():
         app.logger.error(f"Error in create_ticket: {str(e)}")
         return jsonify({'msg': 'Internal server error'}), 500
 
+def run_bulk_create(create):
+    """Shared body of the bulk creation endpoints; create names a BulkCreateService method"""
+    current_user = get_user_from_jwt()
+    if not current_user:
+        return jsonify({'msg': 'User not found'}), 404
+    if current_user.role not in ['super_admin', 'general_manager', 'manager']:
+        return jsonify({'msg': 'Unauthorized - Only managers can create items in bulk'}), 403
+
+    try:
+        if 'file' in request.files:
+            rows = parse_rows(stream=request.files['file'].stream)
+        else:
+            rows = parse_rows(payload=request.get_json(silent=True))
+        service = BulkCreateService(current_user, notify=request.args.get('notify', 'digest'))
+        result = getattr(service, create)(rows)
+    except BulkCreateError as e:
+        return jsonify({'msg': str(e)}), 400
+    except StaleDataError:
+        return stale_rows_response()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error in {create}: {str(e)}")
+        return jsonify({'msg': 'Failed to create items'}), 500
+
+    result['msg'] = f"{result['created']} created, {len(result['errors'])} rejected"
+    return jsonify(result), 201 if result['created'] else 400
+
+@app.route('/tickets/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_tickets():
+    """Create many tickets from a JSON array or CSV upload; ?notify=none skips the digest emails"""
+    return run_bulk_create('create_tickets')
+
+def run_bulk_update(update, id_field):
+    """Shared body of the bulk update endpoints; update names a BulkUpdateService method"""
+    current_user = get_user_from_jwt()
+    if not current_user:
+        return jsonify({'msg': 'User not found'}), 404
+
+    try:
+        updates = parse_updates(request.get_json(silent=True), id_field)
+        service = BulkUpdateService(current_user, notify=request.args.get('notify', 'digest'))
+        result = getattr(service, update)(updates)
+    except BulkUpdateError as e:
+        return jsonify({'msg': str(e)}), 400
+    except StaleDataError:
+        return stale_rows_response()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error in {update}: {str(e)}")
+        return jsonify({'msg': 'Failed to update items'}), 500
+
+    result['msg'] = f"{result['updated']} updated, {len(result['errors'])} rejected"
+    return jsonify(result), 400 if result['errors'] and len(result['errors']) == len(updates) else 200
+
+@app.route('/tickets/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update_tickets():
+    """Change status, priority or assignee of many tickets in one transaction"""
+    return run_bulk_update('update_tickets', 'ticket_id')
+
 @app.route('/tickets', methods=['GET'])
 @jwt_required()
 def get_tickets():
@@ -439,13 +412,11 @@ def get_tickets():
             app.logger.info(f"Super admin: Found {len(tickets)} tickets")
         elif current_user.role == 'manager':
             # Managers can see tickets from their properties
-            properties = Property.query.filter_by(manager_id=current_user.user_id).all()
-            property_ids = [p.property_id for p in properties]
-            tickets = Ticket.query.filter(Ticket.property_id.in_(property_ids)).all()
+            tickets = Ticket.query.filter(get_access_scope(current_user).filter_clause(Ticket.property_id)).all()
             app.logger.info(f"Manager: Found {len(tickets)} tickets")
         else:
             # Regular users can see tickets from their assigned properties
-            property_ids = [prop.property_id for prop in current_user.assigned_properties]
+            property_ids = get_assigned_property_ids(current_user)
             tickets = Ticket.query.filter(Ticket.property_id.in_(property_ids)).all()
             app.logger.info(f"User: Found {len(tickets)} tickets")
 
@@ -454,7 +425,7 @@ def get_tickets():
             creator = User.query.get(ticket.user_id)
             assigned_task = TaskAssignment.query.filter_by(ticket_id=ticket.ticket_id).first()
             assigned_user = None
-            if assigned_task:
+            if assigned_task and assigned_task.assigned_to_user_id:
                 assigned_user = User.query.get(assigned_task.assigned_to_user_id)
 
             ticket_data.append({
@@ -488,15 +459,15 @@ def get_properties():
         app.logger.info(f"Getting properties for user {current_user.username} with role {current_user.role}")
         
         if current_user.role == 'super_admin':
-            properties = Property.query.all()
+            properties = Property.query.filter(visible_property_clause()).all()
             app.logger.info(f"Super admin: Found {len(properties)} properties")
         elif current_user.role == 'manager':
             # Managers can see properties they manage
-            properties = current_user.managed_properties.all()
+            properties = current_user.managed_properties.filter(visible_property_clause()).all()
             app.logger.info(f"Manager: Found {len(properties)} properties")
         else:
             # Regular users can see properties they're assigned to
-            properties = current_user.assigned_properties.all()
+            properties = current_user.assigned_properties.filter(visible_property_clause()).all()
             app.logger.info(f"User: Found {len(properties)} properties")
             
         return jsonify([prop.to_dict() for prop in properties]), 200
@@ -541,6 +512,9 @@ def create_property():
         
         if has_attachments and subscription_plan != 'premium':
             return jsonify({"msg": "Attachments are only available with premium subscription"}), 400
+
+        if data.get('timezone') and data['timezone'] not in pytz.all_timezones_set:
+            return jsonify({"msg": "Invalid timezone"}), 400
             
         # Create new property
         new_property = Property(
@@ -551,7 +525,8 @@ def create_property():
             status=data.get('status', 'active'),
             description=data.get('description', ''),
             subscription_plan=subscription_plan,
-            has_attachments=has_attachments
+            has_attachments=has_attachments,
+            timezone=data.get('timezone') or None
         )
         
         db.session.add(new_property)
@@ -584,18 +559,7 @@ def get_property_rooms(property_id):
             return jsonify({"msg": "User not found"}), 404
 
         # Check if user has access to this property
-        if current_user.role == 'super_admin':
-            property = Property.query.get(property_id)
-        elif current_user.role == 'manager':
-            property = Property.query.filter(
-                Property.property_id == property_id,
-                Property.managers.any(user_id=current_user.user_id)
-            ).first()
-        else:
-            property = Property.query.join(UserProperty).filter(
-                Property.property_id == property_id,
-                UserProperty.user_id == current_user.user_id
-            ).first()
+        property = Property.query.get(property_id) if get_access_scope(current_user).can_access(property_id) else None
 
         if not property:
             app.logger.warning(f"User {current_user.user_id} attempted to access rooms for property {property_id}")
@@ -632,6 +596,10 @@ def create_property_room(property_id):
             app.logger.warning(f"Property {property_id} not found or access denied")
             return jsonify({"msg": "Property not found or access denied"}), 404
 
+        deleting = deleting_response(property_id)
+        if deleting:
+            return deleting
+
         data = request.get_json()
         app.logger.info(f"Received POST request to create room with data: {data}")
         
@@ -698,19 +666,7 @@ def manage_property_room(property_id, room_id):
             return jsonify({"msg": "User not found"}), 404
 
         # Check if user has permission to manage this property
-        if current_user.role == 'super_admin':
-            property = Property.query.get(property_id)
-        elif current_user.role in ['manager', 'general_manager']:
-            # Use the PropertyManager relationship to check if user manages this property
-            property = Property.query.filter(
-                Property.property_id == property_id,
-                Property.managers.any(user_id=current_user.user_id)
-            ).first()
-        else:
-            property = Property.query.join(UserProperty).filter(
-                Property.property_id == property_id,
-                UserProperty.user_id == current_user.user_id
-            ).first()
+        property = Property.query.get(property_id) if get_access_scope(current_user).can_write(property_id) else None
 
         if not property:
             app.logger.warning(f"Property {property_id} not found or access denied")
@@ -728,6 +684,10 @@ def manage_property_room(property_id, room_id):
             app.logger.warning(f"User {current_user.user_id} attempted to modify room without permission")
             return jsonify({"msg": "Unauthorized"}), 403
 
+        deleting = deleting_response(property_id)
+        if deleting:
+            return deleting
+
         if request.method == 'PUT':
             data = request.get_json()
             app.logger.info(f"Received PUT request for room {room_id} with data: {data}")
@@ -927,6 +887,10 @@ def assign_task():
         if not ticket or not user:
             return jsonify({'message': 'Invalid ticket or user ID'}), 404
 
+        deleting = deleting_response(ticket.property_id)
+        if deleting:
+            return deleting
+
         # Map ticket status to task status
         task_status = 'completed' if ticket.status == 'completed' else \
                      'in progress' if ticket.status == 'in progress' else \
@@ -1100,13 +1064,21 @@ def manage_task(task_id):
                     'ticket_status': ticket.status if ticket else task_assignment.status,
                     'ticket_priority': ticket.priority if ticket else None
                 })
-            return jsonify(task_data)
+            return with_etag(jsonify(task_data), task)
 
-        elif request.method in ['PUT', 'PATCH']:
+        deleting = deleting_response(task.property_id)
+        if deleting:
+            return deleting
+
+        if request.method in ['PUT', 'PATCH']:
             data = request.get_json()
             if not data:
                 return jsonify({'msg': 'No input data provided'}), 400
 
+            conflict = check_if_match(task)
+            if conflict:
+                return conflict
+
             app.logger.info(f"Updating task {task_id} with data: {data}")
 
             # Store old values for notification purposes
@@ -1119,7 +1091,7 @@ def manage_task(task_id):
                 old_value = task.title
                 task.title = data['title']
                 # Record history for title change
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1127,13 +1099,13 @@ def manage_task(task_id):
                     old_value=old_value,
                     new_value=data['title'],
                     user_id=current_user.user_id
-                )
+                ))
 
             if 'description' in data:
                 old_value = task.description
                 task.description = data['description']
                 # Record history for description change
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1141,13 +1113,13 @@ def manage_task(task_id):
                     old_value=old_value,
                     new_value=data['description'],
                     user_id=current_user.user_id
-                )
+                ))
 
             if 'status' in data:
                 old_value = task.status
                 task.status = data['status']
                 # Record history for status change
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1155,17 +1127,15 @@ def manage_task(task_id):
                     old_value=old_value,
                     new_value=data['status'],
                     user_id=current_user.user_id
-                )
-                db.session.commit()
+                ))
                 # If completed, record completion event
                 if data['status'] == 'completed' and old_value != 'completed':
-                    History.create_entry(
+                    db.session.add(History.build(
                         entity_type='task',
                         entity_id=task_id,
                         action='completed',
                         user_id=current_user.user_id
-                    )
-                    db.session.commit()
+                    ))
                 # Update associated task assignment and ticket
                 task_assignment = TaskAssignment.query.filter_by(task_id=task_id).first()
                 if task_assignment:
@@ -1176,13 +1146,12 @@ def manage_task(task_id):
                         if data['status'] == 'completed':
                             ticket.status = 'completed'
                             # Record ticket completion event
-                            History.create_entry(
+                            db.session.add(History.build(
                                 entity_type='ticket',
                                 entity_id=ticket.ticket_id,
                                 action='completed',
                                 user_id=current_user.user_id
-                            )
-                            db.session.commit()
+                            ))
                         elif data['status'] == 'in progress':
                             ticket.status = 'in progress'
                         elif data['status'] == 'pending':
@@ -1192,7 +1161,7 @@ def manage_task(task_id):
                 old_value = task.priority
                 task.priority = data['priority']
                 # Record history for priority change
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1200,7 +1169,7 @@ def manage_task(task_id):
                     old_value=old_value,
                     new_value=data['priority'],
                     user_id=current_user.user_id
-                )
+                ))
                 # Update associated ticket priority
                 task_assignment = TaskAssignment.query.filter_by(task_id=task_id).first()
                 if task_assignment:
@@ -1214,7 +1183,7 @@ def manage_task(task_id):
                 # Record history for assignee change
                 old_user = User.query.get(old_value) if old_value else None
                 new_user = User.query.get(data['assigned_to_id']) if data['assigned_to_id'] else None
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1222,7 +1191,7 @@ def manage_task(task_id):
                     old_value=old_user.username if old_user else 'None',
                     new_value=new_user.username if new_user else 'None',
                     user_id=current_user.user_id
-                )
+                ))
                 # Update task assignment if exists
                 task_assignment = TaskAssignment.query.filter_by(task_id=task_id).first()
                 if task_assignment:
@@ -1233,7 +1202,7 @@ def manage_task(task_id):
                 new_value = data['due_date'] if data['due_date'] else 'None'
                 task.due_date = datetime.strptime(data['due_date'], '%Y-%m-%dT%H:%M:%S.%fZ') if data['due_date'] else None
                 # Record history for due date change
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1241,14 +1210,14 @@ def manage_task(task_id):
                     old_value=old_value,
                     new_value=new_value,
                     user_id=current_user.user_id
-                )
+                ))
 
             if 'time_spent' in data:
                 old_value = str(task.time_spent) if task.time_spent is not None else 'None'
                 new_value = str(data['time_spent']) if data.get('time_spent') is not None else 'None'
                 task.time_spent = float(data['time_spent']) if data.get('time_spent') else None
                 # Record history for time spent change
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1256,14 +1225,14 @@ def manage_task(task_id):
                     old_value=old_value,
                     new_value=new_value,
                     user_id=current_user.user_id
-                )
+                ))
 
             if 'cost' in data:
                 old_value = str(task.cost) if task.cost is not None else 'None'
                 new_value = str(data['cost']) if data.get('cost') is not None else 'None'
                 task.cost = float(data['cost']) if data.get('cost') else None
                 # Record history for cost change
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1271,7 +1240,7 @@ def manage_task(task_id):
                     old_value=old_value,
                     new_value=new_value,
                     user_id=current_user.user_id
-                )
+                ))
 
             # Handle ticket_id changes
             if 'ticket_id' in data:
@@ -1283,7 +1252,7 @@ def manage_task(task_id):
                 # Record history for ticket association change
                 old_ticket = Ticket.query.get(old_ticket_id) if old_ticket_id else None
                 new_ticket = Ticket.query.get(new_ticket_id) if new_ticket_id else None
-                History.create_entry(
+                db.session.add(History.build(
                     entity_type='task',
                     entity_id=task_id,
                     action='updated',
@@ -1291,7 +1260,7 @@ def manage_task(task_id):
                     old_value=f"Ticket #{old_ticket_id}" if old_ticket_id else 'None',
                     new_value=f"Ticket #{new_ticket_id}" if new_ticket_id else 'None',
                     user_id=current_user.user_id
-                )
+                ))
                 
                 # If there's a new ticket_id
                 if data['ticket_id']:
@@ -1375,12 +1344,14 @@ def manage_task(task_id):
                     task_data['ticket_id'] = task_assignment.ticket_id
                     task_data['ticket_status'] = task_assignment.status
 
-                return jsonify({
+                return with_etag(jsonify({
                     'msg': 'Task updated successfully',
                     'task': task_data,
                     'notifications_sent': notifications_sent
-                })
+                }), task)
 
+            except StaleDataError:
+                return stale_response(task)
             except Exception as e:
                 db.session.rollback()
                 app.logger.error(f"Database error while updating task: {str(e)}")
@@ -1407,6 +1378,8 @@ def manage_task(task_id):
             db.session.commit()
             return jsonify({'msg': 'Task deleted successfully'})
 
+    except StaleDataError:
+        return stale_response(task)
     except Exception as e:
         app.logger.error(f"Error in manage_task endpoint: {str(e)}")
         db.session.rollback()
@@ -1423,14 +1396,8 @@ def get_property_tasks(property_id):
             return jsonify({"msg": "User not found"}), 404
 
         # Verify access to property
-        if current_user.role == 'user':
-            has_access = any(p.property_id == property_id for p in current_user.assigned_properties)
-            if not has_access:
-                return jsonify({'msg': 'Unauthorized access to property'}), 403
-        elif current_user.role == 'manager':
-            has_access = any(p.property_id == property_id for p in current_user.managed_properties)
-            if not has_access:
-                return jsonify({'msg': 'Unauthorized access to property'}), 403
+        if not get_access_scope(current_user).can_access(property_id):
+            return jsonify({'msg': 'Unauthorized access to property'}), 403
 
         # 1. Get tasks based on user role and property
         tasks_query = Task.query.filter_by(property_id=property_id)
@@ -1520,6 +1487,10 @@ def create_task():
         if not all(field in data for field in required_fields):
             return jsonify({'msg': 'Missing required fields'}), 400
 
+        deleting = deleting_response(data['property_id'])
+        if deleting:
+            return deleting
+
         # Create the task
         task = Task(
             title=data['title'],
@@ -1600,6 +1571,18 @@ def create_task():
         app.logger.error(f"Error creating task: {str(e)}")
         return jsonify({'msg': f'Error creating task: {str(e)}'}), 500
 
+@app.route('/tasks/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_tasks():
+    """Create many tasks from a JSON array or CSV upload; ?notify=none skips the digest emails"""
+    return run_bulk_create('create_tasks')
+
+@app.route('/tasks/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update_tasks():
+    """Change status, priority or assignee of many tasks in one transaction"""
+    return run_bulk_update('update_tasks', 'task_id')
+
 @app.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
@@ -1984,16 +1967,13 @@ def manage_user(user_id):
 @app.route('/properties', methods=['GET', 'POST'])
 @jwt_required()
 def properties():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_user_from_jwt()
+    if not current_user:
+        return jsonify({'message': 'User not found'}), 404
 
     if request.method == 'GET':
-        if current_user.role == 'super_admin':
-            properties = Property.query.all()
-        elif current_user.role == 'manager':
-            properties = Property.query.filter(Property.managers.any(user_id=current_user_id)).all()
-        else:
-            properties = current_user.assigned_properties
+        scope = get_access_scope(current_user)
+        properties = Property.query.filter(scope.filter_clause(Property.property_id), visible_property_clause()).all()
 
         return jsonify({
             'properties': [{
@@ -2023,6 +2003,21 @@ def properties():
         db.session.commit()
         return jsonify({'message': 'Property created successfully', 'property_id': new_property.property_id}), 201
 
+@app.route('/properties/<int:property_id>/deletion', methods=['GET'])
+@jwt_required()
+def get_property_deletion(property_id):
+    """Progress of the latest deletion job for a property, which may already be gone"""
+    current_user = get_user_from_jwt()
+    if not current_user:
+        return jsonify({'message': 'User not found'}), 404
+
+    deletion = PropertyDeletion.query.filter_by(property_id=property_id).order_by(PropertyDeletion.deletion_id.desc()).first()
+    if not deletion:
+        return jsonify({'message': 'No deletion found for this property'}), 404
+    if current_user.role != 'super_admin' and deletion.requested_by_id != current_user.user_id:
+        return jsonify({'message': 'Unauthorized'}), 403
+    return jsonify({'deletion': deletion.to_dict()})
+
 @app.route('/properties/<int:property_id>', methods=['GET', 'PUT', 'DELETE', 'PATCH'])
 @jwt_required()
 def manage_property(property_id):
@@ -2044,6 +2039,12 @@ def manage_property(property_id):
         if current_user.role in ['manager', 'general_manager'] and not any(m.user_id == current_user.user_id for m in property.managers):
             return jsonify({'message': 'Unauthorized - You can only modify properties you manage'}), 403
 
+        # Edits could take the property back out of 'deleting' while its rows are removed
+        if request.method in ['PUT', 'PATCH']:
+            deleting = deleting_response(property_id)
+            if deleting:
+                return deleting
+
         if request.method == 'PUT':
             data = request.get_json()
             if not data:
@@ -2056,8 +2057,11 @@ def manage_property(property_id):
             if has_attachments and subscription_plan != 'premium':
                 return jsonify({"msg": "Attachments are only available with premium subscription"}), 400
 
+            if data.get('timezone') and data['timezone'] not in pytz.all_timezones_set:
+                return jsonify({"msg": "Invalid timezone"}), 400
+
             # Update allowed fields
-            allowed_fields = ['name', 'address', 'type', 'status', 'description', 'subscription_plan', 'has_attachments', 'hotel_code']
+            allowed_fields = ['name', 'address', 'type', 'status', 'description', 'subscription_plan', 'has_attachments', 'hotel_code', 'timezone']
             for field in allowed_fields:
                 if field in data:
                     setattr(property, field, data[field])
@@ -2072,56 +2076,26 @@ def manage_property(property_id):
 
         elif request.method == 'DELETE':
             try:
-                # Get all rooms for this property
-                rooms = Room.query.filter_by(property_id=property_id).all()
-                room_ids = [room.room_id for room in rooms]
-
-                # Get all tickets for this property
-                tickets = Ticket.query.filter_by(property_id=property_id).all()
-                ticket_ids = [ticket.ticket_id for ticket in tickets]
-
-                # Get all tasks for this property
-                tasks = Task.query.filter_by(property_id=property_id).all()
-                task_ids = [task.task_id for task in tasks]
-
-                # Delete service requests first
-                ServiceRequest.query.filter_by(property_id=property_id).delete(synchronize_session=False)
-
-                # Delete task assignments
-                if task_ids or ticket_ids:
-                    TaskAssignment.query.filter(
-                        db.or_(
-                            TaskAssignment.task_id.in_(task_ids) if task_ids else False,
-                            TaskAssignment.ticket_id.in_(ticket_ids) if ticket_ids else False
-                        )
-                    ).delete(synchronize_session=False)
-
-                # Delete tasks
-                if task_ids:
-                    Task.query.filter(Task.task_id.in_(task_ids)).delete(synchronize_session=False)
-
-                # Delete tickets
-                if ticket_ids:
-                    Ticket.query.filter(Ticket.ticket_id.in_(ticket_ids)).delete(synchronize_session=False)
-
-                # Delete rooms
-                if room_ids:
-                    Room.query.filter(Room.room_id.in_(room_ids)).delete(synchronize_session=False)
-
-                # Delete property manager assignments
-                PropertyManager.query.filter_by(property_id=property_id).delete(synchronize_session=False)
+                # Deletion runs in the background; a second request reports the job already running
+                deletion = active_deletion(property_id)
+                if deletion:
+                    return jsonify({'message': 'Property deletion already in progress', 'deletion': deletion.to_dict()}), 202
 
-                # Delete user property assignments
-                UserProperty.query.filter_by(property_id=property_id).delete(synchronize_session=False)
+                deletion = PropertyDeletion(
+                    property_id=property_id,
+                    property_name=property.name,
+                    requested_by_id=current_user.user_id
+                )
+                property.status = DELETING_STATUS
+                db.session.add(deletion)
+                db.session.flush()
 
-                # Finally delete the property
-                db.session.delete(property)
-                
-                # Commit all changes
+                deletion_id = deletion.deletion_id
+                run_after_commit(lambda: start_property_deletion(deletion_id))
                 db.session.commit()
 
-                app.logger.info(f"Property {property_id} and all associated data deleted successfully")
-                return jsonify({'message': 'Property and all associated data deleted successfully'})
+                app.logger.info(f"Property {property_id} deletion {deletion_id} started by {current_user.username}")
+                return jsonify({'message': 'Property deletion started', 'deletion': deletion.to_dict()}), 202
 
             except Exception as e:
                 db.session.rollback()
@@ -2139,8 +2113,11 @@ def manage_property(property_id):
             if has_attachments and subscription_plan != 'premium':
                 return jsonify({"msg": "Attachments are only available with premium subscription"}), 400
 
+            if data.get('timezone') and data['timezone'] not in pytz.all_timezones_set:
+                return jsonify({"msg": "Invalid timezone"}), 400
+
             # Update property fields
-            for field in ['name', 'address', 'status', 'description', 'subscription_plan', 'has_attachments', 'hotel_code']:
+            for field in ['name', 'address', 'status', 'description', 'subscription_plan', 'has_attachments', 'hotel_code', 'timezone']:
                 if field in data:
                     setattr(property, field, data[field])
 
@@ -2179,16 +2156,13 @@ def manage_property(property_id):
 @app.route('/rooms', methods=['GET', 'POST'])
 @jwt_required()
 def rooms():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_user_from_jwt()
+    if not current_user:
+        return jsonify({'message': 'User not found'}), 404
 
     if request.method == 'GET':
-        if current_user.role == 'super_admin':
-            rooms = Room.query.all()
-        elif current_user.role == 'manager':
-            rooms = Room.query.join(Property).filter(Property.managers.any(user_id=current_user_id)).all()
-        else:
-            rooms = Room.query.filter(Room.property_id.in_([p.property_id for p in current_user.assigned_properties])).all()
+        scope = get_access_scope(current_user)
+        rooms = Room.query.filter(scope.filter_clause(Room.property_id), Room.property_id.notin_(deleting_property_ids())).all()
 
         return jsonify({
             'rooms': [{
@@ -2203,6 +2177,10 @@ def rooms():
             return jsonify({'message': 'Unauthorized'}), 403
 
         data = request.get_json()
+        deleting = deleting_response(data['property_id'])
+        if deleting:
+            return deleting
+
         new_room = Room(
             name=data['name'],
             property_id=data['property_id']
@@ -2228,6 +2206,10 @@ def manage_room(room_id):
     if current_user.role not in ['super_admin', 'manager']:
         return jsonify({'message': 'Unauthorized'}), 403
 
+    deleting = deleting_response(room.property_id)
+    if deleting:
+        return deleting
+
     if request.method == 'PUT':
         data = request.get_json()
         old_status = room.status
@@ -2273,6 +2255,7 @@ def manage_room(room_id):
 
 @app.route('/reports/properties', methods=['GET'])
 @jwt_required()
+@read_replica
 def property_report():
     properties = Property.query.all()
     property_data = [{
@@ -2287,6 +2270,7 @@ def property_report():
 
 @app.route('/reports/tasks', methods=['GET'])
 @jwt_required()
+@read_replica
 def task_report():
     tasks = TaskAssignment.query.all()
     task_data = []
@@ -2330,6 +2314,7 @@ def task_report():
 
 @app.route('/reports/tickets', methods=['GET'])
 @jwt_required()
+@read_replica
 def ticket_report():
     tickets = Ticket.query.all()
     ticket_data = []
@@ -2581,14 +2566,8 @@ def get_property_tickets(property_id):
             return jsonify({"msg": "User not found"}), 404
 
         # Verify access to property
-        if current_user.role == 'user':
-            has_access = any(p.property_id == property_id for p in current_user.assigned_properties)
-            if not has_access:
-                return jsonify({'msg': 'Unauthorized access to property'}), 403
-        elif current_user.role == 'manager':
-            has_access = any(p.property_id == property_id for p in current_user.managed_properties)
-            if not has_access:
-                return jsonify({'msg': 'Unauthorized access to property'}), 403
+        if not get_access_scope(current_user).can_access(property_id):
+            return jsonify({'msg': 'Unauthorized access to property'}), 403
 
         # Get tickets for the property
         tickets = Ticket.query.filter_by(property_id=property_id).all()
@@ -2747,6 +2726,7 @@ def admin_change_password(user_id):
 @app.route('/statistics', methods=['GET'])
 @jwt_required()
 @handle_errors
+@read_replica
 def get_statistics():
     current_user = get_jwt_identity()
     if current_user['role'] != 'super_admin':
@@ -2838,6 +2818,7 @@ def calculate_statistics(tickets, tasks):
 @app.route('/dashboard/stats', methods=['GET'])
 @jwt_required()
 @handle_errors
+@read_replica
 def get_dashboard_stats():
     try:
         current_user = get_jwt_identity()
@@ -2984,7 +2965,7 @@ def get_system_settings():
         if not current_user or current_user.role != 'super_admin':
             return jsonify({'error': 'Unauthorized - Only super admins can view system settings'}), 403
 
-        settings = EmailSettings.query.first()
+        settings = get_settings(EmailSettings)
         if not settings:
             return jsonify({
                 'smtp_server': os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
@@ -3074,8 +3055,7 @@ def delete_ticket(ticket_id):
             return jsonify({"msg": "Unauthorized - You can only delete your own tickets"}), 403
         elif current_user.role == 'manager':
             # Managers can only delete tickets from their properties
-            has_access = any(p.property_id == ticket.property_id for p in current_user.managed_properties)
-            if not has_access:
+            if not get_access_scope(current_user).can_write(ticket.property_id):
                 return jsonify({"msg": "Unauthorized - You can only delete tickets from your managed properties"}), 403
 
         # Delete associated task assignments first
@@ -3135,12 +3115,20 @@ def manage_ticket(ticket_id):
             return jsonify({'msg': 'User not found'}), 404
 
         if request.method == 'GET':
-            return jsonify(ticket.to_dict()), 200
+            return with_etag(jsonify(ticket.to_dict()), ticket)
 
-        elif request.method == 'PATCH':
+        deleting = deleting_response(ticket.property_id)
+        if deleting:
+            return deleting
+
+        if request.method == 'PATCH':
             data = request.get_json()
             changes = []  # Track changes for notification
 
+            conflict = check_if_match(ticket)
+            if conflict:
+                return conflict
+
             # Update basic fields if provided
             for field in ['title', 'description', 'category', 'subcategory']:
                 if field in data:
@@ -3150,7 +3138,7 @@ def manage_ticket(ticket_id):
                         setattr(ticket, field, new_value)
                         changes.append(f"{field.title()}: {old_value} → {new_value}")
                         # Record history for each field change
-                        History.create_entry(
+                        db.session.add(History.build(
                             entity_type='ticket',
                             entity_id=ticket_id,
                             action='updated',
@@ -3158,8 +3146,7 @@ def manage_ticket(ticket_id):
                             old_value=str(old_value),
                             new_value=str(new_value),
                             user_id=current_user.user_id
-                        )
-                        db.session.commit()
+                        ))
 
             # Handle status and priority updates with task synchronization
             if 'status' in data:
@@ -3169,7 +3156,7 @@ def manage_ticket(ticket_id):
                     ticket.status = new_status
                     changes.append(f"Status: {old_status} → {new_status}")
                     # Record history for status change
-                    History.create_entry(
+                    db.session.add(History.build(
                         entity_type='ticket',
                         entity_id=ticket_id,
                         action='updated',
@@ -3177,17 +3164,15 @@ def manage_ticket(ticket_id):
                         old_value=old_status,
                         new_value=new_status,
                         user_id=current_user.user_id
-                    )
-                    db.session.commit()
+                    ))
                     # If completed, record completion event and check room status
                     if new_status == 'completed':
-                        History.create_entry(
+                        db.session.add(History.build(
                             entity_type='ticket',
                             entity_id=ticket_id,
                             action='completed',
                             user_id=current_user.user_id
-                        )
-                        db.session.commit()
+                        ))
                         
                         # Check if room should be updated to Available
                         if ticket.room_id:
@@ -3214,13 +3199,12 @@ def manage_ticket(ticket_id):
                             if new_status == 'completed':
                                 task.status = 'completed'
                                 # Record task completion event
-                                History.create_entry(
+                                db.session.add(History.build(
                                     entity_type='task',
                                     entity_id=task.task_id,
                                     action='completed',
                                     user_id=current_user.user_id
-                                )
-                                db.session.commit()
+                                ))
                             elif new_status == 'in progress':
                                 task.status = 'in progress'
                             elif new_status == 'open':
@@ -3234,7 +3218,7 @@ def manage_ticket(ticket_id):
                     ticket.priority = new_priority
                     changes.append(f"Priority: {old_priority} → {new_priority}")
                     # Record history for priority change
-                    History.create_entry(
+                    db.session.add(History.build(
                         entity_type='ticket',
                         entity_id=ticket_id,
                         action='updated',
@@ -3242,7 +3226,7 @@ def manage_ticket(ticket_id):
                         old_value=old_priority,
                         new_value=new_priority,
                         user_id=current_user.user_id
-                    )
+                    ))
                     
                     # Update associated task priority
                     task_assignment = TaskAssignment.query.filter_by(ticket_id=ticket_id).first()
@@ -3275,7 +3259,7 @@ def manage_ticket(ticket_id):
                     ticket.room_id = data['room_id']
                     changes.append(f"Room: {old_room.name if old_room else 'None'} → {new_room.name if new_room else 'None'}")
                     # Record history for room change
-                    History.create_entry(
+                    db.session.add(History.build(
                         entity_type='ticket',
                         entity_id=ticket_id,
                         action='updated',
@@ -3283,7 +3267,7 @@ def manage_ticket(ticket_id):
                         old_value=old_room_name,
                         new_value=new_room_name,
                         user_id=current_user.user_id
-                    )
+                    ))
 
             # Handle incident report fields
             incident_fields = [
@@ -3308,7 +3292,7 @@ def manage_ticket(ticket_id):
                         setattr(ticket, field, new_value)
                         changes.append(f"{field.replace('_', ' ').title()}: {old_value} → {new_value}")
                         # Record history for each field change
-                        History.create_entry(
+                        db.session.add(History.build(
                             entity_type='ticket',
                             entity_id=ticket_id,
                             action='updated',
@@ -3316,7 +3300,7 @@ def manage_ticket(ticket_id):
                             old_value=str(old_value),
                             new_value=str(new_value),
                             user_id=current_user.user_id
-                        )
+                        ))
 
             try:
                 db.session.commit()
@@ -3358,12 +3342,14 @@ def manage_ticket(ticket_id):
                         updated_by=updated_by
                     )
 
-                return jsonify({
+                return with_etag(jsonify({
                     'msg': 'Ticket updated successfully',
                     'ticket': ticket.to_dict(),
                     'changes': changes
-                }), 200
+                }), ticket)
 
+            except StaleDataError:
+                return stale_response(ticket)
             except Exception as e:
                 db.session.rollback()
                 app.logger.error(f"Error updating ticket: {str(e)}")
@@ -3440,6 +3426,8 @@ def manage_ticket(ticket_id):
                 app.logger.error(f"Error deleting ticket: {str(e)}")
                 return jsonify({'msg': 'Failed to delete ticket'}), 500
 
+    except StaleDataError:
+        return stale_response(ticket)
     except Exception as e:
         app.logger.error(f"Error in manage_ticket: {str(e)}")
         return jsonify({'msg': 'Internal server error'}), 500
@@ -3462,6 +3450,10 @@ def upload_rooms(property_id):
         if current_user.role not in ['manager', 'general_manager', 'super_admin']:
             return jsonify({"msg": "Unauthorized - Only managers and general managers can upload rooms"}), 403
 
+        deleting = deleting_response(property_id)
+        if deleting:
+            return deleting
+
         # Get the uploaded file
         if 'file' not in request.files:
             return jsonify({"msg": "No file part in the request"}), 400
@@ -3473,102 +3465,18 @@ def upload_rooms(property_id):
         if not file.filename.endswith('.csv'):
             return jsonify({"msg": "Only CSV files are allowed"}), 400
 
-        # Create a temporary file to store the uploaded CSV
-        import tempfile
-        import csv
-        import os
-        
-        temp_file = tempfile.NamedTemporaryFile(delete=False)
-        file.save(temp_file.name)
-        temp_file.close()
-        
-        # Process the CSV file
-        rooms_added = 0
-        rooms_updated = 0
-        errors = []
-        
+        # Stream the upload straight into the importer
         try:
-            with open(temp_file.name, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                
-                # Validate headers
-                required_headers = ['name', 'type', 'floor', 'status']
-                if not all(header in reader.fieldnames for header in required_headers):
-                    return jsonify({
-                        "msg": "Invalid CSV format. Required headers: name, type, floor, status"
-                    }), 400
-                
-                # Process each row
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 to account for header row
-                    try:
-                        # Check for required fields
-                        if not row['name'] or not row['type'] or not row['floor'] or not row['status']:
-                            errors.append(f"Row {row_num}: Missing required fields")
-                            continue
-                            
-                        # Validate status
-                        valid_statuses = ['Available', 'Occupied', 'Maintenance', 'Cleaning']
-                        if row['status'] not in valid_statuses:
-                            errors.append(f"Row {row_num}: Invalid status '{row['status']}'. Must be one of: {', '.join(valid_statuses)}")
-                            continue
-                        
-                        # Convert data types
-                        try:
-                            floor = int(row['floor'])
-                        except ValueError:
-                            errors.append(f"Row {row_num}: Floor must be a number")
-                            continue
-                            
-                        # Convert capacity to integer if provided
-                        capacity = None
-                        if row.get('capacity') and row['capacity'].strip():
-                            try:
-                                capacity = int(row['capacity'])
-                            except ValueError:
-                                errors.append(f"Row {row_num}: Capacity must be a number")
-                                continue
-                            
-                        # Check if room already exists (by name and property_id)
-                        existing_room = Room.query.filter_by(
-                            name=row['name'],
-                            property_id=property_id
-                        ).first()
-                        
-                        if existing_room:
-                            # Update existing room
-                            existing_room.type = row['type']
-                            existing_room.floor = floor
-                            existing_room.status = row['status']
-                            existing_room.capacity = capacity
-                            existing_room.description = row.get('description', None)
-                            rooms_updated += 1
-                        else:
-                            # Create new room
-                            new_room = Room(
-                                name=row['name'],
-                                type=row['type'],
-                                floor=floor,
-                                status=row['status'],
-                                capacity=capacity,
-                                description=row.get('description', None),
-                                property_id=property_id
-                            )
-                            db.session.add(new_room)
-                            rooms_added += 1
-                            
-                    except Exception as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
-                        
-                # Commit changes
-                db.session.commit()
-                
+            summary = RoomImporter(property_id).import_stream(file.stream)
+        except RoomImportError as e:
+            return jsonify({"msg": str(e)}), 400
         except Exception as e:
             db.session.rollback()
             app.logger.error(f"Error processing CSV: {str(e)}")
             return jsonify({"msg": f"Error processing CSV: {str(e)}"}), 500
-        finally:
-            # Clean up the temporary file
-            os.unlink(temp_file.name)
+        rooms_added = summary['rooms_added']
+        rooms_updated = summary['rooms_updated']
+        errors = [f"Row {row_num}: {message}" for row_num, message in summary['errors']]
             
         # Return results
         result = {
@@ -3579,6 +3487,7 @@ def upload_rooms(property_id):
         
         if errors:
             result["errors"] = errors
+            result["row_errors"] = [{"row": row_num, "error": message} for row_num, message in summary['errors']]
             result["msg"] += f" {len(errors)} errors encountered."
             
         return jsonify(result), 200
@@ -3779,6 +3688,7 @@ def test_all_emails():
 
 @app.route('/service-requests', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_service_request():
     try:
         current_user = get_user_from_jwt()
@@ -3802,6 +3712,10 @@ def create_service_request():
         if not room:
             return jsonify({'msg': 'Invalid room_id or room does not belong to the property'}), 400
 
+        deleting = deleting_response(room.property_id)
+        if deleting:
+            return deleting
+
         # Create new service request
         new_request = ServiceRequest(
             room_id=data['room_id'],
@@ -3815,16 +3729,9 @@ def create_service_request():
             created_by_id=current_user.user_id
         )
         
-        db.session.add(new_request)
-        db.session.flush()  # Get the request ID
-
-        # Record history for service request creation
-        History.create_entry(
-            entity_type='service_request',
-            entity_id=new_request.request_id,
-            action='created',
-            user_id=current_user.user_id
-        )
+        # The whole group is texted, but a task holds a single assignment, so it goes to the
+        # group member with the least open work
+        assignee = TicketRouter([data['property_id']]).group_assignee(data['property_id'], data['request_group'])
 
         # Create a task for the request
         task = Task(
@@ -3832,58 +3739,46 @@ def create_service_request():
             description=f"Priority: {data['priority']}\nGuest: {data.get('guest_name', 'N/A')}\nNotes: {data.get('notes', 'N/A')}",
             status='pending',
             priority=data['priority'],
-            property_id=data['property_id']
-        )
-        
-        db.session.add(task)
-        db.session.flush()  # Get the task ID
-        
-        # Record history for task creation
-        History.create_entry(
-            entity_type='task',
-            entity_id=task.task_id,
-            action='created',
-            user_id=current_user.user_id
+            property_id=data['property_id'],
+            assigned_to_id=assignee.user_id if assignee else None
         )
-        # Link task to request
-        new_request.assigned_task_id = task.task_id
-        
-        # Find all staff members in the request group
-        staff_members = User.query.filter_by(
-            group=data['request_group'],
-            is_active=True
-        ).join(PropertyManager).filter(
-            PropertyManager.property_id == data['property_id']
+        new_request.assigned_task = task
+        db.session.add_all([task, new_request])
+        db.session.flush()  # Get the task and request IDs
+
+        staff_members = db.session.execute(
+            select(User.phone)
+            .join(PropertyManager, PropertyManager.user_id == User.user_id)
+            .where(
+                User.group == data['request_group'],
+                User.is_active == True,
+                PropertyManager.property_id == data['property_id'],
+                User.phone.isnot(None),
+                User.phone != ''
+            )
         ).all()
 
+        history = [
+            History.build('service_request', new_request.request_id, 'created', current_user.user_id),
+            History.build('task', task.task_id, 'created', current_user.user_id)
+        ]
+        if assignee:
+            # Use request_id as ticket_id
+            db.session.add(TaskAssignment(
+                task_id=task.task_id,
+                ticket_id=new_request.request_id,
+                is_service_request=True,
+                assigned_to_user_id=assignee.user_id,
+                status='Pending'
+            ))
+            history.append(History.build('task', task.task_id, 'assigned', current_user.user_id,
+                                         field_name='assigned_to', old_value='None', new_value=assignee.username))
+        db.session.add_all(history)
+
+        # Text the group from a background thread once the request is committed
         if staff_members:
-            # Create task assignments for all staff members using request_id as ticket_id
-            for staff in staff_members:
-                task_assignment = TaskAssignment(
-                    task_id=task.task_id,
-                    ticket_id=new_request.request_id,  # Use request_id as ticket_id
-                    is_service_request=True,
-                    assigned_to_user_id=staff.user_id,
-                    status='Pending'
-                )
-                db.session.add(task_assignment)
-
-                # Record history for task assignment
-                History.create_entry(
-                    entity_type='task',
-                    entity_id=task.task_id,
-                    action='assigned',
-                    user_id=current_user.user_id
-                )
-
-                # Send SMS notification if staff has phone number
-                if staff.phone:
-                    sms_service = SMSService()
-                    sms_service.send_housekeeping_request_notification(
-                        room.name,
-                        f"{data['request_group']} - {data['request_type']}",
-                        staff.phone
-                    )
+            room_name, request_details = room.name, f"{data['request_group']} - {data['request_type']}"
+            run_after_commit(lambda: send_service_request_notification_async(staff_members, room_name, request_details))
 
         try:
             db.session.commit()
@@ -3930,15 +3825,11 @@ def get_service_requests():
             # Users see requests for their group and property
             query = query.filter(
                 (ServiceRequest.request_group == current_user.group) &
-                (ServiceRequest.property_id.in_([p.property_id for p in current_user.assigned_properties]))
+                get_access_scope(current_user).filter_clause(ServiceRequest.property_id)
             )
         elif current_user.role == 'manager':
             # Managers see requests for their managed properties
-            managed_properties = PropertyManager.query.filter_by(
-                user_id=current_user.user_id
-            ).with_entities(PropertyManager.property_id).all()
-            managed_property_ids = [p[0] for p in managed_properties]
-            query = query.filter(ServiceRequest.property_id.in_(managed_property_ids))
+            query = query.filter(get_access_scope(current_user).filter_clause(ServiceRequest.property_id))
 
         # Execute query
         requests = query.order_by(ServiceRequest.created_at.desc()).all()
@@ -3962,6 +3853,14 @@ def update_service_request(request_id):
         service_request = ServiceRequest.query.get_or_404(request_id)
         data = request.get_json()
 
+        deleting = deleting_response(service_request.property_id)
+        if deleting:
+            return deleting
+
+        conflict = check_if_match(service_request)
+        if conflict:
+            return conflict
+
         # Update status if provided
         if 'status' in data:
             old_status = service_request.status
@@ -4002,21 +3901,22 @@ def update_service_request(request_id):
             if field in data:
                 setattr(service_request, field, data[field])
 
-        db.session.commit()
-
         # Record history for service request update
-        History.create_entry(
+        db.session.add(History.build(
             entity_type='service_request',
             entity_id=service_request.request_id,
             action='updated',
             user_id=current_user.user_id
-        )   
-        
-        return jsonify({
+        ))
+        db.session.commit()
+
+        return with_etag(jsonify({
             'msg': 'Service request updated successfully',
             'request': service_request.to_dict()
-        }), 200
+        }), service_request)
 
+    except StaleDataError:
+        return stale_response(service_request)
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error updating service request: {str(e)}")
@@ -4901,6 +4801,10 @@ def upload_ticket_attachment(ticket_id):
         if current_user.role == 'user' and ticket.user_id != current_user.user_id:
             return jsonify({'msg': 'Unauthorized - You can only upload attachments to your own tickets'}), 403
 
+        deleting = deleting_response(ticket.property_id)
+        if deleting:
+            return deleting
+
         # Check if file was uploaded
         if 'file' not in request.files:
             return jsonify({'msg': 'No file uploaded'}), 400
@@ -5116,7 +5020,7 @@ def get_sms_settings():
     """Get SMS settings from database"""
     try:
         # Get the first SMS settings record (there should be only one)
-        sms_settings = SMSSettings.query.first()
+        sms_settings = get_settings(SMSSettings)
         
         # If no settings exist yet, return empty settings
         if not sms_settings:
@@ -5178,7 +5082,7 @@ def test_sms():
             return jsonify({"message": "Phone number is required"}), 400
             
         # Get SMS settings
-        sms_settings = SMSSettings.query.first()
+        sms_settings = get_settings(SMSSettings)
         if not sms_settings:
             return jsonify({"message": "SMS settings not configured"}), 400
             
@@ -5213,7 +5117,7 @@ def test_all_sms():
     """Run comprehensive tests on SMS configuration"""
     try:
         # Get SMS settings
-        sms_settings = SMSSettings.query.first()
+        sms_settings = get_settings(SMSSettings)
         if not sms_settings:
             return jsonify({"message": "SMS settings not configured", "results": []}), 400
         
@@ -5311,7 +5215,7 @@ def get_attachment_settings():
         if current_user.role != 'super_admin':
             return jsonify({'msg': 'Unauthorized - Only super admins can view attachment settings'}), 403
 
-        settings = AttachmentSettings.query.first()
+        settings = get_settings(AttachmentSettings)
         if not settings:
             # Create default settings if none exist
             settings = AttachmentSettings()
@@ -5381,7 +5285,7 @@ def test_attachment_settings():
         if current_user.role != 'super_admin':
             return jsonify({'msg': 'Unauthorized - Only super admins can test attachment settings'}), 403
 
-        settings = AttachmentSettings.query.first()
+        settings = get_settings(AttachmentSettings)
         if not settings:
             return jsonify({'msg': 'No attachment settings found'}), 404
 
@@ -5417,11 +5321,13 @@ def verify_scheduler():
     try:
         # Only allow admin users to verify scheduler settings
         current_user = get_user_from_jwt()
-        if not current_user or current_user.role != 'admin':
+        if not current_user or current_user.role not in ['admin', 'super_admin']:
             return jsonify({"msg": "Unauthorized"}), 403
 
-        from app.scheduler import verify_scheduler_settings
+        from app.scheduler import verify_scheduler_settings, get_scheduler_status
         result = verify_scheduler_settings()
+        # Which process holds the scheduler lease and what the jobs last did
+        result['scheduler'] = get_scheduler_status()
         
         return jsonify(result), 200
         
@@ -5444,7 +5350,7 @@ def get_general_settings():
         if not current_user or current_user.role != 'super_admin':
             return jsonify({'error': 'Unauthorized - Only super admins can view general settings'}), 403
 
-        settings = GeneralSettings.query.first()
+        settings = get_settings(GeneralSettings)
         if not settings:
             settings = GeneralSettings()
             db.session.add(settings)
@@ -5504,7 +5410,7 @@ def get_security_settings():
         if not current_user or current_user.role != 'super_admin':
             return jsonify({'error': 'Unauthorized - Only super admins can view security settings'}), 403
 
-        settings = SecuritySettings.query.first()
+        settings = get_settings(SecuritySettings)
         if not settings:
             settings = SecuritySettings()
             db.session.add(settings)
@@ -5575,7 +5481,7 @@ def get_room_tickets(room_id):
             creator = User.query.get(ticket.user_id)
             assigned_task = TaskAssignment.query.filter_by(ticket_id=ticket.ticket_id).first()
             assigned_user = None
-            if assigned_task:
+            if assigned_task and assigned_task.assigned_to_user_id:
                 assigned_user = User.query.get(assigned_task.assigned_to_user_id)
             
             ticket_data = {
@@ -5805,7 +5711,7 @@ def get_checklists():
         if not current_user:
             return jsonify({'msg': 'User not found'}), 404
 
-        user_properties = [up.property_id for up in current_user.assigned_properties]
+        user_properties = get_assigned_property_ids(current_user)
         if not user_properties:
             return jsonify({'msg': 'No properties assigned to user'}), 400
 
@@ -5884,6 +5790,30 @@ def create_checklist():
         app.logger.error(f"Error creating checklist: {str(e)}")
         return jsonify({'msg': 'Failed to create checklist'}), 500
 
+@app.route('/api/checklists/instances', methods=['GET'])
+@jwt_required()
+def get_checklist_instances():
+    """List generated checklist instances for the properties the user can access"""
+    try:
+        current_user = get_user_from_jwt()
+        if not current_user:
+            return jsonify({'msg': 'User not found'}), 404
+
+        q = ChecklistInstance.query.filter(get_access_scope(current_user).filter_clause(ChecklistInstance.property_id))
+        property_id = request.args.get('property_id', type=int)
+        if property_id:
+            q = q.filter(ChecklistInstance.property_id == property_id)
+        for field in ('status', 'department'):
+            if request.args.get(field):
+                q = q.filter(getattr(ChecklistInstance, field) == request.args[field])
+
+        limit = min(request.args.get('limit', 200, type=int), 1000)
+        instances = q.order_by(ChecklistInstance.due_at.desc(), ChecklistInstance.instance_id).limit(limit).all()
+        return jsonify({'instances': [i.to_dict() for i in instances]}), 200
+    except Exception as e:
+        app.logger.error(f"Error getting checklist instances: {str(e)}")
+        return jsonify({'msg': 'Internal server error'}), 500
+
 @app.route('/api/checklists/<int:checklist_id>', methods=['GET'])
 @jwt_required()
 def get_checklist(checklist_id):
@@ -5896,7 +5826,7 @@ def get_checklist(checklist_id):
         checklist = Checklist.query.get_or_404(checklist_id)
         
         # Check if user has access to this checklist's property
-        user_properties = [up.property_id for up in current_user.assigned_properties]
+        user_properties = get_assigned_property_ids(current_user)
         if checklist.property_id and checklist.property_id not in user_properties:
             return jsonify({'msg': 'Unauthorized access to checklist'}), 403
 
@@ -5918,7 +5848,7 @@ def update_checklist(checklist_id):
         checklist = Checklist.query.get_or_404(checklist_id)
         
         # Check if user has access to this checklist's property
-        user_properties = [up.property_id for up in current_user.assigned_properties]
+        user_properties = get_assigned_property_ids(current_user)
         if checklist.property_id and checklist.property_id not in user_properties:
             return jsonify({'msg': 'Unauthorized access to checklist'}), 403
 
@@ -5963,21 +5893,64 @@ def complete_checklist(checklist_id):
         checklist = Checklist.query.get_or_404(checklist_id)
         
         # Check if user has access to this checklist's property
-        user_properties = [up.property_id for up in current_user.assigned_properties]
+        user_properties = get_assigned_property_ids(current_user)
         if checklist.property_id and checklist.property_id not in user_properties:
             return jsonify({'msg': 'Unauthorized access to checklist'}), 403
 
-        data = request.get_json()
+        data = request.get_json() or {}
+
+        # Checklists without a property apply to every property, so the caller says which one
+        property_id = checklist.property_id or data.get('property_id')
+        if not property_id:
+            first_property = current_user.assigned_properties.first()
+            property_id = first_property.property_id if first_property else None
+        if not property_id:
+            return jsonify({'msg': 'property_id is required for this checklist'}), 400
+        if not checklist.property_id and not get_access_scope(current_user).can_access(property_id):
+            return jsonify({'msg': 'Unauthorized access to property'}), 403
         
         # Create completion record
         completion = ChecklistCompletion(
             checklist_id=checklist_id,
             completed_by_id=current_user.user_id,
-            property_id=checklist.property_id or current_user.assigned_properties[0].property_id,
+            property_id=property_id,
             completion_notes=data.get('notes', '')
         )
 
         db.session.add(completion)
+        db.session.flush()
+
+        # Close the generated instance for this period, and its task if one was created
+        instance = ChecklistInstance.query.filter_by(
+            checklist_id=checklist_id,
+            property_id=completion.property_id,
+            status='open'
+        ).order_by(ChecklistInstance.due_at).first()
+        if instance:
+            instance.status = 'completed'
+            instance.completion_id = completion.completion_id
+            instance.completed_at = completion.completed_at
+            if instance.task_id:
+                task = Task.query.get(instance.task_id)
+                if task and task.status != 'completed':
+                    db.session.add(History.build(
+                        entity_type='task',
+                        entity_id=task.task_id,
+                        action='updated',
+                        field_name='status',
+                        old_value=task.status,
+                        new_value='completed',
+                        user_id=current_user.user_id
+                    ))
+                    db.session.add(History.build(
+                        entity_type='task',
+                        entity_id=task.task_id,
+                        action='completed',
+                        user_id=current_user.user_id
+                    ))
+                    task.status = 'completed'
+                    task.completed_at = completion.completed_at
+
         db.session.commit()
 
         return jsonify({
@@ -6002,7 +5975,7 @@ def add_checklist_item(checklist_id):
         checklist = Checklist.query.get_or_404(checklist_id)
         
         # Check if user has access to this checklist's property
-        user_properties = [up.property_id for up in current_user.assigned_properties]
+        user_properties = get_assigned_property_ids(current_user)
         if checklist.property_id and checklist.property_id not in user_properties:
             return jsonify({'msg': 'Unauthorized access to checklist'}), 403
 
@@ -6051,7 +6024,7 @@ def update_checklist_item(checklist_id, item_id):
         checklist = Checklist.query.get_or_404(checklist_id)
         
         # Check if user has access to this checklist's property
-        user_properties = [up.property_id for up in current_user.assigned_properties]
+        user_properties = get_assigned_property_ids(current_user)
         if checklist.property_id and checklist.property_id not in user_properties:
             return jsonify({'msg': 'Unauthorized access to checklist'}), 403
 
@@ -6097,7 +6070,7 @@ def delete_checklist_item(checklist_id, item_id):
         checklist = Checklist.query.get_or_404(checklist_id)
         
         # Check if user has access to this checklist's property
-        user_properties = [up.property_id for up in current_user.assigned_properties]
+        user_properties = get_assigned_property_ids(current_user)
         if checklist.property_id and checklist.property_id not in user_properties:
             return jsonify({'msg': 'Unauthorized access to checklist'}), 403
 
@@ -0,0 +1,90 @@
+"""
+Change Stream Routes
+Pushes ticket, task, service request and room changes at a property to the browser as Server-Sent Events
+"""
+import time
+from flask import request, jsonify, Response
+from flask_jwt_extended import jwt_required
+from app import app
+from app.extensions import db
+from app.routes import get_user_from_jwt
+from app.services.access_scope import get_access_scope
+from app.services.change_stream import change_broker, replay_changes, format_event, format_reset
+
+@app.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    """
+    Stream committed changes for a property
+
+    Query Parameters:
+    - property_id: (int) Required - the property to watch
+    - jwt: (str) Optional - access token, for EventSource clients that cannot send headers
+    - last_event_id: (int) Optional - resume point when the Last-Event-ID header cannot be sent
+
+    Every change is a `change` event carrying entity_type, entity_id, action and
+    version; its id is the resume point. A `reset` event means changes were missed
+    and the client has to reload its lists. Comments are sent as heartbeats, and the
+    stream ends after CHANGE_STREAM_MAX_SECONDS so the browser reconnects with
+    Last-Event-ID.
+    """
+    current_user = get_user_from_jwt()
+    if not current_user:
+        return jsonify({'msg': 'User not found'}), 404
+
+    property_id = request.args.get('property_id', type=int)
+    if not property_id:
+        return jsonify({'msg': 'property_id is required'}), 400
+    if not get_access_scope(current_user).can_access(property_id):
+        return jsonify({'msg': 'Unauthorized'}), 403
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({'msg': 'Last-Event-ID must be a number'}), 400
+
+    if change_broker.subscriber_count() >= app.config.get('CHANGE_STREAM_MAX_SUBSCRIBERS', 24):
+        response = jsonify({'msg': 'Too many open event streams; try again shortly'})
+        response.headers['Retry-After'] = '10'
+        return response, 503
+
+    subscription = change_broker.subscribe(property_id)
+    backlog = replay_changes(property_id, last_event_id) if last_event_id is not None else []
+    # The stream never queries, so give the connection back before it starts
+    db.session.remove()
+
+    heartbeat_seconds = app.config.get('CHANGE_STREAM_HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + app.config.get('CHANGE_STREAM_MAX_SECONDS', 300)
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            if last_event_id is None:
+                # Gives the browser a resume point before the first change arrives
+                yield f'id: {subscription.start_id}\n\n'
+            elif backlog is None:
+                yield format_reset('Too many changes were missed')
+            replayed = set()
+            for change in backlog or ():
+                replayed.add(change['event_id'])
+                yield format_event(change)
+
+            while time.monotonic() < deadline:
+                change = subscription.get(heartbeat_seconds)
+                if subscription.overflowed:
+                    yield format_reset('Changes arrived faster than they could be sent')
+                    return
+                if change is None:
+                    yield ': heartbeat\n\n'
+                elif change['event_id'] not in replayed:
+                    yield format_event(change)
+        finally:
+            change_broker.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,119 @@
+"""
+Profiling Routes
+Lists and downloads the request profiles captured with the X-Profile header and reports the slow-query log
+"""
+from flask import request, jsonify, send_file, Response
+from flask_jwt_extended import jwt_required
+from app import app
+from app.routes import get_user_from_jwt
+from app.extensions import db
+from app.models import SlowQuery
+from app.profiling import list_profiles, get_profile_path, render_profile
+from app.slow_query_log import slow_query_log
+
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls', 'time')
+SLOW_QUERY_ORDERINGS = {
+    'total': SlowQuery.total_ms.desc(),
+    'max': SlowQuery.max_ms.desc(),
+    'count': SlowQuery.count.desc(),
+    'avg': (SlowQuery.total_ms / SlowQuery.count).desc(),
+    'recent': SlowQuery.last_seen.desc()
+}
+
+def _require_super_admin():
+    current_user = get_user_from_jwt()
+    if not current_user:
+        return jsonify({'error': 'User not found'}), 404
+    if current_user.role != 'super_admin':
+        return jsonify({'error': 'Unauthorized - Only super admins can view diagnostics'}), 403
+    return None
+
+@app.route('/api/admin/profiles', methods=['GET'])
+@jwt_required()
+def get_profiles():
+    """
+    List stored request profiles, newest first
+
+    Send any request with the header `X-Profile: 1` and a super admin token to
+    record a profile; its ID is returned in the X-Profile-Id response header.
+    """
+    try:
+        error = _require_super_admin()
+        if error:
+            return error
+        return jsonify({'success': True, 'profiles': list_profiles(app)}), 200
+    except Exception as e:
+        app.logger.error(f"Error in get_profiles: {str(e)}")
+        return jsonify({'error': f'Failed to list profiles: {str(e)}'}), 500
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+def download_profile(profile_id):
+    """
+    Download a stored profile
+
+    Query Parameters:
+    - format: (str) 'pstats' (default) for the raw file, or 'text' for a summary
+    - sort: (str) Sort key for the text summary - Default: cumulative
+    - limit: (int) Number of functions in the text summary - Default: 50
+
+    The pstats file can be opened with `python -m pstats` or snakeviz.
+    """
+    try:
+        error = _require_super_admin()
+        if error:
+            return error
+
+        path = get_profile_path(app, profile_id)
+        if not path:
+            return jsonify({'error': 'Profile not found'}), 404
+
+        if request.args.get('format') == 'text':
+            sort = request.args.get('sort', 'cumulative')
+            if sort not in PROFILE_SORT_KEYS:
+                return jsonify({'error': 'Invalid sort'}), 400
+            limit = min(request.args.get('limit', 50, type=int), 500)
+            return Response(render_profile(path, sort, limit), mimetype='text/plain')
+
+        return send_file(path, as_attachment=True, download_name=f'{profile_id}.prof',
+                         mimetype='application/octet-stream')
+    except Exception as e:
+        app.logger.error(f"Error in download_profile: {str(e)}")
+        return jsonify({'error': f'Failed to download profile: {str(e)}'}), 500
+
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+@jwt_required()
+def slow_queries():
+    """
+    Get the worst statements from the slow-query log, or clear it with DELETE
+
+    Query Parameters:
+    - order_by: (str) 'total', 'max', 'count', 'avg' or 'recent' - Default: total
+    - limit: (int) Default: 20
+    """
+    try:
+        error = _require_super_admin()
+        if error:
+            return error
+
+        if request.method == 'DELETE':
+            deleted = SlowQuery.query.delete()
+            db.session.commit()
+            return jsonify({'success': True, 'deleted': deleted}), 200
+
+        order_by = request.args.get('order_by', 'total')
+        if order_by not in SLOW_QUERY_ORDERINGS:
+            return jsonify({'error': 'Invalid order_by'}), 400
+        limit = min(request.args.get('limit', 20, type=int), 200)
+
+        queries = SlowQuery.query.order_by(SLOW_QUERY_ORDERINGS[order_by]).limit(limit).all()
+        return jsonify({
+            'success': True,
+            'enabled': slow_query_log.enabled,
+            'threshold_ms': slow_query_log.threshold_ms,
+            'queries': [query.to_dict() for query in queries]
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error in slow_queries: {str(e)}")
+        return jsonify({'error': f'Failed to fetch slow queries: {str(e)}'}), 500
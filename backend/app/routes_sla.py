@@ -0,0 +1,68 @@
+"""
+SLA Report Routes
+Provides response-time and breach reporting derived from ticket, task and service request history
+"""
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required
+from datetime import datetime, timedelta
+from app import app
+from app.routes import get_user_from_jwt
+from app.services.sla_service import SlaService, SLA_ENTITY_MODELS
+from app.services.access_scope import get_access_scope
+from app.services.read_replica import use_replica
+
+@app.route('/api/reports/sla', methods=['GET'])
+@jwt_required()
+def get_sla_report():
+    """
+    Get SLA compliance for a property and date range
+
+    Query Parameters:
+    - property_id: (int) Optional - specific property ID
+    - date_from: (str) YYYY-MM-DD format - start date for report
+    - date_to: (str) YYYY-MM-DD format - end date for report
+    - entity_type: (str) Optional - 'ticket', 'task' or 'service_request'
+
+    Returns time-to-assign, time-to-start and time-to-complete averages per
+    priority, breach counts against the configured targets and the most
+    recent breached items.
+    """
+    try:
+        current_user = get_user_from_jwt()
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
+
+        property_id = request.args.get('property_id', type=int)
+        entity_type = request.args.get('entity_type')
+        date_from_str = request.args.get('date_from')
+        date_to_str = request.args.get('date_to')
+
+        if entity_type and entity_type not in SLA_ENTITY_MODELS:
+            return jsonify({'error': 'Invalid entity_type'}), 400
+
+        try:
+            date_from = datetime.strptime(date_from_str, '%Y-%m-%d') if date_from_str else datetime.now() - timedelta(days=30)
+            date_to = datetime.strptime(date_to_str, '%Y-%m-%d') if date_to_str else datetime.now()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+        date_to = date_to.replace(hour=23, minute=59, second=59)
+
+        scope = get_access_scope(current_user)
+        if property_id:
+            if not scope.can_access(property_id):
+                return jsonify({'error': 'Unauthorized'}), 403
+            property_ids = [property_id]
+        else:
+            property_ids = scope.property_ids
+
+        # Records are kept current by the scheduled sync; this request only reads
+        sla_service = SlaService()
+        with use_replica():
+            report = sla_service.get_report(date_from, date_to, property_ids=property_ids, entity_type=entity_type)
+
+        return jsonify({'success': True, 'property_id': property_id, 'report': report}), 200
+
+    except Exception as e:
+        app.logger.error(f"Error in get_sla_report: {str(e)}")
+        return jsonify({'error': f'Failed to fetch SLA report: {str(e)}'}), 500
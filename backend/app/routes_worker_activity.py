@@ -5,13 +5,17 @@ Provides endpoints for generating property-level worker activity reports
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case
 from app import app, db
 from app.models import User, Task, Property, History
-from app.decorators import token_required
+from app.services.leaderboard_service import LeaderboardService
+from app.services.identity_cache import get_cached_user
+from app.services.access_scope import get_access_scope
+from app.services.read_replica import read_replica
 
 @app.route('/api/reports/property-worker-activity', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_property_worker_activity():
     """
     Get worker activity aggregated by property
@@ -102,41 +106,49 @@ def get_property_worker_activity():
             
             worker_activity_data = []
             total_tasks = 0
+            workers_by_id = {worker.user_id: worker for worker in workers}
             
-            for worker in workers:
-                # Get tasks assigned to this worker for this property in date range
-                tasks = Task.query.filter(
-                    Task.assigned_to_id == worker.user_id,
+            if not workers_by_id:
+                task_rows = []
+            else:
+                # Aggregate every worker's tasks for this property in one grouped query
+                status = func.lower(Task.status)
+                task_query = db.session.query(
+                    Task.assigned_to_id,
+                    func.count(Task.task_id),
+                    func.sum(case((status == 'completed', 1), else_=0)),
+                    func.sum(case((status.in_(['in progress', 'in_progress']), 1), else_=0)),
+                    func.sum(case((status == 'pending', 1), else_=0)),
+                    func.coalesce(func.sum(Task.time_spent), 0),
+                    func.max(func.coalesce(Task.updated_at, Task.created_at)),
+                    func.avg(Task.completion_score)
+                ).filter(
+                    Task.assigned_to_id.in_(workers_by_id.keys()),
                     Task.property_id == prop.property_id,
                     Task.created_at >= date_from,
                     Task.created_at <= date_to
-                ).all()
+                )
                 
                 if not include_completed:
-                    tasks = [t for t in tasks if t.status.lower() != 'completed']
-                
-                if not tasks:
-                    continue
+                    task_query = task_query.filter(status != 'completed')
                 
-                # Calculate metrics
-                tasks_completed = len([t for t in tasks if t.status.lower() == 'completed'])
-                tasks_in_progress = len([t for t in tasks if t.status.lower() == 'in progress' or t.status.lower() == 'in_progress'])
-                tasks_pending = len([t for t in tasks if t.status.lower() == 'pending'])
-                tasks_assigned = len(tasks)
+                task_rows = task_query.group_by(Task.assigned_to_id).all()
+            
+            for (worker_id, tasks_assigned, tasks_completed, tasks_in_progress, tasks_pending,
+                 total_hours, last_activity_at, avg_completion_score) in task_rows:
+                worker = workers_by_id[worker_id]
+                tasks_completed = int(tasks_completed or 0)
+                tasks_in_progress = int(tasks_in_progress or 0)
+                tasks_pending = int(tasks_pending or 0)
+                total_hours = float(total_hours or 0)
                 
-                # Calculate hours
-                total_hours = sum([t.time_spent or 0 for t in tasks])
                 avg_hours_per_task = total_hours / tasks_assigned if tasks_assigned > 0 else 0
                 
                 # Completion rate
                 completion_rate = (tasks_completed / tasks_assigned * 100) if tasks_assigned > 0 else 0
                 
                 # Get last activity
-                last_activity = None
-                if tasks:
-                    # Get the most recent task update
-                    latest_task = max(tasks, key=lambda t: t.updated_at or t.created_at)
-                    last_activity = (latest_task.updated_at or latest_task.created_at).isoformat()
+                last_activity = last_activity_at.isoformat() if last_activity_at else None
                 
                 # Performance score (0-100)
                 # Based on completion rate, hours logged, and task count
@@ -165,7 +177,8 @@ def get_property_worker_activity():
                     'avg_hours_per_task': round(avg_hours_per_task, 2),
                     'completion_rate': round(completion_rate, 1),
                     'last_activity': last_activity,
-                    'performance_score': round(performance_score, 1)
+                    'performance_score': round(performance_score, 1),
+                    'avg_completion_score': round(avg_completion_score, 1) if avg_completion_score is not None else None
                 })
                 
                 total_tasks += tasks_assigned
@@ -196,6 +209,7 @@ def get_property_worker_activity():
 
 @app.route('/api/reports/worker-detailed-activity/<int:worker_id>', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_worker_detailed_activity(worker_id):
     """
     Get detailed activity for a specific worker
@@ -281,6 +295,7 @@ def get_worker_detailed_activity(worker_id):
 
 @app.route('/api/reports/property-summary', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_property_summary():
     """
     Get summary statistics for all properties
@@ -354,3 +369,80 @@ def get_property_summary():
         
     except Exception as e:
         return jsonify({'error': f'Failed to fetch property summary: {str(e)}'}), 500
+
+
+@app.route('/api/reports/leaderboard', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_worker_leaderboard():
+    """
+    Get the top workers for a property or across properties
+    
+    Query Parameters:
+    - property_id: (int) Optional - specific property ID
+    - worker_id: (int) Optional - return the daily buckets for one worker instead
+    - date_from: (str) YYYY-MM-DD format - start date for report
+    - date_to: (str) YYYY-MM-DD format - end date for report
+    - order_by: (str) 'tasks', 'score' or 'hours' - Default: tasks
+    - limit: (int) Default: 10
+    
+    Reads the worker leaderboard table that is updated as tasks complete
+    """
+    try:
+        property_id = request.args.get('property_id', type=int)
+        worker_id = request.args.get('worker_id', type=int)
+        order_by = request.args.get('order_by', 'tasks')
+        limit = min(request.args.get('limit', 10, type=int), 100)
+        date_from_str = request.args.get('date_from')
+        date_to_str = request.args.get('date_to')
+        
+        # Parse dates
+        try:
+            date_from = datetime.strptime(date_from_str, '%Y-%m-%d').date() if date_from_str else (datetime.utcnow() - timedelta(days=30)).date()
+            date_to = datetime.strptime(date_to_str, '%Y-%m-%d').date() if date_to_str else datetime.utcnow().date()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        
+        # Get current user identity
+        user_id = get_jwt_identity().get('user_id')
+        
+        # Restrict staff to their assigned properties and managers to the properties they manage
+        current_user_obj = get_cached_user(user_id)
+        if not current_user_obj:
+            return jsonify({'error': 'User not found'}), 404
+        scope = get_access_scope(current_user_obj)
+        
+        if property_id:
+            if not scope.can_access(property_id):
+                return jsonify({'error': 'Unauthorized'}), 403
+            property_ids = [property_id]
+        else:
+            property_ids = scope.property_ids
+        
+        leaderboard_service = LeaderboardService()
+        
+        if worker_id:
+            buckets = leaderboard_service.worker_history(worker_id, date_from, date_to, property_id=property_id)
+            if property_ids is not None:
+                buckets = [b for b in buckets if b['property_id'] in property_ids]
+            return jsonify({'success': True, 'worker_id': worker_id, 'buckets': buckets}), 200
+        
+        workers = leaderboard_service.top_workers(
+            date_from,
+            date_to,
+            property_ids=property_ids,
+            limit=limit,
+            order_by=order_by
+        )
+        
+        return jsonify({
+            'success': True,
+            'property_id': property_id,
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'order_by': order_by,
+            'workers': workers
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch leaderboard: {str(e)}'}), 500
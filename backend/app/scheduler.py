@@ -1,8 +1,19 @@
-from datetime import datetime, timezone
-from app.models import User, Property, Ticket, Task, ServiceRequest, EmailSettings
+from datetime import datetime, timezone, timedelta
+from app.models import User, Property, Ticket, Task, ServiceRequest, EmailSettings, UserProperty
 from app.services.email_service import EmailService
-from app.extensions import db
+from app.services.leaderboard_service import LeaderboardService
+from app.services.settings_cache import get_settings
+from app.metrics import track_job
+from app.extensions import db, REPLICA_BIND_KEY
+from app.services.read_replica import use_replica, record_replica_heartbeat
+from app.services.scheduler_lease import scheduler_leader, leader_only, prune_job_runs, get_job_runs, run_missed_jobs
+from app.services.due_date_engine import due_date_engine, run_due_date_tick
+import atexit
 import logging
+import threading
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -92,11 +103,13 @@ def init_scheduler():
             logging.info("Scheduler already running, skipping initialization")
             return
 
+        from flask import current_app
+
         # Create new scheduler with default timezone set to EST/EDT (America/New_York)
         scheduler = BackgroundScheduler(timezone=pytz.timezone('America/New_York'))
         
-        # Get settings from database or use defaults
-        settings = EmailSettings.query.first()
+        # Get settings from the settings cache or use defaults
+        settings = get_settings(EmailSettings)
         
         if not settings:
             logging.warning("No email settings found in database, creating with default values")
@@ -128,37 +141,155 @@ def init_scheduler():
                     enable_daily_reports=True
                 )
         
-        # Always add the daily reports job, but only enable it if configured
+        # Plan one report job per executive and local timezone, staggered across a window
         if settings.enable_daily_reports:
-            # Add the daily report job to run at configured time (default 6pm EST)
-            scheduler.add_job(
-                send_daily_reports,
-                trigger=CronTrigger(
-                    hour=settings.daily_report_hour,
-                    minute=settings.daily_report_minute,
-                    timezone=settings.daily_report_timezone
-                ),
-                id='daily_reports',
-                name='Send daily property reports',
-                replace_existing=True,
-                misfire_grace_time=3600  # Allow job to run up to 1 hour late if server was down
+            schedule_daily_reports(
+                hour=settings.daily_report_hour,
+                minute=settings.daily_report_minute,
+                timezone=settings.daily_report_timezone
             )
-            logging.info(f"Added daily report job to run at {settings.daily_report_hour}:{settings.daily_report_minute:02d} {settings.daily_report_timezone}")
         else:
             logging.info("Daily reports are disabled in settings")
-        
+
+        # Pick up new executives, property assignments and settings edited in other processes
+        scheduler.add_job(
+            refresh_daily_report_plan,
+            trigger='interval',
+            minutes=current_app.config.get('DAILY_REPORT_REPLAN_MINUTES', 15),
+            id='daily_report_plan',
+            name='Refresh the daily report plan',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Keep SLA records in step with new history rows
+        scheduler.add_job(
+            scheduled_sla_sync,
+            trigger='interval',
+            minutes=current_app.config.get('SLA_SYNC_INTERVAL_MINUTES', 1),
+            id='sla_sync',
+            name='Sync SLA records from history',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Heartbeat the primary so reads can measure how far the replica lags
+        if current_app.config.get('SQLALCHEMY_BINDS', {}).get(REPLICA_BIND_KEY):
+            scheduler.add_job(
+                scheduled_replica_heartbeat,
+                trigger='interval',
+                seconds=current_app.config.get('REPLICA_HEARTBEAT_SECONDS', 10),
+                id='replica_heartbeat',
+                name='Write read replica heartbeat',
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+
+        # Reminders and escalations for upcoming due dates and ticket follow-ups
+        scheduler.add_job(
+            scheduled_due_date_reminders,
+            trigger='interval',
+            seconds=current_app.config.get('DUE_DATE_TICK_SECONDS', 60),
+            id='due_date_reminders',
+            name='Send due-date reminders and escalations',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Materialize this period's recurring checklists for every property
+        scheduler.add_job(
+            scheduled_checklist_generation,
+            trigger='interval',
+            minutes=current_app.config.get('CHECKLIST_GENERATION_INTERVAL_MINUTES', 60),
+            next_run_time=datetime.now(timezone.utc),
+            id='checklist_generation',
+            name='Generate recurring checklist instances',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Drop idempotency keys whose retry window has passed
+        scheduler.add_job(
+            scheduled_idempotency_purge,
+            trigger='interval',
+            minutes=current_app.config.get('IDEMPOTENCY_PURGE_INTERVAL_MINUTES', 60),
+            id='idempotency_purge',
+            name='Purge expired idempotency keys',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Drop change events older than the /events resume window
+        scheduler.add_job(
+            scheduled_change_event_purge,
+            trigger='interval',
+            minutes=current_app.config.get('CHANGE_STREAM_PURGE_INTERVAL_MINUTES', 60),
+            id='change_event_purge',
+            name='Purge old change events',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Drop sent-notification records older than the due-date lookback
+        scheduler.add_job(
+            scheduled_due_notification_purge,
+            trigger='interval',
+            minutes=current_app.config.get('DUE_NOTIFICATION_PURGE_INTERVAL_MINUTES', 60),
+            id='due_notification_purge',
+            name='Purge old due-date notifications',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Pick up property deletions whose thread died with its worker
+        scheduler.add_job(
+            scheduled_property_deletion_resume,
+            trigger='interval',
+            minutes=current_app.config.get('PROPERTY_DELETE_RESUME_INTERVAL_MINUTES', 5),
+            id='property_deletion_resume',
+            name='Resume stale property deletions',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Every process fires the jobs; only the holder of the scheduler lease runs them
+        scheduler.add_job(
+            renew_scheduler_lease,
+            trigger='interval',
+            seconds=current_app.config.get('SCHEDULER_LEASE_RENEW_SECONDS', 10),
+            id='scheduler_lease',
+            name='Renew or take over the scheduler lease',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
         # Start the scheduler
         scheduler.start()
         logging.info("✅ Scheduler started successfully")
+
+        try:
+            scheduler_leader.try_acquire()
+            atexit.register(release_scheduler_lease)
+        except Exception as e:
+            logging.error(f"Failed to claim the scheduler lease: {str(e)}")
         
         # Log the next run time if reports are enabled
         if settings.enable_daily_reports:
-            daily_job = scheduler.get_job('daily_reports')
-            if daily_job and daily_job.next_run_time:
-                logging.info("📅 Next daily report run time: %s", 
-                    daily_job.next_run_time.strftime("%Y-%m-%d %H:%M:%S %Z"))
+            next_run = _next_daily_report_run()
+            if next_run:
+                logging.info("📅 Next daily report run time: %s", next_run.strftime("%Y-%m-%d %H:%M:%S %Z"))
             else:
-                logging.warning("Daily report job exists but next run time could not be determined")
+                logging.info("No executive reports to schedule yet")
             
     except Exception as e:
         logging.error(f"Failed to initialize scheduler: {str(e)}")
@@ -167,7 +298,7 @@ def init_scheduler():
             if not scheduler or not scheduler.running:
                 scheduler = BackgroundScheduler(timezone=pytz.timezone('America/New_York'))
                 scheduler.add_job(
-                    send_daily_reports, 
+                    scheduled_daily_reports,
                     trigger=CronTrigger(hour=18, minute=0),
                     id='daily_reports',
                     name='Send daily property reports (fallback)',
@@ -189,31 +320,165 @@ def update_daily_report_schedule(hour=18, minute=0, timezone='America/New_York',
             return
 
         if enabled:
-            # Add or update the job
-            scheduler.add_job(
-                send_daily_reports,
-                trigger=CronTrigger(
-                    hour=hour,
-                    minute=minute,
-                    timezone=timezone
-                ),
-                id='daily_reports',
-                name='Send daily property reports',
-                replace_existing=True,
-                misfire_grace_time=3600
-            )
+            # Re-plan the per-executive jobs for the new time
+            schedule_daily_reports(hour=hour, minute=minute, timezone=timezone)
+            next_run = _next_daily_report_run()
             logging.info("Daily report schedule updated. Next run time: %s",
-                scheduler.get_job('daily_reports').next_run_time.strftime("%Y-%m-%d %H:%M:%S %Z"))
+                next_run.strftime("%Y-%m-%d %H:%M:%S %Z") if next_run else 'none')
         else:
-            # Remove the job if it exists
-            if scheduler.get_job('daily_reports'):
-                scheduler.remove_job('daily_reports')
+            # Remove the jobs if they exist
+            if get_daily_report_jobs():
+                remove_daily_report_jobs()
                 logging.info("Daily report schedule disabled")
 
     except Exception as e:
         logging.error(f"Failed to update daily report schedule: {str(e)}")
         raise
 
+DAILY_REPORT_JOB_PREFIX = 'daily_report:'
+
+def _default_report_timezone():
+    """The timezone for properties that do not set their own"""
+    settings = get_settings(EmailSettings)
+    return (settings.daily_report_timezone if settings else None) or 'America/New_York'
+
+def _valid_timezone(name, default):
+    return name if name in pytz.all_timezones_set else default
+
+def local_day_bounds(timezone_name, now=None):
+    """(start, end, day): today in the timezone as a naive UTC [start, end) range, the way timestamps are stored"""
+    tz = pytz.timezone(_valid_timezone(timezone_name, 'America/New_York'))
+    day = (now or datetime.now(timezone.utc)).astimezone(tz).date()
+    start = tz.localize(datetime.combine(day, datetime.min.time()))
+    end = tz.localize(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+    return start.astimezone(pytz.utc).replace(tzinfo=None), end.astimezone(pytz.utc).replace(tzinfo=None), day
+
+def plan_daily_reports(hour=18, minute=0, timezone='America/New_York'):
+    """One report job per executive and local timezone, spread across DAILY_REPORT_SPREAD_MINUTES.
+
+    An executive whose properties are in several timezones gets one email per
+    timezone, sent at the report time there. The offset within the window is
+    derived from the job ID, so every process plans the same run times.
+    """
+    from flask import current_app
+
+    spread_seconds = int(current_app.config.get('DAILY_REPORT_SPREAD_MINUTES', 30) * 60)
+    rows = db.session.query(User.user_id, Property.property_id, Property.timezone).join(
+        UserProperty, UserProperty.user_id == User.user_id
+    ).join(
+        Property, Property.property_id == UserProperty.property_id
+    ).filter(
+        User.is_active == True,
+        User.group == 'Executive'
+    ).order_by(User.user_id, Property.property_id).all()
+
+    groups = defaultdict(list)
+    for user_id, property_id, property_timezone in rows:
+        groups[(user_id, _valid_timezone(property_timezone, timezone))].append(property_id)
+
+    plan = []
+    for (user_id, timezone_name), property_ids in groups.items():
+        job_id = f'{DAILY_REPORT_JOB_PREFIX}{user_id}:{timezone_name}'
+        offset = zlib.crc32(job_id.encode('utf-8')) % spread_seconds if spread_seconds > 0 else 0
+        start = (hour * 3600 + minute * 60 + offset) % 86400
+        plan.append({
+            'job_id': job_id,
+            'user_id': user_id,
+            'property_ids': property_ids,
+            'timezone': timezone_name,
+            'hour': start // 3600,
+            'minute': start % 3600 // 60,
+            'second': start % 60
+        })
+    return plan
+
+def get_daily_report_jobs():
+    """The per-executive report jobs scheduled in this process"""
+    if not scheduler:
+        return []
+    return [job for job in scheduler.get_jobs() if job.id.startswith(DAILY_REPORT_JOB_PREFIX)]
+
+def remove_daily_report_jobs(keep=()):
+    for job in get_daily_report_jobs():
+        if job.id not in keep:
+            scheduler.remove_job(job.id)
+
+def _next_daily_report_run():
+    run_times = [job.next_run_time for job in get_daily_report_jobs() if job.next_run_time]
+    return min(run_times) if run_times else None
+
+def schedule_daily_reports(hour=18, minute=0, timezone='America/New_York'):
+    """Bring the report jobs in line with the current plan, leaving unchanged jobs alone"""
+    if not scheduler:
+        logging.error("Scheduler not initialized")
+        return []
+
+    plan = plan_daily_reports(hour=hour, minute=minute, timezone=_valid_timezone(timezone, 'America/New_York'))
+    for entry in plan:
+        trigger = CronTrigger(
+            hour=entry['hour'],
+            minute=entry['minute'],
+            second=entry['second'],
+            timezone=entry['timezone']
+        )
+        args = [entry['user_id'], entry['property_ids'], entry['timezone']]
+        existing = scheduler.get_job(entry['job_id'])
+        if existing and repr(existing.trigger) == repr(trigger) and list(existing.args) == args:
+            continue
+        scheduler.add_job(
+            leader_only(entry['job_id'])(send_executive_report),
+            trigger=trigger,
+            args=args,
+            id=entry['job_id'],
+            name=f"Send daily report to executive {entry['user_id']} ({entry['timezone']})",
+            replace_existing=True,
+            coalesce=True,
+            misfire_grace_time=3600  # Allow job to run up to 1 hour late if server was down
+        )
+
+    remove_daily_report_jobs(keep={entry['job_id'] for entry in plan})
+    # The single job used before reports were staggered
+    if scheduler.get_job('daily_reports'):
+        scheduler.remove_job('daily_reports')
+    logging.info(f"Planned {len(plan)} daily report jobs")
+    return plan
+
+def refresh_daily_report_plan():
+    """Re-plan the report jobs from the current settings and executive assignments"""
+    from app import app
+
+    with app.app_context():
+        try:
+            settings = get_settings(EmailSettings)
+            if settings and settings.enable_daily_reports:
+                schedule_daily_reports(
+                    hour=settings.daily_report_hour,
+                    minute=settings.daily_report_minute,
+                    timezone=settings.daily_report_timezone
+                )
+            else:
+                remove_daily_report_jobs()
+        except Exception as e:
+            logging.error(f"Error refreshing daily report plan: {str(e)}")
+
+_report_semaphore = None
+_report_semaphore_lock = threading.Lock()
+
+@contextmanager
+def _report_slot():
+    """Cap how many executive reports render and send at once (DAILY_REPORT_MAX_CONCURRENCY)"""
+    global _report_semaphore
+    from flask import current_app
+
+    if _report_semaphore is None:
+        with _report_semaphore_lock:
+            if _report_semaphore is None:
+                _report_semaphore = threading.BoundedSemaphore(
+                    max(1, current_app.config.get('DAILY_REPORT_MAX_CONCURRENCY', 2))
+                )
+    with _report_semaphore:
+        yield
+
 def has_activity(report_data):
     """Check if there is any activity to report"""
     return (len(report_data['open_tickets']) > 0 or
@@ -223,11 +488,15 @@ def has_activity(report_data):
             len(report_data['open_service_requests']) > 0 or
             len(report_data['completed_service_requests_today']) > 0)
 
-def get_daily_property_report(property_id):
+def get_daily_property_report(property_id, timezone_name=None):
+    """Open work and what was closed today, where today is the local day in timezone_name"""
     from app import app
     
     with app.app_context():
-        today = datetime.now(timezone.utc).date()
+        start, end, _ = local_day_bounds(timezone_name or _default_report_timezone())
+
+        def today(timestamp):
+            return timestamp is not None and start <= timestamp < end
         
         # Get property details
         property = Property.query.get_or_404(property_id)
@@ -241,7 +510,8 @@ def get_daily_property_report(property_id):
                 # Get tickets that were closed today
                 db.and_(
                     Ticket.status == 'completed',
-                    db.func.date(Ticket.updated_at) == today
+                    Ticket.updated_at >= start,
+                    Ticket.updated_at < end
                 )
             )
         ).all()
@@ -255,7 +525,8 @@ def get_daily_property_report(property_id):
                 # Get tasks that were completed today
                 db.and_(
                     Task.status == 'completed',
-                    db.func.date(Task.updated_at) == today
+                    Task.updated_at >= start,
+                    Task.updated_at < end
                 )
             )
         ).all()
@@ -269,7 +540,8 @@ def get_daily_property_report(property_id):
                 # Get service requests that were completed today
                 db.and_(
                     ServiceRequest.status == 'completed',
-                    db.func.date(ServiceRequest.created_at) == today
+                    ServiceRequest.created_at >= start,
+                    ServiceRequest.created_at < end
                 )
             )
         ).all()
@@ -279,8 +551,8 @@ def get_daily_property_report(property_id):
         total_cost = sum(task.cost or 0 for task in tasks if task.cost)
         
         # Calculate today's metrics
-        today_labor_time = sum(task.time_spent or 0 for task in tasks if task.time_spent and task.updated_at.date() == today)
-        today_cost = sum(task.cost or 0 for task in tasks if task.cost and task.updated_at.date() == today)
+        today_labor_time = sum(task.time_spent or 0 for task in tasks if task.time_spent and today(task.updated_at))
+        today_cost = sum(task.cost or 0 for task in tasks if task.cost and today(task.updated_at))
 
         # Organize data - include resolver information for completed items
         report_data = {
@@ -289,12 +561,12 @@ def get_daily_property_report(property_id):
             'closed_tickets_today': [{
                 **ticket.to_dict(),
                 'resolved_by': 'Unassigned'  # We'll set this properly if assigned_user exists
-            } for ticket in tickets if ticket.status == 'completed' and ticket.updated_at.date() == today],
+            } for ticket in tickets if ticket.status == 'completed' and today(ticket.updated_at)],
             'open_tasks': [task.to_dict() for task in tasks if task.status != 'completed'],
             'closed_tasks_today': [{
                 **task.to_dict(),
                 'resolved_by': User.query.get(task.assigned_to_id).username if task.assigned_to_id else 'Unassigned'
-            } for task in tasks if task.status == 'completed' and task.updated_at.date() == today],
+            } for task in tasks if task.status == 'completed' and today(task.updated_at)],
             'open_service_requests': [{
                 'title': sr.request_type,
                 'priority': sr.priority,
@@ -309,7 +581,7 @@ def get_daily_property_report(property_id):
                 'category': sr.request_group,
                 'room_name': sr.room.name if sr.room else 'N/A',
                 'completed_by': User.query.get(sr.created_by_id).username if sr.created_by_id else 'Unassigned'
-            } for sr in service_requests if sr.status == 'completed' and sr.created_at.date() == today],
+            } for sr in service_requests if sr.status == 'completed' and today(sr.created_at)],
             'labor_metrics': {
                 'total_labor_time': total_labor_time,
                 'total_cost': total_cost,
@@ -320,309 +592,289 @@ def get_daily_property_report(property_id):
 
         return report_data
 
+def _send_executive_report(user, user_properties, timezone_name, email_service):
+    """Render and email one executive's report for the given properties"""
+    current_time = datetime.now(pytz.timezone(timezone_name))
+
+    if not user_properties:
+        return
+
+    # Generate reports for each property
+    property_reports = []
+    total_labor_time = 0
+    total_cost = 0
+    today_total_labor_time = 0
+    today_total_cost = 0
+
+    for property in user_properties:
+        report_data = get_daily_property_report(property.property_id, timezone_name)
+        if has_activity(report_data):
+            property_reports.append(report_data)
+            # Add to totals
+            total_labor_time += report_data['labor_metrics']['total_labor_time']
+            total_cost += report_data['labor_metrics']['total_cost']
+            today_total_labor_time += report_data['labor_metrics']['today_labor_time']
+            today_total_cost += report_data['labor_metrics']['today_cost']
+
+    if not property_reports:
+        return
+
+    # Create HTML email template - Enhanced for executives
+    html_template = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    </head>
+    <body style="font-family: Arial, Helvetica, sans-serif; line-height: 1.6; color: #333; margin: 0; padding: 0; background-color: #f9f9f9;">
+        <div style="max-width: 900px; margin: 0 auto; background-color: #fff; box-shadow: 0 0 10px rgba(0,0,0,0.1);">
+            <div style="background-color: #3a5a78; color: white; padding: 20px; text-align: center;">
+                <h1 style="margin: 0;">Executive Daily Report</h1>
+                <h3 style="margin: 10px 0 0 0;">{current_time}</h3>
+            </div>
+
+            <div style="background-color: white; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); padding: 20px; margin: 20px;">
+                <h2 style="color: #3a5a78; margin-top: 0;">Daily Summary</h2>
+                <div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 15px; margin-bottom: 20px;">
+                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
+                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_properties}</div>
+                        <div style="font-size: 14px; color: #666;">Properties with Activity</div>
+                    </div>
+                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
+                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_open_tickets}</div>
+                        <div style="font-size: 14px; color: #666;">Open Tickets</div>
+                    </div>
+                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
+                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_closed_tickets}</div>
+                        <div style="font-size: 14px; color: #666;">Tickets Closed Today</div>
+                    </div>
+                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
+                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_open_tasks}</div>
+                        <div style="font-size: 14px; color: #666;">Open Tasks</div>
+                    </div>
+                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
+                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_closed_tasks}</div>
+                        <div style="font-size: 14px; color: #666;">Tasks Completed Today</div>
+                    </div>
+                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
+                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{today_labor_time:.1f}h</div>
+                        <div style="font-size: 14px; color: #666;">Labor Hours Today</div>
+                    </div>
+                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
+                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">${today_cost:.2f}</div>
+                        <div style="font-size: 14px; color: #666;">Cost Today</div>
+                    </div>
+                </div>
+
+                <div style="background-color: #f0f7ff; border: 1px solid #cfe2ff; border-radius: 6px; padding: 10px; margin-top: 15px;">
+                    <h3 style="color: #3a5a78; margin-top: 0;">Labor & Cost Summary</h3>
+                    <p><strong>Total Labor Hours:</strong> {total_labor_time:.1f}h</p>
+                    <p><strong>Total Cost:</strong> ${total_cost:.2f}</p>
+                    <p><strong>Today's Labor Hours:</strong> {today_labor_time:.1f}h</p>
+                    <p><strong>Today's Cost:</strong> ${today_cost:.2f}</p>
+                </div>
+
+                <div style="background-color: #f0f7ff; border: 1px solid #cfe2ff; border-radius: 6px; padding: 10px; margin-top: 15px;">
+                    <h3 style="color: #3a5a78; margin-top: 0;">Top Performers Today</h3>
+                    {top_performers_html}
+                </div>
+            </div>
+
+            {property_reports}
+
+            <div style="text-align: center; padding: 20px; color: #6c757d; font-size: 14px; background-color: #f9f9f9;">
+                <p>This is an automated report. Please do not reply to this email.</p>
+                <p>© {current_year} Property Management System</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+    # Calculate summary statistics
+    total_open_tickets = sum(len(r['open_tickets']) for r in property_reports)
+    total_closed_tickets = sum(len(r['closed_tickets_today']) for r in property_reports)
+    total_open_tasks = sum(len(r['open_tasks']) for r in property_reports)
+    total_closed_tasks = sum(len(r['closed_tasks_today']) for r in property_reports)
+    total_open_sr = sum(len(r['open_service_requests']) for r in property_reports)
+    total_completed_sr = sum(len(r['completed_service_requests_today']) for r in property_reports)
+
+    # Top performers for the executive's local day
+    start, end, _ = local_day_bounds(timezone_name)
+    top_performers = LeaderboardService().top_workers_between(
+        start,
+        end,
+        property_ids=[p.property_id for p in user_properties],
+        limit=3
+    )
+
+    # Generate top performers HTML
+    top_performers_html = ""
+    if top_performers:
+        for i, stats in enumerate(top_performers, 1):
+            top_performers_html += f"""
+            <p><strong>#{i} {stats['username']}</strong> - Completed {stats['tasks_completed']} tasks (avg score {stats['avg_score'] or 0:.0f})</p>
+            <p style="margin-left: 20px;">Labor: {stats['time_spent_total']:.1f}h, Cost: ${stats['cost_total']:.2f}</p>
+            """
+    else:
+        top_performers_html = "<p>No tickets or tasks were completed today</p>"
+
+    # Generate property reports HTML
+    property_reports_html = ""
+    for report in property_reports:
+        property_reports_html += f"""
+        <div class="property-section">
+            <div class="property-header">
+                <h2>{report['property_name']}</h2>
+                <div class="metrics-grid">
+                    <div class="metric-box">
+                        <div class="metric-value">{len(report['open_tickets'])}</div>
+                        <div class="metric-label">Open Tickets</div>
+                    </div>
+                    <div class="metric-box">
+                        <div class="metric-value">{len(report['closed_tickets_today'])}</div>
+                        <div class="metric-label">Tickets Closed Today</div>
+                    </div>
+                    <div class="metric-box">
+                        <div class="metric-value">{len(report['open_tasks'])}</div>
+                        <div class="metric-label">Open Tasks</div>
+                    </div>
+                    <div class="metric-box">
+                        <div class="metric-value">{len(report['closed_tasks_today'])}</div>
+                        <div class="metric-label">Tasks Completed Today</div>
+                    </div>
+                    <div class="metric-box">
+                        <div class="metric-value">{report['labor_metrics']['today_labor_time']:.1f}h</div>
+                        <div class="metric-label">Labor Hours Today</div>
+                    </div>
+                    <div class="metric-box">
+                        <div class="metric-value">${report['labor_metrics']['today_cost']:.2f}</div>
+                        <div class="metric-label">Cost Today</div>
+                    </div>
+                </div>
+            </div>
+
+            <div class="tab-container">
+                <div class="tab">
+                    <button class="tablinks active" onclick="openTab(event, 'Open{report['property_name'].replace(' ', '')}')" id="defaultOpen">Open Issues</button>
+                    <button class="tablinks" onclick="openTab(event, 'Closed{report['property_name'].replace(' ', '')}')">Resolved Today</button>
+                </div>
+
+                <div id="Open{report['property_name'].replace(' ', '')}" class="tabcontent active">
+                    <h3>Open Tickets ({len(report['open_tickets'])})</h3>
+                    <div class="item-list">
+                        {"".join([build_open_ticket_html(ticket) for ticket in report['open_tickets'][:5]]) if report['open_tickets'] else '<p>No open tickets</p>'}
+                        {f'<p><em>+ {len(report["open_tickets"]) - 5} more open tickets...</em></p>' if len(report['open_tickets']) > 5 else ''}
+                    </div>
+
+                    <h3>Open Tasks ({len(report['open_tasks'])})</h3>
+                    <div class="item-list">
+                        {"".join([build_open_task_html(task) for task in report['open_tasks'][:5]]) if report['open_tasks'] else '<p>No open tasks</p>'}
+                        {f'<p><em>+ {len(report["open_tasks"]) - 5} more open tasks...</em></p>' if len(report['open_tasks']) > 5 else ''}
+                    </div>
+
+                    <h3>Open Service Requests ({len(report['open_service_requests'])})</h3>
+                    <div class="item-list">
+                        {"".join([build_open_service_request_html(sr) for sr in report['open_service_requests'][:5]]) if report['open_service_requests'] else '<p>No open service requests</p>'}
+                        {f'<p><em>+ {len(report["open_service_requests"]) - 5} more open service requests...</em></p>' if len(report['open_service_requests']) > 5 else ''}
+                    </div>
+                </div>
+
+                <div id="Closed{report['property_name'].replace(' ', '')}" class="tabcontent">
+                    <h3>Tickets Closed Today ({len(report['closed_tickets_today'])})</h3>
+                    <div class="item-list">
+                        {"".join([build_closed_ticket_html(ticket) for ticket in report['closed_tickets_today']]) if report['closed_tickets_today'] else '<p>No tickets closed today</p>'}
+                    </div>
+
+                    <h3>Tasks Completed Today ({len(report['closed_tasks_today'])})</h3>
+                    <div class="item-list">
+                        {"".join([build_closed_task_html(task) for task in report['closed_tasks_today']]) if report['closed_tasks_today'] else '<p>No tasks completed today</p>'}
+                    </div>
+
+                    <h3>Service Requests Completed Today ({len(report['completed_service_requests_today'])})</h3>
+                    <div class="item-list">
+                        {"".join([build_closed_service_request_html(sr) for sr in report['completed_service_requests_today']]) if report['completed_service_requests_today'] else '<p>No service requests completed today</p>'}
+                    </div>
+                </div>
+            </div>
+        </div>
+        """
+
+    # Add JavaScript for tab functionality
+    property_reports_html += """
+    <script>
+    function openTab(evt, tabName) {
+        var i, tabcontent, tablinks;
+        tabcontent = document.getElementsByClassName("tabcontent");
+        for (i = 0; i < tabcontent.length; i++) {
+            tabcontent[i].style.display = "none";
+            tabcontent[i].classList.remove("active");
+        }
+        tablinks = document.getElementsByClassName("tablinks");
+        for (i = 0; i < tablinks.length; i++) {
+            tablinks[i].className = tablinks[i].className.replace(" active", "");
+        }
+        document.getElementById(tabName).style.display = "block";
+        document.getElementById(tabName).classList.add("active");
+        evt.currentTarget.className += " active";
+    }
+
+    // Set default tab to be open on load
+    document.addEventListener("DOMContentLoaded", function() {
+        var defaultOpen = document.getElementById("defaultOpen");
+        if(defaultOpen) {
+            defaultOpen.click();
+        }
+    });
+    </script>
+    """
+
+    # Format the email content
+    html_content = html_template.format(
+        current_time=current_time.strftime("%B %d, %Y %I:%M %p %Z"),
+        current_year=current_time.year,
+        total_properties=len(property_reports),
+        total_open_tickets=total_open_tickets,
+        total_closed_tickets=total_closed_tickets,
+        total_open_tasks=total_open_tasks,
+        total_closed_tasks=total_closed_tasks,
+        total_labor_time=total_labor_time,
+        total_cost=total_cost,
+        today_labor_time=today_total_labor_time,
+        today_cost=today_total_cost,
+        top_performers_html=top_performers_html,
+        property_reports=property_reports_html
+    )
+
+    # Send the email
+    email_service.send_email(
+        recipient_email=user.email,
+        subject=f"Executive Daily Report - {current_time.strftime('%B %d, %Y')}",
+        html_content=html_content
+    )
+
+    logging.info(f"Sent daily report to {user.email}")
+
+@track_job('daily_reports')
 def send_daily_reports():
-    """Send daily reports to executive users for their assigned properties"""
+    """Send daily reports to executive users for their assigned properties, all at once"""
     try:
-        # Get current time in Eastern Time
-        et_timezone = pytz.timezone('America/New_York')
-        current_time = datetime.now(et_timezone)
-        
         # Import Flask app to ensure we have an application context
         from app import app
         
-        # Use the app context to ensure database operations work
-        with app.app_context():
+        # Use the app context to ensure database operations work; reports only read, so prefer the replica
+        with app.app_context(), use_replica():
             # Get all active executive users
             executive_users = User.query.filter_by(is_active=True, group='Executive').all()
             logging.info(f"Sending daily reports to {len(executive_users)} executive users")
             
             email_service = EmailService()
+            timezone_name = _default_report_timezone()
             
             for user in executive_users:
                 try:
-                    # Get all properties assigned to this user using the relationship
-                    user_properties = user.assigned_properties.all()
-                    
-                    if not user_properties:
-                        continue
-                    
-                    # Generate reports for each property
-                    property_reports = []
-                    total_labor_time = 0
-                    total_cost = 0
-                    today_total_labor_time = 0
-                    today_total_cost = 0
-                    
-                    for property in user_properties:
-                        report_data = get_daily_property_report(property.property_id)
-                        if has_activity(report_data):
-                            property_reports.append(report_data)
-                            # Add to totals
-                            total_labor_time += report_data['labor_metrics']['total_labor_time']
-                            total_cost += report_data['labor_metrics']['total_cost']
-                            today_total_labor_time += report_data['labor_metrics']['today_labor_time']
-                            today_total_cost += report_data['labor_metrics']['today_cost']
-                    
-                    if not property_reports:
-                        continue
-                    
-                    # Create HTML email template - Enhanced for executives
-                    html_template = """
-                    <!DOCTYPE html>
-                    <html>
-                    <head>
-                        <meta charset="utf-8">
-                        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                    </head>
-                    <body style="font-family: Arial, Helvetica, sans-serif; line-height: 1.6; color: #333; margin: 0; padding: 0; background-color: #f9f9f9;">
-                        <div style="max-width: 900px; margin: 0 auto; background-color: #fff; box-shadow: 0 0 10px rgba(0,0,0,0.1);">
-                            <div style="background-color: #3a5a78; color: white; padding: 20px; text-align: center;">
-                                <h1 style="margin: 0;">Executive Daily Report</h1>
-                                <h3 style="margin: 10px 0 0 0;">{current_time}</h3>
-                            </div>
-                            
-                            <div style="background-color: white; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); padding: 20px; margin: 20px;">
-                                <h2 style="color: #3a5a78; margin-top: 0;">Daily Summary</h2>
-                                <div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 15px; margin-bottom: 20px;">
-                                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
-                                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_properties}</div>
-                                        <div style="font-size: 14px; color: #666;">Properties with Activity</div>
-                                    </div>
-                                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
-                                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_open_tickets}</div>
-                                        <div style="font-size: 14px; color: #666;">Open Tickets</div>
-                                    </div>
-                                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
-                                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_closed_tickets}</div>
-                                        <div style="font-size: 14px; color: #666;">Tickets Closed Today</div>
-                                    </div>
-                                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
-                                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_open_tasks}</div>
-                                        <div style="font-size: 14px; color: #666;">Open Tasks</div>
-                                    </div>
-                                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
-                                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{total_closed_tasks}</div>
-                                        <div style="font-size: 14px; color: #666;">Tasks Completed Today</div>
-                                    </div>
-                                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
-                                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">{today_labor_time:.1f}h</div>
-                                        <div style="font-size: 14px; color: #666;">Labor Hours Today</div>
-                                    </div>
-                                    <div style="background-color: #f8f9fa; border-radius: 6px; padding: 15px; text-align: center; box-shadow: 0 1px 3px rgba(0,0,0,0.08);">
-                                        <div style="font-size: 24px; font-weight: bold; color: #3a5a78; margin: 5px 0;">${today_cost:.2f}</div>
-                                        <div style="font-size: 14px; color: #666;">Cost Today</div>
-                                    </div>
-                                </div>
-                                
-                                <div style="background-color: #f0f7ff; border: 1px solid #cfe2ff; border-radius: 6px; padding: 10px; margin-top: 15px;">
-                                    <h3 style="color: #3a5a78; margin-top: 0;">Labor & Cost Summary</h3>
-                                    <p><strong>Total Labor Hours:</strong> {total_labor_time:.1f}h</p>
-                                    <p><strong>Total Cost:</strong> ${total_cost:.2f}</p>
-                                    <p><strong>Today's Labor Hours:</strong> {today_labor_time:.1f}h</p>
-                                    <p><strong>Today's Cost:</strong> ${today_cost:.2f}</p>
-                                </div>
-                                
-                                <div style="background-color: #f0f7ff; border: 1px solid #cfe2ff; border-radius: 6px; padding: 10px; margin-top: 15px;">
-                                    <h3 style="color: #3a5a78; margin-top: 0;">Top Performers Today</h3>
-                                    {top_performers_html}
-                                </div>
-                            </div>
-                            
-                            {property_reports}
-                            
-                            <div style="text-align: center; padding: 20px; color: #6c757d; font-size: 14px; background-color: #f9f9f9;">
-                                <p>This is an automated report. Please do not reply to this email.</p>
-                                <p>© {current_year} Property Management System</p>
-                            </div>
-                        </div>
-                    </body>
-                    </html>
-                    """
-                    
-                    # Calculate summary statistics
-                    total_open_tickets = sum(len(r['open_tickets']) for r in property_reports)
-                    total_closed_tickets = sum(len(r['closed_tickets_today']) for r in property_reports)
-                    total_open_tasks = sum(len(r['open_tasks']) for r in property_reports)
-                    total_closed_tasks = sum(len(r['closed_tasks_today']) for r in property_reports)
-                    total_open_sr = sum(len(r['open_service_requests']) for r in property_reports)
-                    total_completed_sr = sum(len(r['completed_service_requests_today']) for r in property_reports)
-                    
-                    # Calculate top performers
-                    top_performers = {}
-                    
-                    # Count closed tickets by resolver
-                    for report in property_reports:
-                        for ticket in report['closed_tickets_today']:
-                            resolver = ticket.get('resolved_by', 'Unassigned')
-                            if resolver != 'Unassigned':
-                                if resolver not in top_performers:
-                                    top_performers[resolver] = {'tickets': 0, 'tasks': 0, 'labor_time': 0, 'cost': 0}
-                                top_performers[resolver]['tickets'] += 1
-                        
-                        # Count completed tasks by resolver
-                        for task in report['closed_tasks_today']:
-                            resolver = task.get('resolved_by', 'Unassigned')
-                            if resolver != 'Unassigned':
-                                if resolver not in top_performers:
-                                    top_performers[resolver] = {'tickets': 0, 'tasks': 0, 'labor_time': 0, 'cost': 0}
-                                top_performers[resolver]['tasks'] += 1
-                                top_performers[resolver]['labor_time'] += task.get('time_spent', 0) or 0
-                                top_performers[resolver]['cost'] += task.get('cost', 0) or 0
-                    
-                    # Sort by total (tickets + tasks)
-                    sorted_performers = sorted(
-                        top_performers.items(),
-                        key=lambda x: (x[1]['tickets'] + x[1]['tasks']),
-                        reverse=True
-                    )
-                    
-                    # Generate top performers HTML
-                    top_performers_html = ""
-                    if sorted_performers:
-                        for i, (name, stats) in enumerate(sorted_performers[:3], 1):
-                            top_performers_html += f"""
-                            <p><strong>#{i} {name}</strong> - Resolved {stats['tickets']} tickets and completed {stats['tasks']} tasks</p>
-                            <p style="margin-left: 20px;">Labor: {stats['labor_time']:.1f}h, Cost: ${stats['cost']:.2f}</p>
-                            """
-                    else:
-                        top_performers_html = "<p>No tickets or tasks were completed today</p>"
-                    
-                    # Generate property reports HTML
-                    property_reports_html = ""
-                    for report in property_reports:
-                        property_reports_html += f"""
-                        <div class="property-section">
-                            <div class="property-header">
-                                <h2>{report['property_name']}</h2>
-                                <div class="metrics-grid">
-                                    <div class="metric-box">
-                                        <div class="metric-value">{len(report['open_tickets'])}</div>
-                                        <div class="metric-label">Open Tickets</div>
-                                    </div>
-                                    <div class="metric-box">
-                                        <div class="metric-value">{len(report['closed_tickets_today'])}</div>
-                                        <div class="metric-label">Tickets Closed Today</div>
-                                    </div>
-                                    <div class="metric-box">
-                                        <div class="metric-value">{len(report['open_tasks'])}</div>
-                                        <div class="metric-label">Open Tasks</div>
-                                    </div>
-                                    <div class="metric-box">
-                                        <div class="metric-value">{len(report['closed_tasks_today'])}</div>
-                                        <div class="metric-label">Tasks Completed Today</div>
-                                    </div>
-                                    <div class="metric-box">
-                                        <div class="metric-value">{report['labor_metrics']['today_labor_time']:.1f}h</div>
-                                        <div class="metric-label">Labor Hours Today</div>
-                                    </div>
-                                    <div class="metric-box">
-                                        <div class="metric-value">${report['labor_metrics']['today_cost']:.2f}</div>
-                                        <div class="metric-label">Cost Today</div>
-                                    </div>
-                                </div>
-                            </div>
-                            
-                            <div class="tab-container">
-                                <div class="tab">
-                                    <button class="tablinks active" onclick="openTab(event, 'Open{report['property_name'].replace(' ', '')}')" id="defaultOpen">Open Issues</button>
-                                    <button class="tablinks" onclick="openTab(event, 'Closed{report['property_name'].replace(' ', '')}')">Resolved Today</button>
-                                </div>
-                                
-                                <div id="Open{report['property_name'].replace(' ', '')}" class="tabcontent active">
-                                    <h3>Open Tickets ({len(report['open_tickets'])})</h3>
-                                    <div class="item-list">
-                                        {"".join([build_open_ticket_html(ticket) for ticket in report['open_tickets'][:5]]) if report['open_tickets'] else '<p>No open tickets</p>'}
-                                        {f'<p><em>+ {len(report["open_tickets"]) - 5} more open tickets...</em></p>' if len(report['open_tickets']) > 5 else ''}
-                                    </div>
-                                    
-                                    <h3>Open Tasks ({len(report['open_tasks'])})</h3>
-                                    <div class="item-list">
-                                        {"".join([build_open_task_html(task) for task in report['open_tasks'][:5]]) if report['open_tasks'] else '<p>No open tasks</p>'}
-                                        {f'<p><em>+ {len(report["open_tasks"]) - 5} more open tasks...</em></p>' if len(report['open_tasks']) > 5 else ''}
-                                    </div>
-                                    
-                                    <h3>Open Service Requests ({len(report['open_service_requests'])})</h3>
-                                    <div class="item-list">
-                                        {"".join([build_open_service_request_html(sr) for sr in report['open_service_requests'][:5]]) if report['open_service_requests'] else '<p>No open service requests</p>'}
-                                        {f'<p><em>+ {len(report["open_service_requests"]) - 5} more open service requests...</em></p>' if len(report['open_service_requests']) > 5 else ''}
-                                    </div>
-                                </div>
-                                
-                                <div id="Closed{report['property_name'].replace(' ', '')}" class="tabcontent">
-                                    <h3>Tickets Closed Today ({len(report['closed_tickets_today'])})</h3>
-                                    <div class="item-list">
-                                        {"".join([build_closed_ticket_html(ticket) for ticket in report['closed_tickets_today']]) if report['closed_tickets_today'] else '<p>No tickets closed today</p>'}
-                                    </div>
-                                    
-                                    <h3>Tasks Completed Today ({len(report['closed_tasks_today'])})</h3>
-                                    <div class="item-list">
-                                        {"".join([build_closed_task_html(task) for task in report['closed_tasks_today']]) if report['closed_tasks_today'] else '<p>No tasks completed today</p>'}
-                                    </div>
-                                    
-                                    <h3>Service Requests Completed Today ({len(report['completed_service_requests_today'])})</h3>
-                                    <div class="item-list">
-                                        {"".join([build_closed_service_request_html(sr) for sr in report['completed_service_requests_today']]) if report['completed_service_requests_today'] else '<p>No service requests completed today</p>'}
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                        """
-                    
-                    # Add JavaScript for tab functionality
-                    property_reports_html += """
-                    <script>
-                    function openTab(evt, tabName) {
-                        var i, tabcontent, tablinks;
-                        tabcontent = document.getElementsByClassName("tabcontent");
-                        for (i = 0; i < tabcontent.length; i++) {
-                            tabcontent[i].style.display = "none";
-                            tabcontent[i].classList.remove("active");
-                        }
-                        tablinks = document.getElementsByClassName("tablinks");
-                        for (i = 0; i < tablinks.length; i++) {
-                            tablinks[i].className = tablinks[i].className.replace(" active", "");
-                        }
-                        document.getElementById(tabName).style.display = "block";
-                        document.getElementById(tabName).classList.add("active");
-                        evt.currentTarget.className += " active";
-                    }
-                    
-                    // Set default tab to be open on load
-                    document.addEventListener("DOMContentLoaded", function() {
-                        var defaultOpen = document.getElementById("defaultOpen");
-                        if(defaultOpen) {
-                            defaultOpen.click();
-                        }
-                    });
-                    </script>
-                    """
-                    
-                    # Format the email content
-                    html_content = html_template.format(
-                        current_time=current_time.strftime("%B %d, %Y %I:%M %p ET"),
-                        current_year=current_time.year,
-                        total_properties=len(property_reports),
-                        total_open_tickets=total_open_tickets,
-                        total_closed_tickets=total_closed_tickets,
-                        total_open_tasks=total_open_tasks,
-                        total_closed_tasks=total_closed_tasks,
-                        total_labor_time=total_labor_time,
-                        total_cost=total_cost,
-                        today_labor_time=today_total_labor_time,
-                        today_cost=today_total_cost,
-                        top_performers_html=top_performers_html,
-                        property_reports=property_reports_html
-                    )
-                    
-                    # Send the email
-                    email_service.send_email(
-                        recipient_email=user.email,
-                        subject=f"Executive Daily Report - {current_time.strftime('%B %d, %Y')}",
-                        html_content=html_content
-                    )
-                    
-                    logging.info(f"Sent daily report to {user.email}")
-                    
+                    _send_executive_report(user, user.assigned_properties.all(), timezone_name, email_service)
                 except Exception as e:
                     logging.error(f"Error sending report to user {user.email}: {str(e)}")
                     continue
@@ -630,12 +882,200 @@ def send_daily_reports():
     except Exception as e:
         logging.error(f"Error in send_daily_reports: {str(e)}")
 
+@track_job('daily_report')
+def send_executive_report(user_id, property_ids, timezone_name):
+    """Send one executive the report for their properties in one timezone; run by the staggered report jobs"""
+    from app import app
+
+    with app.app_context(), _report_slot(), use_replica():
+        try:
+            user = User.query.get(user_id)
+            if not user or not user.is_active:
+                return
+            properties = Property.query.filter(Property.property_id.in_(property_ids)).order_by(Property.property_id).all()
+            _send_executive_report(user, properties, timezone_name, EmailService())
+        except Exception as e:
+            logging.error(f"Error sending report to user {user_id}: {str(e)}")
+
+@track_job('sla_sync')
+def sync_sla_records():
+    """Apply new history rows to the SLA records"""
+    from app import app
+    from app.services.sla_service import SlaService
+
+    with app.app_context():
+        try:
+            SlaService().sync()
+        except Exception as e:
+            logging.error(f"Error in sync_sla_records: {str(e)}")
+            db.session.rollback()
+
+@track_job('replica_heartbeat')
+def write_replica_heartbeat():
+    """Stamp the replica heartbeat row on the primary"""
+    from app import app
+
+    with app.app_context():
+        try:
+            record_replica_heartbeat()
+        except Exception as e:
+            logging.error(f"Error in write_replica_heartbeat: {str(e)}")
+
+@track_job('due_date_reminders')
+def send_due_date_reminders():
+    """Fire the reminders and escalations whose time has come"""
+    from app import app
+
+    with app.app_context():
+        try:
+            run_due_date_tick()
+        except Exception as e:
+            logging.error(f"Error in send_due_date_reminders: {str(e)}")
+            db.session.rollback()
+
+@track_job('checklist_generation')
+def generate_checklist_instances():
+    """Create the current period's checklist instances"""
+    from app import app
+    from app.services.checklist_service import ChecklistService
+
+    with app.app_context():
+        try:
+            ChecklistService().generate_instances()
+        except Exception as e:
+            logging.error(f"Error in generate_checklist_instances: {str(e)}")
+            db.session.rollback()
+
+@track_job('idempotency_purge')
+def purge_idempotency_keys():
+    """Delete expired idempotency keys"""
+    from app import app
+    from app.services.idempotency import purge_expired_keys
+
+    with app.app_context():
+        try:
+            purged = purge_expired_keys()
+            if purged:
+                logging.info(f"Purged {purged} expired idempotency keys")
+        except Exception as e:
+            logging.error(f"Error in purge_idempotency_keys: {str(e)}")
+            db.session.rollback()
+
+@track_job('change_event_purge')
+def purge_old_change_events():
+    """Delete change events past their retention"""
+    from app import app
+    from app.services.change_stream import purge_change_events
+
+    with app.app_context():
+        try:
+            purged = purge_change_events()
+            if purged:
+                logging.info(f"Purged {purged} old change events")
+        except Exception as e:
+            logging.error(f"Error in purge_old_change_events: {str(e)}")
+            db.session.rollback()
+
+@track_job('due_notification_purge')
+def purge_old_due_notifications():
+    """Delete sent-notification records past their retention"""
+    from app import app
+    from app.services.due_date_engine import purge_due_notifications
+
+    with app.app_context():
+        try:
+            purged = purge_due_notifications()
+            if purged:
+                logging.info(f"Purged {purged} old due-date notifications")
+        except Exception as e:
+            logging.error(f"Error in purge_old_due_notifications: {str(e)}")
+            db.session.rollback()
+
+@track_job('property_deletion_resume')
+def resume_property_deletions():
+    """Finish property deletions that stopped reporting progress"""
+    from app import app
+    from app.services.property_deletion import resume_stale_deletions
+
+    with app.app_context():
+        try:
+            resumed = resume_stale_deletions()
+            if resumed:
+                logging.info(f"Resumed {resumed} stale property deletions")
+        except Exception as e:
+            logging.error(f"Error in resume_property_deletions: {str(e)}")
+            db.session.rollback()
+
+def renew_scheduler_lease():
+    """Keep the lease while this process leads, or take it over once the leader has gone"""
+    from app import app
+
+    with app.app_context():
+        try:
+            if scheduler_leader.try_acquire():
+                prune_job_runs()
+                run_missed_jobs(scheduler)
+        except Exception as e:
+            logging.error(f"Error renewing scheduler lease: {str(e)}")
+
+def release_scheduler_lease():
+    """Hand the lease over on shutdown instead of waiting for it to expire"""
+    from app import app
+
+    with app.app_context():
+        try:
+            scheduler_leader.release()
+        except Exception as e:
+            logging.error(f"Error releasing scheduler lease: {str(e)}")
+
+def shutdown_scheduler():
+    """Stop this process's scheduler and hand over the lease, e.g. before workers are forked from it"""
+    global scheduler
+    if scheduler and scheduler.running:
+        # Also safe in a forked child, whose copy has no threads left to stop
+        scheduler.shutdown(wait=False)
+    scheduler = None
+    release_scheduler_lease()
+
+# Scheduled entry points - the plain functions stay callable directly, e.g. to resend reports
+scheduled_daily_reports = leader_only('daily_reports')(send_daily_reports)
+scheduled_sla_sync = leader_only('sla_sync')(sync_sla_records)
+scheduled_replica_heartbeat = leader_only('replica_heartbeat')(write_replica_heartbeat)
+scheduled_due_date_reminders = leader_only('due_date_reminders')(send_due_date_reminders)
+scheduled_checklist_generation = leader_only('checklist_generation')(generate_checklist_instances)
+scheduled_idempotency_purge = leader_only('idempotency_purge')(purge_idempotency_keys)
+scheduled_change_event_purge = leader_only('change_event_purge')(purge_old_change_events)
+scheduled_due_notification_purge = leader_only('due_notification_purge')(purge_old_due_notifications)
+scheduled_property_deletion_resume = leader_only('property_deletion_resume')(resume_property_deletions)
+
+def get_scheduler_status():
+    """The lease holder, this process's jobs and the most recent job runs across the cluster"""
+    jobs = []
+    if scheduler:
+        for job in scheduler.get_jobs():
+            last_run = get_job_runs(limit=1, job_id=job.id)
+            jobs.append({
+                'id': job.id,
+                'name': job.name,
+                'next_run': job.next_run_time.strftime("%Y-%m-%d %H:%M:%S %Z") if job.next_run_time else None,
+                'last_run': last_run[0].to_dict() if last_run else None
+            })
+    return {
+        'running': bool(scheduler and scheduler.running),
+        'leader': scheduler_leader.current(),
+        'this_process': scheduler_leader.holder,
+        'is_leader': scheduler_leader.is_leader(),
+        'jobs': jobs,
+        'due_dates': due_date_engine.stats(),
+        'recent_runs': [run.to_dict() for run in get_job_runs()]
+    }
+
 def verify_scheduler_settings():
     """Verify and update scheduler settings"""
     global scheduler
     
     try:
-        settings = EmailSettings.query.first()
+        settings = get_settings(EmailSettings)
         if not settings:
             logging.warning("⚠️ No email settings found in database. Scheduler email functionality may not work.")
             return {"status": "warning", "message": "No email settings found in database"}
@@ -669,58 +1109,34 @@ def verify_scheduler_settings():
             logging.info("✅ Scheduler started successfully")
             return {"status": "warning", "message": "Scheduler was not running and has been started"}
 
-        # Verify daily report job exists and has correct settings
-        daily_job = scheduler.get_job('daily_reports')
-        
-        if not daily_job and settings.enable_daily_reports:
-            logging.warning("⚠️ Daily report job not scheduled. Adding job...")
-            update_daily_report_schedule(
-                hour=settings.daily_report_hour,
-                minute=settings.daily_report_minute,
-                timezone=settings.daily_report_timezone,
-                enabled=settings.enable_daily_reports
-            )
-            daily_job = scheduler.get_job('daily_reports')
-            if daily_job:
-                logging.info("✅ Daily report job added successfully")
-                return {"status": "success", "message": "Daily report job has been created", "next_run": daily_job.next_run_time.strftime("%Y-%m-%d %H:%M:%S %Z")}
-            else:
-                return {"status": "error", "message": "Failed to add daily report job"}
-                
-        elif daily_job and not settings.enable_daily_reports:
-            logging.warning("⚠️ Daily reports are disabled in settings but job exists. Removing job...")
-            scheduler.remove_job('daily_reports')
-            return {"status": "success", "message": "Daily reports are disabled and the job has been removed"}
-            
-        elif daily_job:
-            # Check if job settings match database settings
-            job_trigger = daily_job.trigger
-            settings_changed = False
-            
-            if hasattr(job_trigger, 'hour') and job_trigger.hour != settings.daily_report_hour:
-                settings_changed = True
-            elif hasattr(job_trigger, 'minute') and job_trigger.minute != settings.daily_report_minute:
-                settings_changed = True
-            elif hasattr(job_trigger, 'timezone') and str(job_trigger.timezone) != settings.daily_report_timezone:
-                settings_changed = True
-                
-            if settings_changed:
-                logging.info("⚠️ Daily report job settings don't match database. Updating...")
-                update_daily_report_schedule(
-                    hour=settings.daily_report_hour,
-                    minute=settings.daily_report_minute,
-                    timezone=settings.daily_report_timezone,
-                    enabled=settings.enable_daily_reports
-                )
-                daily_job = scheduler.get_job('daily_reports')
-                return {"status": "success", "message": "Daily report job settings have been updated", "next_run": daily_job.next_run_time.strftime("%Y-%m-%d %H:%M:%S %Z")}
-            
-            # Verify the next run time is as expected (should be at 6pm EST today or tomorrow)
-            next_run = daily_job.next_run_time
-            logging.info(f"✅ Next daily report scheduled for: {next_run.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            return {"status": "success", "message": "Scheduler settings verified successfully", "next_run": next_run.strftime("%Y-%m-%d %H:%M:%S %Z")}
-        else:
+        # Verify the daily report jobs match the settings and the current executive assignments
+        daily_jobs = get_daily_report_jobs()
+
+        if not settings.enable_daily_reports:
+            if daily_jobs:
+                logging.warning("⚠️ Daily reports are disabled in settings but jobs exist. Removing jobs...")
+                remove_daily_report_jobs()
+                return {"status": "success", "message": "Daily reports are disabled and the jobs have been removed"}
             return {"status": "success", "message": "Daily reports are disabled in settings and no job exists"}
+
+        before = {job.id: repr(job.trigger) for job in daily_jobs}
+        plan = schedule_daily_reports(
+            hour=settings.daily_report_hour,
+            minute=settings.daily_report_minute,
+            timezone=settings.daily_report_timezone
+        )
+        after = {job.id: repr(job.trigger) for job in get_daily_report_jobs()}
+        next_run = _next_daily_report_run()
+        next_run_text = next_run.strftime("%Y-%m-%d %H:%M:%S %Z") if next_run else None
+
+        if not plan:
+            return {"status": "success", "message": "No executives with assigned properties to report to"}
+        if before != after:
+            logging.info("⚠️ Daily report jobs did not match the settings. Updated.")
+            return {"status": "success", "message": f"Daily report jobs have been updated ({len(plan)} scheduled)", "next_run": next_run_text}
+
+        logging.info(f"✅ Next daily report scheduled for: {next_run_text}")
+        return {"status": "success", "message": f"Scheduler settings verified successfully ({len(plan)} daily report jobs)", "next_run": next_run_text}
             
     except Exception as e:
         error_msg = f"Error verifying scheduler settings: {str(e)}"
@@ -0,0 +1,60 @@
+from sqlalchemy import true
+from app.services.identity_cache import get_identity_entry
+
+# Roles that may read every property
+UNRESTRICTED_READ_ROLES = ('super_admin', 'general_manager')
+# Roles that may change every property
+UNRESTRICTED_WRITE_ROLES = ('super_admin',)
+# Roles whose scope comes from property_managers rather than user_properties
+MANAGING_ROLES = ('manager', 'general_manager')
+
+class AccessScope:
+    """The set of properties a user can read and write, computed once per cached identity"""
+
+    def __init__(self, user_id, role, read_ids, write_ids):
+        self.user_id = user_id
+        self.role = role
+        # None means unrestricted
+        self.read_ids = read_ids
+        self.write_ids = write_ids
+
+    @classmethod
+    def for_entry(cls, entry):
+        role = entry.user.role
+        linked = entry.managed_property_ids if role in MANAGING_ROLES else entry.assigned_property_ids
+        read_ids = None if role in UNRESTRICTED_READ_ROLES else linked
+        write_ids = None if role in UNRESTRICTED_WRITE_ROLES else linked
+        return cls(entry.user.user_id, role, read_ids, write_ids)
+
+    @property
+    def unrestricted(self):
+        return self.read_ids is None
+
+    @property
+    def property_ids(self):
+        """Readable property IDs, or None when every property is readable"""
+        return self.read_ids
+
+    def can_access(self, property_id):
+        """O(1) read check for a single property"""
+        return self.read_ids is None or property_id in self.read_ids
+
+    def can_write(self, property_id):
+        """O(1) write check for a single property"""
+        return self.write_ids is None or property_id in self.write_ids
+
+    def filter_clause(self, column, write=False):
+        """SQL clause restricting a property_id column to this scope"""
+        ids = self.write_ids if write else self.read_ids
+        if ids is None:
+            return true()
+        return column.in_(ids)
+
+def get_access_scope(user):
+    """Return the AccessScope for a user, reusing it until their identity is invalidated"""
+    entry = get_identity_entry(user)
+    if entry is None:
+        return AccessScope(user.user_id, user.role, frozenset(), frozenset())
+    if entry.access_scope is None:
+        entry.access_scope = AccessScope.for_entry(entry)
+    return entry.access_scope
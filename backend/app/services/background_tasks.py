@@ -2,6 +2,19 @@ from threading import Thread
 from flask import current_app
 from app.services.email_service import EmailService
 from app.services.sms_service import SMSService
+from app.metrics import NOTIFICATIONS_IN_FLIGHT
+
+def _run_in_background(send, channel):
+    """Run a notification send on its own thread, tracking how many are pending"""
+    gauge = NOTIFICATIONS_IN_FLIGHT.labels(channel)
+    gauge.inc()
+
+    def _run():
+        try:
+            send()
+        finally:
+            gauge.dec()
+    Thread(target=_run).start()
 
 def send_email_async(email_service, recipient_email, subject, html_content):
     """Send email asynchronously"""
@@ -14,7 +27,7 @@ def send_task_notification_async(task, user, property_name):
         with current_app.app_context():
             email_service = EmailService()
             email_service.send_task_assignment_notification(user, task, property_name)
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_ticket_notification_async(ticket, property_name, recipients, notification_type="new", changes=None, updated_by=None):
     """Send ticket notification asynchronously"""
@@ -29,12 +42,14 @@ def send_ticket_notification_async(ticket, property_name, recipients, notificati
                 changes,
                 updated_by
             )
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_service_request_notification_async(staff_members, room_name, request_details):
-    """Send service request notification asynchronously"""
+    """Send service request notification asynchronously; staff_members only need a phone attribute"""
+    app = current_app._get_current_object()
+
     def _send():
-        with current_app.app_context():
+        with app.app_context():
             sms_service = SMSService()
             for staff in staff_members:
                 if staff.phone:
@@ -45,8 +60,8 @@ def send_service_request_notification_async(staff_members, room_name, request_de
                             staff.phone
                         )
                     except Exception as e:
-                        current_app.logger.error(f"Error sending SMS to {staff.phone}: {str(e)}")
-    Thread(target=_send).start()
+                        app.logger.error(f"Error sending SMS to {staff.phone}: {str(e)}")
+    _run_in_background(_send, 'sms')
 
 def send_user_registration_notification_async(user, password, registered_by=None):
     """Send user registration notification asynchronously"""
@@ -54,7 +69,7 @@ def send_user_registration_notification_async(user, password, registered_by=None
         with current_app.app_context():
             email_service = EmailService()
             email_service.send_user_registration_email(user, password, registered_by)
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_user_management_notification_async(user, changes, updated_by, admin_emails, change_type):
     """Send user management notification asynchronously"""
@@ -68,7 +83,7 @@ def send_user_management_notification_async(user, changes, updated_by, admin_ema
                 admin_emails=admin_emails,
                 change_type=change_type
             )
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_password_reset_notification_async(user, reset_by, is_self_reset):
     """Send password reset notification asynchronously"""
@@ -80,7 +95,7 @@ def send_password_reset_notification_async(user, reset_by, is_self_reset):
                 reset_by=reset_by,
                 is_self_reset=is_self_reset
             )
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_password_reset_link_async(user, reset_token):
     """Send password reset link asynchronously"""
@@ -91,7 +106,7 @@ def send_password_reset_link_async(user, reset_token):
                 user=user,
                 reset_token=reset_token
             )
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_admin_alert_async(subject, message, admin_emails):
     """Send admin alert asynchronously"""
@@ -103,7 +118,7 @@ def send_admin_alert_async(subject, message, admin_emails):
                 message=message,
                 admin_emails=admin_emails
             )
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_room_status_notification_async(room, property_name, old_status, new_status, recipients):
     """Send room status change notification asynchronously"""
@@ -117,7 +132,7 @@ def send_room_status_notification_async(room, property_name, old_status, new_sta
                 new_status=new_status,
                 recipients=recipients
             )
-    Thread(target=_send).start()
+    _run_in_background(_send, 'email')
 
 def send_property_status_notification_async(property, old_status, new_status, recipients):
     """Send property status change notification asynchronously"""
@@ -130,4 +145,69 @@ def send_property_status_notification_async(property, old_status, new_status, re
                 new_status=new_status,
                 recipients=recipients
             )
-    Thread(target=_send).start() 
\ No newline at end of file
+    _run_in_background(_send, 'email') 
+
+def send_bulk_creation_digests_async(digests):
+    """Send one bulk import digest per recipient; digests are (recipient, tickets, tasks) tuples"""
+    app = current_app._get_current_object()
+
+    def _send():
+        with app.app_context():
+            email_service = EmailService()
+            for user, tickets, tasks in digests:
+                try:
+                    email_service.send_bulk_creation_digest(user, tickets, tasks)
+                except Exception as e:
+                    app.logger.error(f"Error sending bulk import digest to {user.email}: {str(e)}")
+    _run_in_background(_send, 'email')
+
+def send_bulk_update_digests_async(digests, updated_by):
+    """Send one bulk update digest per recipient; digests are (recipient, changes) tuples"""
+    app = current_app._get_current_object()
+
+    def _send():
+        with app.app_context():
+            email_service = EmailService()
+            for user, changes in digests:
+                try:
+                    email_service.send_bulk_update_digest(user, changes, updated_by)
+                except Exception as e:
+                    app.logger.error(f"Error sending bulk update digest to {user.email}: {str(e)}")
+    _run_in_background(_send, 'email')
+
+def notify_ticket_created_async(ticket_id, task_id=None):
+    """Email a new ticket's task assignee and the property's managers and super admins, by id"""
+    app = current_app._get_current_object()
+    if not app.config.get('ENABLE_EMAIL_NOTIFICATIONS', True):
+        return
+
+    def _send():
+        from app.extensions import db
+        from app.models import Ticket, Task, User, PropertyManager
+        with app.app_context():
+            try:
+                ticket = db.session.get(Ticket, ticket_id)
+                if not ticket:
+                    return
+                email_service = EmailService()
+                property_name = ticket.property.name if ticket.property else "Unknown Property"
+
+                task = db.session.get(Task, task_id) if task_id else None
+                if task and task.assigned_to:
+                    try:
+                        email_service.send_task_assignment_notification(task.assigned_to, task, property_name)
+                    except Exception as e:
+                        app.logger.error(f"Failed to send task assignment email: {str(e)}")
+
+                property_managers = User.query.join(PropertyManager).filter(
+                    PropertyManager.property_id == ticket.property_id,
+                    User.is_active == True
+                ).all()
+                super_admins = User.query.filter_by(role='super_admin').all()
+                recipients = list(set(property_managers + super_admins))
+                email_service.send_ticket_notification(ticket, property_name, recipients, notification_type="new")
+            except Exception as e:
+                app.logger.error(f"Error sending notifications for ticket #{ticket_id}: {str(e)}")
+            finally:
+                db.session.remove()
+    _run_in_background(_send, 'email')
@@ -0,0 +1,394 @@
+import csv
+import io
+from collections import namedtuple
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import select, insert
+from app.extensions import db
+from app.models import User, Property, PropertyManager, Room, Ticket, Task, TaskAssignment, History
+from app.services.access_scope import get_access_scope
+from app.services.ticket_routing import TicketRouter
+from app.services.background_tasks import send_bulk_creation_digests_async
+from app.services.property_deletion import visible_property_clause
+
+NOTIFY_MODES = ('digest', 'none')
+
+# Room status a new ticket puts the room into, by category; other categories only take an available room out of order
+ROOM_STATUS_BY_CATEGORY = {'Maintenance': 'Maintenance', 'Housekeeping': 'Cleaning'}
+
+# What a digest email needs from a recipient, as plain values the email thread can read safely
+DigestRecipient = namedtuple('DigestRecipient', 'user_id username email')
+
+def property_recipients(property_ids):
+    """Digest recipients for changes at some properties: their active managers by property, and the super admins"""
+    managers = {}
+    for property_id, user_id, username, email in db.session.execute(
+        select(PropertyManager.property_id, User.user_id, User.username, User.email)
+        .join(User, User.user_id == PropertyManager.user_id)
+        .where(PropertyManager.property_id.in_(property_ids), User.is_active == True)
+    ):
+        managers.setdefault(property_id, []).append(DigestRecipient(user_id, username, email))
+    super_admins = [DigestRecipient(*row) for row in db.session.execute(
+        select(User.user_id, User.username, User.email).where(User.role == 'super_admin', User.is_active == True)
+    )]
+    return managers, super_admins
+
+class BulkCreateError(ValueError):
+    """The request as a whole cannot be processed"""
+
+def parse_rows(payload=None, stream=None):
+    """Return (row_num, dict) pairs from a JSON array or a CSV upload.
+
+    JSON items are numbered from 1; CSV rows use their line number. Empty CSV cells are
+    treated as missing.
+    """
+    if stream is not None:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            return [
+                (row_num, {key: value for key, value in row.items() if key and value not in (None, '')})
+                for row_num, row in enumerate(csv.DictReader(text), start=2)
+            ]
+        except UnicodeDecodeError:
+            raise BulkCreateError("CSV file must be UTF-8 encoded")
+        finally:
+            text.detach()
+    if isinstance(payload, dict):
+        payload = payload.get('items')
+    if not isinstance(payload, list):
+        raise BulkCreateError("Expected a JSON array of items or a CSV file")
+    return list(enumerate(payload, start=1))
+
+def _int(data, field):
+    value = data.get(field)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number")
+
+def _float(data, field):
+    value = data.get(field)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number")
+
+def _bool(data, field, default):
+    value = data.get(field)
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes', 'y')
+    return bool(value)
+
+def _datetime(data, field):
+    """Parse an ISO 8601 timestamp, storing aware values as naive UTC like the rest of the schema"""
+    value = data.get(field)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO 8601 date")
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _referenced_ids(rows, field):
+    """Distinct integer IDs a batch refers to in one field, ignoring values that will fail validation"""
+    ids = set()
+    for _, data in rows:
+        if isinstance(data, dict):
+            try:
+                ids.add(_int(data, field))
+            except ValueError:
+                pass
+    ids.discard(None)
+    return ids
+
+def _required(data, fields):
+    for field in fields:
+        if data.get(field) in (None, ''):
+            raise ValueError(f"Missing required field: {field}")
+
+class BulkCreateService:
+    """Creates many tickets or tasks in one transaction.
+
+    Lookups (properties, rooms, users, tickets, routing) are resolved once per request, and
+    each table is written with a single flush, which SQLAlchemy batches into multi-row
+    INSERTs. Rows that fail validation are skipped and reported by row number.
+    """
+
+    def __init__(self, current_user, notify='digest'):
+        if notify not in NOTIFY_MODES:
+            raise BulkCreateError(f"notify must be one of: {', '.join(NOTIFY_MODES)}")
+        self.current_user = current_user
+        self.notify = notify
+        self.scope = get_access_scope(current_user)
+        self.max_rows = current_app.config.get('BULK_CREATE_MAX_ROWS', 5000)
+
+    def _check_size(self, rows):
+        if not rows:
+            raise BulkCreateError("No items provided")
+        if len(rows) > self.max_rows:
+            raise BulkCreateError(f"Too many items; at most {self.max_rows} per request")
+
+    def _properties(self, rows):
+        """Writable properties referenced by the rows, by ID; properties being deleted take no new items"""
+        ids = _referenced_ids(rows, 'property_id')
+        if not ids:
+            return {}
+        properties = db.session.execute(
+            select(Property).where(Property.property_id.in_(ids), visible_property_clause())
+        ).scalars()
+        return {p.property_id: p for p in properties if self.scope.can_write(p.property_id)}
+
+    def _collect(self, rows, build):
+        """Run build over every row, returning the built values and (row_num, message) errors"""
+        built = []
+        errors = []
+        for row_num, data in rows:
+            if not isinstance(data, dict):
+                errors.append((row_num, "Item must be an object"))
+                continue
+            try:
+                built.append(build(data))
+            except ValueError as e:
+                errors.append((row_num, str(e)))
+        return built, errors
+
+    def create_tickets(self, rows):
+        """Create tickets, their routed tasks and assignments, and the matching history"""
+        self._check_size(rows)
+        properties = self._properties(rows)
+        room_ids = _referenced_ids(rows, 'room_id')
+        rooms = {}
+        if room_ids:
+            rooms = {r.room_id: r for r in db.session.execute(select(Room).where(Room.room_id.in_(room_ids))).scalars()}
+
+        def build(data):
+            _required(data, ('title', 'description', 'priority', 'category', 'property_id'))
+            property_id = _int(data, 'property_id')
+            if property_id not in properties:
+                raise ValueError(f"Property {property_id} not found or not accessible")
+            room_id = _int(data, 'room_id')
+            if room_id and (room_id not in rooms or rooms[room_id].property_id != property_id):
+                raise ValueError("Invalid room_id or room does not belong to the property")
+            if len(str(data['title'])) > 100:
+                raise ValueError("title must be at most 100 characters")
+            return Ticket(
+                title=data['title'],
+                description=data['description'],
+                priority=data['priority'],
+                category=data['category'],
+                subcategory=data.get('subcategory'),
+                property_id=property_id,
+                user_id=self.current_user.user_id,
+                room_id=room_id,
+                is_incident_report=_bool(data, 'is_incident_report', False),
+                incident_type=data.get('incident_type'),
+                incident_location=data.get('incident_location'),
+                incident_date=_datetime(data, 'incident_date'),
+                injury_type=data.get('injury_type'),
+                severity=data.get('severity'),
+                witness_names=data.get('witness_names'),
+                police_report_filed=_bool(data, 'police_report_filed', False),
+                insurance_claim_filed=_bool(data, 'insurance_claim_filed', False),
+                claim_number=data.get('claim_number'),
+                follow_up_required=_bool(data, 'follow_up_required', True),
+                follow_up_date=_datetime(data, 'follow_up_date')
+            )
+
+        tickets, errors = self._collect(rows, build)
+        if not tickets:
+            return {'created': 0, 'ticket_ids': [], 'tasks_created': 0, 'errors': self._errors(errors)}
+
+        for ticket in tickets:
+            room = rooms.get(ticket.room_id)
+            if room:
+                if ticket.category in ROOM_STATUS_BY_CATEGORY:
+                    room.status = ROOM_STATUS_BY_CATEGORY[ticket.category]
+                elif room.status == 'Available':
+                    room.status = 'Out of Order'
+
+        db.session.add_all(tickets)
+        db.session.flush()
+
+        router = TicketRouter(properties)
+        routed = []
+        for ticket in tickets:
+            manager = router.assignee(ticket.property_id, ticket.category)
+            if manager:
+                routed.append((ticket, manager, Task(
+                    title=f"Task for Ticket #{ticket.ticket_id}: {ticket.title}"[:100],
+                    description=f"Auto-generated task for ticket. Category: {ticket.category}\nDescription: {ticket.description}",
+                    status='pending',
+                    priority=ticket.priority,
+                    property_id=ticket.property_id,
+                    assigned_to_id=manager.user_id
+                )))
+        db.session.add_all([task for _, _, task in routed])
+        db.session.flush()
+
+        # History and assignments have no session hooks, so they go out as plain executemany inserts
+        user_id = self.current_user.user_id
+        history = [{'entity_type': 'ticket', 'entity_id': ticket.ticket_id, 'action': 'created', 'user_id': user_id} for ticket in tickets]
+        assignments = []
+        for ticket, manager, task in routed:
+            assignments.append({
+                'task_id': task.task_id, 'ticket_id': ticket.ticket_id,
+                'assigned_to_user_id': manager.user_id, 'status': 'Pending'
+            })
+            history.append({'entity_type': 'task', 'entity_id': task.task_id, 'action': 'created', 'user_id': user_id})
+            history.append({
+                'entity_type': 'task', 'entity_id': task.task_id, 'action': 'assigned', 'field_name': 'assigned_to',
+                'old_value': 'None', 'new_value': manager.username, 'user_id': user_id
+            })
+        self._insert(History, history)
+        self._insert(TaskAssignment, assignments)
+
+        # Read everything the response and digests need before commit expires the new rows
+        result = {
+            'created': len(tickets),
+            'ticket_ids': [ticket.ticket_id for ticket in tickets],
+            'tasks_created': len(routed),
+            'errors': self._errors(errors)
+        }
+        ticket_items = [(ticket.property_id, self._summary(properties, ticket, ticket.ticket_id)) for ticket in tickets]
+        task_items = [(manager, self._summary(properties, task, task.task_id)) for _, manager, task in routed]
+        db.session.commit()
+
+        if self.notify == 'digest':
+            self._send_digests(ticket_items, task_items)
+        return result
+
+    def create_tasks(self, rows):
+        """Create tasks, linking them to tickets where a ticket_id is given"""
+        self._check_size(rows)
+        properties = self._properties(rows)
+        user_ids = _referenced_ids(rows, 'assigned_to_id')
+        ticket_ids = _referenced_ids(rows, 'ticket_id')
+        users = {}
+        if user_ids:
+            users = {u.user_id: u for u in db.session.execute(
+                select(User).where(User.user_id.in_(user_ids), User.is_active == True)
+            ).scalars()}
+        tickets = {}
+        if ticket_ids:
+            tickets = {t.ticket_id: t for t in db.session.execute(
+                select(Ticket).where(Ticket.ticket_id.in_(ticket_ids))
+            ).scalars()}
+
+        def build(data):
+            _required(data, ('title', 'priority', 'property_id'))
+            if 'description' not in data:
+                raise ValueError("Missing required field: description")
+            property_id = _int(data, 'property_id')
+            if property_id not in properties:
+                raise ValueError(f"Property {property_id} not found or not accessible")
+            assigned_to_id = _int(data, 'assigned_to_id')
+            if assigned_to_id and assigned_to_id not in users:
+                raise ValueError(f"User {assigned_to_id} not found or inactive")
+            ticket_id = _int(data, 'ticket_id')
+            ticket = tickets.get(ticket_id) if ticket_id else None
+            if ticket_id and not ticket:
+                raise ValueError(f"Ticket {ticket_id} not found")
+            if ticket and not assigned_to_id:
+                raise ValueError("assigned_to_id is required when linking a task to a ticket")
+            if len(str(data['title'])) > 100:
+                raise ValueError("title must be at most 100 characters")
+            task = Task(
+                title=data['title'],
+                description=data['description'],
+                priority=data['priority'],
+                property_id=property_id,
+                status=data.get('status', 'pending'),
+                assigned_to_id=assigned_to_id,
+                due_date=_datetime(data, 'due_date'),
+                time_spent=_float(data, 'time_spent'),
+                cost=_float(data, 'cost')
+            )
+            if ticket:
+                # Tasks imported from a ticket follow its status and priority
+                task.status = 'completed' if ticket.status == 'completed' else \
+                    'in progress' if ticket.status == 'in progress' else 'pending'
+                task.priority = ticket.priority
+            return task, ticket
+
+        built, errors = self._collect(rows, build)
+        if not built:
+            return {'created': 0, 'task_ids': [], 'errors': self._errors(errors)}
+
+        db.session.add_all([task for task, _ in built])
+        db.session.flush()
+
+        user_id = self.current_user.user_id
+        self._insert(History, [
+            {'entity_type': 'task', 'entity_id': task.task_id, 'action': 'created', 'user_id': user_id}
+            for task, _ in built
+        ])
+        self._insert(TaskAssignment, [
+            {'task_id': task.task_id, 'ticket_id': ticket.ticket_id, 'assigned_to_user_id': task.assigned_to_id, 'status': task.status}
+            for task, ticket in built if ticket
+        ])
+
+        result = {
+            'created': len(built),
+            'task_ids': [task.task_id for task, _ in built],
+            'errors': self._errors(errors)
+        }
+        task_items = [
+            (users[task.assigned_to_id], self._summary(properties, task, task.task_id))
+            for task, _ in built if task.assigned_to_id
+        ]
+        db.session.commit()
+
+        if self.notify == 'digest':
+            self._send_digests([], task_items)
+        return result
+
+    @staticmethod
+    def _insert(model, rows):
+        """Insert plain rows for a model with one executemany, keeping the column defaults"""
+        if rows:
+            db.session.execute(insert(model.__table__), rows)
+
+    @staticmethod
+    def _summary(properties, item, item_id):
+        """What a digest email lists for one ticket or task"""
+        return {
+            'id': item_id,
+            'title': item.title,
+            'priority': item.priority,
+            'property_name': properties[item.property_id].name
+        }
+
+    def _send_digests(self, ticket_items, task_items):
+        """One email per recipient: new tickets at the properties they manage, tasks assigned to them.
+
+        ticket_items are (property_id, summary) pairs and task_items are (assignee, summary) pairs.
+        """
+        recipients = {}
+
+        def entry(user):
+            return recipients.setdefault(user.user_id, (DigestRecipient(user.user_id, user.username, user.email), [], []))
+
+        if ticket_items:
+            managers, super_admins = property_recipients({property_id for property_id, _ in ticket_items})
+            for property_id, item in ticket_items:
+                for user in managers.get(property_id, []) + super_admins:
+                    entry(user)[1].append(item)
+        for user, item in task_items:
+            entry(user)[2].append(item)
+
+        digests = list(recipients.values())
+        if digests:
+            send_bulk_creation_digests_async(digests)
+
+    @staticmethod
+    def _errors(errors):
+        return [{'row': row, 'error': message} for row, message in errors]
@@ -0,0 +1,394 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, insert, update
+from app.extensions import db
+from app.models import User, Property, Room, Ticket, Task, TaskAssignment, History
+from app.services.access_scope import get_access_scope
+from app.services.background_tasks import send_bulk_update_digests_async
+from app.services.bulk_create import NOTIFY_MODES, DigestRecipient, property_recipients
+from app.services.property_deletion import deleting_property_ids
+
+# Fields a bulk update may change on each item
+UPDATABLE_FIELDS = ('status', 'priority', 'assigned_to_id')
+
+# Status a linked ticket or task follows, as manage_task and manage_ticket map them
+TASK_TO_TICKET_STATUS = {'completed': 'completed', 'in progress': 'in progress', 'pending': 'open'}
+TICKET_TO_TASK_STATUS = {'completed': 'completed', 'in progress': 'in progress', 'open': 'pending'}
+
+MANAGING_ROLES = ('super_admin', 'manager', 'general_manager')
+
+class BulkUpdateError(ValueError):
+    """The request as a whole cannot be processed"""
+
+def parse_updates(payload, id_field):
+    """Return (row_num, id, changes) triples from a JSON array (or {"items": [...]}) of updates"""
+    if isinstance(payload, dict):
+        payload = payload.get('items')
+    if not isinstance(payload, list):
+        raise BulkUpdateError("Expected a JSON array of updates")
+    updates = []
+    for row_num, item in enumerate(payload, start=1):
+        if not isinstance(item, dict):
+            updates.append((row_num, None, "Item must be an object"))
+            continue
+        try:
+            item_id = int(item.get(id_field))
+        except (TypeError, ValueError):
+            updates.append((row_num, None, f"{id_field} must be a number"))
+            continue
+        changes = {field: item[field] for field in UPDATABLE_FIELDS if field in item}
+        if not changes:
+            updates.append((row_num, item_id, f"Nothing to update; expected one of: {', '.join(UPDATABLE_FIELDS)}"))
+            continue
+        if any(field != 'assigned_to_id' and not value for field, value in changes.items()):
+            updates.append((row_num, item_id, "status and priority cannot be empty"))
+            continue
+        updates.append((row_num, item_id, changes))
+    return updates
+
+def _update_grouped(key, groups):
+    """One UPDATE per distinct set of new values; groups maps (column, value) to the keys to set it on.
+
+    A key found in several groups gets all of its values in one statement, so its version
+    moves once however many of its fields change.
+    """
+    changes = {}
+    for (column, value), ids in groups.items():
+        for item_id in ids:
+            changes.setdefault(item_id, {})[column] = value
+    merged = {}
+    for item_id, values in changes.items():
+        merged.setdefault(tuple(sorted(values.items(), key=lambda item: item[0])), []).append(item_id)
+
+    version = key.class_.__mapper__.version_id_col
+    for values, ids in merged.items():
+        values = dict(values)
+        if version is not None:
+            # Statement UPDATEs skip the mapper's version check, so bump the version here
+            # for clients holding the old ETag
+            values[version.key] = version + 1
+        db.session.execute(update(key.class_).where(key.in_(ids)).values(values))
+
+class BulkUpdateService:
+    """Applies many status, priority and assignee changes in one transaction.
+
+    Tasks and tickets are loaded with one query each and changed through the ORM, so the
+    leaderboard and due-date hooks see every transition. The linked TaskAssignment and
+    Ticket rows are synced with one UPDATE per distinct set of new values, and history is written
+    with a single executemany.
+    """
+
+    def __init__(self, current_user, notify='digest'):
+        if notify not in NOTIFY_MODES:
+            raise BulkUpdateError(f"notify must be one of: {', '.join(NOTIFY_MODES)}")
+        self.current_user = current_user
+        self.notify = notify
+        self.scope = get_access_scope(current_user)
+        self.is_manager = current_user.role in MANAGING_ROLES
+        self.max_rows = current_app.config.get('BULK_UPDATE_MAX_ROWS', 5000)
+        self.history = []
+
+    def _check_size(self, updates):
+        if not updates:
+            raise BulkUpdateError("No updates provided")
+        if len(updates) > self.max_rows:
+            raise BulkUpdateError(f"Too many updates; at most {self.max_rows} per request")
+
+    def _record(self, entity_type, entity_id, action, field_name=None, old_value=None, new_value=None):
+        self.history.append({
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'action': action,
+            'field_name': field_name,
+            'old_value': str(old_value) if old_value is not None else None,
+            'new_value': str(new_value) if new_value is not None else None,
+            'user_id': self.current_user.user_id
+        })
+
+    def _users(self, updates, *known_ids):
+        """Username and active flag for every user an update names or currently holds an item"""
+        ids = {changes.get('assigned_to_id') for _, _, changes in updates if isinstance(changes, dict)}
+        for group in known_ids:
+            ids.update(group)
+        ids = {user_id for user_id in ids if isinstance(user_id, int)}
+        if not ids:
+            return {}
+        return {row.user_id: row for row in db.session.execute(
+            select(User.user_id, User.username, User.is_active).where(User.user_id.in_(ids))
+        )}
+
+    def _validate(self, updates, items, errors, label):
+        """Yield (row_num, item, changes) for well-formed updates that name a known item, once each"""
+        seen = set()
+        for row_num, item_id, changes in updates:
+            if not isinstance(changes, dict):
+                errors.append((row_num, changes))
+                continue
+            if item_id in seen:
+                errors.append((row_num, f"Duplicate update for {label} {item_id}"))
+                continue
+            seen.add(item_id)
+            item = items.get(item_id)
+            if item is None:
+                errors.append((row_num, f"{label} {item_id} not found"))
+                continue
+            yield row_num, item, changes
+
+    def _check_assignee(self, changes, users, property_id):
+        """Only managers reassign, and only to active users who can see the item's property"""
+        if 'assigned_to_id' not in changes:
+            return
+        if not self.is_manager:
+            raise ValueError("Only managers can change the assignee")
+        assignee_id = changes['assigned_to_id']
+        if assignee_id is None:
+            return
+        if not isinstance(assignee_id, int) or assignee_id not in users or not users[assignee_id].is_active:
+            raise ValueError(f"User {assignee_id} not found or inactive")
+        if not get_access_scope(users[assignee_id]).can_access(property_id):
+            raise ValueError(f"User {assignee_id} has no access to property {property_id}")
+
+    def _deleting(self, items):
+        """IDs of the properties among the items' that are being deleted"""
+        property_ids = {item.property_id for item in items.values() if item.property_id is not None}
+        if not property_ids:
+            return set()
+        return set(db.session.execute(
+            deleting_property_ids().where(Property.property_id.in_(property_ids))
+        ).scalars())
+
+    def _username(self, users, user_id):
+        return users[user_id].username if user_id in users else 'None'
+
+    def update_tasks(self, updates):
+        """Update tasks and sync their ticket assignments and tickets"""
+        self._check_size(updates)
+        ids = {item_id for _, item_id, _ in updates if item_id is not None}
+        tasks = {task.task_id: task for task in db.session.execute(select(Task).where(Task.task_id.in_(ids))).scalars()}
+        users = self._users(updates, {task.assigned_to_id for task in tasks.values()})
+        links = dict(db.session.execute(
+            select(TaskAssignment.task_id, TaskAssignment.ticket_id).where(TaskAssignment.task_id.in_(tasks))
+        ).all()) if tasks else {}
+
+        errors = []
+        changed = {}
+        assignment_groups = {}
+        ticket_groups = {}
+        deleting = self._deleting(tasks)
+        for row_num, task, changes in self._validate(updates, tasks, errors, 'Task'):
+            if not (self.is_manager and self.scope.can_write(task.property_id)) and task.assigned_to_id != self.current_user.user_id:
+                errors.append((row_num, f"Unauthorized for task {task.task_id}"))
+                continue
+            if task.property_id in deleting:
+                errors.append((row_num, f"Task {task.task_id} belongs to a property being deleted"))
+                continue
+            try:
+                self._check_assignee(changes, users, task.property_id)
+            except ValueError as e:
+                errors.append((row_num, str(e)))
+                continue
+
+            ticket_id = links.get(task.task_id)
+            summary = []
+            if 'status' in changes and changes['status'] != task.status:
+                old_status, task.status = task.status, changes['status']
+                self._record('task', task.task_id, 'updated', 'status', old_status, task.status)
+                if task.status == 'completed':
+                    self._record('task', task.task_id, 'completed')
+                assignment_groups.setdefault(('status', task.status), []).append(task.task_id)
+                ticket_status = TASK_TO_TICKET_STATUS.get(task.status)
+                if ticket_id and ticket_status:
+                    ticket_groups.setdefault(('status', ticket_status), []).append(ticket_id)
+                summary.append(f"Status: {old_status} → {task.status}")
+            if 'priority' in changes and changes['priority'] != task.priority:
+                old_priority, task.priority = task.priority, changes['priority']
+                self._record('task', task.task_id, 'updated', 'priority', old_priority, task.priority)
+                if ticket_id:
+                    ticket_groups.setdefault(('priority', task.priority), []).append(ticket_id)
+                summary.append(f"Priority: {old_priority} → {task.priority}")
+            if 'assigned_to_id' in changes and changes['assigned_to_id'] != task.assigned_to_id:
+                old_name = self._username(users, task.assigned_to_id)
+                task.assigned_to_id = changes['assigned_to_id']
+                new_name = self._username(users, task.assigned_to_id)
+                self._record('task', task.task_id, 'updated', 'assigned_to', old_name, new_name)
+                # None unassigns the ticket's assignment as well
+                assignment_groups.setdefault(('assigned_to_user_id', task.assigned_to_id), []).append(task.task_id)
+                summary.append(f"Assigned to: {old_name} → {new_name}")
+            if summary:
+                task.updated_at = datetime.utcnow()
+                changed[task.task_id] = (task, summary)
+
+        if changed:
+            self._complete_tickets(ticket_groups.get(('status', 'completed'), []))
+            _update_grouped(TaskAssignment.task_id, assignment_groups)
+            _update_grouped(Ticket.ticket_id, ticket_groups)
+        return self._finish('task', changed, errors, users, [
+            (task.property_id, f"Task #{task.task_id}: {task.title}", task.assigned_to_id, summary)
+            for task, summary in changed.values()
+        ])
+
+    def _complete_tickets(self, ticket_ids):
+        """Record completion for linked tickets that are about to be completed"""
+        if not ticket_ids:
+            return
+        for ticket_id in db.session.execute(
+            select(Ticket.ticket_id).where(Ticket.ticket_id.in_(ticket_ids), Ticket.status != 'completed')
+        ).scalars():
+            self._record('ticket', ticket_id, 'completed')
+
+    def update_tickets(self, updates):
+        """Update tickets and sync their linked tasks, ticket assignments and rooms"""
+        self._check_size(updates)
+        ids = {item_id for _, item_id, _ in updates if item_id is not None}
+        tickets = {ticket.ticket_id: ticket for ticket in db.session.execute(
+            select(Ticket).where(Ticket.ticket_id.in_(ids))
+        ).scalars()}
+        links = {}
+        if tickets:
+            for task_id, ticket_id in db.session.execute(
+                select(TaskAssignment.task_id, TaskAssignment.ticket_id).where(TaskAssignment.ticket_id.in_(tickets))
+            ):
+                links.setdefault(ticket_id, []).append(task_id)
+        linked_tasks = {}
+        if links:
+            task_ids = [task_id for task_ids in links.values() for task_id in task_ids]
+            linked_tasks = {task.task_id: task for task in db.session.execute(
+                select(Task).where(Task.task_id.in_(task_ids))
+            ).scalars()}
+        users = self._users(updates, {task.assigned_to_id for task in linked_tasks.values()})
+
+        errors = []
+        changed = {}
+        assignment_groups = {}
+        completed_rooms = set()
+        completed_ids = []
+        deleting = self._deleting(tickets)
+        for row_num, ticket, changes in self._validate(updates, tickets, errors, 'Ticket'):
+            if not self.scope.can_write(ticket.property_id):
+                errors.append((row_num, f"Unauthorized for ticket {ticket.ticket_id}"))
+                continue
+            if ticket.property_id in deleting:
+                errors.append((row_num, f"Ticket {ticket.ticket_id} belongs to a property being deleted"))
+                continue
+            try:
+                self._check_assignee(changes, users, ticket.property_id)
+                if 'assigned_to_id' in changes and not links.get(ticket.ticket_id):
+                    raise ValueError(f"Ticket {ticket.ticket_id} has no task to assign")
+            except ValueError as e:
+                errors.append((row_num, str(e)))
+                continue
+
+            tasks = [linked_tasks[task_id] for task_id in links.get(ticket.ticket_id, []) if task_id in linked_tasks]
+            summary = []
+            if 'status' in changes and changes['status'] != ticket.status:
+                old_status, ticket.status = ticket.status, changes['status']
+                self._record('ticket', ticket.ticket_id, 'updated', 'status', old_status, ticket.status)
+                if ticket.status == 'completed':
+                    self._record('ticket', ticket.ticket_id, 'completed')
+                    completed_ids.append(ticket.ticket_id)
+                    if ticket.room_id:
+                        completed_rooms.add(ticket.room_id)
+                task_status = TICKET_TO_TASK_STATUS.get(ticket.status)
+                for task in tasks:
+                    if task_status and task.status != task_status:
+                        task.status = task_status
+                        if task_status == 'completed':
+                            self._record('task', task.task_id, 'completed')
+                    assignment_groups.setdefault(('status', task.status), []).append(task.task_id)
+                summary.append(f"Status: {old_status} → {ticket.status}")
+            if 'priority' in changes and changes['priority'] != ticket.priority:
+                old_priority, ticket.priority = ticket.priority, changes['priority']
+                self._record('ticket', ticket.ticket_id, 'updated', 'priority', old_priority, ticket.priority)
+                for task in tasks:
+                    task.priority = ticket.priority
+                summary.append(f"Priority: {old_priority} → {ticket.priority}")
+            if 'assigned_to_id' in changes:
+                new_name = self._username(users, changes['assigned_to_id'])
+                for task in tasks:
+                    if task.assigned_to_id != changes['assigned_to_id']:
+                        old_name = self._username(users, task.assigned_to_id)
+                        task.assigned_to_id = changes['assigned_to_id']
+                        self._record('task', task.task_id, 'updated', 'assigned_to', old_name, new_name)
+                        assignment_groups.setdefault(('assigned_to_user_id', task.assigned_to_id), []).append(task.task_id)
+                        summary.append(f"Assigned to: {old_name} → {new_name}")
+            if summary:
+                changed[ticket.ticket_id] = (ticket, tasks, summary)
+
+        if changed:
+            _update_grouped(TaskAssignment.task_id, assignment_groups)
+            self._release_rooms(completed_rooms, completed_ids)
+        return self._finish('ticket', changed, errors, users, [
+            (ticket.property_id, f"Ticket #{ticket.ticket_id}: {ticket.title}",
+             tasks[0].assigned_to_id if tasks else None, summary)
+            for ticket, tasks, summary in changed.values()
+        ])
+
+    def _release_rooms(self, room_ids, completed_ids):
+        """Make rooms available again when no other open ticket holds them"""
+        if not room_ids:
+            return
+        busy = set(db.session.execute(
+            select(Ticket.room_id).where(
+                Ticket.room_id.in_(room_ids),
+                Ticket.ticket_id.notin_(completed_ids),
+                Ticket.status.in_(['open', 'in progress'])
+            ).distinct()
+        ).scalars())
+        free = room_ids - busy
+        if free:
+            db.session.execute(update(Room).where(Room.room_id.in_(free)).values(status='Available'))
+
+    def _finish(self, entity_type, changed, errors, users, items):
+        """Write the batched history, commit and send the digests"""
+        if self.history:
+            db.session.execute(insert(History.__table__), self.history)
+
+        properties = {}
+        if items:
+            property_ids = {property_id for property_id, _, _, _ in items}
+            properties = dict(db.session.execute(
+                select(Property.property_id, Property.name).where(Property.property_id.in_(property_ids))
+            ).all())
+        digest_items = [
+            (property_id, assignee_id, {
+                'label': label,
+                'property_name': properties.get(property_id, 'Unknown Property'),
+                'changes': '; '.join(summary)
+            })
+            for property_id, label, assignee_id, summary in items
+        ]
+        db.session.commit()
+
+        if self.notify == 'digest' and digest_items:
+            self._send_digests(digest_items)
+        return {
+            'updated': len(changed),
+            f'{entity_type}_ids': sorted(changed),
+            'errors': [{'row': row, 'error': message} for row, message in sorted(errors)]
+        }
+
+    def _send_digests(self, digest_items):
+        """One email per recipient: super admins, the properties' managers and the assignees"""
+        managers, super_admins = property_recipients({property_id for property_id, _, _ in digest_items})
+        assignee_ids = {assignee_id for _, assignee_id, _ in digest_items if assignee_id}
+        assignees = {}
+        if assignee_ids:
+            assignees = {row.user_id: DigestRecipient(*row) for row in db.session.execute(
+                select(User.user_id, User.username, User.email).where(User.user_id.in_(assignee_ids), User.is_active == True)
+            )}
+
+        recipients = {}
+        for property_id, assignee_id, item in digest_items:
+            users = managers.get(property_id, []) + super_admins
+            if assignee_id in assignees:
+                users.append(assignees[assignee_id])
+            for user in users:
+                # The person who made the changes already knows about them
+                if user.user_id != self.current_user.user_id:
+                    entries = recipients.setdefault(user.user_id, (user, []))[1]
+                    if item not in entries:
+                        entries.append(item)
+
+        digests = list(recipients.values())
+        if digests:
+            send_bulk_update_digests_async(digests, self.current_user.username)
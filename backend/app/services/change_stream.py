@@ -0,0 +1,283 @@
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, select, insert, delete, func
+from app.extensions import db
+from app.models import Ticket, Task, ServiceRequest, Room, ChangeEvent
+
+# Models whose changes are streamed, and the entity_type clients see for them
+STREAM_MODELS = {Ticket: 'ticket', Task: 'task', ServiceRequest: 'service_request', Room: 'room'}
+TABLE_MODELS = {model.__table__: model for model in STREAM_MODELS}
+
+# How long an event ID skipped by the poller is waited for. IDs are handed out when a
+# transaction inserts its events, so on PostgreSQL a later ID can commit first; SQLite
+# writers are serialised and never leave such gaps.
+GAP_WAIT_SECONDS = 10
+
+def format_event(change):
+    """One change as an SSE message"""
+    return f"id: {change['event_id']}\nevent: change\ndata: {json.dumps(change)}\n\n"
+
+def format_reset(reason):
+    """Tell the client it missed events and has to reload its lists"""
+    return f"event: reset\ndata: {json.dumps({'reason': reason})}\n\n"
+
+class Subscription:
+    """One open stream's queue of changes for a property"""
+
+    def __init__(self, property_id, max_pending):
+        self.property_id = property_id
+        # The newest event published when the subscription was made
+        self.start_id = 0
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def push(self, change):
+        try:
+            self._queue.put_nowait(change)
+        except queue.Full:
+            # A client this far behind is told to reload rather than holding memory
+            self.overflowed = True
+
+    def get(self, timeout):
+        """The next change, or None when nothing arrived within timeout seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class ChangeBroker:
+    """Fans committed changes out to the event streams open in this worker.
+
+    Changes are written to change_events in the transaction that makes them, so every
+    worker sees the same events under the same IDs. While streams are open, one thread
+    per worker polls the table for new rows and pushes them to the subscriptions of
+    their property; commits made in this worker wake it at once, commits made by other
+    workers arrive within CHANGE_STREAM_POLL_SECONDS.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._last_id = None
+        self._gaps = {}
+
+    def subscribe(self, property_id):
+        subscription = Subscription(property_id, current_app.config.get('CHANGE_STREAM_MAX_PENDING', 1000))
+        with self._lock:
+            self._subscriptions.setdefault(property_id, set()).add(subscription)
+            if self._thread is None:
+                # Start from the newest event; anything older is the stream's replay to send
+                self._last_id = db.session.execute(select(func.max(ChangeEvent.event_id))).scalar() or 0
+                self._gaps = {}
+                app = current_app._get_current_object()
+                self._thread = threading.Thread(target=self._run, args=(app,), name='change-stream', daemon=True)
+                self._thread.start()
+            subscription.start_id = self._last_id
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.property_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.property_id]
+        self._wake.set()
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def notify(self):
+        """Poll now rather than at the next interval"""
+        self._wake.set()
+
+    def publish(self, change):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(change['property_id'], ()))
+        for subscription in subscriptions:
+            subscription.push(change)
+
+    def poll(self):
+        """Publish events committed since the last poll; returns how many went out"""
+        now = time.monotonic()
+        self._gaps = {event_id: seen for event_id, seen in self._gaps.items() if now - seen < GAP_WAIT_SECONDS}
+        floor = min(self._gaps) - 1 if self._gaps else self._last_id
+        batch = current_app.config.get('CHANGE_STREAM_POLL_BATCH', 500)
+        rows = ChangeEvent.query.filter(ChangeEvent.event_id > floor).order_by(ChangeEvent.event_id).limit(batch).all()
+        published = 0
+        for row in rows:
+            if row.event_id <= self._last_id and self._gaps.pop(row.event_id, None) is None:
+                continue
+            # A large jump (sequence reset, purged rows) only leaves its last IDs as gaps
+            for missing in range(max(self._last_id + 1, row.event_id - batch), row.event_id):
+                self._gaps[missing] = now
+            self._last_id = max(self._last_id, row.event_id)
+            self.publish(row.to_dict())
+            published += 1
+        if len(rows) == batch:
+            self._wake.set()
+        return published
+
+    def _run(self, app):
+        with app.app_context():
+            poll_seconds = app.config.get('CHANGE_STREAM_POLL_SECONDS', 1)
+            while True:
+                self._wake.wait(poll_seconds)
+                self._wake.clear()
+                with self._lock:
+                    if not self._subscriptions:
+                        self._thread = None
+                        return
+                try:
+                    self.poll()
+                except Exception as e:
+                    app.logger.error(f"Error polling change events: {str(e)}")
+                finally:
+                    # Hand the connection back between polls
+                    db.session.remove()
+
+change_broker = ChangeBroker()
+
+def replay_changes(property_id, after_id):
+    """Events for a property after a Last-Event-ID, or None when too many were missed to replay"""
+    limit = current_app.config.get('CHANGE_STREAM_REPLAY_LIMIT', 500)
+    rows = ChangeEvent.query.filter(
+        ChangeEvent.property_id == property_id,
+        ChangeEvent.event_id > after_id
+    ).order_by(ChangeEvent.event_id).limit(limit + 1).all()
+    if len(rows) > limit:
+        return None
+    # An ID older than every retained event may have missed purged ones
+    oldest = db.session.execute(select(func.min(ChangeEvent.event_id))).scalar()
+    if oldest is not None and after_id < oldest - 1:
+        return None
+    return [row.to_dict() for row in rows]
+
+def purge_change_events(chunk_size=1000):
+    """Delete events older than CHANGE_STREAM_RETENTION_HOURS a chunk at a time; returns how many went"""
+    cutoff = datetime.utcnow() - timedelta(hours=current_app.config.get('CHANGE_STREAM_RETENTION_HOURS', 24))
+    purged = 0
+    while True:
+        deleted = db.session.execute(
+            delete(ChangeEvent)
+            .where(ChangeEvent.event_id.in_(
+                select(ChangeEvent.event_id).where(ChangeEvent.created_at < cutoff).limit(chunk_size)
+            ))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        purged += deleted
+        if deleted < chunk_size:
+            return purged
+
+def _pending(session):
+    return session.info.setdefault('change_stream_pending', {})
+
+def _note(session, entity_type, entity_id, property_id, action, version=None):
+    """Keep one event per row and transaction: the first action, unless the row is deleted, and the latest version"""
+    if property_id is None or entity_id is None:
+        return
+    pending = _pending(session)
+    key = (entity_type, entity_id)
+    previous = pending.get(key)
+    if previous and action != 'deleted':
+        action = previous['action']
+    pending[key] = {
+        'property_id': property_id,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'action': action,
+        'version': version
+    }
+
+def _collect_changes(session, flush_context):
+    for objects, action in ((session.new, 'created'), (session.dirty, 'updated'), (session.deleted, 'deleted')):
+        for obj in objects:
+            entity_type = STREAM_MODELS.get(type(obj))
+            if entity_type is None:
+                continue
+            if action == 'updated' and not session.is_modified(obj, include_collections=False):
+                continue
+            entity_id = obj.__mapper__.primary_key_from_instance(obj)[0]
+            _note(session, entity_type, entity_id, obj.property_id, action, getattr(obj, 'version', None))
+
+def _statement_mapper(orm_execute_state):
+    """The model a statement writes to; Core statements against a model's Table carry no bind_mapper"""
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        model = TABLE_MODELS.get(getattr(orm_execute_state.statement, 'table', None))
+        mapper = model.__mapper__ if model is not None else None
+    return mapper
+
+def _collect_bulk_changes(orm_execute_state):
+    """Statement INSERTs and UPDATEs bypass the flush, so find the rows they write"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_insert):
+        return None
+    mapper = _statement_mapper(orm_execute_state)
+    entity_type = STREAM_MODELS.get(mapper.class_) if mapper else None
+    if entity_type is None:
+        return None
+    session = orm_execute_state.session
+    statement = orm_execute_state.statement
+    key = mapper.primary_key[0]
+    property_id = mapper.local_table.c.property_id
+
+    if orm_execute_state.is_insert:
+        # New IDs are only known afterwards, so run the INSERT here with them added to its RETURNING
+        statement = statement.returning(key.label('change_stream_id'), property_id.label('change_stream_property_id'))
+        frozen = orm_execute_state.invoke_statement(statement=statement).freeze()
+        for row in frozen().all():
+            _note(session, entity_type, row[-2], row[-1], 'created')
+        return frozen()
+
+    parameters = orm_execute_state.parameters
+    if isinstance(parameters, (list, tuple)):
+        if statement.whereclause is None:
+            # ORM bulk UPDATE by primary key
+            queries = [(select(key, property_id).where(key.in_([row[key.key] for row in parameters])), {})]
+        else:
+            queries = [(select(key, property_id).where(statement.whereclause), row) for row in parameters]
+    else:
+        query = select(key, property_id)
+        if statement.whereclause is not None:
+            query = query.where(statement.whereclause)
+        queries = [(query, parameters or {})]
+    for query, params in queries:
+        for entity_id, entity_property_id in session.execute(query, params).all():
+            _note(session, entity_type, entity_id, entity_property_id, 'updated')
+    return None
+
+def _write_changes(session):
+    """Insert the transaction's events just before it commits, once its last flush is done"""
+    session.flush()
+    pending = session.info.pop('change_stream_pending', None)
+    if pending:
+        session.connection().execute(insert(ChangeEvent.__table__), list(pending.values()))
+        session.info['change_stream_written'] = True
+
+def _announce_changes(session):
+    if session.info.pop('change_stream_written', None):
+        change_broker.notify()
+
+def _discard_changes(session):
+    session.info.pop('change_stream_pending', None)
+    session.info.pop('change_stream_written', None)
+
+def register_change_stream_hooks():
+    """Record ticket, task, service request and room changes for the /events stream"""
+    for name, fn in (
+        ('after_flush', _collect_changes),
+        ('do_orm_execute', _collect_bulk_changes),
+        ('before_commit', _write_changes),
+        ('after_commit', _announce_changes),
+        ('after_rollback', _discard_changes)
+    ):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,157 @@
+from flask import current_app
+from datetime import datetime, timedelta, time
+from sqlalchemy import select, update, insert, bindparam
+from app.extensions import db, insert_ignoring_duplicates
+from app.models import Checklist, ChecklistInstance, Property, Task, History
+
+RECURRING_TYPES = ('daily', 'weekly', 'monthly')
+
+# Status given to the task of an instance that was missed
+MISSED_TASK_STATUS = 'cancelled'
+
+def period_bounds(checklist_type, day):
+    """Return (period_start, due_at) for the daily, weekly or monthly period containing a date"""
+    if checklist_type == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+    elif checklist_type == 'monthly':
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = day
+        end = start + timedelta(days=1)
+    return start, datetime.combine(end, time.min)
+
+class ChecklistService:
+    """Materializes recurring checklists into one instance per property and period"""
+
+    def __init__(self):
+        self.batch_size = current_app.config.get('CHECKLIST_GENERATION_BATCH_SIZE', 1000)
+        self.create_tasks = current_app.config.get('CHECKLIST_CREATE_TASKS', False)
+        self.logger = current_app.logger
+
+    def _targets(self, checklists):
+        """Property IDs per checklist; checklists without a property apply to every active property"""
+        active_property_ids = None
+        targets = {}
+        for checklist in checklists:
+            if checklist.property_id:
+                targets[checklist.checklist_id] = [checklist.property_id]
+                continue
+            if active_property_ids is None:
+                active_property_ids = db.session.execute(
+                    select(Property.property_id).where(Property.status == 'active')
+                ).scalars().all()
+            targets[checklist.checklist_id] = active_property_ids
+        return targets
+
+    def generate_instances(self, now=None):
+        """Create the missing instances for the current period of every active recurring checklist.
+
+        Existing (checklist, property, period) rows are skipped, so the job can run as often
+        as needed. Returns counts of created instances and tasks and of instances marked missed.
+        """
+        now = now or datetime.utcnow()
+        table = ChecklistInstance.__table__
+
+        checklists = db.session.execute(
+            select(
+                Checklist.checklist_id, Checklist.title, Checklist.description,
+                Checklist.checklist_type, Checklist.property_id, Checklist.department, Checklist.created_by_id
+            ).where(Checklist.is_active == True, Checklist.checklist_type.in_(RECURRING_TYPES))
+        ).all()
+
+        candidates = []
+        targets = self._targets(checklists)
+        for checklist in checklists:
+            period_start, due_at = period_bounds(checklist.checklist_type, now.date())
+            for property_id in targets[checklist.checklist_id]:
+                candidates.append((checklist, property_id, period_start, due_at))
+
+        existing = set()
+        if candidates:
+            existing = set(db.session.execute(
+                select(table.c.checklist_id, table.c.property_id, table.c.period_start).where(
+                    table.c.checklist_id.in_({c.checklist_id for c in checklists}),
+                    table.c.period_start.in_({candidate[2] for candidate in candidates})
+                )
+            ).all())
+        missing = [c for c in candidates if (c[0].checklist_id, c[1], c[2]) not in existing]
+
+        created = 0
+        tasks_created = 0
+        for offset in range(0, len(missing), self.batch_size):
+            batch = missing[offset:offset + self.batch_size]
+            # A concurrent run may have created some of these; only the rows inserted here come back
+            inserted = db.session.execute(
+                insert_ignoring_duplicates(table).returning(
+                    table.c.instance_id, table.c.checklist_id, table.c.property_id, table.c.period_start
+                ),
+                [{
+                    'checklist_id': checklist.checklist_id,
+                    'property_id': property_id,
+                    'department': checklist.department,
+                    'period_start': period_start,
+                    'due_at': due_at,
+                    'status': 'open',
+                    'created_at': now
+                } for checklist, property_id, period_start, due_at in batch]
+            ).all()
+            created += len(inserted)
+            if self.create_tasks and inserted:
+                by_key = {(c[0].checklist_id, c[1], c[2]): c for c in batch}
+                new_instances = [(row.instance_id, by_key[(row.checklist_id, row.property_id, row.period_start)]) for row in inserted]
+                task_ids = self._insert_tasks([candidate for _, candidate in new_instances], now)
+                db.session.execute(
+                    update(table).where(table.c.instance_id == bindparam('b_instance_id')).values(task_id=bindparam('b_task_id')),
+                    [{'b_instance_id': instance_id, 'b_task_id': task_id}
+                     for (instance_id, _), task_id in zip(new_instances, task_ids)]
+                )
+                tasks_created += len(task_ids)
+
+        # Instances whose period ended without a completion
+        missed_task_ids = db.session.execute(
+            update(table).where(table.c.status == 'open', table.c.due_at <= now).values(status='missed')
+            .returning(table.c.task_id)
+        ).scalars().all()
+        missed = len(missed_task_ids)
+        self._cancel_tasks([task_id for task_id in missed_task_ids if task_id])
+
+        db.session.commit()
+        if created or missed:
+            self.logger.info(f"Generated {created} checklist instances ({tasks_created} tasks), marked {missed} missed")
+        return {'created': created, 'tasks': tasks_created, 'missed': missed}
+
+    def _cancel_tasks(self, task_ids):
+        """Cancel the still-open tasks of missed instances so they stop drawing reminders"""
+        if not task_ids:
+            return
+        db.session.execute(
+            update(Task).where(Task.task_id.in_(task_ids), Task.status.notin_(('completed', MISSED_TASK_STATUS)))
+            .values(status=MISSED_TASK_STATUS, version=Task.version + 1, updated_at=datetime.utcnow())
+        )
+
+    def _insert_tasks(self, batch, now):
+        """Insert one task per new instance, and its 'created' history row, with an executemany each.
+        Returns the task IDs in order; the checklist's creator is recorded as the history user."""
+        task_table = Task.__table__
+        result = db.session.execute(
+            insert(task_table).returning(task_table.c.task_id, sort_by_parameter_order=True),
+            [{
+                'title': f"{checklist.title} ({period_start.isoformat()})"[:100],
+                'description': checklist.description,
+                'status': 'pending',
+                'priority': 'Medium',
+                'due_date': due_at,
+                'property_id': property_id,
+                'created_at': now,
+                'updated_at': now
+            } for checklist, property_id, period_start, due_at in batch]
+        )
+        task_ids = [row[0] for row in result]
+        db.session.execute(insert(History.__table__), [
+            {'entity_type': 'task', 'entity_id': task_id, 'action': 'created',
+             'user_id': checklist.created_by_id, 'created_at': now}
+            for task_id, (checklist, _, _, _) in zip(task_ids, batch)
+        ])
+        return task_ids
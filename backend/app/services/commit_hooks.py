@@ -0,0 +1,23 @@
+from flask import current_app
+from sqlalchemy import event
+from app.extensions import db
+
+def run_after_commit(callback):
+    """Call callback once the current transaction commits; it is dropped if the transaction rolls back"""
+    db.session.info.setdefault('after_commit_callbacks', []).append(callback)
+
+def _run_callbacks(session):
+    for callback in session.info.pop('after_commit_callbacks', []):
+        try:
+            callback()
+        except Exception as e:
+            current_app.logger.error(f"After-commit callback failed: {str(e)}")
+
+def _discard_callbacks(session):
+    session.info.pop('after_commit_callbacks', None)
+
+def register_commit_hooks():
+    """Run callbacks queued with run_after_commit when their transaction ends"""
+    for name, fn in (('after_commit', _run_callbacks), ('after_rollback', _discard_callbacks)):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from flask import request, jsonify
+from sqlalchemy import event, inspect, select
+from app.extensions import db
+
+# Tickets, tasks and service requests carry a `version` column that SQLAlchemy checks on
+# every UPDATE (version_id_col). Clients see it as the ETag of the row and send it back in
+# If-Match, so an edit made from a stale screen is refused instead of silently overwriting.
+
+def with_etag(response, obj):
+    """Set the ETag of a versioned row on a response and return it"""
+    response.set_etag(str(obj.version))
+    return response
+
+def conflict_response(obj):
+    """409 telling the client which version it has to reload"""
+    response = jsonify({
+        'msg': 'This item was changed by someone else; reload it and try again',
+        'error': 'version_conflict',
+        'current_version': obj.version
+    })
+    response.status_code = 409
+    return with_etag(response, obj)
+
+def check_if_match(obj):
+    """409 response when the request's If-Match names another version of obj, otherwise None.
+
+    Requests without If-Match are let through; the version check on UPDATE still stops
+    them from overwriting a change committed while they were being processed.
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag or if_match.contains_weak(str(obj.version)):
+        return None
+    return conflict_response(obj)
+
+def stale_response(obj):
+    """Roll back a commit that lost the race for obj and answer 409 with its current version"""
+    db.session.rollback()
+    current = db.session.get(type(obj), inspect(obj).identity)
+    if current is None:
+        return jsonify({'msg': 'Not found; it was deleted by someone else'}), 404
+    return conflict_response(current)
+
+def _remember_versions(session, flush_context, instances):
+    """Note the versions dirty rows were loaded at; a failed flush expires them before they can be reported"""
+    versions = {}
+    for obj in session.dirty:
+        mapper = inspect(obj).mapper
+        if mapper.version_id_col is None:
+            continue
+        key = mapper.get_property_by_column(mapper.version_id_col).key
+        state = inspect(obj)
+        version = state.committed_state.get(key, state.dict.get(key))
+        if version is not None and state.identity:
+            versions[(mapper.class_, state.identity[0])] = version
+    session.info['flush_versions'] = versions
+
+def _forget_versions(session):
+    session.info.pop('flush_versions', None)
+
+def register_concurrency_hooks():
+    """Keep the versions each flush expects, so a StaleDataError can name the rows that moved"""
+    for name, fn in (
+        ('before_flush', _remember_versions),
+        ('after_commit', _forget_versions)
+    ):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
+
+def stale_rows_response():
+    """Roll back a batch that lost a version race and answer 409 listing the rows that changed.
+
+    Call it from the StaleDataError handler, before anything else touches the session.
+    """
+    versions = db.session.info.pop('flush_versions', {})
+    db.session.rollback()
+    by_model = defaultdict(dict)
+    for (model, entity_id), version in versions.items():
+        by_model[model][entity_id] = version
+
+    conflicts = []
+    for model, loaded in by_model.items():
+        mapper = inspect(model)
+        key = mapper.primary_key[0]
+        current = dict(db.session.execute(
+            select(key, mapper.version_id_col).where(key.in_(list(loaded)))
+        ).all())
+        for entity_id, version in sorted(loaded.items()):
+            if current.get(entity_id) != version:
+                conflicts.append({key.key: entity_id, 'current_version': current.get(entity_id)})
+
+    response = jsonify({
+        'msg': 'Some items were changed by someone else; reload them and try again',
+        'error': 'version_conflict',
+        'conflicts': conflicts
+    })
+    response.status_code = 409
+    return response
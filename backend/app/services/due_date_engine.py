@@ -0,0 +1,418 @@
+"""
+Due-Date Reminders
+Keeps upcoming task due dates and ticket follow-ups in a min-heap and fires batched reminders and escalations
+
+Only the next DUE_DATE_HORIZON_HOURS are held in memory. The window is filled
+with range scans on the indexed due_date / follow_up_date columns and extended
+as time passes. Rows edited since the last tick are re-read through the indexed
+updated_at columns, and commits made in this process are pushed in directly.
+Entries are checked against the database when they fire, so an entry made
+stale by an edit is dropped. Sent notifications are recorded in
+due_notifications, which keeps reminders from repeating after a restart or
+leader failover. Events whose claim or delivery fails go back on the heap and
+are retried a few times.
+"""
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, event, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Task, Ticket, User, PropertyManager, DueNotification
+
+TASK_REMINDER = 'task_reminder'
+TASK_OVERDUE = 'task_overdue'
+TICKET_FOLLOW_UP = 'ticket_follow_up'
+
+DONE_STATUSES = ('completed', 'closed', 'cancelled')
+
+def _is_done(status):
+    return (status or '').lower() in DONE_STATUSES
+
+def task_events(task_id, due_date, status):
+    """(fire_at, kind, task_id, due_at) for a task's reminder and overdue escalation"""
+    if not task_id or not due_date or _is_done(status):
+        return []
+    lead = timedelta(hours=current_app.config.get('TASK_REMINDER_LEAD_HOURS', 24))
+    grace = timedelta(hours=current_app.config.get('TASK_ESCALATION_GRACE_HOURS', 1))
+    return [
+        (due_date - lead, TASK_REMINDER, task_id, due_date),
+        (due_date + grace, TASK_OVERDUE, task_id, due_date)
+    ]
+
+def ticket_events(ticket_id, follow_up_date, follow_up_required, status):
+    """(fire_at, kind, ticket_id, due_at) for a ticket's follow-up"""
+    if not ticket_id or not follow_up_date or not follow_up_required or _is_done(status):
+        return []
+    return [(follow_up_date, TICKET_FOLLOW_UP, ticket_id, follow_up_date)]
+
+class DueDateEngine:
+    """Min-heap of upcoming reminder and escalation events for one process"""
+
+    def __init__(self):
+        self._heap = []
+        self._queued = set()
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.window_start = None
+        self.loaded_until = None
+        self.changes_seen_at = None
+        self.last_tick = None
+
+    def reset(self):
+        with self._lock:
+            self._heap = []
+            self._queued = set()
+            self._attempts = {}
+            self.window_start = None
+            self.loaded_until = None
+            self.changes_seen_at = None
+            self.last_tick = None
+
+    @property
+    def loaded(self):
+        return self.loaded_until is not None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, events):
+        """Queue events that fall inside the loaded window; later ones are found by the next range scan"""
+        if not self.loaded:
+            return
+        with self._lock:
+            for item in events:
+                fire_at, kind, entity_id, due_at = item
+                key = (kind, entity_id, due_at)
+                if fire_at < self.window_start or fire_at >= self.loaded_until or key in self._queued:
+                    continue
+                heapq.heappush(self._heap, item)
+                self._queued.add(key)
+
+    def pop_due(self, now):
+        """Remove and return every event whose time has come"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                item = heapq.heappop(self._heap)
+                self._queued.discard(item[1:])
+                due.append(item)
+        return due
+
+    def retry(self, keys, now):
+        """Queue events again after DUE_DATE_RETRY_SECONDS, giving up after DUE_DATE_MAX_ATTEMPTS tries"""
+        delay = timedelta(seconds=current_app.config.get('DUE_DATE_RETRY_SECONDS', 300))
+        limit = current_app.config.get('DUE_DATE_MAX_ATTEMPTS', 5)
+        events = []
+        with self._lock:
+            for key in keys:
+                attempts = self._attempts.get(key, 1) + 1
+                if attempts > limit:
+                    self._attempts.pop(key, None)
+                    logging.error(f"Giving up on due-date notification {key} after {limit} attempts")
+                    continue
+                self._attempts[key] = attempts
+                events.append((now + delay, *key))
+        self.push(events)
+
+    def delivered(self, keys):
+        with self._lock:
+            for key in keys:
+                self._attempts.pop(key, None)
+
+    def _scan_range(self, start, end):
+        """Events firing in [start, end), read with range scans on the indexed date columns"""
+        lead = timedelta(hours=current_app.config.get('TASK_REMINDER_LEAD_HOURS', 24))
+        grace = timedelta(hours=current_app.config.get('TASK_ESCALATION_GRACE_HOURS', 1))
+        events = []
+        tasks = db.session.execute(
+            select(Task.task_id, Task.due_date, Task.status).where(
+                Task.due_date >= start - grace,
+                Task.due_date < end + lead
+            )
+        ).all()
+        for row in tasks:
+            events.extend(task_events(*row))
+        tickets = db.session.execute(
+            select(Ticket.ticket_id, Ticket.follow_up_date, Ticket.follow_up_required, Ticket.status).where(
+                Ticket.follow_up_date >= start,
+                Ticket.follow_up_date < end
+            )
+        ).all()
+        for row in tickets:
+            events.extend(ticket_events(*row))
+        return [item for item in events if start <= item[0] < end]
+
+    def _scan_changes(self, since):
+        """Events for rows edited since the last tick, by any process"""
+        events = []
+        tasks = db.session.execute(
+            select(Task.task_id, Task.due_date, Task.status).where(Task.updated_at >= since)
+        ).all()
+        for row in tasks:
+            events.extend(task_events(*row))
+        tickets = db.session.execute(
+            select(Ticket.ticket_id, Ticket.follow_up_date, Ticket.follow_up_required, Ticket.status).where(
+                Ticket.updated_at >= since
+            )
+        ).all()
+        for row in tickets:
+            events.extend(ticket_events(*row))
+        return events
+
+    def refresh(self, now):
+        """Load the window on first use, then extend it and pick up edits incrementally"""
+        config = current_app.config
+        horizon = timedelta(hours=config.get('DUE_DATE_HORIZON_HOURS', 6))
+        tick = timedelta(seconds=config.get('DUE_DATE_TICK_SECONDS', 60))
+
+        lookback = timedelta(hours=config.get('DUE_DATE_LOOKBACK_HOURS', 24))
+
+        # A process that was not ticking (just started or just became leader) reloads everything
+        if self.last_tick is None or now - self.last_tick > 3 * tick:
+            self.reset()
+            self.window_start = now - lookback
+            self.loaded_until = now + horizon
+            self.changes_seen_at = now
+            self.push(self._scan_range(self.window_start, self.loaded_until))
+        else:
+            # Edits to items that fell due long ago do not set off old escalations
+            self.window_start = now - lookback
+            if self.loaded_until < now + horizon / 2:
+                start, self.loaded_until = self.loaded_until, now + horizon
+                self.push(self._scan_range(start, self.loaded_until))
+            # Overlap the previous scan so rows committed late with an earlier updated_at are not missed
+            since = self.changes_seen_at - tick
+            self.changes_seen_at = now
+            self.push(self._scan_changes(since))
+        self.last_tick = now
+
+    def stats(self):
+        return {
+            'queued': len(self._heap),
+            'next_event_at': self._heap[0][0].isoformat() if self._heap else None,
+            'loaded_until': self.loaded_until.isoformat() if self.loaded_until else None,
+            'last_tick': self.last_tick.isoformat() if self.last_tick else None
+        }
+
+due_date_engine = DueDateEngine()
+
+def _insert_new(conn, table):
+    """INSERT that does nothing when the row already exists, so its rowcount says whether this run won it"""
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(table).on_conflict_do_nothing()
+
+def _claim(events):
+    """Record the events as sent and return the ones no earlier run has sent.
+
+    Rows are claimed one at a time, so an event another process already sent is skipped
+    without giving up the rest of the batch.
+    """
+    if not events:
+        return []
+    table = DueNotification.__table__
+    keys = sorted({(kind, entity_id, due_at) for _, kind, entity_id, due_at in events},
+                  key=lambda key: (key[2], key[0], key[1]))
+    now = datetime.utcnow()
+    claimed = []
+    with db.engine.begin() as conn:
+        statement = _insert_new(conn, table)
+        for kind, entity_id, due_at in keys:
+            row = {'kind': kind, 'entity_id': entity_id, 'due_at': due_at, 'sent_at': now}
+            if statement is not None:
+                if conn.execute(statement.values(**row)).rowcount:
+                    claimed.append((kind, entity_id, due_at))
+                continue
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(table).values(**row))
+                claimed.append((kind, entity_id, due_at))
+            except IntegrityError:
+                pass
+    return claimed
+
+def _release(keys):
+    """Forget claims whose notifications were not delivered, so a retry can claim them again"""
+    if not keys:
+        return
+    table = DueNotification.__table__
+    with db.engine.begin() as conn:
+        conn.execute(delete(table).where(tuple_(table.c.kind, table.c.entity_id, table.c.due_at).in_(list(keys))))
+
+def purge_due_notifications(chunk_size=1000):
+    """Delete notifications older than DUE_NOTIFICATION_RETENTION_DAYS a chunk at a time; returns how many went.
+
+    The engine never looks further back than DUE_DATE_LOOKBACK_HOURS, so older records
+    no longer keep anything from repeating.
+    """
+    config = current_app.config
+    retention = max(
+        timedelta(days=config.get('DUE_NOTIFICATION_RETENTION_DAYS', 30)),
+        timedelta(hours=config.get('DUE_DATE_LOOKBACK_HOURS', 24) + config.get('TASK_ESCALATION_GRACE_HOURS', 1))
+    )
+    cutoff = datetime.utcnow() - retention
+    purged = 0
+    while True:
+        deleted = db.session.execute(
+            delete(DueNotification)
+            .where(DueNotification.id.in_(
+                select(DueNotification.id).where(DueNotification.due_at < cutoff).limit(chunk_size)
+            ))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        purged += deleted
+        if deleted < chunk_size:
+            return purged
+
+def fire(events, now, email_service=None):
+    """Send reminders to assignees and one escalation digest per manager for the events that are still valid"""
+    by_kind = defaultdict(dict)
+    for _, kind, entity_id, due_at in events:
+        by_kind[kind][entity_id] = due_at
+
+    task_ids = set(by_kind[TASK_REMINDER]) | set(by_kind[TASK_OVERDUE])
+    tasks = {task.task_id: task for task in Task.query.filter(Task.task_id.in_(task_ids)).all()} if task_ids else {}
+    ticket_ids = set(by_kind[TICKET_FOLLOW_UP])
+    tickets = {ticket.ticket_id: ticket for ticket in Ticket.query.filter(Ticket.ticket_id.in_(ticket_ids)).all()} if ticket_ids else {}
+
+    # Drop events made stale by edits since they were queued
+    valid = []
+    for item in events:
+        _, kind, entity_id, due_at = item
+        if kind == TICKET_FOLLOW_UP:
+            ticket = tickets.get(entity_id)
+            if ticket and ticket.follow_up_required and ticket.follow_up_date == due_at and not _is_done(ticket.status):
+                valid.append(item)
+        else:
+            task = tasks.get(entity_id)
+            if not task or task.due_date != due_at or _is_done(task.status):
+                continue
+            # Once the task is overdue the escalation covers it
+            if kind == TASK_REMINDER and (due_at <= now or not task.assigned_to_id):
+                continue
+            valid.append(item)
+
+    try:
+        claimed = _claim(valid)
+    except Exception as e:
+        logging.error(f"Error claiming due-date notifications: {str(e)}")
+        due_date_engine.retry([item[1:] for item in valid], now)
+        return {'reminders': 0, 'escalations': 0}
+    if not claimed:
+        return {'reminders': 0, 'escalations': 0}
+
+    if email_service is None:
+        from app.services.email_service import EmailService
+        email_service = EmailService()
+
+    reminders = 0
+    failed = []
+    overdue_by_property = defaultdict(list)
+    follow_ups_by_property = defaultdict(list)
+    reporters = defaultdict(list)
+    for kind, entity_id, _ in claimed:
+        if kind == TASK_REMINDER:
+            task = tasks[entity_id]
+            try:
+                email_service.send_task_reminder(task.assigned_to, task, task.property.name if task.property else 'N/A')
+                reminders += 1
+            except Exception as e:
+                logging.error(f"Error sending reminder for task {entity_id}: {str(e)}")
+                failed.append((kind, entity_id, task.due_date))
+        elif kind == TASK_OVERDUE:
+            overdue_by_property[tasks[entity_id].property_id].append(tasks[entity_id])
+        else:
+            ticket = tickets[entity_id]
+            follow_ups_by_property[ticket.property_id].append(ticket)
+            # The reporter hears about their own follow-up as well
+            reporters[ticket.user_id].append(ticket)
+
+    property_ids = set(overdue_by_property) | set(follow_ups_by_property)
+    digests = defaultdict(lambda: ([], []))
+    if property_ids:
+        for manager_id, property_id in db.session.query(PropertyManager.user_id, PropertyManager.property_id).filter(
+            PropertyManager.property_id.in_(property_ids)
+        ).all():
+            digests[manager_id][0].extend(overdue_by_property.get(property_id, []))
+            digests[manager_id][1].extend(follow_ups_by_property.get(property_id, []))
+    for user_id, follow_ups in reporters.items():
+        digest = digests[user_id]
+        digest[1].extend(ticket for ticket in follow_ups if ticket not in digest[1])
+
+    recipients = {user.user_id: user for user in User.query.filter(User.user_id.in_(digests), User.is_active == True).all()} if digests else {}
+    escalations = 0
+    # An escalation counts as delivered once any digest carrying it went out
+    attempted, sent = set(), set()
+    for user_id, (overdue, follow_ups) in digests.items():
+        user = recipients.get(user_id)
+        if not user or not user.email or not (overdue or follow_ups):
+            continue
+        keys = {(TASK_OVERDUE, task.task_id, task.due_date) for task in overdue} | \
+               {(TICKET_FOLLOW_UP, ticket.ticket_id, ticket.follow_up_date) for ticket in follow_ups}
+        attempted |= keys
+        try:
+            email_service.send_escalation_digest(user, overdue, follow_ups)
+            escalations += 1
+            sent |= keys
+        except Exception as e:
+            logging.error(f"Error sending escalation digest to user {user_id}: {str(e)}")
+    failed.extend(attempted - sent)
+
+    if failed:
+        try:
+            _release(failed)
+            due_date_engine.retry(failed, now)
+        except Exception as e:
+            logging.error(f"Error releasing undelivered due-date notifications: {str(e)}")
+    due_date_engine.delivered(set(claimed) - set(failed))
+
+    logging.info(f"Due-date engine sent {reminders} reminders and {escalations} escalation digests")
+    return {'reminders': reminders, 'escalations': escalations}
+
+def run_due_date_tick(now=None, email_service=None):
+    """Refresh the heap and fire everything that is due; run by the scheduler in the lease holder"""
+    now = now or datetime.utcnow()
+    due_date_engine.refresh(now)
+    due = due_date_engine.pop_due(now)
+    if not due:
+        return {'reminders': 0, 'escalations': 0}
+    return fire(due, now, email_service)
+
+def _collect_due_date_changes(session, flush_context):
+    """Remember the due dates written by this flush"""
+    if not due_date_engine.loaded:
+        return
+    pending = session.info.setdefault('due_date_changes', [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Task):
+            pending.extend(task_events(obj.task_id, obj.due_date, obj.status))
+        elif isinstance(obj, Ticket):
+            pending.extend(ticket_events(obj.ticket_id, obj.follow_up_date, obj.follow_up_required, obj.status))
+
+def _apply_due_date_changes(session):
+    pending = session.info.pop('due_date_changes', None)
+    if pending:
+        due_date_engine.push(pending)
+
+def _discard_due_date_changes(session):
+    session.info.pop('due_date_changes', None)
+
+def register_due_date_hooks():
+    """Push due dates committed in this process straight into the heap"""
+    for name, fn in (
+        ('after_flush', _collect_due_date_changes),
+        ('after_commit', _apply_due_date_changes),
+        ('after_rollback', _discard_due_date_changes)
+    ):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -4,6 +4,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 import logging
+from app.metrics import track_notification
 
 class EmailService:
     def __init__(self):
@@ -15,17 +16,13 @@ class EmailService:
         self.sender_email = current_app.config.get('SENDER_EMAIL', 'noreply@modernmanagementhotels.com')
         self.logger = current_app.logger
 
+    @track_notification('email')
     def send_email(self, recipient_email, subject, html_content):
         try:
-            self.logger.info("="*50)
-            self.logger.info("Starting email send process")
-            self.logger.info(f"SMTP Settings:")
-            self.logger.info(f"Server: {self.smtp_server}")
-            self.logger.info(f"Port: {self.smtp_port}")
-            self.logger.info(f"Username: {self.smtp_username}")
-            self.logger.info(f"Password length: {len(self.smtp_password)}")
-            self.logger.info(f"Recipient: {recipient_email}")
-            self.logger.info(f"Subject: {subject}")
+            self.logger.debug(
+                f"Sending email via {self.smtp_server}:{self.smtp_port} as {self.smtp_username} "
+                f"to {recipient_email}: {subject}"
+            )
             
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
@@ -35,45 +32,32 @@ class EmailService:
             html_part = MIMEText(html_content, 'html')
             msg.attach(html_part)
 
-            self.logger.info("Connecting to SMTP server...")
             server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.set_debuglevel(1)  # Enable SMTP debug mode
+            if self.logger.isEnabledFor(logging.DEBUG):
+                server.set_debuglevel(1)  # SMTP protocol trace only when debugging
             
-            self.logger.info("Initiating TLS connection...")
             server.starttls()
-            
-            self.logger.info(f"Attempting login for {self.smtp_username}...")
             server.login(self.smtp_username, self.smtp_password)
-            
-            self.logger.info("Sending email...")
             server.send_message(msg)
-            self.logger.info(f"✓ Email sent successfully to {recipient_email}")
-            
             server.quit()
-            self.logger.info("SMTP connection closed")
-            self.logger.info("="*50)
+            self.logger.info(f"✓ Email sent successfully to {recipient_email}")
             return True
             
         except smtplib.SMTPAuthenticationError as e:
-            self.logger.error("❌ SMTP Authentication Error:")
-            self.logger.error(f"Error code: {e.smtp_code}")
-            self.logger.error(f"Error message: {e.smtp_error}")
+            self.logger.error(f"❌ SMTP Authentication Error ({e.smtp_code}) sending to {recipient_email}: {e.smtp_error}")
             return False
         except smtplib.SMTPException as e:
-            self.logger.error("❌ SMTP Error:")
-            self.logger.error(str(e))
+            self.logger.error(f"❌ SMTP Error sending to {recipient_email}: {str(e)}")
             return False
         except Exception as e:
-            self.logger.error("❌ Unexpected error during email send:")
-            self.logger.error(f"Error type: {type(e).__name__}")
-            self.logger.error(f"Error message: {str(e)}")
+            self.logger.error(f"❌ Unexpected error during email send to {recipient_email}: {type(e).__name__}: {str(e)}")
             return False
 
     def send_task_assignment_notification(self, user, task, property_name):
         """Send task assignment notifications to relevant users"""
-        self.logger.info(f"Preparing task assignment notification for user {user.username} (ID: {user.user_id})")
-        self.logger.info(f"Task details - ID: {task.task_id}, Title: {task.title}, Priority: {task.priority}")
-        self.logger.info(f"Property: {property_name}")
+        self.logger.debug(f"Preparing task assignment notification for user {user.username} (ID: {user.user_id})")
+        self.logger.debug(f"Task details - ID: {task.task_id}, Title: {task.title}, Priority: {task.priority}")
+        self.logger.debug(f"Property: {property_name}")
 
         subject = f"New Task Assignment: {task.title} - {property_name} [{task.property.hotel_code}]"
         
@@ -262,6 +246,140 @@ class EmailService:
 
         return self.send_email(user.email, subject, html_content)
 
+    def send_escalation_digest(self, user, overdue_tasks, follow_up_tickets):
+        """One email listing every overdue task and due ticket follow-up for a recipient"""
+        subject = f"Escalation: {len(overdue_tasks)} overdue task(s), {len(follow_up_tickets)} follow-up(s) due"
+
+        task_rows = "".join(f"""
+                        <tr>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{task.title}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{task.property.name if task.property else 'N/A'}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd; color: {self._get_priority_color(task.priority)};">{task.priority}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{task.assigned_to.username if task.assigned_to else 'Unassigned'}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{task.due_date.strftime('%Y-%m-%d %H:%M')}</td>
+                        </tr>""" for task in overdue_tasks)
+        ticket_rows = "".join(f"""
+                        <tr>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">#{ticket.ticket_id} {ticket.title}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{ticket.property.name if ticket.property else 'N/A'}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{ticket.status}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{ticket.follow_up_date.strftime('%Y-%m-%d %H:%M')}</td>
+                        </tr>""" for ticket in follow_up_tickets)
+
+        tasks_html = f"""
+                    <h3 style="color: #dc3545;">Overdue Tasks</h3>
+                    <table style="width: 100%; border-collapse: collapse;">
+                        <tr><th align="left">Task</th><th align="left">Property</th><th align="left">Priority</th><th align="left">Assigned To</th><th align="left">Due</th></tr>
+                        {task_rows}
+                    </table>""" if overdue_tasks else ""
+        tickets_html = f"""
+                    <h3 style="color: #fd7e14;">Follow-ups Due</h3>
+                    <table style="width: 100%; border-collapse: collapse;">
+                        <tr><th align="left">Ticket</th><th align="left">Property</th><th align="left">Status</th><th align="left">Follow-up Date</th></tr>
+                        {ticket_rows}
+                    </table>""" if follow_up_tickets else ""
+
+        html_content = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 700px; margin: 0 auto; padding: 20px;">
+                    <h2 style="color: #1976d2;">Items Needing Attention</h2>
+                    <p>Hello {user.username},</p>
+                    <p>The following items at your properties are past due:</p>
+                    {tasks_html}
+                    {tickets_html}
+                    <div style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd;">
+                        <p style="color: #666;">Best regards,<br>Property Management System</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+
+        return self.send_email(user.email, subject, html_content)
+
+    def send_bulk_creation_digest(self, user, tickets, tasks):
+        """One email summarizing the tickets and tasks a bulk import created for a recipient.
+
+        tickets and tasks are lists of dicts with id, title, priority and property_name.
+        """
+        subject = f"Imported: {len(tickets)} new ticket(s), {len(tasks)} task(s) assigned to you"
+
+        def rows(items, prefix):
+            return "".join(f"""
+                        <tr>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{prefix}{item['id']} {item['title']}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{item['property_name']}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd; color: {self._get_priority_color(item['priority'])};">{item['priority']}</td>
+                        </tr>""" for item in items)
+
+        tickets_html = f"""
+                    <h3 style="color: #1976d2;">New Tickets</h3>
+                    <table style="width: 100%; border-collapse: collapse;">
+                        <tr><th align="left">Ticket</th><th align="left">Property</th><th align="left">Priority</th></tr>
+                        {rows(tickets, '#')}
+                    </table>""" if tickets else ""
+        tasks_html = f"""
+                    <h3 style="color: #1976d2;">Tasks Assigned to You</h3>
+                    <table style="width: 100%; border-collapse: collapse;">
+                        <tr><th align="left">Task</th><th align="left">Property</th><th align="left">Priority</th></tr>
+                        {rows(tasks, 'Task #')}
+                    </table>""" if tasks else ""
+
+        html_content = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 700px; margin: 0 auto; padding: 20px;">
+                    <h2 style="color: #1976d2;">Bulk Import Summary</h2>
+                    <p>Hello {user.username},</p>
+                    <p>The following items were just imported at your properties:</p>
+                    {tickets_html}
+                    {tasks_html}
+                    <div style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd;">
+                        <p style="color: #666;">Best regards,<br>Property Management System</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+
+        return self.send_email(user.email, subject, html_content)
+
+    def send_bulk_update_digest(self, user, changes, updated_by):
+        """One email listing the changes a bulk update made that concern a recipient.
+
+        changes are dicts with label, property_name and changes.
+        """
+        subject = f"{len(changes)} item(s) updated by {updated_by}"
+
+        change_rows = "".join(f"""
+                        <tr>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{change['label']}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{change['property_name']}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #ddd;">{change['changes']}</td>
+                        </tr>""" for change in changes)
+
+        html_content = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 700px; margin: 0 auto; padding: 20px;">
+                    <h2 style="color: #1976d2;">Bulk Update Summary</h2>
+                    <p>Hello {user.username},</p>
+                    <p>{updated_by} updated the following items:</p>
+                    <table style="width: 100%; border-collapse: collapse;">
+                        <tr><th align="left">Item</th><th align="left">Property</th><th align="left">Changes</th></tr>
+                        {change_rows}
+                    </table>
+                    <div style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd;">
+                        <p style="color: #666;">Best regards,<br>Property Management System</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+
+        return self.send_email(user.email, subject, html_content)
+
     def send_user_registration_email(self, user, password, requested_by=None):
         subject = "Welcome to Property Management System - Your Account Details"
         
@@ -6,11 +6,12 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 from email.utils import parseaddr
 from app.models import EmailSettings
+from app.services.settings_cache import get_settings
 import os
 
 class EmailTestService:
     def __init__(self):
-        self.settings = EmailSettings.query.first()
+        self.settings = get_settings(EmailSettings)
         if not self.settings:
             raise ValueError("Email settings not configured")
         self.smtp_password = self.settings.smtp_password or os.getenv('EMAIL_PASSWORD', '')
@@ -0,0 +1,138 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, request, jsonify, make_response
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+def _request_hash():
+    digest = hashlib.sha256()
+    digest.update(f'{request.method} {request.path}\n'.encode('utf-8'))
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+def _in_flight():
+    return jsonify({'msg': f'A request with this {IDEMPOTENCY_HEADER} is still being processed'}), 409
+
+def _claim(user_id, key, request_hash):
+    """Return (record, None) once this request owns the key, or (None, response) to send instead"""
+    now = datetime.utcnow()
+    record = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+    if record and record.expires_at <= now:
+        # By statement, as a concurrent retry may have removed it already
+        db.session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.id == record.id, IdempotencyKey.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.expunge(record)
+        record = None
+
+    if record:
+        if record.request_hash != request_hash:
+            return None, (jsonify({'msg': f'{IDEMPOTENCY_HEADER} was already used for a different request'}), 422)
+        if record.status_code is not None:
+            replay = current_app.response_class(record.response_body, status=record.status_code, mimetype='application/json')
+            replay.headers[REPLAYED_HEADER] = 'true'
+            return None, replay
+        lock = timedelta(seconds=current_app.config.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+        if now - record.created_at < lock:
+            return None, _in_flight()
+        # The first attempt died before storing its response; this retry takes over, unless
+        # a concurrent retry moved created_at on from the value read here first
+        record_id = record.id
+        claimed = db.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.id == record_id,
+                IdempotencyKey.created_at == record.created_at,
+                IdempotencyKey.status_code.is_(None)
+            )
+            .values(created_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed == 0:
+            db.session.rollback()
+            return None, _in_flight()
+        db.session.commit()
+        return record_id, None
+    else:
+        ttl = timedelta(hours=current_app.config.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+        record = IdempotencyKey(user_id=user_id, key=key, request_hash=request_hash, created_at=now, expires_at=now + ttl)
+        db.session.add(record)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent retry claimed the key first
+        db.session.rollback()
+        return None, _in_flight()
+    return record.id, None
+
+def _release(record_id):
+    db.session.rollback()
+    db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record_id))
+    db.session.commit()
+
+def idempotent(f):
+    """Replay the stored response when a POST is retried with the same Idempotency-Key.
+
+    Keys are scoped to the user and kept for IDEMPOTENCY_KEY_TTL_HOURS. Responses below 500
+    are stored; server errors release the key so the client can retry. Requests without
+    the header run as usual.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        identity = get_jwt_identity()
+        if not key or not identity or 'user_id' not in identity:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'msg': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        record_id, early_response = _claim(identity['user_id'], key, _request_hash())
+        if early_response is not None:
+            return early_response
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            _release(record_id)
+            raise
+        try:
+            record = db.session.get(IdempotencyKey, record_id)
+            if response.status_code < 500:
+                record.status_code = response.status_code
+                record.response_body = response.get_data(as_text=True)
+            else:
+                db.session.delete(record)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Failed to store idempotent response for key {key}: {str(e)}")
+        return response
+    return decorated_function
+
+def purge_expired_keys(chunk_size=1000):
+    """Delete expired idempotency keys a chunk at a time; returns how many went"""
+    now = datetime.utcnow()
+    purged = 0
+    while True:
+        deleted = db.session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.id.in_(
+                select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now).limit(chunk_size)
+            ))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        purged += deleted
+        if deleted < chunk_size:
+            return purged
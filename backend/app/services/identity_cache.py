@@ -0,0 +1,148 @@
+import threading
+import time
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from app.extensions import db
+from app.models import User, Property, PropertyManager, UserProperty
+
+class CachedIdentity:
+    """Detached snapshot of a user plus the IDs of the properties they are linked to"""
+    __slots__ = ('user', 'assigned_property_ids', 'managed_property_ids', 'expires_at', 'access_scope')
+
+    def __init__(self, user, assigned_property_ids, managed_property_ids, expires_at):
+        self.user = user
+        self.assigned_property_ids = assigned_property_ids
+        self.managed_property_ids = managed_property_ids
+        self.expires_at = expires_at
+        # Filled in lazily by app.services.access_scope and dropped with the entry
+        self.access_scope = None
+
+class IdentityCache:
+    """Process-level TTL cache of user snapshots shared by all requests in a worker"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self.invalidate(user_id)
+            return None
+        return entry
+
+    def set(self, entry):
+        with self._lock:
+            self._entries[entry.user.user_id] = entry
+
+    def invalidate(self, user_id=None):
+        """Drop one user, or every user when no ID is given"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+identity_cache = IdentityCache()
+
+def _snapshot(user):
+    """Copy the loaded column values of a user into a detached instance that can be merged into any session"""
+    snapshot = User.__mapper__.class_manager.new_instance()
+    for column in User.__mapper__.column_attrs:
+        setattr(snapshot, column.key, getattr(user, column.key))
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def _load_identity(user_id):
+    user = User.query.get(user_id)
+    if not user:
+        return None, None
+
+    assigned = frozenset(row[0] for row in db.session.query(UserProperty.property_id).filter_by(user_id=user_id))
+    managed = frozenset(row[0] for row in db.session.query(PropertyManager.property_id).filter_by(user_id=user_id))
+    ttl = current_app.config.get('USER_CACHE_TTL_SECONDS', 30)
+    entry = CachedIdentity(_snapshot(user), assigned, managed, time.monotonic() + ttl)
+    if ttl > 0:
+        identity_cache.set(entry)
+    return user, entry
+
+def _request_memo():
+    if 'identity_memo' not in g:
+        g.identity_memo = {}
+    return g.identity_memo
+
+def get_cached_identity(user_id):
+    """Return (user, CachedIdentity) for a user, memoized per request and cached per process"""
+    memo = _request_memo()
+    if user_id in memo:
+        return memo[user_id]
+
+    entry = identity_cache.get(user_id)
+    if entry is not None:
+        # Attach a copy to this request's session without touching the database
+        user = db.session.merge(entry.user, load=False)
+    else:
+        user, entry = _load_identity(user_id)
+
+    memo[user_id] = (user, entry)
+    return user, entry
+
+def get_cached_user(user_id):
+    """Return the user for an ID, or None if it does not exist"""
+    return get_cached_identity(user_id)[0]
+
+def get_identity_entry(user):
+    """Return the CachedIdentity for a user, loading it if needed"""
+    return get_cached_identity(user.user_id)[1]
+
+def get_assigned_property_ids(user):
+    """IDs of the properties a user is assigned to (user_properties)"""
+    entry = get_identity_entry(user)
+    return entry.assigned_property_ids if entry else frozenset()
+
+def get_managed_property_ids(user):
+    """IDs of the properties a user manages (property_managers)"""
+    entry = get_identity_entry(user)
+    return entry.managed_property_ids if entry else frozenset()
+
+IDENTITY_MODELS = (User, PropertyManager, UserProperty)
+
+def _collect_invalidations(session, flush_context):
+    """Remember which users were touched by this flush"""
+    pending = session.info.setdefault('identity_invalidations', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, IDENTITY_MODELS) and obj.user_id is not None:
+            pending.add(obj.user_id)
+        elif isinstance(obj, Property):
+            # Membership changes made through Property.managers / assigned_users
+            pending.add(None)
+
+def _apply_invalidations(session):
+    pending = session.info.pop('identity_invalidations', None)
+    if not pending:
+        return
+    for user_id in pending:
+        identity_cache.invalidate(user_id)
+    if has_app_context() and 'identity_memo' in g:
+        g.identity_memo.clear()
+
+def _invalidate_on_bulk_write(orm_execute_state):
+    """Query.delete()/update() bypass the flush, so clear everything when they touch identity tables"""
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    if any(mapper.class_ in IDENTITY_MODELS for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info.setdefault('identity_invalidations', set()).add(None)
+
+def register_identity_cache_hooks():
+    """Evict cached identities when users or their property links change"""
+    for name, fn in (
+        ('after_flush', _collect_invalidations),
+        ('do_orm_execute', _invalidate_on_bulk_write),
+        ('after_commit', _apply_invalidations),
+        ('after_rollback', _apply_invalidations)
+    ):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,297 @@
+from datetime import datetime
+from sqlalchemy import case, event, func, insert, or_, select, update
+from app.extensions import db
+from app.models import Task, User, WorkerLeaderboard
+
+COMPLETED_STATUS = 'completed'
+
+def _is_completed(status):
+    return (status or '').lower() == COMPLETED_STATUS
+
+LEADERBOARD_FIELDS = ('status', 'completed_at', 'assigned_to_id', 'property_id', 'completion_score', 'time_spent', 'cost')
+
+def _committed_values(session, tasks):
+    """Load the committed leaderboard fields for dirty tasks in one query.
+
+    Attribute history can't be used because committed attributes are expired
+    and SQLAlchemy does not load the old value when an expired column is set.
+    """
+    task_ids = [task.task_id for task in tasks if task.task_id]
+    if not task_ids:
+        return {}
+    columns = [getattr(Task, field) for field in LEADERBOARD_FIELDS]
+    with session.no_autoflush:
+        rows = session.execute(
+            select(Task.task_id, *columns).where(Task.task_id.in_(task_ids))
+        ).all()
+    return {row[0]: dict(zip(LEADERBOARD_FIELDS, row[1:])) for row in rows}
+
+def _bucket_key(property_id, user_id, completed_at):
+    return property_id, user_id, completed_at.date() if completed_at else None
+
+def _leaderboard_deltas(session):
+    """Stamp newly completed tasks and collect the leaderboard changes pending in a flush"""
+    deltas = {}
+
+    def add(property_id, user_id, completed_at, tasks=0, score=0.0, time_spent=0.0, cost=0.0):
+        if not user_id or not property_id or not completed_at:
+            return
+        key = (property_id, user_id, completed_at.date())
+        bucket = deltas.setdefault(key, {'tasks': 0, 'score': 0.0, 'time_spent': 0.0, 'cost': 0.0, 'last': None})
+        bucket['tasks'] += tasks
+        bucket['score'] += score or 0.0
+        bucket['time_spent'] += time_spent or 0.0
+        bucket['cost'] += cost or 0.0
+        if tasks > 0 and (bucket['last'] is None or completed_at > bucket['last']):
+            bucket['last'] = completed_at
+
+    new = session.new
+    tasks = [obj for obj in list(new) + list(session.dirty) if isinstance(obj, Task)]
+    committed = _committed_values(session, [task for task in tasks if task not in new])
+
+    for task in tasks:
+        old = committed.get(task.task_id, {})
+        was_completed = _is_completed(old.get('status'))
+        now_completed = _is_completed(task.status)
+
+        if now_completed and not was_completed:
+            task.completed_at = task.completed_at or datetime.utcnow()
+            task.completion_score = task.calculate_completion_score()
+            add(task.property_id, task.assigned_to_id, task.completed_at,
+                1, task.completion_score, task.time_spent, task.cost)
+        elif was_completed and not now_completed:
+            # Reopened - take the task back out of the bucket it was credited to
+            add(old['property_id'], old['assigned_to_id'], old['completed_at'], -1,
+                -(old['completion_score'] or 0), -(old['time_spent'] or 0), -(old['cost'] or 0))
+            task.completed_at = None
+            task.completion_score = None
+        elif now_completed and old and (
+            _bucket_key(old['property_id'], old['assigned_to_id'], old['completed_at'])
+            != _bucket_key(task.property_id, task.assigned_to_id, task.completed_at)
+        ):
+            # Reassigned, moved or re-dated after completion - the credit follows the task to its new bucket
+            add(old['property_id'], old['assigned_to_id'], old['completed_at'], -1,
+                -(old['completion_score'] or 0), -(old['time_spent'] or 0), -(old['cost'] or 0))
+            add(task.property_id, task.assigned_to_id, task.completed_at,
+                1, task.completion_score, task.time_spent, task.cost)
+        elif now_completed and old:
+            # Labour and cost logged after completion still count towards the bucket
+            time_delta = (task.time_spent or 0) - (old['time_spent'] or 0)
+            cost_delta = (task.cost or 0) - (old['cost'] or 0)
+            if time_delta or cost_delta:
+                add(task.property_id, task.assigned_to_id, task.completed_at,
+                    time_spent=time_delta, cost=cost_delta)
+
+    return deltas
+
+def _floored(column, delta):
+    """column + delta, never below zero, evaluated by the database"""
+    total = column + delta
+    return case((total < 0, 0), else_=total)
+
+def _bucket_upsert(connection, key, delta, now):
+    """Add one delta to a bucket in a single statement, creating the bucket if needed.
+
+    Buckets are shared by every writer completing tasks for the same worker and day,
+    so the arithmetic happens in the UPDATE and the insert resolves its own conflict.
+    """
+    table = WorkerLeaderboard.__table__
+    property_id, user_id, period_date = key
+    last = delta['last']
+    changes = {
+        'tasks_completed': _floored(table.c.tasks_completed, delta['tasks']),
+        'score_total': _floored(table.c.score_total, delta['score']),
+        'time_spent_total': _floored(table.c.time_spent_total, delta['time_spent']),
+        'cost_total': _floored(table.c.cost_total, delta['cost']),
+        'updated_at': now
+    }
+    if last:
+        changes['last_completed_at'] = case(
+            (or_(table.c.last_completed_at.is_(None), table.c.last_completed_at < last), last),
+            else_=table.c.last_completed_at
+        )
+
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(table).values(
+            property_id=property_id, user_id=user_id, period_date=period_date,
+            tasks_completed=max(0, delta['tasks']), score_total=max(0.0, delta['score']),
+            time_spent_total=max(0.0, delta['time_spent']), cost_total=max(0.0, delta['cost']),
+            last_completed_at=last, updated_at=now
+        )
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.property_id, table.c.user_id, table.c.period_date],
+            set_=changes
+        ))
+        return
+
+    result = connection.execute(update(table).where(
+        table.c.property_id == property_id,
+        table.c.user_id == user_id,
+        table.c.period_date == period_date
+    ).values(**changes))
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(
+            property_id=property_id, user_id=user_id, period_date=period_date,
+            tasks_completed=max(0, delta['tasks']), score_total=max(0.0, delta['score']),
+            time_spent_total=max(0.0, delta['time_spent']), cost_total=max(0.0, delta['cost']),
+            last_completed_at=last, updated_at=now
+        ))
+
+def _apply_leaderboard_deltas(session, flush_context, instances):
+    deltas = _leaderboard_deltas(session)
+    if not deltas:
+        return
+
+    connection = session.connection()
+    now = datetime.utcnow()
+    for key, delta in deltas.items():
+        _bucket_upsert(connection, key, delta, now)
+
+def register_leaderboard_hooks():
+    """Persist completion scores and leaderboard buckets whenever tasks are flushed"""
+    if not event.contains(db.session, 'before_flush', _apply_leaderboard_deltas):
+        event.listen(db.session, 'before_flush', _apply_leaderboard_deltas)
+
+class LeaderboardService:
+    """Indexed top-K reads over the incrementally maintained worker leaderboard"""
+
+    ORDERINGS = {
+        'tasks': func.sum(WorkerLeaderboard.tasks_completed),
+        'score': func.sum(WorkerLeaderboard.score_total),
+        'hours': func.sum(WorkerLeaderboard.time_spent_total)
+    }
+
+    def top_workers(self, date_from, date_to, property_ids=None, limit=10, order_by='tasks'):
+        """Rank workers across one or more properties for a date range"""
+        ordering = self.ORDERINGS.get(order_by, self.ORDERINGS['tasks'])
+        query = db.session.query(
+            WorkerLeaderboard.user_id,
+            User.username,
+            func.sum(WorkerLeaderboard.tasks_completed),
+            func.sum(WorkerLeaderboard.score_total),
+            func.sum(WorkerLeaderboard.time_spent_total),
+            func.sum(WorkerLeaderboard.cost_total),
+            func.max(WorkerLeaderboard.last_completed_at)
+        ).join(User, User.user_id == WorkerLeaderboard.user_id).filter(
+            WorkerLeaderboard.period_date >= date_from,
+            WorkerLeaderboard.period_date <= date_to
+        )
+        if property_ids is not None:
+            query = query.filter(WorkerLeaderboard.property_id.in_(property_ids))
+
+        rows = query.group_by(WorkerLeaderboard.user_id, User.username).order_by(
+            ordering.desc()
+        ).limit(limit).all()
+
+        return [{
+            'user_id': user_id,
+            'username': username,
+            'tasks_completed': int(tasks or 0),
+            'score_total': round(score or 0, 1),
+            'avg_score': round(score / tasks, 1) if tasks else None,
+            'time_spent_total': round(time_spent or 0, 2),
+            'cost_total': round(cost or 0, 2),
+            'last_completed_at': last.isoformat() if last else None
+        } for user_id, username, tasks, score, time_spent, cost, last in rows]
+
+    def top_workers_between(self, start, end, property_ids=None, limit=10):
+        """Rank workers by tasks completed in an exact [start, end) UTC window.
+
+        Buckets are UTC days, so a local day that straddles two of them is read from the
+        completed tasks themselves; the window is a single day, so this stays small.
+        """
+        score = func.coalesce(func.sum(Task.completion_score), 0)
+        tasks = func.count(Task.task_id)
+        query = db.session.query(
+            Task.assigned_to_id,
+            User.username,
+            tasks,
+            score,
+            func.coalesce(func.sum(Task.time_spent), 0),
+            func.coalesce(func.sum(Task.cost), 0),
+            func.max(Task.completed_at)
+        ).join(User, User.user_id == Task.assigned_to_id).filter(
+            func.lower(Task.status) == COMPLETED_STATUS,
+            Task.completed_at >= start,
+            Task.completed_at < end
+        )
+        if property_ids is not None:
+            query = query.filter(Task.property_id.in_(property_ids))
+
+        rows = query.group_by(Task.assigned_to_id, User.username).order_by(tasks.desc()).limit(limit).all()
+
+        return [{
+            'user_id': user_id,
+            'username': username,
+            'tasks_completed': int(count or 0),
+            'score_total': round(total or 0, 1),
+            'avg_score': round(total / count, 1) if count else None,
+            'time_spent_total': round(time_spent or 0, 2),
+            'cost_total': round(cost or 0, 2),
+            'last_completed_at': last.isoformat() if last else None
+        } for user_id, username, count, total, time_spent, cost, last in rows]
+
+    def worker_history(self, user_id, date_from, date_to, property_id=None):
+        """Return the daily buckets for a single worker"""
+        query = WorkerLeaderboard.query.filter(
+            WorkerLeaderboard.user_id == user_id,
+            WorkerLeaderboard.period_date >= date_from,
+            WorkerLeaderboard.period_date <= date_to
+        )
+        if property_id:
+            query = query.filter(WorkerLeaderboard.property_id == property_id)
+        return [row.to_dict() for row in query.order_by(WorkerLeaderboard.period_date.desc()).all()]
+
+    def backfill(self, batch_size=500):
+        """Score completed tasks that predate the leaderboard, then rebuild every bucket"""
+        scored = 0
+        while True:
+            tasks = Task.query.filter(
+                func.lower(Task.status) == COMPLETED_STATUS,
+                Task.completion_score.is_(None),
+                Task.created_at.isnot(None)
+            ).order_by(Task.task_id).limit(batch_size).all()
+            if not tasks:
+                break
+            for task in tasks:
+                # Tasks completed before completed_at existed only know when they last changed
+                task.completed_at = task.completed_at or task.updated_at or task.created_at
+                task.completion_score = task.calculate_completion_score()
+            db.session.commit()
+            scored += len(tasks)
+        return scored, self.rebuild()
+
+    def rebuild(self):
+        """Recreate every bucket from completed tasks, e.g. after a backfill or migration"""
+        WorkerLeaderboard.query.delete(synchronize_session=False)
+        rows = db.session.query(
+            Task.property_id,
+            Task.assigned_to_id,
+            func.date(Task.completed_at),
+            func.count(Task.task_id),
+            func.coalesce(func.sum(Task.completion_score), 0),
+            func.coalesce(func.sum(Task.time_spent), 0),
+            func.coalesce(func.sum(Task.cost), 0),
+            func.max(Task.completed_at)
+        ).filter(
+            func.lower(Task.status) == COMPLETED_STATUS,
+            Task.completed_at.isnot(None),
+            Task.assigned_to_id.isnot(None),
+            Task.property_id.isnot(None)
+        ).group_by(Task.property_id, Task.assigned_to_id, func.date(Task.completed_at)).all()
+
+        for property_id, user_id, period, tasks, score, time_spent, cost, last in rows:
+            if isinstance(period, str):
+                period = datetime.strptime(period, '%Y-%m-%d').date()
+            db.session.add(WorkerLeaderboard(
+                property_id=property_id, user_id=user_id, period_date=period,
+                tasks_completed=tasks, score_total=score, time_spent_total=time_spent,
+                cost_total=cost, last_completed_at=last
+            ))
+        db.session.commit()
+        return len(rows)
@@ -0,0 +1,226 @@
+from datetime import datetime, timedelta
+from threading import Thread
+from flask import current_app, jsonify
+from sqlalchemy import select, delete, update, and_, or_
+from app.extensions import db
+from app.models import (
+    Property, Room, Ticket, TicketAttachment, Task, TaskAssignment, ServiceRequest, History, SlaRecord,
+    DueNotification, WorkerLeaderboard, PropertyManager, UserProperty, Checklist, ChecklistItem,
+    ChecklistCompletion, ChecklistInstance, PropertyDeletion
+)
+from app.services.due_date_engine import TASK_REMINDER, TASK_OVERDUE, TICKET_FOLLOW_UP
+from app.services.file_storage_service import FileStorageService
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+# Property status while its deletion job runs
+DELETING_STATUS = 'deleting'
+
+# A running deletion that has not reported progress for this long is assumed to have died with its worker
+STALE_AFTER = timedelta(minutes=5)
+
+def deleting_property_ids():
+    """Select of the properties whose deletion job is running"""
+    return select(Property.property_id).where(Property.status == DELETING_STATUS)
+
+def visible_property_clause():
+    """Filter for property listings: properties being deleted are already gone for users"""
+    return or_(Property.status.is_(None), Property.status != DELETING_STATUS)
+
+def is_deleting(property_id):
+    # Usually answered from the identity map, as the caller has just loaded the property or its rows
+    property = db.session.get(Property, property_id)
+    return property is not None and property.status == DELETING_STATUS
+
+def deleting_response(property_id):
+    """409 response when the property is being deleted, otherwise None"""
+    if property_id is None or not is_deleting(property_id):
+        return None
+    return jsonify({'msg': 'This property is being deleted', 'error': 'property_deleting'}), 409
+
+def deletion_steps(property_id):
+    """(name, model, condition) in the order a property's data has to go, children first.
+
+    Conditions select by subquery on the property's tickets, tasks, service requests and
+    checklists, so no IDs are loaded into Python and every step can be re-run safely.
+    """
+    ticket_ids = select(Ticket.ticket_id).where(Ticket.property_id == property_id)
+    task_ids = select(Task.task_id).where(Task.property_id == property_id)
+    request_ids = select(ServiceRequest.request_id).where(ServiceRequest.property_id == property_id)
+    checklist_ids = select(Checklist.checklist_id).where(Checklist.property_id == property_id)
+
+    return [
+        ('history', History, or_(
+            and_(History.entity_type == 'ticket', History.entity_id.in_(ticket_ids)),
+            and_(History.entity_type == 'task', History.entity_id.in_(task_ids)),
+            and_(History.entity_type == 'service_request', History.entity_id.in_(request_ids))
+        )),
+        ('due_notifications', DueNotification, or_(
+            and_(DueNotification.kind.in_([TASK_REMINDER, TASK_OVERDUE]), DueNotification.entity_id.in_(task_ids)),
+            and_(DueNotification.kind == TICKET_FOLLOW_UP, DueNotification.entity_id.in_(ticket_ids))
+        )),
+        ('sla_records', SlaRecord, SlaRecord.property_id == property_id),
+        # Service request assignments borrow ticket_id for the request ID
+        ('task_assignments', TaskAssignment, or_(
+            TaskAssignment.task_id.in_(task_ids),
+            and_(TaskAssignment.is_service_request.isnot(True), TaskAssignment.ticket_id.in_(ticket_ids)),
+            and_(TaskAssignment.is_service_request == True, TaskAssignment.ticket_id.in_(request_ids))
+        )),
+        ('ticket_attachments', TicketAttachment, TicketAttachment.ticket_id.in_(ticket_ids)),
+        ('checklist_instances', ChecklistInstance, or_(
+            ChecklistInstance.property_id == property_id, ChecklistInstance.checklist_id.in_(checklist_ids)
+        )),
+        ('checklist_completions', ChecklistCompletion, or_(
+            ChecklistCompletion.property_id == property_id, ChecklistCompletion.checklist_id.in_(checklist_ids)
+        )),
+        ('checklist_items', ChecklistItem, ChecklistItem.checklist_id.in_(checklist_ids)),
+        ('checklists', Checklist, Checklist.property_id == property_id),
+        ('service_requests', ServiceRequest, ServiceRequest.property_id == property_id),
+        ('tasks', Task, Task.property_id == property_id),
+        ('tickets', Ticket, Ticket.property_id == property_id),
+        ('rooms', Room, Room.property_id == property_id),
+        ('worker_leaderboard', WorkerLeaderboard, WorkerLeaderboard.property_id == property_id),
+        ('property_managers', PropertyManager, PropertyManager.property_id == property_id),
+        ('user_properties', UserProperty, UserProperty.property_id == property_id),
+        ('property', Property, Property.property_id == property_id)
+    ]
+
+def active_deletion(property_id):
+    """The property's pending or running deletion, unless it has gone stale"""
+    deletion = PropertyDeletion.query.filter(
+        PropertyDeletion.property_id == property_id,
+        PropertyDeletion.status.in_(ACTIVE_STATUSES)
+    ).order_by(PropertyDeletion.deletion_id.desc()).first()
+    if deletion and deletion.updated_at and datetime.utcnow() - deletion.updated_at > STALE_AFTER:
+        deletion.status = 'failed'
+        deletion.error = 'No progress reported; restarted'
+        deletion.finished_at = datetime.utcnow()
+        return None
+    return deletion
+
+class PropertyDeleter:
+    """Deletes a property and everything that belongs to it, one chunk per transaction.
+
+    Each chunk is a subquery-bounded DELETE committed together with the job's progress, so
+    locks on busy tables are held for one chunk at a time and an interrupted job can simply
+    be started again.
+    """
+
+    def __init__(self, deletion_id, chunk_size=None):
+        self.deletion_id = deletion_id
+        self.chunk_size = chunk_size or current_app.config.get('PROPERTY_DELETE_CHUNK_SIZE', 1000)
+        self.file_storage = None
+
+    def run(self):
+        deletion = db.session.get(PropertyDeletion, self.deletion_id)
+        steps = deletion_steps(deletion.property_id)
+        deletion.status = 'running'
+        deletion.steps_total = len(steps)
+        deletion.steps_done = 0
+        db.session.commit()
+
+        try:
+            for done, (name, model, condition) in enumerate(steps):
+                deletion.step = name
+                deletion.steps_done = done
+                db.session.commit()
+                if model is TicketAttachment:
+                    self._delete_attachments(deletion, condition)
+                else:
+                    self._delete_chunks(deletion, model, condition)
+
+            deletion.status = 'completed'
+            deletion.step = None
+            deletion.steps_done = len(steps)
+            deletion.finished_at = datetime.utcnow()
+            db.session.commit()
+            current_app.logger.info(
+                f"Property {deletion.property_id} deleted: {deletion.rows_deleted} rows, {deletion.files_deleted} files"
+            )
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error deleting property {deletion.property_id}: {str(e)}")
+            deletion = db.session.get(PropertyDeletion, self.deletion_id)
+            deletion.status = 'failed'
+            deletion.error = str(e)
+            deletion.finished_at = datetime.utcnow()
+            db.session.commit()
+
+    def _delete_chunks(self, deletion, model, condition):
+        primary_key = model.__mapper__.primary_key
+        while True:
+            statement = delete(model).execution_options(synchronize_session=False)
+            if len(primary_key) == 1:
+                # Bound each statement so it only locks one chunk of rows
+                column = primary_key[0]
+                statement = statement.where(column.in_(select(column).where(condition).limit(self.chunk_size)))
+            else:
+                # Link tables keyed by (property, user) are small enough to clear at once
+                statement = statement.where(condition)
+            deleted = db.session.execute(statement).rowcount
+            deletion.rows_deleted += deleted
+            db.session.commit()
+            if len(primary_key) != 1 or deleted < self.chunk_size:
+                return
+
+    def _delete_attachments(self, deletion, condition):
+        """Attachment rows go a chunk at a time, and their files once the chunk is committed"""
+        while True:
+            rows = db.session.execute(
+                select(TicketAttachment.attachment_id, TicketAttachment.file_path).where(condition).limit(self.chunk_size)
+            ).all()
+            if not rows:
+                return
+            db.session.execute(
+                delete(TicketAttachment)
+                .where(TicketAttachment.attachment_id.in_([row.attachment_id for row in rows]))
+                .execution_options(synchronize_session=False)
+            )
+            deletion.rows_deleted += len(rows)
+            db.session.commit()
+
+            self.file_storage = self.file_storage or FileStorageService()
+            deleted_files = sum(1 for row in rows if self.file_storage.delete_file(row.file_path))
+            deletion.files_deleted += deleted_files
+            db.session.commit()
+
+def resume_stale_deletions():
+    """Run again the deletion jobs whose thread died with its worker; returns how many were resumed.
+
+    A job is taken by moving its updated_at on from the value read, so a job that another
+    process resumes in the meantime, or that reports progress after all, is left alone.
+    """
+    cutoff = datetime.utcnow() - STALE_AFTER
+    stale = db.session.execute(
+        select(PropertyDeletion.deletion_id, PropertyDeletion.updated_at).where(
+            PropertyDeletion.status.in_(ACTIVE_STATUSES),
+            or_(PropertyDeletion.updated_at.is_(None), PropertyDeletion.updated_at < cutoff)
+        ).order_by(PropertyDeletion.deletion_id)
+    ).all()
+    db.session.commit()
+
+    resumed = 0
+    for deletion_id, updated_at in stale:
+        seen = PropertyDeletion.updated_at.is_(None) if updated_at is None else PropertyDeletion.updated_at == updated_at
+        claimed = db.session.execute(
+            update(PropertyDeletion)
+            .where(PropertyDeletion.deletion_id == deletion_id, PropertyDeletion.status.in_(ACTIVE_STATUSES), seen)
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            continue
+        current_app.logger.info(f"Resuming stale property deletion {deletion_id}")
+        PropertyDeleter(deletion_id).run()
+        resumed += 1
+    return resumed
+
+def start_property_deletion(deletion_id):
+    """Run a property deletion job on its own thread"""
+    app = current_app._get_current_object()
+
+    def _run():
+        with app.app_context():
+            PropertyDeleter(deletion_id).run()
+    Thread(target=_run).start()
@@ -0,0 +1,103 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from flask import current_app
+from sqlalchemy import select, update, insert
+from app.extensions import db, REPLICA_BIND_KEY
+from app.models import ReplicaHeartbeat
+
+class ReplicaHealth:
+    """Remembers whether the replica is usable so the lag query runs at most every few seconds"""
+
+    def __init__(self):
+        self.checked_at = None
+        self.usable = False
+        self.lag_seconds = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.checked_at = None
+            self.usable = False
+            self.lag_seconds = None
+
+replica_health = ReplicaHealth()
+
+def get_replica_engine():
+    """The replica engine, or None when no replica is configured"""
+    return db.engines.get(REPLICA_BIND_KEY)
+
+def replica_lag_seconds(engine):
+    """Age of the newest heartbeat visible on the replica, or None if there is none"""
+    with engine.connect() as conn:
+        beat_at = conn.execute(
+            select(ReplicaHeartbeat.__table__.c.beat_at).where(ReplicaHeartbeat.__table__.c.id == 1)
+        ).scalar()
+    if beat_at is None:
+        return None
+    return max(0.0, (datetime.utcnow() - beat_at).total_seconds())
+
+def replica_is_usable():
+    """True when a replica is configured, reachable and within REPLICA_MAX_LAG_SECONDS"""
+    engine = get_replica_engine()
+    if engine is None:
+        return False
+
+    check_seconds = current_app.config.get('REPLICA_LAG_CHECK_SECONDS', 5)
+    now = time.monotonic()
+    if replica_health.checked_at is not None and now - replica_health.checked_at < check_seconds:
+        return replica_health.usable
+
+    try:
+        lag = replica_lag_seconds(engine)
+    except Exception as e:
+        current_app.logger.warning(f"Read replica unavailable, using primary: {str(e)}")
+        lag = None
+
+    max_lag = current_app.config.get('REPLICA_MAX_LAG_SECONDS', 30)
+    usable = lag is not None and lag <= max_lag
+    if lag is not None and not usable:
+        current_app.logger.warning(f"Read replica is {lag:.0f}s behind (max {max_lag}s), using primary")
+
+    with replica_health._lock:
+        replica_health.checked_at = now
+        replica_health.usable = usable
+        replica_health.lag_seconds = lag
+    return usable
+
+@contextmanager
+def use_replica():
+    """Send the reads in this block to the replica, falling back to the primary when it lags.
+
+    Only use this around read-only work - anything flushed inside the block
+    still goes to the primary, but reads will not see it until it replicates.
+    """
+    if not replica_is_usable():
+        yield False
+        return
+
+    session = db.session()
+    session.info['use_replica'] = session.info.get('use_replica', 0) + 1
+    try:
+        yield True
+    finally:
+        session.info['use_replica'] -= 1
+
+def read_replica(f):
+    """Decorator running a read-only view or job against the replica"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with use_replica():
+            return f(*args, **kwargs)
+    return decorated_function
+
+def record_replica_heartbeat():
+    """Stamp the heartbeat row on the primary; the replica's copy shows how far behind it is"""
+    table = ReplicaHeartbeat.__table__
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        result = conn.execute(update(table).where(table.c.id == 1).values(beat_at=now))
+        if result.rowcount == 0:
+            conn.execute(insert(table).values(id=1, beat_at=now))
@@ -0,0 +1,129 @@
+import csv
+import io
+from flask import current_app
+from sqlalchemy import select, insert, update
+from app.extensions import db
+from app.models import Room
+
+REQUIRED_HEADERS = ('name', 'type', 'floor', 'status')
+VALID_STATUSES = ('Available', 'Occupied', 'Maintenance', 'Cleaning')
+
+class RoomImportError(ValueError):
+    """The upload as a whole cannot be imported (bad encoding or headers)"""
+
+def _parse_int(value):
+    value = (value or '').strip()
+    return int(value) if value else None
+
+def validate_rows(reader):
+    """Validate every CSV row in one pass.
+
+    Returns (rows, errors): rows are (row_num, values) ready to write and errors are
+    (row_num, message) for the rows that were skipped.
+    """
+    rows = []
+    errors = []
+    for row_num, row in enumerate(reader, start=2):  # Start at 2 to account for header row
+        name = (row.get('name') or '').strip()
+        room_type = (row.get('type') or '').strip()
+        status = (row.get('status') or '').strip()
+        if not name or not room_type or not (row.get('floor') or '').strip() or not status:
+            errors.append((row_num, "Missing required fields"))
+            continue
+        if status not in VALID_STATUSES:
+            errors.append((row_num, f"Invalid status '{status}'. Must be one of: {', '.join(VALID_STATUSES)}"))
+            continue
+        try:
+            floor = _parse_int(row['floor'])
+        except ValueError:
+            errors.append((row_num, "Floor must be a number"))
+            continue
+        try:
+            capacity = _parse_int(row.get('capacity'))
+        except ValueError:
+            errors.append((row_num, "Capacity must be a number"))
+            continue
+        if len(name) > 100 or len(room_type) > 50:
+            errors.append((row_num, "Name or type is too long"))
+            continue
+        rows.append((row_num, {
+            'name': name,
+            'type': room_type,
+            'floor': floor,
+            'status': status,
+            'capacity': capacity,
+            'description': row.get('description') or None
+        }))
+    return rows, errors
+
+class RoomImporter:
+    """Upserts the rooms of one property from a CSV stream.
+
+    Existing rooms are matched by name against a map loaded once per import, and writes go
+    out as executemany INSERT/UPDATE statements committed in chunks.
+    """
+
+    def __init__(self, property_id, chunk_size=None):
+        self.property_id = property_id
+        self.chunk_size = chunk_size or current_app.config.get('ROOM_IMPORT_CHUNK_SIZE', 500)
+
+    def _existing_rooms(self):
+        """Map of room name to room_id for the property; the first room wins if names repeat"""
+        rooms = {}
+        for room_id, name in db.session.execute(
+            select(Room.room_id, Room.name).where(Room.property_id == self.property_id).order_by(Room.room_id)
+        ):
+            rooms.setdefault(name, room_id)
+        return rooms
+
+    def import_stream(self, stream):
+        """Import a binary CSV stream without buffering it to disk"""
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.DictReader(text)
+            if not reader.fieldnames or not all(header in reader.fieldnames for header in REQUIRED_HEADERS):
+                raise RoomImportError("Invalid CSV format. Required headers: name, type, floor, status")
+            rows, errors = validate_rows(reader)
+        except UnicodeDecodeError:
+            raise RoomImportError("CSV file must be UTF-8 encoded")
+        finally:
+            text.detach()
+        return self.apply(rows, errors)
+
+    def apply(self, rows, errors=None):
+        """Write validated rows; a later row naming the same room overwrites the earlier one"""
+        existing = self._existing_rooms()
+        inserts = {}
+        updates = {}
+        added = 0
+        updated = 0
+        for _, values in rows:
+            name = values['name']
+            if name in existing:
+                updates[name] = dict(values, room_id=existing[name])
+                updated += 1
+            else:
+                if name in inserts:
+                    updated += 1
+                else:
+                    added += 1
+                inserts[name] = dict(values, property_id=self.property_id)
+
+        self._write(list(inserts.values()), list(updates.values()))
+        return {
+            'rooms_added': added,
+            'rooms_updated': updated,
+            'errors': sorted(errors or [])
+        }
+
+    def _write(self, insert_rows, update_rows):
+        table = Room.__table__
+        for offset in range(0, max(len(insert_rows), len(update_rows)), self.chunk_size):
+            insert_chunk = insert_rows[offset:offset + self.chunk_size]
+            update_chunk = update_rows[offset:offset + self.chunk_size]
+            if insert_chunk:
+                db.session.execute(insert(table), insert_chunk)
+            if update_chunk:
+                # ORM bulk UPDATE by primary key - still one executemany
+                db.session.execute(update(Room), update_chunk)
+            db.session.commit()
@@ -0,0 +1,230 @@
+"""
+Scheduler Leader Election
+Every process runs a BackgroundScheduler, but only the holder of the scheduler lease row runs jobs
+
+The lease is a single row claimed with a conditional UPDATE, so it works the
+same on PostgreSQL and SQLite. The leader renews it on an interval; when the
+leader dies the row expires after SCHEDULER_LEASE_TTL_SECONDS and the next
+process to renew or fire a job takes over. Each run is recorded in
+scheduler_job_runs, which lets the leader run cron jobs whose fire fell into
+a handover, when no process held a live lease.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import current_app
+from sqlalchemy import select, update, insert, delete, or_, case, func
+from sqlalchemy.exc import IntegrityError
+from apscheduler.triggers.cron import CronTrigger
+from app.extensions import db
+from app.models import SchedulerLease, SchedulerJobRun
+
+LEASE_NAME = 'scheduler'
+
+# How long after a cron fire its run must have started before the fire counts as missed
+MISSED_RUN_GRACE = timedelta(minutes=1)
+
+class SchedulerLeader:
+    """This process's view of the scheduler lease"""
+
+    def __init__(self, name=LEASE_NAME):
+        self.name = name
+        self.expires_at = None
+        self._holder = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def holder(self):
+        # A forked worker must not inherit its parent's identity
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._holder = f'{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}'
+            self.expires_at = None
+        return self._holder
+
+    def is_leader(self):
+        """True while the lease this process last wrote has not expired"""
+        holder = self.holder
+        return bool(holder and self.expires_at and datetime.utcnow() < self.expires_at)
+
+    def try_acquire(self):
+        """Take the lease if it is free or expired, or renew it if this process holds it"""
+        table = SchedulerLease.__table__
+        holder = self.holder
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=current_app.config.get('SCHEDULER_LEASE_TTL_SECONDS', 30))
+
+        with self._lock:
+            with db.engine.begin() as conn:
+                result = conn.execute(
+                    update(table)
+                    .where(table.c.name == self.name, or_(table.c.holder == holder, table.c.expires_at < now))
+                    .values(
+                        holder=holder,
+                        acquired_at=case((table.c.holder == holder, table.c.acquired_at), else_=now),
+                        renewed_at=now,
+                        expires_at=expires_at
+                    )
+                )
+                acquired = result.rowcount == 1
+                if not acquired and conn.execute(select(table.c.name).where(table.c.name == self.name)).first() is None:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(insert(table).values(
+                                name=self.name, holder=holder, acquired_at=now, renewed_at=now, expires_at=expires_at
+                            ))
+                        acquired = True
+                    except IntegrityError:
+                        # Another process created the row first
+                        acquired = False
+
+            was_leader = self.is_leader()
+            self.expires_at = expires_at if acquired else None
+
+        if acquired and not was_leader:
+            logging.info(f"Scheduler lease acquired by {holder}")
+        elif was_leader and not acquired:
+            logging.warning(f"Scheduler lease lost by {holder}")
+        return acquired
+
+    def release(self):
+        """Give up the lease so another process can take over without waiting for it to expire"""
+        if not self.is_leader():
+            return
+        table = SchedulerLease.__table__
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.name == self.name, table.c.holder == self.holder)
+                .values(expires_at=datetime.utcnow())
+            )
+        self.expires_at = None
+
+    def current(self):
+        """The lease row as a dict, or None if no process has claimed it yet"""
+        lease = db.session.get(SchedulerLease, self.name)
+        return lease.to_dict() if lease else None
+
+scheduler_leader = SchedulerLeader()
+
+def _start_run(job_id, holder):
+    table = SchedulerJobRun.__table__
+    with db.engine.begin() as conn:
+        return conn.execute(
+            insert(table).values(job_id=job_id, holder=holder, status='running', started_at=datetime.utcnow())
+        ).inserted_primary_key[0]
+
+def _finish_run(run_id, status, duration_ms, error=None):
+    table = SchedulerJobRun.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(table).where(table.c.id == run_id).values(
+            status=status, finished_at=datetime.utcnow(), duration_ms=duration_ms, error=error
+        ))
+
+def prune_job_runs():
+    """Delete job runs older than SCHEDULER_JOB_RUN_RETENTION_DAYS"""
+    table = SchedulerJobRun.__table__
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config.get('SCHEDULER_JOB_RUN_RETENTION_DAYS', 7))
+    with db.engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.started_at < cutoff))
+
+def last_fire_time(trigger, since, until):
+    """The latest time a trigger fired in [since, until], or None"""
+    last = None
+    fire = trigger.get_next_fire_time(None, since)
+    while fire is not None and fire <= until:
+        last = fire
+        fire = trigger.get_next_fire_time(fire, fire + timedelta(seconds=1))
+    return last
+
+def run_missed_jobs(scheduler):
+    """Queue a run of each cron job whose latest fire left no run behind; returns their IDs.
+
+    A fire that lands while the old leader's lease is expiring is skipped by every
+    process, and a daily job would otherwise wait a day. Only fires within
+    SCHEDULER_MISSED_RUN_HOURS are made up, and only for jobs that have run before,
+    so a new or re-timed job does not fire early.
+    """
+    if scheduler is None:
+        return []
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(hours=current_app.config.get('SCHEDULER_MISSED_RUN_HOURS', 6))
+    fires = {}
+    for job in scheduler.get_jobs():
+        leader_job_id = getattr(job.func, 'leader_job_id', None)
+        if leader_job_id is None or not isinstance(job.trigger, CronTrigger):
+            continue
+        fire = last_fire_time(job.trigger, since, now - MISSED_RUN_GRACE)
+        if fire is not None:
+            fires[leader_job_id] = (job, fire.astimezone(timezone.utc).replace(tzinfo=None))
+    if not fires:
+        return []
+
+    table = SchedulerJobRun.__table__
+    with db.engine.connect() as conn:
+        last_runs = dict(conn.execute(
+            select(table.c.job_id, func.max(table.c.started_at))
+            .where(table.c.job_id.in_(list(fires)))
+            .group_by(table.c.job_id)
+        ).all())
+
+    queued = []
+    for leader_job_id, (job, fire) in fires.items():
+        last_run = last_runs.get(leader_job_id)
+        # Allow for clocks between hosts being slightly apart
+        if last_run is None or last_run >= fire - timedelta(seconds=5):
+            continue
+        logging.warning(f"Running {leader_job_id}: its {fire.isoformat()} fire was missed during a lease handover")
+        # A one-off job, so the cron schedule itself is left alone
+        scheduler.add_job(
+            job.func,
+            args=job.args,
+            kwargs=job.kwargs,
+            id=f'{job.id}:missed',
+            name=f'{job.name} (missed run)',
+            replace_existing=True
+        )
+        queued.append(leader_job_id)
+    return queued
+
+def leader_only(job_id):
+    """Wrap a scheduled job so it runs only in the process holding the lease, and record each run"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            from app import app
+
+            with app.app_context():
+                try:
+                    if not scheduler_leader.try_acquire():
+                        logging.debug(f"Skipping {job_id}: another process holds the scheduler lease")
+                        return None
+                    run_id = _start_run(job_id, scheduler_leader.holder)
+                except Exception as e:
+                    logging.error(f"Skipping {job_id}: scheduler lease unavailable: {str(e)}")
+                    return None
+
+                started_at = time.perf_counter()
+                try:
+                    result = f(*args, **kwargs)
+                except Exception as e:
+                    _finish_run(run_id, 'error', (time.perf_counter() - started_at) * 1000, str(e)[:2000])
+                    raise
+                _finish_run(run_id, 'success', (time.perf_counter() - started_at) * 1000)
+                return result
+        decorated_function.leader_job_id = job_id
+        return decorated_function
+    return decorator
+
+def get_job_runs(limit=20, job_id=None):
+    """Most recent job runs, newest first"""
+    query = SchedulerJobRun.query
+    if job_id:
+        query = query.filter_by(job_id=job_id)
+    return query.order_by(SchedulerJobRun.started_at.desc(), SchedulerJobRun.id.desc()).limit(limit).all()
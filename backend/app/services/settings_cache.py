@@ -0,0 +1,119 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event, select, update, insert
+from sqlalchemy.orm import make_transient_to_detached
+from app.extensions import db
+from app.models import (
+    EmailSettings, SMSSettings, AttachmentSettings, GeneralSettings, SecuritySettings, SettingsVersion
+)
+
+SETTINGS_MODELS = (EmailSettings, SMSSettings, AttachmentSettings, GeneralSettings, SecuritySettings)
+
+# Sentinel for "looked up and there is no row", so missing settings are cached too
+_MISSING = object()
+
+def _snapshot(obj):
+    """Copy the column values of a settings row into a detached, read-only instance"""
+    mapper = obj.__mapper__
+    snapshot = mapper.class_manager.new_instance()
+    for column in mapper.column_attrs:
+        setattr(snapshot, column.key, getattr(obj, column.key))
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+class SettingsCache:
+    """Per-worker cache of the singleton settings rows.
+
+    Reads are served from memory. Every flush that touches a settings row bumps
+    the shared settings_version row in the same transaction; other workers
+    compare that version at most once per SETTINGS_CACHE_POLL_SECONDS and
+    reload when it has moved, so edits propagate within seconds.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        return db.session.execute(select(SettingsVersion.version).where(SettingsVersion.id == 1)).scalar() or 0
+
+    def _check_version(self):
+        poll_seconds = current_app.config.get('SETTINGS_CACHE_POLL_SECONDS', 5)
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < poll_seconds:
+            return
+        version = self._current_version()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+
+    def get(self, model):
+        """Return a detached copy of the settings row for a model, or None if it does not exist.
+
+        The copy is not attached to a session - load the row with a query
+        before changing it.
+        """
+        self._check_version()
+        entry = self._entries.get(model)
+        if entry is None:
+            row = model.query.first()
+            entry = _snapshot(row) if row else _MISSING
+            with self._lock:
+                self._entries[model] = entry
+        return None if entry is _MISSING else entry
+
+    def load(self):
+        """Warm every settings model, e.g. when a worker starts"""
+        for model in SETTINGS_MODELS:
+            self.get(model)
+
+    def invalidate(self):
+        """Forget everything so the next read reloads from the database"""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+settings_cache = SettingsCache()
+
+def get_settings(model):
+    """Return the cached settings row for a model, or None if it has not been created"""
+    return settings_cache.get(model)
+
+def _bump_settings_version(session, flush_context):
+    """Record settings edits in the shared version row as part of the same transaction"""
+    changed = [obj for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+               if isinstance(obj, SETTINGS_MODELS)]
+    if not changed or session.info.get('settings_version_bumped'):
+        return
+    connection = session.connection()
+    result = connection.execute(
+        update(SettingsVersion.__table__)
+        .where(SettingsVersion.__table__.c.id == 1)
+        .values(version=SettingsVersion.__table__.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(SettingsVersion.__table__).values(id=1, version=1))
+    session.info['settings_version_bumped'] = True
+
+def _apply_settings_changes(session):
+    if session.info.pop('settings_version_bumped', None):
+        # This worker sees its own edits immediately; others notice the new version
+        settings_cache.invalidate()
+
+def _discard_settings_changes(session):
+    session.info.pop('settings_version_bumped', None)
+
+def register_settings_cache_hooks():
+    """Bump the settings version and drop this worker's cache whenever settings rows change"""
+    for name, fn in (
+        ('after_flush', _bump_settings_version),
+        ('after_commit', _apply_settings_changes),
+        ('after_rollback', _discard_settings_changes)
+    ):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,283 @@
+from flask import current_app
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, or_
+from app.extensions import db, insert_ignoring_duplicates
+from app.models import History, SlaRecord, SlaSyncState, Ticket, Task, ServiceRequest, TaskAssignment
+
+SLA_ENTITY_MODELS = {
+    'ticket': (Ticket, Ticket.ticket_id),
+    'task': (Task, Task.task_id),
+    'service_request': (ServiceRequest, ServiceRequest.request_id)
+}
+
+STARTED_STATUSES = {'in progress', 'in_progress'}
+COMPLETED_STATUSES = {'completed', 'closed', 'resolved'}
+REOPENED_STATUSES = {'open', 'pending'}
+
+DEFAULT_TARGETS = {'assign': 1, 'start': 4, 'complete': 24}
+
+# The single sync state row
+SYNC_STATE_ID = 1
+
+class SlaService:
+    """Maintains SLA records incrementally from new History rows and reports on them"""
+
+    def __init__(self):
+        self.targets = current_app.config.get('SLA_TARGETS', {})
+        self.batch_size = current_app.config.get('SLA_SYNC_BATCH_SIZE', 1000)
+        self.logger = current_app.logger
+
+    def get_targets(self, priority):
+        """Return the target hours for a priority, falling back to the medium targets"""
+        return self.targets.get((priority or '').lower(), self.targets.get('medium', DEFAULT_TARGETS))
+
+    def _lock_state(self):
+        """The sync state row, created if missing and locked for the rest of the transaction"""
+        db.session.execute(insert_ignoring_duplicates(SlaSyncState.__table__).values(id=SYNC_STATE_ID, last_history_id=0))
+        return SlaSyncState.query.filter_by(id=SYNC_STATE_ID).with_for_update().populate_existing().one()
+
+    def sync(self, max_batches=None):
+        """Apply History rows newer than the stored watermark. Returns the number of rows applied.
+
+        IDs skipped below the watermark belong to transactions that may still commit, so
+        they are kept as gaps and looked for again for SLA_SYNC_GAP_SECONDS.
+        """
+        gap_wait = timedelta(seconds=current_app.config.get('SLA_SYNC_GAP_SECONDS', 300))
+        applied = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            state = self._lock_state()
+            now = datetime.utcnow()
+            gaps = {
+                int(history_id): datetime.fromisoformat(seen)
+                for history_id, seen in (state.gaps or {}).items()
+                if now - datetime.fromisoformat(seen) < gap_wait
+            }
+            query = History.query.filter(
+                or_(History.history_id > state.last_history_id, History.history_id.in_(gaps))
+                if gaps else History.history_id > state.last_history_id
+            )
+            rows = query.order_by(History.history_id).limit(self.batch_size).all()
+
+            last_id = state.last_history_id
+            for row in rows:
+                if row.history_id > last_id:
+                    # A large jump (sequence reset, purged rows) only leaves its last IDs as gaps
+                    for missing in range(max(last_id + 1, row.history_id - self.batch_size), row.history_id):
+                        gaps[missing] = now
+                    last_id = row.history_id
+                else:
+                    gaps.pop(row.history_id, None)
+            # Only the most recent gaps are worth waiting for
+            if len(gaps) > self.batch_size:
+                gaps = dict(sorted(gaps.items())[-self.batch_size:])
+
+            sla_rows = [row for row in rows if row.entity_type in SLA_ENTITY_MODELS]
+            if sla_rows:
+                self._apply_batch(sla_rows)
+            state.last_history_id = last_id
+            state.gaps = {str(history_id): seen.isoformat() for history_id, seen in gaps.items()} or None
+            db.session.commit()
+
+            applied += len(sla_rows)
+            batches += 1
+            if len(rows) < self.batch_size:
+                break
+
+        flagged = self.flag_overdue()
+        if applied or flagged:
+            self.logger.info(f"SLA sync applied {applied} history rows, flagged {flagged} overdue records")
+        return applied
+
+    def flag_overdue(self, now=None):
+        """Mark open records whose targets have passed as breached"""
+        now = now or datetime.utcnow()
+        flagged = 0
+        for at_column, due_column, flag_column in (
+            (SlaRecord.assigned_at, SlaRecord.assign_due_at, 'assign_breached'),
+            (SlaRecord.started_at, SlaRecord.start_due_at, 'start_breached'),
+            (SlaRecord.completed_at, SlaRecord.complete_due_at, 'complete_breached')
+        ):
+            flagged += SlaRecord.query.filter(
+                at_column.is_(None),
+                SlaRecord.completed_at.is_(None),
+                due_column < now,
+                getattr(SlaRecord, flag_column).is_(False)
+            ).update({flag_column: True, 'breached': True}, synchronize_session=False)
+        db.session.commit()
+        return flagged
+
+    def _apply_batch(self, rows):
+        """Fold one ordered batch of History rows into SLA records"""
+        ids_by_type = {entity_type: set() for entity_type in SLA_ENTITY_MODELS}
+        for row in rows:
+            ids_by_type[row.entity_type].add(row.entity_id)
+
+        # Task events also drive the SLA of the ticket the task was created for
+        ticket_for_task = {}
+        if ids_by_type['task']:
+            ticket_for_task = dict(db.session.query(
+                TaskAssignment.task_id, TaskAssignment.ticket_id
+            ).filter(
+                TaskAssignment.task_id.in_(ids_by_type['task']),
+                TaskAssignment.is_service_request.isnot(True)
+            ).all())
+            ids_by_type['ticket'].update(ticket_for_task.values())
+
+        records = {}
+        for entity_type, entity_ids in ids_by_type.items():
+            if not entity_ids:
+                continue
+            for record in SlaRecord.query.filter(
+                SlaRecord.entity_type == entity_type,
+                SlaRecord.entity_id.in_(entity_ids)
+            ).all():
+                records[(entity_type, record.entity_id)] = record
+
+            missing = [entity_id for entity_id in entity_ids if (entity_type, entity_id) not in records]
+            if missing:
+                model, pk = SLA_ENTITY_MODELS[entity_type]
+                new_records = [{
+                    'entity_type': entity_type,
+                    'entity_id': getattr(entity, pk.key),
+                    'property_id': entity.property_id,
+                    'priority': entity.priority,
+                    'opened_at': entity.created_at or datetime.utcnow()
+                } for entity in model.query.filter(pk.in_(missing)).all()]
+                if new_records:
+                    # Another writer may create the same records; theirs are kept and loaded below
+                    db.session.execute(insert_ignoring_duplicates(SlaRecord.__table__), new_records)
+                    for record in SlaRecord.query.filter(
+                        SlaRecord.entity_type == entity_type,
+                        SlaRecord.entity_id.in_(missing)
+                    ).all():
+                        records[(entity_type, record.entity_id)] = record
+
+        touched = set()
+        for row in rows:
+            keys = [(row.entity_type, row.entity_id)]
+            if row.entity_type == 'task' and row.entity_id in ticket_for_task and row.action != 'created':
+                keys.append(('ticket', ticket_for_task[row.entity_id]))
+            for key in keys:
+                record = records.get(key)
+                if record is not None and self._apply_event(record, row, own=(key[0] == row.entity_type)):
+                    touched.add(key)
+
+        now = datetime.utcnow()
+        for key in touched:
+            self._recompute(records[key], now)
+
+    def _apply_event(self, record, row, own=True):
+        """Apply a single History row to a record. Returns True when the record changed."""
+        at = row.created_at or datetime.utcnow()
+        action = row.action
+        new_value = (row.new_value or '').strip().lower()
+
+        if action == 'created' and own:
+            record.opened_at = min(record.opened_at, at) if record.opened_at else at
+            return True
+
+        if action == 'assigned' or (action == 'updated' and row.field_name == 'assigned_to' and new_value not in ('', 'none')):
+            if not record.assigned_at or at < record.assigned_at:
+                record.assigned_at = at
+            return True
+
+        if action == 'completed':
+            record.completed_at = record.completed_at or at
+            return True
+
+        is_status_change = action == 'status_changed' or (action == 'updated' and row.field_name == 'status')
+        if is_status_change and new_value:
+            if new_value in STARTED_STATUSES:
+                if not record.started_at or at < record.started_at:
+                    record.started_at = at
+            elif new_value in COMPLETED_STATUSES:
+                record.completed_at = record.completed_at or at
+            elif new_value in REOPENED_STATUSES and own:
+                record.completed_at = None
+            return True
+
+        if action == 'updated' and row.field_name == 'priority' and own and row.new_value:
+            record.priority = row.new_value
+            return True
+
+        return False
+
+    def _recompute(self, record, now):
+        """Refresh targets, intervals and breach flags for a record"""
+        targets = self.get_targets(record.priority)
+        record.assign_due_at = record.opened_at + timedelta(hours=targets['assign'])
+        record.start_due_at = record.opened_at + timedelta(hours=targets['start'])
+        record.complete_due_at = record.opened_at + timedelta(hours=targets['complete'])
+
+        record.time_to_assign = (record.assigned_at - record.opened_at).total_seconds() if record.assigned_at else None
+        record.time_to_start = (record.started_at - record.opened_at).total_seconds() if record.started_at else None
+        record.time_to_complete = (record.completed_at - record.opened_at).total_seconds() if record.completed_at else None
+
+        finished = record.completed_at
+        record.assign_breached = (record.assigned_at or finished or now) > record.assign_due_at
+        record.start_breached = (record.started_at or finished or now) > record.start_due_at
+        record.complete_breached = (finished or now) > record.complete_due_at
+        record.breached = record.assign_breached or record.start_breached or record.complete_breached
+
+    def get_report(self, date_from, date_to, property_ids=None, entity_type=None, breach_limit=50):
+        """Aggregate SLA records opened in a date range, optionally limited to a set of properties"""
+        filters = [SlaRecord.opened_at >= date_from, SlaRecord.opened_at <= date_to]
+        if property_ids is not None:
+            filters.append(SlaRecord.property_id.in_(property_ids))
+        if entity_type:
+            filters.append(SlaRecord.entity_type == entity_type)
+
+        rows = db.session.query(
+            SlaRecord.entity_type,
+            SlaRecord.priority,
+            func.count(SlaRecord.record_id),
+            func.avg(SlaRecord.time_to_assign),
+            func.avg(SlaRecord.time_to_start),
+            func.avg(SlaRecord.time_to_complete),
+            func.sum(case((SlaRecord.completed_at.isnot(None), 1), else_=0)),
+            func.sum(case((SlaRecord.assign_breached.is_(True), 1), else_=0)),
+            func.sum(case((SlaRecord.start_breached.is_(True), 1), else_=0)),
+            func.sum(case((SlaRecord.complete_breached.is_(True), 1), else_=0)),
+            func.sum(case((SlaRecord.breached.is_(True), 1), else_=0))
+        ).filter(*filters).group_by(SlaRecord.entity_type, SlaRecord.priority).all()
+
+        def hours(seconds):
+            return round(seconds / 3600, 2) if seconds is not None else None
+
+        summary = {}
+        total = 0
+        total_breached = 0
+        for (row_type, priority, count, avg_assign, avg_start, avg_complete,
+             completed, assign_breached, start_breached, complete_breached, breached) in rows:
+            targets = self.get_targets(priority)
+            summary.setdefault(row_type, []).append({
+                'priority': priority,
+                'total': count,
+                'completed': int(completed or 0),
+                'avg_hours_to_assign': hours(avg_assign),
+                'avg_hours_to_start': hours(avg_start),
+                'avg_hours_to_complete': hours(avg_complete),
+                'target_hours': targets,
+                'assign_breaches': int(assign_breached or 0),
+                'start_breaches': int(start_breached or 0),
+                'complete_breaches': int(complete_breached or 0),
+                'breached': int(breached or 0),
+                'compliance_rate': round((1 - (breached or 0) / count) * 100, 1) if count else 100.0
+            })
+            total += count
+            total_breached += int(breached or 0)
+
+        breaches = SlaRecord.query.filter(
+            *filters, SlaRecord.breached.is_(True)
+        ).order_by(SlaRecord.opened_at.desc()).limit(breach_limit).all()
+
+        return {
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'total': total,
+            'breached': total_breached,
+            'compliance_rate': round((1 - total_breached / total) * 100, 1) if total else 100.0,
+            'by_entity': summary,
+            'breaches': [record.to_dict() for record in breaches]
+        }
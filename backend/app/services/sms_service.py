@@ -1,7 +1,7 @@
 from flask import current_app
-from twilio.rest import Client
 import logging
 import os
+from app.metrics import track_notification
 
 class SMSService:
     def __init__(self):
@@ -13,10 +13,13 @@ class SMSService:
         self.logger = current_app.logger
         
         if self.enable_sms and self.account_sid and self.auth_token:
+            # Imported here so workers only load the Twilio SDK when SMS is configured
+            from twilio.rest import Client
             self.client = Client(self.account_sid, self.auth_token)
         else:
             self.client = None
 
+    @track_notification('sms')
     def send_sms(self, to_number, message):
         """Send SMS using Twilio"""
         if not self.client:
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import event, func, select
+from app.extensions import db
+from app.models import User, PropertyManager, Task
+from app.services.due_date_engine import DONE_STATUSES
+
+# Manager group that owns each ticket category
+CATEGORY_GROUPS = {
+    'Maintenance': 'Engineering',
+    'Housekeeping': 'Housekeeping',
+    'Front Desk': 'Front Desk',
+    'General': 'Front Desk',
+    'IT': 'IT',
+    'Security': 'Security',
+    'Food & Beverage': 'Food & Beverage',
+    'Accounting': 'Accounting',
+    'Incident Report': 'Management'
+}
+
+# Group that picks up tickets nobody in the category's group can take
+FALLBACK_GROUP = 'Executive'
+
+# Plain values for a routed manager, safe to share between requests and threads
+RoutedManager = namedtuple('RoutedManager', 'user_id username email group')
+
+# How a ticket picks between several eligible managers in the same group
+LEAST_LOADED = 'least_loaded'
+ROUND_ROBIN = 'round_robin'
+
+class RoutingCache:
+    """Process-level routing table: each property's active managers by group, plus assignee load.
+
+    The table expires after ROUTING_CACHE_TTL_SECONDS and edits to users or property managers
+    made in this worker clear it on commit. Open task counts are counted up in memory as
+    tickets are routed and re-read from the database every ROUTING_LOAD_SYNC_SECONDS, which
+    also picks up tasks completed or assigned elsewhere.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._load = {}
+        self._load_expires = 0
+        self._turns = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, property_ids):
+        """Return {property_id: {group: (RoutedManager, ...)}}, loading uncached properties in one query"""
+        now = time.monotonic()
+        found = {}
+        missing = set()
+        for property_id in property_ids:
+            entry = self._entries.get(property_id)
+            if entry is not None and entry[0] > now:
+                found[property_id] = entry[1]
+            else:
+                missing.add(property_id)
+        if not missing:
+            return found
+
+        loaded = {property_id: {} for property_id in missing}
+        for property_id, user_id, username, email, group in db.session.execute(
+            select(PropertyManager.property_id, User.user_id, User.username, User.email, User.group)
+            .join(User, User.user_id == PropertyManager.user_id)
+            .where(PropertyManager.property_id.in_(missing), User.is_active == True)
+            .order_by(User.user_id)
+        ):
+            loaded[property_id].setdefault(group, []).append(RoutedManager(user_id, username, email, group))
+        loaded = {
+            property_id: {group: tuple(managers) for group, managers in groups.items()}
+            for property_id, groups in loaded.items()
+        }
+
+        ttl = current_app.config.get('ROUTING_CACHE_TTL_SECONDS', 60)
+        if ttl > 0:
+            with self._lock:
+                for property_id, managers in loaded.items():
+                    self._entries[property_id] = (now + ttl, managers)
+        found.update(loaded)
+        return found
+
+    def sync_load(self, user_ids):
+        """Re-read open task counts when they are stale or missing any of user_ids"""
+        now = time.monotonic()
+        if now < self._load_expires and all(user_id in self._load for user_id in user_ids):
+            return
+        expired = now >= self._load_expires
+        wanted = set(user_ids) | (set(self._load) if expired else set())
+        if not wanted:
+            return
+
+        counts = dict.fromkeys(wanted, 0)
+        counts.update(db.session.execute(
+            select(Task.assigned_to_id, func.count(Task.task_id))
+            .where(Task.assigned_to_id.in_(wanted), func.lower(Task.status).notin_(DONE_STATUSES))
+            .group_by(Task.assigned_to_id)
+        ).all())
+        with self._lock:
+            self._load.update(counts)
+            if expired:
+                self._load_expires = now + current_app.config.get('ROUTING_LOAD_SYNC_SECONDS', 30)
+
+    def pick(self, property_id, group, candidates, strategy):
+        """Choose one of candidates and count the new task against them"""
+        with self._lock:
+            if strategy == ROUND_ROBIN:
+                turn = self._turns.get((property_id, group), 0)
+                self._turns[(property_id, group)] = turn + 1
+                manager = candidates[turn % len(candidates)]
+            else:
+                manager = min(candidates, key=lambda candidate: self._load.get(candidate.user_id, 0))
+            self._load[manager.user_id] = self._load.get(manager.user_id, 0) + 1
+        return manager
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._load_expires = 0
+
+routing_cache = RoutingCache()
+
+class TicketRouter:
+    """Resolves the manager a new ticket's task goes to, for a fixed set of properties.
+
+    Managers and their open task counts are read once when the router is built, so each
+    routing decision after that is an in-memory lookup, and routing a batch of tickets
+    spreads them across a group instead of handing every one to the same manager.
+    """
+
+    def __init__(self, property_ids):
+        property_ids = {int(property_id) for property_id in property_ids if property_id}
+        self._managers = routing_cache.get_many(property_ids) if property_ids else {}
+        self._strategy = current_app.config.get('ROUTING_STRATEGY', LEAST_LOADED)
+        if self._strategy == LEAST_LOADED:
+            routing_cache.sync_load({
+                manager.user_id
+                for groups in self._managers.values()
+                for managers in groups.values()
+                for manager in managers
+            })
+
+    def assignee(self, property_id, category):
+        """A manager from the category's group at the property, else from its executives, else None"""
+        group = CATEGORY_GROUPS.get(category)
+        return (group and self.group_assignee(property_id, group)) or self.group_assignee(property_id, FALLBACK_GROUP)
+
+    def group_assignee(self, property_id, group):
+        """A manager from exactly this group at the property, or None"""
+        property_id = int(property_id)
+        candidates = self._managers.get(property_id, {}).get(group)
+        if not candidates:
+            return None
+        return routing_cache.pick(property_id, group, candidates, self._strategy)
+
+ROUTING_MODELS = (User, PropertyManager)
+
+def _collect_routing_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ROUTING_MODELS):
+            session.info['routing_changed'] = True
+            return
+
+def _routing_bulk_write(orm_execute_state):
+    """Query.update()/delete() on users or managers bypass the flush"""
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    if any(mapper.class_ in ROUTING_MODELS for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info['routing_changed'] = True
+
+def _apply_routing_changes(session):
+    if session.info.pop('routing_changed', None):
+        routing_cache.invalidate()
+
+def _discard_routing_changes(session):
+    session.info.pop('routing_changed', None)
+
+def register_routing_cache_hooks():
+    """Clear the routing cache when users or property managers change"""
+    for name, fn in (
+        ('after_flush', _collect_routing_changes),
+        ('do_orm_execute', _routing_bulk_write),
+        ('after_commit', _apply_routing_changes),
+        ('after_rollback', _discard_routing_changes)
+    ):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
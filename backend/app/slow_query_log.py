@@ -0,0 +1,195 @@
+"""
+Slow Query Log
+Records SQL statements slower than a threshold, with the route and code that issued them and an EXPLAIN plan
+
+Timing happens inline in the cursor events; fingerprinting the statement,
+running EXPLAIN and writing the slow_queries row happen on a background
+thread so slow requests are not made slower. Parameter values are never
+stored, as they include emails, password hashes and tokens; only their types are.
+"""
+import hashlib
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import traceback
+from datetime import datetime
+from flask import request, has_request_context
+from sqlalchemy import event, select, update, insert
+
+_THIS_FILE = os.path.abspath(__file__)
+_PROJECT_DIR = os.path.dirname(os.path.dirname(_THIS_FILE)) + os.sep
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%\([^)]+\)s|%s)(?:\s*,\s*(?:\?|%\([^)]+\)s|%s))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_sql(statement):
+    """Strip literals and collapse IN lists so equivalent statements share a fingerprint"""
+    sql = _STRING_LITERAL.sub('?', statement)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(?)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+def describe_parameters(parameters, executemany=False):
+    """The shape of a statement's parameters - names and types, never values"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = describe_parameters(parameters[0]) if parameters else '()'
+        return f'{len(parameters)} x {first}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+def _source_frame():
+    """The innermost application frame that led to the statement"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_PROJECT_DIR) and filename != _THIS_FILE and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, _PROJECT_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+class SlowQueryLog:
+    """Times statements on an engine and hands slow ones to a background writer"""
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold_ms = 500
+        self.engine = None
+        self._queue = queue.Queue(maxsize=1000)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._explained = set()
+
+    def configure(self, app, engine):
+        self.enabled = app.config.get('SLOW_QUERY_LOG_ENABLED', False)
+        self.threshold_ms = app.config.get('SLOW_QUERY_THRESHOLD_MS', 500)
+        self.engine = engine
+        if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            conn.info.setdefault('slow_query_started_at', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('slow_query_started_at')
+        if not started:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1000
+        if duration_ms < self.threshold_ms or getattr(self._local, 'writing', False):
+            return
+        route = None
+        if has_request_context():
+            route = f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait({
+                'statement': statement,
+                'parameters': parameters,
+                'executemany': executemany,
+                'duration_ms': duration_ms,
+                'route': route,
+                'source': _source_frame(),
+                'seen_at': datetime.utcnow()
+            })
+        except queue.Full:
+            pass
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='slow-query-log', daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout=5):
+        """Wait until queued entries are written, e.g. in tests"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _run(self):
+        self._local.writing = True
+        while True:
+            entry = self._queue.get()
+            try:
+                self._record(entry)
+            except Exception as e:
+                logging.error(f"Error recording slow query: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _explain(self, conn, statement, parameters, executemany):
+        if executemany or not statement.lstrip().upper().startswith('SELECT'):
+            return None
+        prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        plan = '\n'.join(' | '.join(str(value) for value in row) for row in rows)
+        # PostgreSQL prints bound values into filter conditions
+        return _STRING_LITERAL.sub("'?'", plan)
+
+    def _record(self, entry):
+        from app.models import SlowQuery
+        table = SlowQuery.__table__
+        statement = normalize_sql(entry['statement'])
+        fingerprint = hashlib.sha1(statement.encode('utf-8')).hexdigest()
+        duration_ms = entry['duration_ms']
+
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                select(table.c.id, table.c.max_ms, table.c.explain_plan).where(table.c.fingerprint == fingerprint)
+            ).first()
+
+            plan = None
+            if fingerprint not in self._explained and not (row and row.explain_plan):
+                try:
+                    with conn.begin_nested():
+                        plan = self._explain(conn, entry['statement'], entry['parameters'], entry['executemany'])
+                except Exception as e:
+                    plan = f'EXPLAIN failed: {e}'
+                self._explained.add(fingerprint)
+
+            values = {
+                'sample_parameters': describe_parameters(entry['parameters'], entry['executemany'])[:2000],
+                'route': entry['route'],
+                'source': entry['source'],
+                'last_seen': entry['seen_at']
+            }
+            if plan:
+                values['explain_plan'] = plan
+
+            if row:
+                conn.execute(update(table).where(table.c.id == row.id).values(
+                    count=table.c.count + 1,
+                    total_ms=table.c.total_ms + duration_ms,
+                    max_ms=max(row.max_ms or 0, duration_ms),
+                    **values
+                ))
+            else:
+                conn.execute(insert(table).values(
+                    fingerprint=fingerprint,
+                    statement=statement,
+                    count=1,
+                    total_ms=duration_ms,
+                    max_ms=duration_ms,
+                    first_seen=entry['seen_at'],
+                    **values
+                ))
+
+slow_query_log = SlowQueryLog()
+
+def init_slow_query_log(app, engine):
+    """Attach the slow-query hooks; nothing is recorded unless SLOW_QUERY_LOG_ENABLED is set"""
+    slow_query_log.configure(app, engine)
@@ -13,7 +13,20 @@ class Config:
             database_url += '?sslmode=require'
             
     SQLALCHEMY_DATABASE_URI = database_url
+
+    # Optional read replica used for reports and dashboards
+    replica_database_url = os.environ.get('REPLICA_DATABASE_URL')
+    if replica_database_url and 'postgresql://' in replica_database_url and '?' not in replica_database_url:
+        replica_database_url += '?sslmode=require'
+    SQLALCHEMY_BINDS = {'replica': replica_database_url} if replica_database_url else {}
+    REPLICA_MAX_LAG_SECONDS = int(os.environ.get('REPLICA_MAX_LAG_SECONDS', 30))
+    REPLICA_LAG_CHECK_SECONDS = int(os.environ.get('REPLICA_LAG_CHECK_SECONDS', 5))
+    REPLICA_HEARTBEAT_SECONDS = int(os.environ.get('REPLICA_HEARTBEAT_SECONDS', 10))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Startup work done by create_app() - turn off where migrations own the schema or another process runs the jobs
+    AUTO_CREATE_SCHEMA = os.environ.get('AUTO_CREATE_SCHEMA', 'True').lower() == 'true'
+    START_SCHEDULER = os.environ.get('START_SCHEDULER', 'True').lower() == 'true'
     
     # SQLAlchemy session management
     SQLALCHEMY_ENGINE_OPTIONS = {
@@ -51,6 +64,25 @@ class Config:
     # Logging configuration
     LOG_TO_STDOUT = os.environ.get('LOG_TO_STDOUT')
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FILE = os.environ.get('LOG_FILE', 'logs/app.log')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', 10))
+    # Fraction of requests logged with their (redacted) headers, args and body
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))
+
+    # Metrics - bearer token required by /metrics; without one the endpoint is closed
+    METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN', '')
+    # Serve /metrics without a token, only where the app port is reachable from the internal network alone
+    METRICS_ALLOW_UNAUTHENTICATED = os.environ.get('METRICS_ALLOW_UNAUTHENTICATED', 'False').lower() == 'true'
+
+    # Request profiling - super admins send X-Profile: 1 to store a cProfile dump
+    ENABLE_REQUEST_PROFILING = os.environ.get('ENABLE_REQUEST_PROFILING', 'True').lower() == 'true'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 100))
+
+    # Slow-query log - statements slower than the threshold are recorded with an EXPLAIN plan
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'False').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 500))
     
     # Development vs Production
     DEBUG = os.environ.get('FLASK_DEBUG', False)
@@ -78,6 +110,98 @@ class Config:
     SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'noreply@modernmanagementhotels.com')
     ENABLE_EMAIL_NOTIFICATIONS = os.environ.get('ENABLE_EMAIL_NOTIFICATIONS', 'True').lower() == 'true'
 
+    # Identity cache - how long a worker reuses a user and their property IDs
+    USER_CACHE_TTL_SECONDS = int(os.environ.get('USER_CACHE_TTL_SECONDS', 30))
+
+    # Routing cache - how long a worker reuses each property's managers when routing new tickets
+    ROUTING_CACHE_TTL_SECONDS = int(os.environ.get('ROUTING_CACHE_TTL_SECONDS', 60))
+    # least_loaded (fewest open tasks) or round_robin between managers in the same group
+    ROUTING_STRATEGY = os.environ.get('ROUTING_STRATEGY', 'least_loaded')
+    # How often the in-memory open task counts are re-read from the database
+    ROUTING_LOAD_SYNC_SECONDS = int(os.environ.get('ROUTING_LOAD_SYNC_SECONDS', 30))
+
+    # Settings cache - how often a worker checks the settings version row for edits made elsewhere
+    SETTINGS_CACHE_POLL_SECONDS = int(os.environ.get('SETTINGS_CACHE_POLL_SECONDS', 5))
+
+    # SLA configuration - target hours per priority for assignment, start and completion
+    SLA_TARGETS = {
+        'critical': {'assign': 0.25, 'start': 1, 'complete': 4},
+        'urgent': {'assign': 0.25, 'start': 1, 'complete': 4},
+        'high': {'assign': 0.5, 'start': 2, 'complete': 8},
+        'medium': {'assign': 1, 'start': 4, 'complete': 24},
+        'normal': {'assign': 1, 'start': 4, 'complete': 24},
+        'low': {'assign': 4, 'start': 8, 'complete': 72}
+    }
+    SLA_SYNC_BATCH_SIZE = int(os.environ.get('SLA_SYNC_BATCH_SIZE', 1000))
+    SLA_SYNC_INTERVAL_MINUTES = int(os.environ.get('SLA_SYNC_INTERVAL_MINUTES', 1))
+    # History IDs are handed out before commit, so a skipped ID is re-checked for this long
+    SLA_SYNC_GAP_SECONDS = int(os.environ.get('SLA_SYNC_GAP_SECONDS', 300))
+
+    # Scheduler leader election - only the process holding the lease row runs scheduled jobs
+    SCHEDULER_LEASE_TTL_SECONDS = int(os.environ.get('SCHEDULER_LEASE_TTL_SECONDS', 30))
+    SCHEDULER_LEASE_RENEW_SECONDS = int(os.environ.get('SCHEDULER_LEASE_RENEW_SECONDS', 10))
+    SCHEDULER_JOB_RUN_RETENTION_DAYS = int(os.environ.get('SCHEDULER_JOB_RUN_RETENTION_DAYS', 7))
+    # Cron fires missed during a lease handover are run by the new leader if they are at most this old
+    SCHEDULER_MISSED_RUN_HOURS = float(os.environ.get('SCHEDULER_MISSED_RUN_HOURS', 6))
+
+    # Daily reports - each executive's report runs at a fixed offset within the window, in their properties' timezone
+    DAILY_REPORT_SPREAD_MINUTES = int(os.environ.get('DAILY_REPORT_SPREAD_MINUTES', 30))
+    DAILY_REPORT_MAX_CONCURRENCY = int(os.environ.get('DAILY_REPORT_MAX_CONCURRENCY', 2))
+    DAILY_REPORT_REPLAN_MINUTES = int(os.environ.get('DAILY_REPORT_REPLAN_MINUTES', 15))
+
+    # Due-date reminders - assignees are reminded before a task is due, managers get a digest once it is overdue
+    TASK_REMINDER_LEAD_HOURS = float(os.environ.get('TASK_REMINDER_LEAD_HOURS', 24))
+    TASK_ESCALATION_GRACE_HOURS = float(os.environ.get('TASK_ESCALATION_GRACE_HOURS', 1))
+    DUE_DATE_TICK_SECONDS = int(os.environ.get('DUE_DATE_TICK_SECONDS', 60))
+    DUE_DATE_HORIZON_HOURS = float(os.environ.get('DUE_DATE_HORIZON_HOURS', 6))
+    # How far back a freshly started leader looks for events it may have missed while down
+    DUE_DATE_LOOKBACK_HOURS = float(os.environ.get('DUE_DATE_LOOKBACK_HOURS', 24))
+    # Undelivered notifications are retried this often, up to DUE_DATE_MAX_ATTEMPTS sends in all
+    DUE_DATE_RETRY_SECONDS = int(os.environ.get('DUE_DATE_RETRY_SECONDS', 300))
+    DUE_DATE_MAX_ATTEMPTS = int(os.environ.get('DUE_DATE_MAX_ATTEMPTS', 5))
+    DUE_NOTIFICATION_RETENTION_DAYS = int(os.environ.get('DUE_NOTIFICATION_RETENTION_DAYS', 30))
+    DUE_NOTIFICATION_PURGE_INTERVAL_MINUTES = int(os.environ.get('DUE_NOTIFICATION_PURGE_INTERVAL_MINUTES', 60))
+
+    # Recurring checklists - daily, weekly and monthly checklists get one instance per property and period
+    CHECKLIST_GENERATION_INTERVAL_MINUTES = int(os.environ.get('CHECKLIST_GENERATION_INTERVAL_MINUTES', 60))
+    CHECKLIST_GENERATION_BATCH_SIZE = int(os.environ.get('CHECKLIST_GENERATION_BATCH_SIZE', 1000))
+    CHECKLIST_CREATE_TASKS = os.environ.get('CHECKLIST_CREATE_TASKS', 'False').lower() == 'true'
+
+    # Room CSV imports commit their inserts and updates in chunks of this many rows
+    ROOM_IMPORT_CHUNK_SIZE = int(os.environ.get('ROOM_IMPORT_CHUNK_SIZE', 500))
+
+    # Largest number of tickets or tasks accepted by one bulk creation request
+    BULK_CREATE_MAX_ROWS = int(os.environ.get('BULK_CREATE_MAX_ROWS', 5000))
+    # Largest number of tickets or tasks one bulk update request may change
+    BULK_UPDATE_MAX_ROWS = int(os.environ.get('BULK_UPDATE_MAX_ROWS', 5000))
+
+    # Property deletion jobs delete and commit this many rows of each table at a time
+    PROPERTY_DELETE_CHUNK_SIZE = int(os.environ.get('PROPERTY_DELETE_CHUNK_SIZE', 1000))
+    # Deletions whose thread died with its worker are picked up by the scheduler this often
+    PROPERTY_DELETE_RESUME_INTERVAL_MINUTES = int(os.environ.get('PROPERTY_DELETE_RESUME_INTERVAL_MINUTES', 5))
+
+    # How long POST /tickets and /service-requests remember an Idempotency-Key and its response
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    # A key whose first request stored no response within this long can be retried
+    IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+    # How often expired keys are purged
+    IDEMPOTENCY_PURGE_INTERVAL_MINUTES = int(os.environ.get('IDEMPOTENCY_PURGE_INTERVAL_MINUTES', 60))
+
+    # /events change streams - each open stream holds a worker thread (see gunicorn.conf.py)
+    CHANGE_STREAM_POLL_SECONDS = float(os.environ.get('CHANGE_STREAM_POLL_SECONDS', 1))
+    CHANGE_STREAM_POLL_BATCH = int(os.environ.get('CHANGE_STREAM_POLL_BATCH', 500))
+    CHANGE_STREAM_HEARTBEAT_SECONDS = float(os.environ.get('CHANGE_STREAM_HEARTBEAT_SECONDS', 15))
+    # Streams end after this long and the browser reconnects with Last-Event-ID, freeing the thread
+    CHANGE_STREAM_MAX_SECONDS = int(os.environ.get('CHANGE_STREAM_MAX_SECONDS', 300))
+    # Open streams allowed per worker; keep below the worker's thread count
+    CHANGE_STREAM_MAX_SUBSCRIBERS = int(os.environ.get('CHANGE_STREAM_MAX_SUBSCRIBERS', 24))
+    # Changes queued for one slow client before it is told to reload instead
+    CHANGE_STREAM_MAX_PENDING = int(os.environ.get('CHANGE_STREAM_MAX_PENDING', 1000))
+    # Missed events replayed on reconnect; further behind than this the client reloads
+    CHANGE_STREAM_REPLAY_LIMIT = int(os.environ.get('CHANGE_STREAM_REPLAY_LIMIT', 500))
+    CHANGE_STREAM_RETENTION_HOURS = int(os.environ.get('CHANGE_STREAM_RETENTION_HOURS', 24))
+    CHANGE_STREAM_PURGE_INTERVAL_MINUTES = int(os.environ.get('CHANGE_STREAM_PURGE_INTERVAL_MINUTES', 60))
+
     # SMS configuration
     TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID', '')
     TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN', '')
@@ -0,0 +1,23 @@
+# Gunicorn loads this file automatically from the working directory
+import os
+from prometheus_client import multiprocess
+
+# Threaded workers, so open /events streams do not block other requests
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+
+def pre_fork(server, worker):
+    """With --preload the master ran create_app(); stop what its workers cannot inherit"""
+    if server.cfg.preload_app:
+        from app import before_fork
+        before_fork()
+
+def post_fork(server, worker):
+    """Give each worker of a preloaded master its own connections and scheduler"""
+    if server.cfg.preload_app:
+        from app import after_fork
+        after_fork()
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the aggregated /metrics output"""
+    multiprocess.mark_process_dead(worker.pid)
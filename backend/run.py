@@ -1,8 +1,8 @@
-from app import app
+from app import create_app
 import logging
 import os
 from datetime import datetime
-from app.scheduler import init_scheduler, verify_scheduler_settings
+from app.scheduler import verify_scheduler_settings
 
 # Configure logging
 def setup_run_logging():
@@ -23,14 +23,13 @@ def setup_run_logging():
 
 logger = setup_run_logging()
 
+# Create tables, warm the settings cache and start the scheduler once for this process
+app = create_app()
+
 def initialize_scheduler():
-    """Initialize the scheduler and verify settings"""
+    """Verify the scheduler started by create_app()"""
     with app.app_context():
         try:
-            logger.info("Initializing scheduler...")
-            init_scheduler()
-            logger.info("Scheduler initialized successfully")
-            
             # Verify scheduler settings
             logger.info("Verifying scheduler settings...")
             verify_scheduler_settings()
@@ -39,8 +38,9 @@ def initialize_scheduler():
             logger.error(f"Failed to initialize scheduler: {e}")
             raise
 
-# Initialize scheduler when the app starts
-initialize_scheduler()
+# Verify the scheduler when the app starts
+if app.config.get('START_SCHEDULER', True):
+    initialize_scheduler()
 
 # Drop all tables and recreate them on startup
 # with app.app_context():
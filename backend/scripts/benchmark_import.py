@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script to measure how long it takes to import the app and to run its startup work.
+Usage: python scripts/benchmark_import.py [runs]
+
+Each run happens in a fresh interpreter, the way a gunicorn worker (or the
+master with --preload) boots. DATABASE_URL defaults to a throwaway SQLite file.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time
+started = time.perf_counter()
+import app as package
+imported = time.perf_counter()
+if hasattr(package, 'create_app'):
+    package.create_app()
+finished = time.perf_counter()
+print(f'{(imported - started) * 1000:.1f} {(finished - imported) * 1000:.1f}')
+"""
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    import_ms, startup_ms = result.stdout.strip().splitlines()[-1].split()
+    return float(import_ms), float(startup_ms)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    workdir = tempfile.mkdtemp(prefix='benchmark_import_')
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(workdir, 'benchmark.db'))
+    env.setdefault('LOG_FILE', os.path.join(workdir, 'app.log'))
+
+    # Warm-up run creates the schema and byte-compiles the modules
+    run_once(env)
+    samples = [run_once(env) for _ in range(runs)]
+
+    for label, values in (
+        ('import app', [s[0] for s in samples]),
+        ('create_app()', [s[1] for s in samples]),
+        ('total', [s[0] + s[1] for s in samples])
+    ):
+        print(f'{label:<14} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms   max {max(values):8.1f} ms')
+
+if __name__ == '__main__':
+    main()
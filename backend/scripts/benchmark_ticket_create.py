@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script to measure how many tickets POST /tickets creates per second on one worker.
+Usage: python scripts/benchmark_ticket_create.py [tickets]
+
+Requests go through the Flask test client, so the figure covers routing, the
+database transaction and serialization but not the network or a WSGI server.
+Emails are switched off. DATABASE_URL defaults to a throwaway SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+workdir = tempfile.mkdtemp(prefix='benchmark_ticket_create_')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(workdir, 'benchmark.db'))
+os.environ.setdefault('LOG_FILE', os.path.join(workdir, 'app.log'))
+os.environ['ENABLE_EMAIL_NOTIFICATIONS'] = 'false'
+
+def main():
+    from app import app, db
+    from app.models import User, Property, PropertyManager
+
+    tickets = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    app.config['ENABLE_EMAIL_NOTIFICATIONS'] = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        prop = Property(name='Benchmark', hotel_code='BMK', address='1 Test Rd')
+        admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        engineer = User(username='engineer', email='engineer@example.com', password='secret', role='manager', group='Engineering')
+        db.session.add_all([prop, admin, engineer])
+        db.session.flush()
+        db.session.add(PropertyManager(property_id=prop.property_id, user_id=engineer.user_id))
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        body = {'title': 'Leaking pipe', 'description': 'Bathroom', 'priority': 'High',
+                'category': 'Maintenance', 'property_id': prop.property_id}
+
+    client = app.test_client()
+    # Warm-up request fills the identity and routing caches
+    client.post('/tickets', headers=headers, json=body)
+
+    started = time.perf_counter()
+    for _ in range(tickets):
+        response = client.post('/tickets', headers=headers, json=body)
+        if response.status_code != 201:
+            sys.exit(f'POST /tickets returned {response.status_code}: {response.get_data(as_text=True)}')
+    elapsed = time.perf_counter() - started
+
+    print(f'{tickets} tickets in {elapsed:.2f} s   {tickets / elapsed:8.1f} tickets/s   {elapsed / tickets * 1000:.2f} ms/ticket')
+
+if __name__ == '__main__':
+    main()
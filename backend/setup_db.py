@@ -3,8 +3,9 @@ from app.models import (
     User, Property, Ticket, Task, TaskAssignment, Room, PropertyManager, 
     EmailSettings, TicketAttachment, UserProperty, SMSSettings, ServiceRequest, 
     History, AttachmentSettings, GeneralSettings, SecuritySettings, 
-    Checklist, ChecklistItem, ChecklistCompletion
+    Checklist, ChecklistItem, ChecklistCompletion, WorkerLeaderboard, SlaSyncState
 )
+from app.services.leaderboard_service import LeaderboardService
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
 from sqlalchemy import text, inspect
@@ -218,6 +219,22 @@ def initialize_data():
         db.session.rollback()
         raise
 
+def create_missing_indexes():
+    """Create model indexes that tables created before them do not have yet; returns their names"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                print(f"Creating index {index.name} on {table.name}")
+                index.create(db.engine)
+                created.append(index.name)
+    return created
+
 def setup_database():
     """Main function to set up or update the database"""
     print("Starting database setup process...")
@@ -247,7 +264,8 @@ def setup_database():
                 SecuritySettings.__tablename__: SecuritySettings,
                 Checklist.__tablename__: Checklist,
                 ChecklistItem.__tablename__: ChecklistItem,
-                ChecklistCompletion.__tablename__: ChecklistCompletion
+                ChecklistCompletion.__tablename__: ChecklistCompletion,
+                SlaSyncState.__tablename__: SlaSyncState
             }
             
             inspector = inspect(db.engine)
@@ -279,8 +297,24 @@ def setup_database():
                                 ALTER TABLE {table_name}
                                 ADD COLUMN {quoted_col_name} {col_type} {nullable} {default}
                             """))
+
+                    # Columns that became optional, e.g. task_assignments.assigned_to_user_id
+                    if db.engine.dialect.name == 'postgresql':
+                        for existing in inspector.get_columns(table_name):
+                            column = model.__table__.columns.get(existing['name'])
+                            if column is not None and column.nullable and not column.primary_key and not existing['nullable']:
+                                print(f"Dropping NOT NULL on {table_name}.{existing['name']}")
+                                db.session.execute(text(f'ALTER TABLE {table_name} ALTER COLUMN "{existing["name"]}" DROP NOT NULL'))
             
             db.session.commit()
+
+            # create_all() and the column checks above leave existing tables without newer indexes
+            create_missing_indexes()
+
+            # Leaderboard buckets are maintained on completion; seed them from tasks completed before that
+            if WorkerLeaderboard.query.first() is None and Task.query.filter(db.func.lower(Task.status) == 'completed').first():
+                scored, buckets = LeaderboardService().backfill()
+                print(f"Backfilled worker leaderboard: {scored} tasks scored, {buckets} buckets.")
             
             # Initialize admin user if needed
             if User.query.count() == 0:
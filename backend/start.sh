@@ -10,5 +10,10 @@ export FLASK_ENV=development
 # Drop and recreate tables
 python3 setup_db.py
 
+# Shared directory for per-worker Prometheus samples, cleared on every start
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Start gunicorn
 gunicorn --bind 0.0.0.0:5000 run:app --reload 
\ No newline at end of file
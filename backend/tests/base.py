@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+
+# The tests drop every table, so they always run against a throwaway SQLite file
+# whatever DATABASE_URL the environment points at
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'ticketing_test.db')
+os.environ.pop('REPLICA_DATABASE_URL', None)
+
+from app import app, db
+
+def check_throwaway_database():
+    """Refuse to go on unless every engine the app can reach is SQLite"""
+    for bind_key, engine in db.engines.items():
+        if engine.url.get_backend_name() != 'sqlite':
+            raise RuntimeError(f'Refusing to run tests against {engine.url!r} (bind {bind_key!r}); tests need SQLite')
+
+class DatabaseTestCase(unittest.TestCase):
+    """A test with an app context and empty tables, dropped again afterwards"""
+
+    def setUp(self):
+        self.app_context = app.app_context()
+        self.app_context.push()
+        check_throwaway_database()
+        db.drop_all()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
@@ -0,0 +1,2 @@
+# Imported before any test module so even tests that skip the shared base never see the real DATABASE_URL
+import base  # noqa: F401
@@ -0,0 +1,67 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, Room, UserProperty, PropertyManager
+from app.services.identity_cache import identity_cache, get_cached_user
+from app.services.access_scope import get_access_scope
+
+class TestAccessScope(DatabaseTestCase):
+    def setUp(self):
+        """Set up two properties, a manager of the first and a user assigned to the second"""
+        super().setUp()
+        identity_cache.invalidate()
+
+        self.first = Property(name='First Hotel', hotel_code='AS1')
+        self.second = Property(name='Second Hotel', hotel_code='AS2')
+        self.manager = User(username='scope_manager', email='m@test.com', password='secret', role='manager')
+        self.staff = User(username='scope_user', email='u@test.com', password='secret', role='user')
+        self.gm = User(username='scope_gm', email='gm@test.com', password='secret', role='general_manager')
+        db.session.add_all([self.first, self.second, self.manager, self.staff, self.gm])
+        db.session.commit()
+        db.session.add_all([
+            PropertyManager(user_id=self.manager.user_id, property_id=self.first.property_id),
+            PropertyManager(user_id=self.gm.user_id, property_id=self.second.property_id),
+            UserProperty(user_id=self.staff.user_id, property_id=self.second.property_id),
+            Room(name='101', property_id=self.first.property_id),
+            Room(name='201', property_id=self.second.property_id)
+        ])
+        db.session.commit()
+
+    def scope_for(self, user):
+        return get_access_scope(get_cached_user(user.user_id))
+
+    def test_role_scopes(self):
+        """Managers use managed properties, users assigned ones, general managers read everything"""
+        manager_scope = self.scope_for(self.manager)
+        self.assertTrue(manager_scope.can_access(self.first.property_id))
+        self.assertFalse(manager_scope.can_access(self.second.property_id))
+
+        staff_scope = self.scope_for(self.staff)
+        self.assertEqual(staff_scope.property_ids, {self.second.property_id})
+        self.assertTrue(staff_scope.can_write(self.second.property_id))
+
+        gm_scope = self.scope_for(self.gm)
+        self.assertTrue(gm_scope.unrestricted)
+        self.assertTrue(gm_scope.can_access(self.first.property_id))
+        self.assertFalse(gm_scope.can_write(self.first.property_id))
+        self.assertTrue(gm_scope.can_write(self.second.property_id))
+
+    def test_filter_clause(self):
+        """The SQL clause returns the same rows as the in-memory check"""
+        rooms = Room.query.filter(self.scope_for(self.manager).filter_clause(Room.property_id)).all()
+        self.assertEqual([room.name for room in rooms], ['101'])
+        self.assertEqual(Room.query.filter(self.scope_for(self.gm).filter_clause(Room.property_id)).count(), 2)
+
+    def test_scope_reused_until_invalidated(self):
+        """The scope is computed once per cached identity and rebuilt after membership changes"""
+        scope = self.scope_for(self.staff)
+        self.assertIs(self.scope_for(self.staff), scope)
+
+        db.session.add(UserProperty(user_id=self.staff.user_id, property_id=self.first.property_id))
+        db.session.commit()
+        self.assertTrue(self.scope_for(self.staff).can_access(self.first.property_id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from base import check_throwaway_database
+
+from sqlalchemy import inspect
+import app as app_package
+from app import app, db, create_app, before_fork, after_fork
+from app.models import EmailSettings
+
+class TestAppFactory(unittest.TestCase):
+    def setUp(self):
+        """Start from an empty database and a process that has not run startup work"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        check_throwaway_database()
+        db.drop_all()
+        self.start_scheduler = app.config.get('START_SCHEDULER')
+        app.config['START_SCHEDULER'] = False
+        app.extensions.pop('startup_complete', None)
+
+    def tearDown(self):
+        app.config['START_SCHEDULER'] = self.start_scheduler
+        app.extensions.pop('startup_complete', None)
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        self.app_context.pop()
+
+    def test_import_does_no_startup_work(self):
+        """Importing the package leaves the schema and the scheduler alone"""
+        from app import scheduler
+        self.assertIsNone(scheduler.scheduler)
+        self.assertNotIn('email_settings', inspect(db.engine).get_table_names())
+
+    def test_create_app_creates_schema_and_default_settings(self):
+        """create_app builds the tables and the default email settings once"""
+        self.assertIs(create_app(), app)
+        self.assertIn('email_settings', inspect(db.engine).get_table_names())
+        self.assertEqual(EmailSettings.query.count(), 1)
+
+        db.session.query(EmailSettings).delete()
+        db.session.commit()
+        create_app()
+        self.assertEqual(EmailSettings.query.count(), 0)
+
+    def test_schema_creation_can_be_disabled(self):
+        """AUTO_CREATE_SCHEMA=False leaves the schema to migrations"""
+        app.config['AUTO_CREATE_SCHEMA'] = False
+        try:
+            create_app()
+        finally:
+            app.config['AUTO_CREATE_SCHEMA'] = True
+        self.assertNotIn('email_settings', inspect(db.engine).get_table_names())
+        self.assertTrue(app_package.app.extensions['startup_complete'])
+
+    def test_fork_hooks_move_the_scheduler_to_the_worker(self):
+        """A preloaded master stops its scheduler and pool before forking; the worker starts its own"""
+        from app import scheduler
+        app.config['START_SCHEDULER'] = True
+        create_app()
+        master_scheduler = scheduler.scheduler
+        self.assertTrue(master_scheduler.running)
+        try:
+            before_fork()
+            self.assertIsNone(scheduler.scheduler)
+            self.assertFalse(master_scheduler.running)
+            self.assertEqual(db.engine.pool.checkedin(), 0)
+
+            after_fork()
+            self.assertTrue(scheduler.scheduler.running)
+            self.assertIsNot(scheduler.scheduler, master_scheduler)
+        finally:
+            scheduler.shutdown_scheduler()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, PropertyManager, Ticket, Task, TaskAssignment, History
+
+class TestBulkCreate(DatabaseTestCase):
+    def setUp(self):
+        """A property with an engineering and an executive manager, and a super admin client"""
+        super().setUp()
+
+        self.property = Property(name='Lakeside', hotel_code='LKS', address='1 Lake Rd')
+        self.engineer = User(username='engineer', email='engineer@example.com', password='secret', role='manager', group='Engineering')
+        self.executive = User(username='executive', email='executive@example.com', password='secret', role='manager', group='Executive')
+        admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        db.session.add_all([self.property, self.engineer, self.executive, admin])
+        db.session.flush()
+        db.session.add_all([
+            PropertyManager(property_id=self.property.property_id, user_id=self.engineer.user_id),
+            PropertyManager(property_id=self.property.property_id, user_id=self.executive.user_id)
+        ])
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        self.client = app.test_client()
+
+    def _ticket(self, title, category):
+        return {'title': title, 'description': 'Imported', 'priority': 'High', 'category': category, 'property_id': self.property.property_id}
+
+    def test_tickets_are_routed_per_category(self):
+        """Each ticket gets a task for its category's manager, or the executive as a fallback"""
+        response = self.client.post('/tickets/bulk?notify=none', headers=self.headers, json=[
+            self._ticket('Leaking pipe', 'Maintenance'),
+            self._ticket('Printer jam', 'IT'),
+            self._ticket('Nowhere', 'IT') | {'property_id': 999}
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json['created'], response.json['tasks_created']), (2, 2))
+        self.assertEqual(response.json['errors'], [{'row': 3, 'error': 'Property 999 not found or not accessible'}])
+
+        assignees = {
+            assignment.ticket.title: assignment.assigned_to_user_id for assignment in TaskAssignment.query.all()
+        }
+        self.assertEqual(assignees, {'Leaking pipe': self.engineer.user_id, 'Printer jam': self.executive.user_id})
+        self.assertEqual(History.query.filter_by(entity_type='ticket', action='created').count(), 2)
+        self.assertEqual(History.query.filter_by(entity_type='task', action='assigned').count(), 2)
+
+    def test_tasks_from_csv(self):
+        """Tasks can be uploaded as CSV, with invalid rows reported by line number"""
+        csv_body = (
+            'title,description,priority,property_id,assigned_to_id,due_date\n'
+            f'Paint hallway,Second floor,Low,{self.property.property_id},{self.engineer.user_id},2026-11-02T09:00:00Z\n'
+            f'Broken,Lift,Low,{self.property.property_id},not-a-user,\n'
+        )
+        response = self.client.post(
+            '/tasks/bulk?notify=none', headers=self.headers,
+            data={'file': (io.BytesIO(csv_body.encode('utf-8')), 'tasks.csv')}, content_type='multipart/form-data'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['created'], 1)
+        self.assertEqual(response.json['errors'], [{'row': 3, 'error': 'assigned_to_id must be a number'}])
+
+        task = db.session.get(Task, response.json['task_ids'][0])
+        self.assertEqual((task.title, task.assigned_to_id, task.due_date.hour), ('Paint hallway', self.engineer.user_id, 9))
+
+    def test_rejects_bad_requests(self):
+        """Non-array bodies, unknown notify modes and non-managers are refused"""
+        self.assertEqual(self.client.post('/tickets/bulk', headers=self.headers, json={'title': 'x'}).status_code, 400)
+        self.assertEqual(self.client.post('/tickets/bulk?notify=sms', headers=self.headers, json=[]).status_code, 400)
+
+        worker = User(username='worker', email='worker@example.com', password='secret')
+        db.session.add(worker)
+        db.session.commit()
+        response = self.client.post('/tickets/bulk', headers={'Authorization': f'Bearer {worker.get_token()}'}, json=[])
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Ticket.query.count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
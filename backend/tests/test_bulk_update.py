@@ -0,0 +1,149 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, UserProperty, Room, Ticket, Task, TaskAssignment, History, WorkerLeaderboard
+
+class TestBulkUpdate(DatabaseTestCase):
+    def setUp(self):
+        """Three tickets, each with a linked task; the first ticket holds a room"""
+        super().setUp()
+
+        self.property = Property(name='Summit', hotel_code='SMT', address='1 Peak Rd')
+        self.admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        self.worker = User(username='worker', email='worker@example.com', password='secret')
+        self.other = User(username='other', email='other@example.com', password='secret')
+        db.session.add_all([self.property, self.admin, self.worker, self.other])
+        db.session.flush()
+        self.room = Room(name='301', property_id=self.property.property_id, status='Maintenance')
+        db.session.add_all([self.room] + [
+            UserProperty(user_id=user.user_id, property_id=self.property.property_id) for user in (self.worker, self.other)
+        ])
+        db.session.flush()
+
+        self.tickets = []
+        self.tasks = []
+        for number in range(3):
+            ticket = Ticket(
+                title=f'Ticket {number}', description='d', priority='Low', status='open',
+                user_id=self.admin.user_id, property_id=self.property.property_id,
+                room_id=self.room.room_id if number == 0 else None
+            )
+            task = Task(title=f'Task {number}', priority='Low', property_id=self.property.property_id, assigned_to_id=self.worker.user_id)
+            db.session.add_all([ticket, task])
+            db.session.flush()
+            db.session.add(TaskAssignment(task_id=task.task_id, ticket_id=ticket.ticket_id, assigned_to_user_id=self.worker.user_id))
+            self.tickets.append(ticket)
+            self.tasks.append(task)
+        db.session.commit()
+
+        self.headers = {'Authorization': f'Bearer {self.admin.get_token()}'}
+        self.client = app.test_client()
+
+    def test_task_moves_sync_tickets(self):
+        """Completing tasks completes their tickets and assignments and credits the leaderboard"""
+        response = self.client.patch('/tasks/bulk?notify=none', headers=self.headers, json=[
+            {'task_id': self.tasks[0].task_id, 'status': 'completed'},
+            {'task_id': self.tasks[1].task_id, 'status': 'in progress', 'priority': 'High'},
+            {'task_id': 999, 'status': 'completed'}
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['updated'], 2)
+        self.assertEqual(response.json['errors'], [{'row': 3, 'error': 'Task 999 not found'}])
+
+        db.session.expire_all()
+        self.assertEqual([t.status for t in self.tickets], ['completed', 'in progress', 'open'])
+        self.assertEqual(self.tickets[1].priority, 'High')
+        self.assertEqual(TaskAssignment.query.filter_by(status='completed').count(), 1)
+        self.assertIsNotNone(self.tasks[0].completed_at)
+        self.assertEqual(WorkerLeaderboard.query.one().tasks_completed, 1)
+        self.assertEqual(History.query.filter_by(action='completed').count(), 2)
+
+    def test_ticket_moves_sync_tasks_and_rooms(self):
+        """Completing tickets completes their tasks and frees rooms no other open ticket holds"""
+        response = self.client.patch('/tickets/bulk?notify=none', headers=self.headers, json=[
+            {'ticket_id': self.tickets[0].ticket_id, 'status': 'completed'},
+            {'ticket_id': self.tickets[2].ticket_id, 'assigned_to_id': self.other.user_id}
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['ticket_ids'], [self.tickets[0].ticket_id, self.tickets[2].ticket_id])
+
+        db.session.expire_all()
+        self.assertEqual(self.tasks[0].status, 'completed')
+        self.assertEqual(self.room.status, 'Available')
+        self.assertEqual(self.tasks[2].assigned_to_id, self.other.user_id)
+        assignment = TaskAssignment.query.filter_by(task_id=self.tasks[2].task_id).one()
+        self.assertEqual(assignment.assigned_to_user_id, self.other.user_id)
+
+    def test_workers_only_move_their_own_tasks(self):
+        """Without a managing role only tasks assigned to the caller can be changed"""
+        self.tasks[1].assigned_to_id = self.other.user_id
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {self.worker.get_token()}'}
+        response = self.client.patch('/tasks/bulk?notify=none', headers=headers, json=[
+            {'task_id': self.tasks[0].task_id, 'status': 'in progress'},
+            {'task_id': self.tasks[1].task_id, 'status': 'in progress'}
+        ])
+        self.assertEqual(response.json['task_ids'], [self.tasks[0].task_id])
+        self.assertEqual(response.json['errors'], [{'row': 2, 'error': f'Unauthorized for task {self.tasks[1].task_id}'}])
+
+    def test_unassign_clears_ticket_assignment(self):
+        """Unassigning a task also clears the assignee on its ticket assignment"""
+        response = self.client.patch('/tasks/bulk?notify=none', headers=self.headers, json=[
+            {'task_id': self.tasks[0].task_id, 'assigned_to_id': None}
+        ])
+        self.assertEqual(response.json['task_ids'], [self.tasks[0].task_id])
+
+        db.session.expire_all()
+        self.assertIsNone(self.tasks[0].assigned_to_id)
+        self.assertIsNone(TaskAssignment.query.filter_by(task_id=self.tasks[0].task_id).one().assigned_to_user_id)
+
+    def test_assignees_need_access_and_a_manager(self):
+        """Managers only assign to users of the item's property; workers cannot hand their tasks on"""
+        outsider = User(username='outsider', email='outsider@example.com', password='secret')
+        db.session.add(outsider)
+        db.session.commit()
+        response = self.client.patch('/tasks/bulk?notify=none', headers=self.headers, json=[
+            {'task_id': self.tasks[0].task_id, 'assigned_to_id': outsider.user_id}
+        ])
+        self.assertEqual(response.json['errors'], [
+            {'row': 1, 'error': f'User {outsider.user_id} has no access to property {self.property.property_id}'}
+        ])
+
+        headers = {'Authorization': f'Bearer {self.worker.get_token()}'}
+        response = self.client.patch('/tasks/bulk?notify=none', headers=headers, json=[
+            {'task_id': self.tasks[0].task_id, 'assigned_to_id': self.other.user_id}
+        ])
+        self.assertEqual(response.json['errors'], [{'row': 1, 'error': 'Only managers can change the assignee'}])
+        db.session.expire_all()
+        self.assertEqual(self.tasks[0].assigned_to_id, self.worker.user_id)
+
+    def test_ticket_version_moves_once_per_update(self):
+        """A task changing status and priority bumps its ticket's version once"""
+        version = self.tickets[1].version
+        self.client.patch('/tasks/bulk?notify=none', headers=self.headers, json=[
+            {'task_id': self.tasks[1].task_id, 'status': 'in progress', 'priority': 'High'}
+        ])
+        db.session.expire_all()
+        self.assertEqual((self.tickets[1].status, self.tickets[1].priority), ('in progress', 'High'))
+        self.assertEqual(self.tickets[1].version, version + 1)
+
+    def test_read_only_properties_are_not_writable(self):
+        """A general manager can read every property but only change the ones they manage"""
+        manager = User(username='gm', email='gm@example.com', password='secret', role='general_manager')
+        db.session.add(manager)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {manager.get_token()}'}
+
+        response = self.client.patch('/tickets/bulk?notify=none', headers=headers, json=[
+            {'ticket_id': self.tickets[0].ticket_id, 'status': 'completed'}
+        ])
+        self.assertEqual(response.json['errors'], [{'row': 1, 'error': f'Unauthorized for ticket {self.tickets[0].ticket_id}'}])
+        response = self.client.patch('/tasks/bulk?notify=none', headers=headers, json=[
+            {'task_id': self.tasks[0].task_id, 'status': 'completed'}
+        ])
+        self.assertEqual(response.json['errors'], [{'row': 1, 'error': f'Unauthorized for task {self.tasks[0].task_id}'}])
+
+if __name__ == '__main__':
+    unittest.main()
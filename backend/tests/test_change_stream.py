@@ -0,0 +1,131 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, PropertyManager, Room, Ticket, ChangeEvent
+from app.services.bulk_update import _update_grouped
+from app.services.change_stream import change_broker
+from app.services.room_import import RoomImporter
+
+class TestChangeStream(DatabaseTestCase):
+    def setUp(self):
+        """Two properties with a room each, watched by a super admin and a manager of the first"""
+        super().setUp()
+
+        self.admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        self.manager = User(username='manager', email='manager@example.com', password='secret', role='manager', group='Engineering')
+        self.harbor = Property(name='Harbor', hotel_code='HBR', address='1 Dock St')
+        self.hill = Property(name='Hill', hotel_code='HIL', address='2 Top Rd')
+        db.session.add_all([self.admin, self.manager, self.harbor, self.hill])
+        db.session.flush()
+        self.room = Room(name='101', property_id=self.harbor.property_id)
+        db.session.add_all([self.room, Room(name='201', property_id=self.hill.property_id),
+                            PropertyManager(property_id=self.harbor.property_id, user_id=self.manager.user_id)])
+        db.session.commit()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app.config['CHANGE_STREAM_MAX_SECONDS'] = 300
+        super().tearDown()
+
+    def _ticket(self, property_id, **fields):
+        ticket = Ticket(title='Leak', description='Sink', priority='Low', user_id=self.admin.user_id, property_id=property_id, **fields)
+        db.session.add(ticket)
+        return ticket
+
+    def _changes(self):
+        return [(e.entity_type, e.entity_id, e.action, e.version) for e in ChangeEvent.query.order_by(ChangeEvent.event_id)]
+
+    def test_one_event_per_row_and_transaction(self):
+        """Repeated flushes collapse into one event with the final version; rollbacks record nothing"""
+        ChangeEvent.query.delete()
+        db.session.commit()
+        ticket = self._ticket(self.harbor.property_id)
+        db.session.flush()
+        ticket.priority = 'High'
+        db.session.flush()
+        db.session.commit()
+        ticket.status = 'in progress'
+        db.session.flush()
+        ticket.priority = 'Low'
+        db.session.commit()
+        ticket.status = 'completed'
+        db.session.flush()
+        db.session.rollback()
+
+        self.assertEqual(self._changes(), [
+            ('ticket', ticket.ticket_id, 'created', 2),
+            ('ticket', ticket.ticket_id, 'updated', 4)
+        ])
+
+    def test_statement_updates_are_recorded(self):
+        """Bulk UPDATEs that bypass the flush still produce events for every row they touch"""
+        ticket = self._ticket(self.harbor.property_id)
+        db.session.commit()
+        ChangeEvent.query.delete()
+        db.session.commit()
+
+        _update_grouped(Ticket.ticket_id, {('status', 'in progress'): [ticket.ticket_id]})
+        db.session.commit()
+        self.assertEqual(self._changes(), [('ticket', ticket.ticket_id, 'updated', None)])
+
+    def test_table_statements_are_recorded(self):
+        """Inserts and updates written against a model's table, like room imports, produce events"""
+        ChangeEvent.query.delete()
+        db.session.commit()
+        room_id = self.room.room_id
+
+        RoomImporter(self.harbor.property_id).apply([(2, {'name': '101', 'status': 'Cleaning'}), (3, {'name': '102', 'status': 'Available'})])
+        new_room = Room.query.filter_by(name='102').one()
+        db.session.execute(Room.__table__.update().where(Room.__table__.c.room_id == room_id).values(floor=1))
+        db.session.commit()
+
+        self.assertEqual(sorted(self._changes()), [
+            ('room', room_id, 'updated', None),
+            ('room', room_id, 'updated', None),
+            ('room', new_room.room_id, 'created', None)
+        ])
+        self.assertEqual(ChangeEvent.query.filter_by(entity_id=new_room.room_id).one().property_id, self.harbor.property_id)
+
+    def test_broker_fans_out_by_property(self):
+        """A poll hands new events only to subscriptions for their property"""
+        harbor = change_broker.subscribe(self.harbor.property_id)
+        hill = change_broker.subscribe(self.hill.property_id)
+        try:
+            ticket = self._ticket(self.harbor.property_id)
+            db.session.commit()
+            change_broker.poll()
+            change = harbor.get(timeout=1)
+            self.assertEqual((change['entity_type'], change['entity_id'], change['action']), ('ticket', ticket.ticket_id, 'created'))
+            self.assertIsNone(hill.get(timeout=0))
+        finally:
+            change_broker.unsubscribe(harbor)
+            change_broker.unsubscribe(hill)
+
+    def test_stream_replays_from_last_event_id(self):
+        """Reconnecting with Last-Event-ID sends only the property's later events"""
+        app.config['CHANGE_STREAM_MAX_SECONDS'] = 0
+        seen = db.session.query(db.func.max(ChangeEvent.event_id)).scalar()
+        harbor_ticket = self._ticket(self.harbor.property_id)
+        self._ticket(self.hill.property_id)
+        db.session.commit()
+        ticket_id = harbor_ticket.ticket_id
+
+        response = self.client.get(f'/events?property_id={self.harbor.property_id}&jwt={self.manager.get_token()}',
+                                   headers={'Last-Event-ID': str(seen)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        body = response.get_data(as_text=True)
+        self.assertIn(f'"entity_id": {ticket_id}', body)
+        self.assertEqual(body.count('event: change'), 1)
+        self.assertEqual(change_broker.subscriber_count(), 0)
+
+    def test_stream_is_scoped_to_accessible_properties(self):
+        """Managers cannot watch properties they do not manage"""
+        response = self.client.get(f'/events?property_id={self.hill.property_id}',
+                                   headers={'Authorization': f'Bearer {self.manager.get_token()}'})
+        self.assertEqual(response.status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
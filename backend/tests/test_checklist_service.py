@@ -0,0 +1,121 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, UserProperty, Checklist, ChecklistInstance, Task, History, ChangeEvent
+from app.services.checklist_service import ChecklistService, period_bounds
+
+class TestChecklistService(DatabaseTestCase):
+    def setUp(self):
+        """Three properties (one inactive), a global daily checklist and a property weekly checklist"""
+        super().setUp()
+        self.create_tasks = app.config.get('CHECKLIST_CREATE_TASKS')
+
+        self.properties = [
+            Property(name='North', hotel_code='N1', address='1 North St'),
+            Property(name='South', hotel_code='S1', address='1 South St'),
+            Property(name='Closed', hotel_code='C1', address='1 Closed St', status='inactive')
+        ]
+        self.author = User(username='author', email='author@example.com', password='secret', role='manager')
+        db.session.add_all(self.properties + [self.author])
+        db.session.flush()
+
+        self.daily = Checklist(title='Opening rounds', checklist_type='daily', department='Front Desk', created_by_id=self.author.user_id)
+        self.weekly = Checklist(
+            title='Boiler check', checklist_type='weekly', department='Engineering',
+            property_id=self.properties[0].property_id, created_by_id=self.author.user_id
+        )
+        self.custom = Checklist(title='One off', checklist_type='custom', department='Management', created_by_id=self.author.user_id)
+        db.session.add_all([self.daily, self.weekly, self.custom])
+        db.session.commit()
+
+        # A Wednesday
+        self.now = datetime(2026, 10, 21, 9, 30)
+
+    def tearDown(self):
+        app.config['CHECKLIST_CREATE_TASKS'] = self.create_tasks
+        super().tearDown()
+
+    def test_period_bounds(self):
+        """Periods start on the day, the Monday and the first of the month"""
+        day = date(2026, 10, 21)
+        self.assertEqual(period_bounds('daily', day), (day, datetime(2026, 10, 22)))
+        self.assertEqual(period_bounds('weekly', day), (date(2026, 10, 19), datetime(2026, 10, 26)))
+        self.assertEqual(period_bounds('monthly', date(2026, 12, 31)), (date(2026, 12, 1), datetime(2027, 1, 1)))
+
+    def test_generation_is_idempotent(self):
+        """Each recurring checklist gets one instance per active property and period"""
+        result = ChecklistService().generate_instances(now=self.now)
+        self.assertEqual(result['created'], 3)
+
+        keys = {(i.checklist_id, i.property_id, i.period_start) for i in ChecklistInstance.query.all()}
+        self.assertEqual(keys, {
+            (self.daily.checklist_id, self.properties[0].property_id, date(2026, 10, 21)),
+            (self.daily.checklist_id, self.properties[1].property_id, date(2026, 10, 21)),
+            (self.weekly.checklist_id, self.properties[0].property_id, date(2026, 10, 19))
+        })
+
+        again = ChecklistService().generate_instances(now=self.now + timedelta(hours=1))
+        self.assertEqual(again['created'], 0)
+        self.assertEqual(ChecklistInstance.query.count(), 3)
+
+    def test_next_period_marks_missed(self):
+        """A new day creates new daily instances and marks yesterday's open ones missed"""
+        ChecklistService().generate_instances(now=self.now)
+        result = ChecklistService().generate_instances(now=self.now + timedelta(days=1))
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['missed'], 2)
+        self.assertEqual(ChecklistInstance.query.filter_by(status='open').count(), 3)
+
+    def test_optional_tasks(self):
+        """With CHECKLIST_CREATE_TASKS each instance gets a task due at the end of its period"""
+        app.config['CHECKLIST_CREATE_TASKS'] = True
+        result = ChecklistService().generate_instances(now=self.now)
+
+        self.assertEqual(result['tasks'], 3)
+        for instance in ChecklistInstance.query.all():
+            task = db.session.get(Task, instance.task_id)
+            self.assertEqual(task.property_id, instance.property_id)
+            self.assertEqual(task.due_date, instance.due_at)
+        self.assertEqual(ChangeEvent.query.filter_by(entity_type='task', action='created').count(), 3)
+        created = History.query.filter_by(entity_type='task', action='created').all()
+        self.assertEqual({(h.entity_id, h.user_id) for h in created},
+                         {(i.task_id, self.author.user_id) for i in ChecklistInstance.query.all()})
+
+    def test_missed_instances_cancel_their_tasks(self):
+        """Tasks of missed instances are cancelled, and no task exists without its instance"""
+        app.config['CHECKLIST_CREATE_TASKS'] = True
+        ChecklistService().generate_instances(now=self.now)
+        result = ChecklistService().generate_instances(now=self.now + timedelta(days=1))
+        self.assertEqual((result['created'], result['tasks'], result['missed']), (2, 2, 2))
+
+        self.assertEqual(Task.query.count(), ChecklistInstance.query.count())
+        for instance in ChecklistInstance.query.all():
+            task = db.session.get(Task, instance.task_id)
+            self.assertEqual(task.status, 'cancelled' if instance.status == 'missed' else 'pending')
+
+    def test_completion_records_task_history(self):
+        """Completing a checklist completes its instance's task and records it in the history"""
+        app.config['CHECKLIST_CREATE_TASKS'] = True
+        ChecklistService().generate_instances(now=self.now)
+        db.session.add(UserProperty(user_id=self.author.user_id, property_id=self.properties[0].property_id))
+        db.session.commit()
+
+        response = app.test_client().post(f'/api/checklists/{self.weekly.checklist_id}/complete', json={},
+                                          headers={'Authorization': f'Bearer {self.author.get_token()}'})
+        self.assertEqual(response.status_code, 201)
+
+        task_id = ChecklistInstance.query.filter_by(checklist_id=self.weekly.checklist_id).one().task_id
+        self.assertEqual(db.session.get(Task, task_id).status, 'completed')
+        history = History.query.filter_by(entity_type='task', entity_id=task_id).order_by(History.history_id).all()
+        self.assertEqual([(h.action, h.new_value, h.user_id) for h in history], [
+            ('created', None, self.author.user_id),
+            ('updated', 'completed', self.author.user_id),
+            ('completed', None, self.author.user_id)
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
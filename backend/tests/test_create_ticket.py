@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, PropertyManager, Room, Ticket, Task, TaskAssignment, History
+from app.services.ticket_routing import routing_cache
+
+class TestCreateTicket(DatabaseTestCase):
+    def setUp(self):
+        """A property with an engineering manager, a room and a super admin client"""
+        super().setUp()
+        routing_cache.invalidate()
+
+        self.property = Property(name='Harbor', hotel_code='HBR', address='1 Dock St')
+        self.engineer = User(username='engineer', email='engineer@example.com', password='secret', role='manager', group='Engineering')
+        admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        db.session.add_all([self.property, self.engineer, admin])
+        db.session.flush()
+        self.room = Room(name='101', property_id=self.property.property_id)
+        db.session.add_all([self.room, PropertyManager(property_id=self.property.property_id, user_id=self.engineer.user_id)])
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        self.client = app.test_client()
+
+        notifier = patch('app.routes.notify_ticket_created_async')
+        self.notify = notifier.start()
+        self.addCleanup(notifier.stop)
+
+    def _create(self, category, **extra):
+        body = {'title': 'Leaking pipe', 'description': 'Bathroom', 'priority': 'High',
+                'category': category, 'property_id': self.property.property_id}
+        return self.client.post('/tickets', headers=self.headers, json=body | extra)
+
+    def test_routes_to_group_manager_in_one_transaction(self):
+        """The ticket, its task, assignment and history commit together, then notifications are queued"""
+        response = self._create('Maintenance', room_id=self.room.room_id)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['assigned_to']['user_id'], self.engineer.user_id)
+
+        ticket_id = response.json['ticket']['ticket_id']
+        task = Task.query.one()
+        self.assertEqual(task.title, f'Task for Ticket #{ticket_id}: Leaking pipe')
+        self.assertEqual(TaskAssignment.query.one().ticket_id, ticket_id)
+        self.assertEqual(History.query.count(), 3)
+        self.assertEqual(db.session.get(Room, self.room.room_id).status, 'Maintenance')
+        self.notify.assert_called_once_with(ticket_id, task.task_id)
+
+    def test_ticket_without_manager(self):
+        """With nobody to route to, the ticket is still created, without a task"""
+        response = self._create('IT')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('task_created', response.json)
+        self.assertEqual((Ticket.query.count(), Task.query.count(), History.query.count()), (1, 0, 1))
+        self.notify.assert_called_once_with(response.json['ticket']['ticket_id'], None)
+
+    def test_new_manager_invalidates_routing(self):
+        """Adding a manager to the property is picked up by the next ticket"""
+        self.assertNotIn('task_created', self._create('IT').json)
+        it = User(username='it', email='it@example.com', password='secret', role='manager', group='IT')
+        db.session.add(it)
+        db.session.flush()
+        db.session.add(PropertyManager(property_id=self.property.property_id, user_id=it.user_id))
+        db.session.commit()
+        self.assertEqual(self._create('IT').json['assigned_to']['user_id'], it.user_id)
+
+    def test_failed_transaction_sends_nothing(self):
+        """Notifications queued by a rolled back ticket are dropped"""
+        with patch('app.routes.History.build', side_effect=RuntimeError('boom')):
+            response = self._create('Maintenance')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(Ticket.query.count(), 0)
+        self.notify.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from datetime import datetime, timezone
+import pytz
+from apscheduler.schedulers.background import BackgroundScheduler
+from app import app, db
+from app import scheduler as report_scheduler
+from app.models import User, Property, UserProperty, Ticket, Task
+from app.scheduler import plan_daily_reports, schedule_daily_reports, get_daily_report_jobs, local_day_bounds, get_daily_property_report
+from app.services.leaderboard_service import LeaderboardService
+
+class TestDailyReportSchedule(DatabaseTestCase):
+    def setUp(self):
+        """Two executives, one with properties in two timezones, and a scheduler that is not started"""
+        super().setUp()
+
+        self.chicago = Property(name='Chicago', hotel_code='CHI', address='1 Lake St', timezone='America/Chicago')
+        self.denver = Property(name='Denver', hotel_code='DEN', address='1 Peak St', timezone='America/Denver')
+        self.default = Property(name='Default', hotel_code='DEF', address='1 Main St')
+        self.first = User(username='exec1', email='exec1@example.com', password='secret', group='Executive')
+        self.second = User(username='exec2', email='exec2@example.com', password='secret', group='Executive')
+        self.worker = User(username='worker', email='worker@example.com', password='secret')
+        db.session.add_all([self.chicago, self.denver, self.default, self.first, self.second, self.worker])
+        db.session.flush()
+        db.session.add_all([
+            UserProperty(user_id=self.first.user_id, property_id=self.chicago.property_id),
+            UserProperty(user_id=self.first.user_id, property_id=self.denver.property_id),
+            UserProperty(user_id=self.second.user_id, property_id=self.default.property_id),
+            UserProperty(user_id=self.worker.user_id, property_id=self.default.property_id)
+        ])
+        db.session.commit()
+
+        self.previous_scheduler = report_scheduler.scheduler
+        report_scheduler.scheduler = BackgroundScheduler(timezone=pytz.timezone('America/New_York'))
+
+    def tearDown(self):
+        report_scheduler.scheduler = self.previous_scheduler
+        super().tearDown()
+
+    def test_plan_per_executive_and_timezone(self):
+        """Each executive gets one job per local timezone, offset within the spread window"""
+        plan = plan_daily_reports(hour=18, minute=0, timezone='America/New_York')
+        groups = {(entry['user_id'], entry['timezone']): entry for entry in plan}
+
+        self.assertEqual(set(groups), {
+            (self.first.user_id, 'America/Chicago'),
+            (self.first.user_id, 'America/Denver'),
+            (self.second.user_id, 'America/New_York')
+        })
+        self.assertEqual(groups[(self.second.user_id, 'America/New_York')]['property_ids'], [self.default.property_id])
+
+        spread = app.config['DAILY_REPORT_SPREAD_MINUTES'] * 60
+        for entry in plan:
+            offset = entry['hour'] * 3600 + entry['minute'] * 60 + entry['second'] - 18 * 3600
+            self.assertTrue(0 <= offset < spread)
+
+        self.assertEqual(plan, plan_daily_reports(hour=18, minute=0, timezone='America/New_York'))
+
+    def test_schedule_is_incremental(self):
+        """Re-planning keeps unchanged jobs and drops executives who no longer qualify"""
+        schedule_daily_reports(hour=18, minute=0, timezone='America/New_York')
+        jobs = {job.id: job for job in get_daily_report_jobs()}
+        self.assertEqual(len(jobs), 3)
+        chicago_job = jobs[f'daily_report:{self.first.user_id}:America/Chicago']
+        self.assertEqual(str(chicago_job.trigger.timezone), 'America/Chicago')
+
+        schedule_daily_reports(hour=18, minute=0, timezone='America/New_York')
+        self.assertIs(report_scheduler.scheduler.get_job(chicago_job.id), chicago_job)
+
+        self.second.is_active = False
+        db.session.commit()
+        schedule_daily_reports(hour=18, minute=0, timezone='America/New_York')
+        self.assertEqual(len(get_daily_report_jobs()), 2)
+
+    def test_report_day_is_local(self):
+        """18:00 in Tokyo is 09:00 UTC, so the report covers the Tokyo day, not the UTC one"""
+        start, end, day = local_day_bounds('Asia/Tokyo', now=datetime(2026, 3, 10, 9, 0, tzinfo=timezone.utc))
+        self.assertEqual((start, end, str(day)), (datetime(2026, 3, 9, 15), datetime(2026, 3, 10, 15), '2026-03-10'))
+        start, end, day = local_day_bounds('America/Los_Angeles', now=datetime(2026, 3, 11, 1, 0, tzinfo=timezone.utc))
+        self.assertEqual((start, end, str(day)), (datetime(2026, 3, 10, 7), datetime(2026, 3, 11, 7), '2026-03-10'))
+
+        now = datetime.now(timezone.utc)
+        start, end, _ = local_day_bounds('Asia/Tokyo', now=now)
+        pid, uid = self.default.property_id, self.worker.user_id
+        inside, before = start + (end - start) / 2, start.replace(microsecond=0) - (end - start) / 24
+        db.session.add_all([
+            Ticket(title='In', description='d', priority='Low', status='completed', user_id=uid, property_id=pid, updated_at=inside),
+            Ticket(title='Out', description='d', priority='Low', status='completed', user_id=uid, property_id=pid, updated_at=before),
+            Task(title='In', status='completed', property_id=pid, assigned_to_id=uid, completed_at=inside),
+            Task(title='Out', status='completed', property_id=pid, assigned_to_id=uid, completed_at=before)
+        ])
+        db.session.commit()
+        # Completion stamps the leaderboard hook's own time; put them back where the test needs them
+        db.session.execute(Task.__table__.update().where(Task.title == 'In').values(completed_at=inside, updated_at=inside))
+        db.session.execute(Task.__table__.update().where(Task.title == 'Out').values(completed_at=before, updated_at=before))
+        db.session.execute(Ticket.__table__.update().where(Ticket.title == 'Out').values(updated_at=before))
+        db.session.execute(Ticket.__table__.update().where(Ticket.title == 'In').values(updated_at=inside))
+        db.session.commit()
+
+        report = get_daily_property_report(pid, 'Asia/Tokyo')
+        self.assertEqual([t['title'] for t in report['closed_tickets_today']], ['In'])
+        self.assertEqual([t['title'] for t in report['closed_tasks_today']], ['In'])
+        top = LeaderboardService().top_workers_between(start, end, property_ids=[pid])
+        self.assertEqual([(w['user_id'], w['tasks_completed']) for w in top], [(uid, 1)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import unittest
+from datetime import datetime, timedelta
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, PropertyManager, Task, Ticket, DueNotification
+from app.services.due_date_engine import due_date_engine, run_due_date_tick, purge_due_notifications, TASK_REMINDER, TASK_OVERDUE
+
+class RecordingEmailService:
+    """Collects what would have been emailed"""
+
+    def __init__(self):
+        self.reminders = []
+        self.digests = []
+
+    def send_task_reminder(self, user, task, property_name):
+        self.reminders.append((user.username, task.task_id))
+        return True
+
+    def send_escalation_digest(self, user, overdue_tasks, follow_up_tickets):
+        self.digests.append((
+            user.username,
+            sorted(task.task_id for task in overdue_tasks),
+            sorted(ticket.ticket_id for ticket in follow_up_tickets)
+        ))
+        return True
+
+class FlakyEmailService(RecordingEmailService):
+    """Fails the first reminder it is asked to send"""
+
+    def send_task_reminder(self, user, task, property_name):
+        if not getattr(self, 'failed', False):
+            self.failed = True
+            raise RuntimeError('SMTP unavailable')
+        return super().send_task_reminder(user, task, property_name)
+
+class TestDueDateEngine(DatabaseTestCase):
+    def setUp(self):
+        """A property with a manager and a worker"""
+        super().setUp()
+        due_date_engine.reset()
+
+        self.property = Property(name='Harbor', hotel_code='HRB', address='1 Pier')
+        self.manager = User(username='manager', email='manager@example.com', password='secret', role='manager')
+        self.worker = User(username='worker', email='worker@example.com', password='secret')
+        db.session.add_all([self.property, self.manager, self.worker])
+        db.session.flush()
+        db.session.add(PropertyManager(property_id=self.property.property_id, user_id=self.manager.user_id))
+        db.session.commit()
+
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.email = RecordingEmailService()
+
+    def tearDown(self):
+        due_date_engine.reset()
+        super().tearDown()
+
+    def _task(self, title, due_in, status='pending'):
+        task = Task(
+            title=title, status=status, priority='High', property_id=self.property.property_id,
+            assigned_to_id=self.worker.user_id, due_date=self.now + due_in
+        )
+        db.session.add(task)
+        db.session.commit()
+        return task
+
+    def _tick(self, after):
+        return run_due_date_tick(now=self.now + after, email_service=self.email)
+
+    def test_window_holds_only_upcoming_events(self):
+        """Only events inside the horizon are loaded into the heap"""
+        self._task('soon', timedelta(hours=29))
+        self._task('later', timedelta(days=5))
+        self._tick(timedelta(0))
+        # The reminder for 'soon' fires in 5 hours; nothing else is inside the window
+        self.assertEqual(len(due_date_engine), 1)
+
+    def test_reminder_sent_once(self):
+        """The assignee is reminded once the lead time is reached, and only once"""
+        task = self._task('inspect boiler', timedelta(hours=23))
+        self._tick(timedelta(0))
+        self._tick(timedelta(minutes=1))
+        self.assertEqual(self.email.reminders, [('worker', task.task_id)])
+
+        # A process that restarts does not remind again
+        due_date_engine.reset()
+        self._tick(timedelta(minutes=2))
+        self.assertEqual(len(self.email.reminders), 1)
+        self.assertEqual(DueNotification.query.filter_by(kind=TASK_REMINDER).count(), 1)
+
+    def test_overdue_tasks_batched_per_manager(self):
+        """Overdue tasks are escalated to the property managers in a single digest"""
+        first = self._task('fix door', -timedelta(hours=2))
+        second = self._task('fix window', -timedelta(hours=3))
+        self._task('done already', -timedelta(hours=2), status='completed')
+        self._tick(timedelta(0))
+
+        self.assertEqual(self.email.digests, [('manager', sorted([first.task_id, second.task_id]), [])])
+        self.assertEqual(DueNotification.query.filter_by(kind=TASK_OVERDUE).count(), 2)
+
+    def test_edits_are_picked_up_incrementally(self):
+        """Moving a due date drops the stale event and queues the new one without a full reload"""
+        task = self._task('paint lobby', timedelta(hours=30))
+        self._tick(timedelta(0))
+
+        task.due_date = self.now - timedelta(hours=2)
+        db.session.commit()
+        self._tick(timedelta(minutes=1))
+        self.assertEqual(self.email.digests, [('manager', [task.task_id], [])])
+        self.assertEqual(self.email.reminders, [])
+
+    def test_follow_up_notifies_managers_and_reporter(self):
+        """Due ticket follow-ups go to the property managers and the reporter"""
+        ticket = Ticket(
+            title='Guest slipped', description='Wet floor', priority='High', status='open',
+            user_id=self.worker.user_id, property_id=self.property.property_id,
+            follow_up_required=True, follow_up_date=self.now - timedelta(minutes=5)
+        )
+        db.session.add(ticket)
+        db.session.commit()
+        self._tick(timedelta(0))
+
+        self.assertEqual(sorted(self.email.digests), [
+            ('manager', [], [ticket.ticket_id]),
+            ('worker', [], [ticket.ticket_id])
+        ])
+
+    def test_claims_skip_only_events_already_sent(self):
+        """One event sent by another process does not hold back the rest of the batch"""
+        first = self._task('fix door', -timedelta(hours=2))
+        second = self._task('fix window', -timedelta(hours=3))
+        db.session.add(DueNotification(kind=TASK_OVERDUE, entity_id=first.task_id, due_at=first.due_date))
+        db.session.commit()
+        self._tick(timedelta(0))
+        self.assertEqual(self.email.digests, [('manager', [second.task_id], [])])
+
+    def test_failed_send_is_retried(self):
+        """A reminder that could not be sent is released and goes out on a later tick"""
+        self.email = FlakyEmailService()
+        task = self._task('inspect boiler', timedelta(hours=23))
+        self._tick(timedelta(0))
+        self.assertEqual(self.email.reminders, [])
+        self.assertEqual(DueNotification.query.count(), 0)
+
+        self._tick(timedelta(minutes=1))
+        self.assertEqual(self.email.reminders, [])
+        self._tick(timedelta(seconds=app.config['DUE_DATE_RETRY_SECONDS'] + 60))
+        self.assertEqual(self.email.reminders, [('worker', task.task_id)])
+        self.assertEqual(DueNotification.query.count(), 1)
+
+    def test_new_tickets_are_picked_up_incrementally(self):
+        """Tickets created after the window was loaded have updated_at set and are found by the change scan"""
+        self._tick(timedelta(0))
+        # Written by another process, so the commit hooks here never see it
+        db.session.execute(Ticket.__table__.insert().values(
+            title='Broken lock', description='Room 12', priority='High', status='open',
+            user_id=self.worker.user_id, property_id=self.property.property_id,
+            follow_up_required=True, follow_up_date=self.now + timedelta(minutes=30)
+        ))
+        db.session.commit()
+        self.assertIsNotNone(Ticket.query.one().updated_at)
+        self._tick(timedelta(minutes=1))
+        self._tick(timedelta(minutes=31))
+        self.assertEqual(len(self.email.digests), 2)
+
+    def test_purge_keeps_recent_notifications(self):
+        """Only notifications older than the retention are purged"""
+        db.session.add_all([
+            DueNotification(kind=TASK_OVERDUE, entity_id=1, due_at=self.now - timedelta(days=60)),
+            DueNotification(kind=TASK_OVERDUE, entity_id=2, due_at=self.now - timedelta(hours=1))
+        ])
+        db.session.commit()
+        self.assertEqual(purge_due_notifications(), 1)
+        self.assertEqual([row.entity_id for row in DueNotification.query.all()], [2])
+
+    def test_setup_adds_scan_indexes_to_existing_tables(self):
+        """Databases created before the due-date indexes get them from setup_db"""
+        from sqlalchemy import inspect, text
+        from setup_db import create_missing_indexes
+        with db.engine.begin() as conn:
+            conn.execute(text('DROP INDEX ix_tasks_due_date'))
+            conn.execute(text('DROP INDEX ix_tickets_follow_up_date'))
+
+        self.assertEqual(sorted(create_missing_indexes()), ['ix_tasks_due_date', 'ix_tickets_follow_up_date'])
+        self.assertIn('ix_tasks_due_date', {index['name'] for index in inspect(db.engine).get_indexes('tasks')})
+        self.assertEqual(create_missing_indexes(), [])
+
+if __name__ == '__main__':
+    unittest.main()
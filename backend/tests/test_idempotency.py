@@ -0,0 +1,117 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import event, update
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, Room, Ticket, ServiceRequest, IdempotencyKey
+from app.services.idempotency import purge_expired_keys
+
+class TestIdempotencyKeys(DatabaseTestCase):
+    def setUp(self):
+        """A property with a room and a super admin client; notifications are stubbed out"""
+        super().setUp()
+
+        self.property = Property(name='Cove', hotel_code='COV', address='1 Cove Rd')
+        self.admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        db.session.add_all([self.property, self.admin])
+        db.session.flush()
+        self.room = Room(name='12', property_id=self.property.property_id)
+        db.session.add(self.room)
+        db.session.commit()
+        self.client = app.test_client()
+
+        for target in ('app.routes.notify_ticket_created_async', 'app.routes.send_service_request_notification_async'):
+            notifier = patch(target)
+            notifier.start()
+            self.addCleanup(notifier.stop)
+
+    def _headers(self, key):
+        return {'Authorization': f'Bearer {self.admin.get_token()}', 'Idempotency-Key': key}
+
+    def _ticket(self, title='Broken lamp'):
+        return {'title': title, 'description': 'Lobby', 'priority': 'Low', 'category': 'General', 'property_id': self.property.property_id}
+
+    def test_retried_ticket_is_created_once(self):
+        """A retry replays the first response instead of creating a second ticket"""
+        first = self.client.post('/tickets', headers=self._headers('tablet-1'), json=self._ticket())
+        retry = self.client.post('/tickets', headers=self._headers('tablet-1'), json=self._ticket())
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(retry.json, first.json)
+        self.assertEqual(retry.headers.get('Idempotent-Replayed'), 'true')
+        self.assertEqual(Ticket.query.count(), 1)
+
+        other = self.client.post('/tickets', headers=self._headers('tablet-2'), json=self._ticket())
+        self.assertEqual(other.status_code, 201)
+        self.assertEqual(Ticket.query.count(), 2)
+
+    def test_retried_service_request_is_created_once(self):
+        body = {'room_id': self.room.room_id, 'property_id': self.property.property_id,
+                'request_group': 'Housekeeping', 'request_type': 'Towels', 'priority': 'Low'}
+        for _ in range(3):
+            self.assertEqual(self.client.post('/service-requests', headers=self._headers('sr-1'), json=body).status_code, 201)
+        self.assertEqual(ServiceRequest.query.count(), 1)
+
+    def test_key_reuse_and_in_flight_requests(self):
+        """A different body under the same key is refused, as is a retry while the first is running"""
+        self.client.post('/tickets', headers=self._headers('tablet-1'), json=self._ticket())
+        reused = self.client.post('/tickets', headers=self._headers('tablet-1'), json=self._ticket('Other'))
+        self.assertEqual(reused.status_code, 422)
+
+        db.session.add(IdempotencyKey(user_id=self.admin.user_id, key='running', request_hash='x' * 64,
+                                      expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db.session.commit()
+        with patch('app.services.idempotency._request_hash', return_value='x' * 64):
+            running = self.client.post('/tickets', headers=self._headers('running'), json=self._ticket())
+        self.assertEqual(running.status_code, 409)
+        self.assertEqual(Ticket.query.count(), 1)
+
+    def test_stale_key_is_taken_over_once(self):
+        """A retry takes over a key whose first attempt died, unless another retry got there first"""
+        stale = datetime.utcnow() - timedelta(minutes=10)
+        for key in ('died', 'raced'):
+            db.session.add(IdempotencyKey(user_id=self.admin.user_id, key=key, request_hash='x' * 64,
+                                          created_at=stale, expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db.session.commit()
+
+        with patch('app.services.idempotency._request_hash', return_value='x' * 64):
+            taken = self.client.post('/tickets', headers=self._headers('died'), json=self._ticket())
+            self.assertEqual(taken.status_code, 201)
+
+            def concurrent_claim(orm_execute_state):
+                # Another retry moves created_at on between this one's read and its UPDATE
+                if orm_execute_state.is_update and orm_execute_state.bind_mapper.class_ is IdempotencyKey:
+                    orm_execute_state.session.connection().execute(
+                        update(IdempotencyKey.__table__).where(IdempotencyKey.key == 'raced').values(created_at=datetime.utcnow())
+                    )
+            event.listen(db.session, 'do_orm_execute', concurrent_claim)
+            try:
+                raced = self.client.post('/tickets', headers=self._headers('raced'), json=self._ticket())
+            finally:
+                event.remove(db.session, 'do_orm_execute', concurrent_claim)
+        self.assertEqual(raced.status_code, 409)
+        self.assertEqual(Ticket.query.count(), 1)
+
+    def test_server_errors_release_the_key(self):
+        """A failed attempt leaves nothing behind, so the retry runs for real"""
+        with patch('app.routes.TicketRouter', side_effect=RuntimeError('boom')):
+            failed = self.client.post('/tickets', headers=self._headers('tablet-1'), json=self._ticket())
+        self.assertEqual(failed.status_code, 500)
+        self.assertEqual(IdempotencyKey.query.count(), 0)
+        self.assertEqual(self.client.post('/tickets', headers=self._headers('tablet-1'), json=self._ticket()).status_code, 201)
+
+    def test_purge_expired_keys(self):
+        now = datetime.utcnow()
+        db.session.add_all([
+            IdempotencyKey(user_id=self.admin.user_id, key=f'k{n}', request_hash='x' * 64, status_code=201,
+                           expires_at=now - timedelta(minutes=1) if n < 3 else now + timedelta(hours=1))
+            for n in range(5)
+        ])
+        db.session.commit()
+        self.assertEqual(purge_expired_keys(chunk_size=2), 3)
+        self.assertEqual(IdempotencyKey.query.count(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
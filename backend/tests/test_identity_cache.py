@@ -0,0 +1,81 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from sqlalchemy import event
+from app import app, db
+from app.models import User, Property, UserProperty, PropertyManager
+from app.services.identity_cache import identity_cache, get_cached_user, get_assigned_property_ids, get_managed_property_ids
+
+class TestIdentityCache(DatabaseTestCase):
+    def setUp(self):
+        """Set up a user assigned to one property"""
+        super().setUp()
+        identity_cache.invalidate()
+
+        self.user = User(username='cached', email='cached@test.com', password='secret', role='manager')
+        self.property = Property(name='Cache Hotel', hotel_code='CH1')
+        db.session.add_all([self.user, self.property])
+        db.session.commit()
+        db.session.add(UserProperty(user_id=self.user.user_id, property_id=self.property.property_id))
+        db.session.commit()
+        self.user_id = self.user.user_id
+        self.property_id = self.property.property_id
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count)
+        super().tearDown()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def new_request(self):
+        """Simulate a fresh request with its own session and request memo"""
+        self.app_context.pop()
+        self.app_context = app.app_context()
+        self.app_context.push()
+
+    def test_cached_lookup_issues_no_sql(self):
+        """A warm cache resolves the user and their property IDs without SQL"""
+        self.new_request()
+        user = get_cached_user(self.user_id)
+        self.assertEqual(get_assigned_property_ids(user), {self.property_id})
+
+        self.new_request()
+        self.statements.clear()
+        user = get_cached_user(self.user_id)
+        self.assertEqual(user.username, 'cached')
+        self.assertEqual(get_assigned_property_ids(user), {self.property_id})
+        self.assertEqual(get_managed_property_ids(user), frozenset())
+        self.assertEqual(self.statements, [])
+
+    def test_membership_write_invalidates(self):
+        """Writing PropertyManager rows evicts the cached identity"""
+        self.new_request()
+        user = get_cached_user(self.user_id)
+        self.assertEqual(get_managed_property_ids(user), frozenset())
+
+        db.session.add(PropertyManager(user_id=self.user_id, property_id=self.property_id))
+        db.session.commit()
+
+        self.new_request()
+        user = get_cached_user(self.user_id)
+        self.assertEqual(get_managed_property_ids(user), {self.property_id})
+
+    def test_bulk_delete_invalidates(self):
+        """Query.delete() on user_properties clears the cache"""
+        self.new_request()
+        get_cached_user(self.user_id)
+
+        UserProperty.query.filter_by(user_id=self.user_id).delete()
+        db.session.commit()
+
+        self.new_request()
+        user = get_cached_user(self.user_id)
+        self.assertEqual(get_assigned_property_ids(user), frozenset())
+
+if __name__ == '__main__':
+    unittest.main()
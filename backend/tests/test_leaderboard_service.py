@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, timedelta
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, Task, WorkerLeaderboard
+from app.services.leaderboard_service import LeaderboardService
+
+class TestLeaderboardService(DatabaseTestCase):
+    def setUp(self):
+        """Set up a property with two workers"""
+        super().setUp()
+
+        self.alice = User(username='alice', email='alice@test.com', password='secret')
+        self.bob = User(username='bob', email='bob@test.com', password='secret')
+        self.property = Property(name='Leaderboard Hotel', hotel_code='LB1')
+        db.session.add_all([self.alice, self.bob, self.property])
+        db.session.commit()
+
+    def create_task(self, user, **kwargs):
+        task = Task(title='Task', property_id=self.property.property_id, assigned_to_id=user.user_id,
+                    created_at=datetime.utcnow() - timedelta(hours=2), **kwargs)
+        db.session.add(task)
+        db.session.commit()
+        return task
+
+    def test_completion_persists_score(self):
+        """Completing a task stamps completed_at and persists the completion score"""
+        task = self.create_task(self.alice, priority='Low')
+        self.assertIsNone(task.completion_score)
+
+        task.status = 'completed'
+        db.session.commit()
+
+        self.assertIsNotNone(task.completed_at)
+        self.assertEqual(task.completion_score, 100)
+        self.assertEqual(task.to_dict()['completion_score'], 100)
+
+    def test_leaderboard_updated_incrementally(self):
+        """Completions and reopenings adjust the worker buckets"""
+        for _ in range(2):
+            task = self.create_task(self.alice, time_spent=1.5)
+            task.status = 'completed'
+        bob_task = self.create_task(self.bob)
+        bob_task.status = 'completed'
+        db.session.commit()
+
+        today = datetime.utcnow().date()
+        top = LeaderboardService().top_workers(today, today, property_ids=[self.property.property_id])
+        self.assertEqual([w['username'] for w in top], ['alice', 'bob'])
+        self.assertEqual(top[0]['tasks_completed'], 2)
+        self.assertEqual(top[0]['time_spent_total'], 3.0)
+
+        task.status = 'in progress'
+        db.session.commit()
+        bucket = WorkerLeaderboard.query.filter_by(user_id=self.alice.user_id).one()
+        self.assertEqual(bucket.tasks_completed, 1)
+        self.assertIsNone(task.completed_at)
+
+    def test_rebuild_matches_incremental(self):
+        """Rebuilding from tasks reproduces the incrementally maintained buckets"""
+        task = self.create_task(self.alice, cost=20.0)
+        task.status = 'completed'
+        db.session.commit()
+        before = WorkerLeaderboard.query.one().to_dict()
+
+        LeaderboardService().rebuild()
+        after = WorkerLeaderboard.query.one().to_dict()
+        for field in ('tasks_completed', 'score_total', 'cost_total', 'period_date'):
+            self.assertEqual(before[field], after[field])
+
+    def test_reassigned_completion_moves_bucket(self):
+        """Reassigning a completed task moves its credit, with its hours, to the new worker"""
+        task = self.create_task(self.alice, time_spent=2.0)
+        task.status = 'completed'
+        db.session.commit()
+
+        task.assigned_to_id = self.bob.user_id
+        task.time_spent = 3.0
+        db.session.commit()
+        buckets = {b.user_id: b for b in WorkerLeaderboard.query.all()}
+        self.assertEqual((buckets[self.alice.user_id].tasks_completed, buckets[self.alice.user_id].time_spent_total), (0, 0))
+        self.assertEqual((buckets[self.bob.user_id].tasks_completed, buckets[self.bob.user_id].time_spent_total), (1, 3.0))
+
+    def test_backfill_scores_legacy_completions(self):
+        """Tasks completed before scoring existed get a score and a bucket"""
+        task = self.create_task(self.bob)
+        db.session.execute(Task.__table__.update().values(status='completed', completed_at=None, completion_score=None))
+        db.session.commit()
+        self.assertIsNone(WorkerLeaderboard.query.first())
+
+        scored, buckets = LeaderboardService().backfill()
+        self.assertEqual((scored, buckets), (1, 1))
+        db.session.refresh(task)
+        self.assertIsNotNone(task.completion_score)
+        bucket = WorkerLeaderboard.query.one()
+        self.assertEqual((bucket.user_id, bucket.tasks_completed), (self.bob.user_id, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import unittest
+
+import base  # forces the throwaway test database
+
+from app import app
+from app.logging_setup import JsonFormatter, redact, REDACTED
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+class TestLoggingSetup(unittest.TestCase):
+    def setUp(self):
+        """Capture records leaving the background log listener"""
+        self.pipeline = app.extensions['log_pipeline']
+        self.capture = CaptureHandler()
+        self.pipeline.handlers = self.pipeline.handlers + (self.capture,)
+        self.sample_rate = app.config['LOG_SAMPLE_RATE']
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.pipeline.handlers = tuple(h for h in self.pipeline.handlers if h is not self.capture)
+        app.config['LOG_SAMPLE_RATE'] = self.sample_rate
+
+    def request_records(self):
+        self.pipeline.flush()
+        return [r for r in self.capture.records if getattr(r, 'request', None)]
+
+    def test_redact_nested_secrets(self):
+        """Secret keys are replaced at any depth, case-insensitively"""
+        data = {'Authorization': 'Bearer abc', 'user': {'password': 'x', 'name': 'n'}, 'items': [{'token': 't'}]}
+        self.assertEqual(redact(data), {
+            'Authorization': REDACTED,
+            'user': {'password': REDACTED, 'name': 'n'},
+            'items': [{'token': REDACTED}]
+        })
+
+    def test_json_formatter_includes_extra(self):
+        """Each record becomes a single JSON line with its extra fields"""
+        record = logging.LogRecord('app', logging.INFO, __file__, 1, 'hello %s', ('world',), None)
+        record.request = {'status': 200}
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry['message'], 'hello world')
+        self.assertEqual(entry['request'], {'status': 200})
+
+    def test_sampled_request_detail_is_redacted(self):
+        """Unsampled requests log only the summary; sampled ones include redacted detail"""
+        app.config['LOG_SAMPLE_RATE'] = 0
+        self.client.post('/login', json={'username': 'nobody', 'password': 'hunter2'})
+        app.config['LOG_SAMPLE_RATE'] = 1
+        self.client.post('/login', json={'username': 'nobody', 'password': 'hunter2'})
+
+        unsampled, sampled = [r.request for r in self.request_records()][-2:]
+        self.assertEqual(unsampled['path'], '/login')
+        self.assertNotIn('body', unsampled)
+        self.assertEqual(sampled['body'], {'username': 'nobody', 'password': REDACTED})
+        self.assertIn('duration_ms', sampled)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_forked_process_writes_its_logs(self):
+        """A child forked after the listener started gets a listener of its own"""
+        app.logger.info('parent')
+        self.pipeline.flush()
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                app.logger.warning('child')
+                self.pipeline.flush()
+                written = any(r.getMessage() == 'child' for r in self.capture.records)
+                os.write(write_end, b'1' if written else b'0')
+            finally:
+                os._exit(0)
+        os.close(write_end)
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read_end, 1), b'1')
+        os.close(read_end)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User
+from app.metrics import REGISTRY, track_job, track_notification
+
+class TestMetrics(DatabaseTestCase):
+    def setUp(self):
+        """Set up a super admin and a test client"""
+        super().setUp()
+        self.token = app.config.get('METRICS_AUTH_TOKEN')
+        app.config['METRICS_AUTH_TOKEN'] = 'scrape-secret'
+        self.scrape_headers = {'Authorization': 'Bearer scrape-secret'}
+
+        admin = User(username='metrics_admin', email='metrics@test.com', password='secret', role='super_admin')
+        db.session.add(admin)
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app.config['METRICS_AUTH_TOKEN'] = self.token
+        app.config['METRICS_ALLOW_UNAUTHENTICATED'] = False
+        super().tearDown()
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_request_and_query_metrics(self):
+        """Requests are counted per route and status, with their SQL statements"""
+        labels = {'method': 'GET', 'endpoint': '/properties', 'status': '200'}
+        requests_before = self.sample('http_requests_total', **labels)
+        queries_before = self.sample('db_queries_total', endpoint='/properties')
+
+        response = self.client.get('/properties', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.sample('http_requests_total', **labels), requests_before + 1)
+        self.assertGreater(self.sample('db_queries_total', endpoint='/properties'), queries_before)
+
+        body = self.client.get('/metrics', headers=self.scrape_headers).get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_bucket', body)
+        self.assertIn('db_pool_checkout_wait_seconds_count', body)
+
+    def test_metrics_token(self):
+        """/metrics requires the configured bearer token, and is closed when none is configured"""
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers=self.scrape_headers).status_code, 200)
+
+        app.config['METRICS_AUTH_TOKEN'] = ''
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        app.config['METRICS_ALLOW_UNAUTHENTICATED'] = True
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_job_and_notification_decorators(self):
+        """Job durations and notification outcomes are observed"""
+        @track_job('test_job')
+        def job():
+            return 'done'
+
+        @track_notification('test_channel')
+        def send():
+            return False
+
+        self.assertEqual(job(), 'done')
+        self.assertFalse(send())
+        self.assertEqual(self.sample('scheduler_job_duration_seconds_count', job='test_job', outcome='success'), 1)
+        self.assertEqual(self.sample('notification_send_duration_seconds_count', channel='test_channel', outcome='failed'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch
+
+from base import DatabaseTestCase
+
+from sqlalchemy import update
+from app import app, db
+from app.models import User, Property, Room, Ticket, Task, TaskAssignment, ServiceRequest, History
+from app.services import bulk_update
+from app.services.bulk_update import _update_grouped
+
+class TestOptimisticConcurrency(DatabaseTestCase):
+    def setUp(self):
+        """A ticket with its task and a service request, edited by a super admin"""
+        super().setUp()
+
+        admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        prop = Property(name='Harbor', hotel_code='HBR', address='1 Dock St')
+        db.session.add_all([admin, prop])
+        db.session.flush()
+        room = Room(name='101', property_id=prop.property_id)
+        db.session.add(room)
+        db.session.flush()
+        ticket = Ticket(title='Leak', description='Sink', priority='Low', status='open', user_id=admin.user_id,
+                        property_id=prop.property_id, room_id=room.room_id)
+        task = Task(title='Fix leak', priority='Low', status='pending', property_id=prop.property_id, assigned_to_id=admin.user_id)
+        db.session.add_all([ticket, task])
+        db.session.flush()
+        db.session.add(TaskAssignment(task_id=task.task_id, ticket_id=ticket.ticket_id, assigned_to_user_id=admin.user_id))
+        service_request = ServiceRequest(room_id=room.room_id, property_id=prop.property_id, request_group='Housekeeping',
+                                         request_type='Towels', created_by_id=admin.user_id)
+        db.session.add(service_request)
+        db.session.commit()
+        self.ticket_id, self.task_id, self.request_id = ticket.ticket_id, task.task_id, service_request.request_id
+        self.headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        self.client = app.test_client()
+
+        mailer = patch('app.routes.EmailService')
+        mailer.start()
+        self.addCleanup(mailer.stop)
+
+    def _patch(self, url, etag, body):
+        return self.client.patch(url, headers=self.headers | {'If-Match': etag}, json=body)
+
+    def test_if_match_guards_ticket_updates(self):
+        """A PATCH with the current ETag applies once; a second with the same ETag gets 409"""
+        read = self.client.get(f'/tickets/{self.ticket_id}', headers=self.headers)
+        self.assertEqual((read.headers['ETag'], read.json['version']), ('"1"', 1))
+
+        first = self._patch(f'/tickets/{self.ticket_id}', read.headers['ETag'], {'priority': 'High'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json['ticket']['version'], 2)
+        self.assertEqual(first.headers['ETag'], '"2"')
+
+        second = self._patch(f'/tickets/{self.ticket_id}', read.headers['ETag'], {'priority': 'Low'})
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual((second.json['current_version'], second.headers['ETag']), (2, '"2"'))
+        self.assertEqual(db.session.get(Ticket, self.ticket_id).priority, 'High')
+
+    def test_task_update_commits_once(self):
+        """Completing a task moves its version and its ticket's, in one transaction with its history"""
+        response = self._patch(f'/tasks/{self.task_id}', 'W/"1"', {'status': 'completed', 'priority': 'High'})
+        self.assertEqual(response.status_code, 200)
+        version = response.json['task']['version']
+        self.assertGreater(version, 1)
+        self.assertEqual(response.headers['ETag'], f'"{version}"')
+        self.assertGreater(db.session.get(Ticket, self.ticket_id).version, 1)
+        self.assertEqual(History.query.count(), 4)
+
+        stale = self._patch(f'/tasks/{self.task_id}', '"1"', {'status': 'pending'})
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(db.session.get(Task, self.task_id).status, 'completed')
+
+    def test_concurrent_commit_is_refused(self):
+        """A write committed after the row was read makes the losing PATCH answer 409"""
+        build = History.build
+
+        def concurrent_write(*args, **kwargs):
+            with db.engine.begin() as connection:
+                connection.execute(update(ServiceRequest.__table__)
+                                   .where(ServiceRequest.__table__.c.request_id == self.request_id)
+                                   .values(notes='Front desk', version=2))
+            return build(*args, **kwargs)
+
+        with patch('app.routes.History.build', side_effect=concurrent_write):
+            response = self.client.patch(f'/service-requests/{self.request_id}', headers=self.headers, json={'notes': 'Extra'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json['current_version'], 2)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(ServiceRequest, self.request_id).notes, 'Front desk')
+        self.assertEqual(History.query.count(), 0)
+
+    def test_bulk_updates_bump_version(self):
+        """Statement UPDATEs from bulk edits invalidate ETags too"""
+        _update_grouped(Ticket.ticket_id, {('status', 'in progress'): [self.ticket_id]})
+        db.session.commit()
+        response = self._patch(f'/tickets/{self.ticket_id}', '"1"', {'priority': 'High'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json['current_version'], 2)
+
+    def test_bulk_conflict_lists_changed_rows(self):
+        """A bulk PATCH that loses a version race answers 409 naming the rows that changed"""
+        update_grouped = bulk_update._update_grouped
+
+        def concurrent_write(*args, **kwargs):
+            with db.engine.begin() as connection:
+                connection.execute(update(Task.__table__).where(Task.__table__.c.task_id == self.task_id)
+                                   .values(priority='High', version=Task.__table__.c.version + 1))
+            return update_grouped(*args, **kwargs)
+
+        with patch('app.services.bulk_update._update_grouped', side_effect=concurrent_write):
+            response = self.client.patch('/tasks/bulk?notify=none', headers=self.headers,
+                                         json=[{'task_id': self.task_id, 'status': 'in progress'}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json['conflicts'], [{'task_id': self.task_id, 'current_version': 2}])
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Task, self.task_id).status, 'pending')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User
+
+class TestRequestProfiling(DatabaseTestCase):
+    def setUp(self):
+        """Set up a super admin, a regular user and a scratch profile directory"""
+        super().setUp()
+        self.profile_dir = tempfile.mkdtemp()
+        self.original_dir = app.config.get('PROFILE_DIR')
+        app.config['PROFILE_DIR'] = self.profile_dir
+
+        admin = User(username='profile_admin', email='admin@test.com', password='secret', role='super_admin')
+        user = User(username='profile_user', email='user@test.com', password='secret', role='user')
+        db.session.add_all([admin, user])
+        db.session.commit()
+        self.admin_headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        self.user_headers = {'Authorization': f'Bearer {user.get_token()}'}
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app.config['PROFILE_DIR'] = self.original_dir
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        super().tearDown()
+
+    def test_super_admin_profile_stored_and_downloadable(self):
+        """X-Profile from a super admin stores a profile that can be listed and read"""
+        response = self.client.get('/properties', headers={**self.admin_headers, 'X-Profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        profile_id = response.headers.get('X-Profile-Id')
+        self.assertTrue(profile_id)
+
+        listing = self.client.get('/api/admin/profiles', headers=self.admin_headers).get_json()
+        self.assertEqual([p['profile_id'] for p in listing['profiles']], [profile_id])
+        self.assertEqual(listing['profiles'][0]['endpoint'], 'properties')
+
+        text = self.client.get(f'/api/admin/profiles/{profile_id}?format=text', headers=self.admin_headers)
+        self.assertIn('function calls', text.get_data(as_text=True))
+        raw = self.client.get(f'/api/admin/profiles/{profile_id}', headers=self.admin_headers)
+        self.assertEqual(raw.status_code, 200)
+
+    def test_other_roles_not_profiled(self):
+        """The header is ignored for non super admins and the endpoints are forbidden"""
+        response = self.client.get('/properties', headers={**self.user_headers, 'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+        self.assertEqual(self.client.get('/api/admin/profiles', headers=self.user_headers).status_code, 403)
+        self.assertEqual(self.client.get('/api/admin/profiles/..%2Fsecret', headers=self.admin_headers).status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
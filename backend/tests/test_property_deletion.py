@@ -0,0 +1,169 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import (
+    User, Property, PropertyManager, UserProperty, Room, Ticket, TicketAttachment, Task, TaskAssignment,
+    ServiceRequest, History, SlaRecord, Checklist, ChecklistItem, ChecklistInstance, PropertyDeletion
+)
+from app.services.property_deletion import PropertyDeleter, resume_stale_deletions
+
+class TestPropertyDeletion(DatabaseTestCase):
+    def setUp(self):
+        """Two properties with rooms, tickets, tasks, a service request, a checklist and an attachment"""
+        super().setUp()
+        self.upload_folder = tempfile.mkdtemp()
+        app.config['UPLOAD_FOLDER'] = self.upload_folder
+
+        self.admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        self.doomed = Property(name='Doomed', hotel_code='DMD', address='1 End Rd')
+        self.kept = Property(name='Kept', hotel_code='KPT', address='2 Stay Rd')
+        db.session.add_all([self.admin, self.doomed, self.kept])
+        db.session.flush()
+        for prop in (self.doomed, self.kept):
+            self._populate(prop)
+        db.session.commit()
+        self.doomed_id, self.kept_id = self.doomed.property_id, self.kept.property_id
+        self.headers = {'Authorization': f'Bearer {self.admin.get_token()}'}
+        self.client = app.test_client()
+
+    def _populate(self, prop):
+        pid, uid = prop.property_id, self.admin.user_id
+        db.session.add_all([PropertyManager(property_id=pid, user_id=uid), UserProperty(property_id=pid, user_id=uid)])
+        room = Room(name='1', property_id=pid)
+        db.session.add(room)
+        db.session.flush()
+        for n in range(3):
+            ticket = Ticket(title=f'T{n}', description='d', priority='Low', status='open', user_id=uid, property_id=pid, room_id=room.room_id)
+            task = Task(title=f'K{n}', priority='Low', property_id=pid, assigned_to_id=uid)
+            db.session.add_all([ticket, task])
+            db.session.flush()
+            db.session.add_all([
+                TaskAssignment(task_id=task.task_id, ticket_id=ticket.ticket_id, assigned_to_user_id=uid),
+                History.build('ticket', ticket.ticket_id, 'created', uid),
+                History.build('task', task.task_id, 'created', uid),
+                SlaRecord(entity_type='ticket', entity_id=ticket.ticket_id, property_id=pid, opened_at=datetime.utcnow())
+            ])
+        request_task = Task(title='Towels', priority='Low', property_id=pid)
+        db.session.add(request_task)
+        db.session.flush()
+        db.session.add(ServiceRequest(room_id=room.room_id, property_id=pid, request_group='Housekeeping', request_type='Towels',
+                                      priority='Low', created_by_id=uid, assigned_task_id=request_task.task_id))
+        checklist = Checklist(title='Opening', checklist_type='daily', property_id=pid, created_by_id=uid)
+        db.session.add(checklist)
+        db.session.flush()
+        db.session.add_all([
+            ChecklistItem(checklist_id=checklist.checklist_id, description='Unlock'),
+            ChecklistInstance(checklist_id=checklist.checklist_id, property_id=pid, period_start=date(2026, 1, 1), due_at=datetime(2026, 1, 2))
+        ])
+
+        path = os.path.join(str(ticket.ticket_id), 'photo.jpg')
+        os.makedirs(os.path.join(self.upload_folder, str(ticket.ticket_id)), exist_ok=True)
+        with open(os.path.join(self.upload_folder, path), 'w') as f:
+            f.write('jpg')
+        db.session.add(TicketAttachment(ticket_id=ticket.ticket_id, file_name='photo.jpg', file_path=path, uploaded_by_id=uid))
+
+    def tearDown(self):
+        app.config['UPLOAD_FOLDER'] = 'uploads'
+        super().tearDown()
+
+    def _counts(self, property_id):
+        return {
+            'tickets': Ticket.query.filter_by(property_id=property_id).count(),
+            'tasks': Task.query.filter_by(property_id=property_id).count(),
+            'rooms': Room.query.filter_by(property_id=property_id).count(),
+            'requests': ServiceRequest.query.filter_by(property_id=property_id).count(),
+            'checklists': Checklist.query.filter_by(property_id=property_id).count(),
+            'instances': ChecklistInstance.query.filter_by(property_id=property_id).count(),
+            'sla': SlaRecord.query.filter_by(property_id=property_id).count(),
+            'managers': PropertyManager.query.filter_by(property_id=property_id).count()
+        }
+
+    def test_deletes_everything_in_chunks(self):
+        """Every table is cleared for the deleted property, with files, while the other property is untouched"""
+        kept_before = self._counts(self.kept_id)
+        deletion = PropertyDeletion(property_id=self.doomed_id, property_name='Doomed', requested_by_id=self.admin.user_id)
+        db.session.add(deletion)
+        db.session.commit()
+
+        PropertyDeleter(deletion.deletion_id, chunk_size=2).run()
+
+        db.session.expire_all()
+        self.assertEqual(deletion.status, 'completed')
+        self.assertEqual(deletion.steps_done, deletion.steps_total)
+        self.assertEqual(deletion.files_deleted, 1)
+        self.assertIsNone(db.session.get(Property, self.doomed_id))
+        self.assertEqual(set(self._counts(self.doomed_id).values()), {0})
+        self.assertEqual(self._counts(self.kept_id), kept_before)
+        self.assertEqual(History.query.count(), 6)
+        self.assertEqual(TaskAssignment.query.count(), 3)
+        self.assertEqual(ChecklistItem.query.count(), 1)
+        self.assertEqual(TicketAttachment.query.count(), 1)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(self.upload_folder)), 1)
+
+    def test_delete_request_starts_one_job(self):
+        """DELETE hands off to a background job and reports it again while it runs"""
+        with patch('app.routes.start_property_deletion') as start:
+            response = self.client.delete(f'/properties/{self.doomed_id}', headers=self.headers)
+            self.assertEqual(response.status_code, 202)
+            deletion_id = response.json['deletion']['deletion_id']
+            start.assert_called_once_with(deletion_id)
+
+            again = self.client.delete(f'/properties/{self.doomed_id}', headers=self.headers)
+            self.assertEqual((again.status_code, again.json['deletion']['deletion_id']), (202, deletion_id))
+            start.assert_called_once()
+
+        self.assertEqual(db.session.get(Property, self.doomed_id).status, 'deleting')
+        PropertyDeleter(deletion_id).run()
+        progress = self.client.get(f'/properties/{self.doomed_id}/deletion', headers=self.headers)
+        self.assertEqual(progress.json['deletion']['status'], 'completed')
+
+    def test_deleting_property_takes_no_writes(self):
+        """Once deletion starts the property drops out of listings and new rows for it are refused"""
+        with patch('app.routes.start_property_deletion'):
+            self.client.delete(f'/properties/{self.doomed_id}', headers=self.headers)
+
+        ticket = self.client.post('/tickets', headers=self.headers, json={
+            'title': 'Leak', 'description': 'd', 'priority': 'Low', 'category': 'Maintenance', 'property_id': self.doomed_id
+        })
+        self.assertEqual((ticket.status_code, ticket.json['error']), (409, 'property_deleting'))
+        task = self.client.post('/tasks', headers=self.headers, json={
+            'title': 'Fix', 'description': 'd', 'priority': 'Low', 'property_id': self.doomed_id
+        })
+        self.assertEqual(task.status_code, 409)
+        room = self.client.post('/rooms', headers=self.headers, json={'name': '2', 'property_id': self.doomed_id})
+        self.assertEqual(room.status_code, 409)
+        existing = Ticket.query.filter_by(property_id=self.doomed_id).first()
+        patched = self.client.patch(f'/tickets/{existing.ticket_id}', headers=self.headers, json={'title': 'Changed'})
+        self.assertEqual(patched.status_code, 409)
+
+        listed = self.client.get('/properties', headers=self.headers)
+        self.assertEqual([p['property_id'] for p in listed.json], [self.kept_id])
+        rooms = self.client.get('/rooms', headers=self.headers)
+        self.assertEqual({r['property_id'] for r in rooms.json['rooms']}, {self.kept_id})
+
+    def test_stale_deletion_is_resumed(self):
+        """A job whose thread died is finished by the scheduler; a job still reporting progress is left alone"""
+        stale = PropertyDeletion(property_id=self.doomed_id, property_name='Doomed', requested_by_id=self.admin.user_id, status='running')
+        fresh = PropertyDeletion(property_id=self.kept_id, property_name='Kept', requested_by_id=self.admin.user_id, status='running')
+        db.session.add_all([stale, fresh])
+        db.session.commit()
+        db.session.execute(PropertyDeletion.__table__.update().where(
+            PropertyDeletion.deletion_id == stale.deletion_id
+        ).values(updated_at=datetime.utcnow() - timedelta(minutes=10)))
+        db.session.commit()
+
+        self.assertEqual(resume_stale_deletions(), 1)
+        db.session.expire_all()
+        self.assertEqual(stale.status, 'completed')
+        self.assertIsNone(db.session.get(Property, self.doomed_id))
+        self.assertEqual(fresh.status, 'running')
+        self.assertIsNotNone(db.session.get(Property, self.kept_id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from base import DatabaseTestCase
+
+from sqlalchemy import create_engine
+from app import app, db
+from app.extensions import REPLICA_BIND_KEY
+from app.models import Property, ReplicaHeartbeat
+from app.services.read_replica import use_replica, read_replica, replica_health, record_replica_heartbeat
+
+class TestReadReplica(DatabaseTestCase):
+    def setUp(self):
+        """Attach a second SQLite file as the replica bind"""
+        super().setUp()
+        replica_health.reset()
+
+        self.replica_path = os.path.join(tempfile.gettempdir(), 'ticketing_test_replica.db')
+        if os.path.exists(self.replica_path):
+            os.remove(self.replica_path)
+        self.replica = create_engine('sqlite:///' + self.replica_path)
+        db.metadata.create_all(self.replica)
+        db.engines[REPLICA_BIND_KEY] = self.replica
+
+        db.session.add(Property(name='Primary Hotel', hotel_code='PR1'))
+        db.session.commit()
+        # The replica has not caught up with the primary yet
+        with self.replica.begin() as conn:
+            conn.execute(Property.__table__.insert().values(name='Replica Hotel', hotel_code='RE1'))
+
+    def tearDown(self):
+        db.engines.pop(REPLICA_BIND_KEY, None)
+        replica_health.reset()
+        db.session.remove()
+        self.replica.dispose()
+        os.remove(self.replica_path)
+        super().tearDown()
+
+    def replicate_heartbeat(self, age_seconds):
+        with self.replica.begin() as conn:
+            conn.execute(ReplicaHeartbeat.__table__.insert().values(
+                id=1, beat_at=datetime.utcnow() - timedelta(seconds=age_seconds)
+            ))
+
+    def property_names(self):
+        return [p.name for p in Property.query.all()]
+
+    def test_reads_routed_to_fresh_replica(self):
+        """Inside use_replica reads come from the replica, writes still go to the primary"""
+        self.replicate_heartbeat(1)
+
+        with use_replica() as on_replica:
+            self.assertTrue(on_replica)
+            self.assertEqual(self.property_names(), ['Replica Hotel'])
+            db.session.add(Property(name='Written Hotel', hotel_code='WR1'))
+            db.session.flush()
+
+        db.session.commit()
+        self.assertEqual(self.property_names(), ['Primary Hotel', 'Written Hotel'])
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        """A stale heartbeat sends reads back to the primary"""
+        self.replicate_heartbeat(app.config['REPLICA_MAX_LAG_SECONDS'] + 60)
+
+        @read_replica
+        def report():
+            return self.property_names()
+
+        self.assertEqual(report(), ['Primary Hotel'])
+
+    def test_missing_heartbeat_falls_back(self):
+        """Without a replicated heartbeat the replica is not trusted"""
+        record_replica_heartbeat()
+        self.assertIsNotNone(ReplicaHeartbeat.query.get(1))
+        with use_replica() as on_replica:
+            self.assertFalse(on_replica)
+            self.assertEqual(self.property_names(), ['Primary Hotel'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import Property, Room
+from app.services.room_import import RoomImporter, RoomImportError
+
+HEADER = 'name,type,floor,status,capacity,description\n'
+
+class TestRoomImport(DatabaseTestCase):
+    def setUp(self):
+        """A property that already has one room"""
+        super().setUp()
+
+        self.property = Property(name='Resort', hotel_code='RST', address='1 Beach Rd')
+        db.session.add(self.property)
+        db.session.flush()
+        db.session.add(Room(name='101', type='standard', floor=1, status='Available', property_id=self.property.property_id))
+        db.session.commit()
+
+    def _import(self, body, chunk_size=None):
+        stream = io.BytesIO((HEADER + body).encode('utf-8'))
+        return RoomImporter(self.property.property_id, chunk_size=chunk_size).import_stream(stream)
+
+    def test_inserts_and_updates(self):
+        """Known names are updated in place and new names are inserted"""
+        result = self._import('101,suite,1,Cleaning,4,Sea view\n102,standard,1,Available,,\n', chunk_size=1)
+        self.assertEqual((result['rooms_added'], result['rooms_updated'], result['errors']), (1, 1, []))
+
+        rooms = {room.name: room for room in Room.query.filter_by(property_id=self.property.property_id)}
+        self.assertEqual(set(rooms), {'101', '102'})
+        self.assertEqual((rooms['101'].type, rooms['101'].status, rooms['101'].capacity), ('suite', 'Cleaning', 4))
+        self.assertIsNone(rooms['102'].capacity)
+
+    def test_row_errors(self):
+        """Invalid rows are reported with their line number and the rest are imported"""
+        result = self._import('201,standard,two,Available,,\n202,standard,2,Closed,,\n203,standard,2,Available,,\n')
+        self.assertEqual(result['rooms_added'], 1)
+        self.assertEqual([row for row, _ in result['errors']], [2, 3])
+        self.assertIn('Floor must be a number', result['errors'][0][1])
+
+    def test_repeated_name_in_file(self):
+        """A name repeated in the upload creates one room with the last row's values"""
+        result = self._import('301,standard,3,Available,,\n301,deluxe,3,Maintenance,,\n')
+        self.assertEqual((result['rooms_added'], result['rooms_updated']), (1, 1))
+        room = Room.query.filter_by(name='301').one()
+        self.assertEqual(room.type, 'deluxe')
+
+    def test_missing_headers(self):
+        """An upload without the required headers is rejected as a whole"""
+        with self.assertRaises(RoomImportError):
+            RoomImporter(self.property.property_id).import_stream(io.BytesIO(b'name,floor\n101,1\n'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from datetime import datetime, timedelta
+import pytz
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import SchedulerLease, SchedulerJobRun
+from app.services.scheduler_lease import SchedulerLeader, scheduler_leader, leader_only, prune_job_runs, run_missed_jobs
+from app.scheduler import get_scheduler_status
+
+class TestSchedulerLease(DatabaseTestCase):
+    def setUp(self):
+        """Start with no lease and no recorded runs"""
+        super().setUp()
+        scheduler_leader.expires_at = None
+
+    def tearDown(self):
+        scheduler_leader.expires_at = None
+        super().tearDown()
+
+    def _expire_lease(self):
+        lease = db.session.get(SchedulerLease, 'scheduler')
+        lease.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    def test_single_leader(self):
+        """Only one process holds the lease; the holder can renew it"""
+        first, second = SchedulerLeader(), SchedulerLeader()
+        self.assertNotEqual(first.holder, second.holder)
+
+        self.assertTrue(first.try_acquire())
+        self.assertFalse(second.try_acquire())
+        self.assertTrue(first.try_acquire())
+        self.assertTrue(first.is_leader())
+        self.assertFalse(second.is_leader())
+        self.assertEqual(db.session.get(SchedulerLease, 'scheduler').holder, first.holder)
+
+    def test_failover_after_expiry(self):
+        """Another process takes over once the leader stops renewing"""
+        first, second = SchedulerLeader(), SchedulerLeader()
+        first.try_acquire()
+        self._expire_lease()
+
+        self.assertTrue(second.try_acquire())
+        self.assertFalse(first.try_acquire())
+        self.assertFalse(first.is_leader())
+        self.assertEqual(db.session.get(SchedulerLease, 'scheduler').holder, second.holder)
+
+    def test_release_hands_over(self):
+        """A released lease can be taken immediately"""
+        first, second = SchedulerLeader(), SchedulerLeader()
+        first.try_acquire()
+        first.release()
+        self.assertTrue(second.try_acquire())
+
+    def test_leader_only_runs_once(self):
+        """Wrapped jobs run only in the lease holder and each run is recorded"""
+        calls = []
+        job = leader_only('test_job')(lambda: calls.append(1) or 'done')
+
+        other = SchedulerLeader()
+        other.try_acquire()
+        self.assertIsNone(job())
+        self.assertEqual(calls, [])
+        self.assertEqual(SchedulerJobRun.query.count(), 0)
+
+        other.release()
+        self.assertEqual(job(), 'done')
+        self.assertEqual(calls, [1])
+        run = SchedulerJobRun.query.one()
+        self.assertEqual(run.job_id, 'test_job')
+        self.assertEqual(run.status, 'success')
+        self.assertEqual(run.holder, scheduler_leader.holder)
+        self.assertIsNotNone(run.finished_at)
+
+    def test_failed_run_recorded(self):
+        """An exception marks the run as failed"""
+        def broken():
+            raise RuntimeError('smtp down')
+
+        with self.assertRaises(RuntimeError):
+            leader_only('broken_job')(broken)()
+        run = SchedulerJobRun.query.one()
+        self.assertEqual(run.status, 'error')
+        self.assertIn('smtp down', run.error)
+
+    def test_status_and_pruning(self):
+        """The status lists the leader and recent runs; old runs are pruned"""
+        leader_only('test_job')(lambda: None)()
+        db.session.add(SchedulerJobRun(
+            job_id='test_job', holder='old', status='success',
+            started_at=datetime.utcnow() - timedelta(days=30)
+        ))
+        db.session.commit()
+
+        status = get_scheduler_status()
+        self.assertEqual(status['leader']['holder'], scheduler_leader.holder)
+        self.assertTrue(status['is_leader'])
+        self.assertEqual(len(status['recent_runs']), 2)
+
+        prune_job_runs()
+        self.assertEqual(SchedulerJobRun.query.count(), 1)
+
+    def test_missed_cron_fire_runs_after_handover(self):
+        """A cron fire skipped while no process held the lease is queued once by the next leader"""
+        scheduler = BackgroundScheduler(timezone=pytz.utc)
+        fired = datetime.utcnow() - timedelta(minutes=30)
+        trigger = CronTrigger(hour=fired.hour, minute=fired.minute, timezone=pytz.utc)
+        scheduler.add_job(leader_only('report')(lambda: None), trigger=trigger, id='report', name='Report')
+        scheduler.add_job(leader_only('never_ran')(lambda: None), trigger=trigger, id='never_ran', name='Never ran')
+        db.session.add(SchedulerJobRun(job_id='report', holder='old', status='success', started_at=fired - timedelta(days=1)))
+        db.session.commit()
+
+        self.assertEqual(run_missed_jobs(scheduler), ['report'])
+        missed = scheduler.get_job('report:missed')
+        self.assertEqual(missed.name, 'Report (missed run)')
+
+        missed.func()
+        scheduler.remove_job('report:missed')
+        self.assertEqual(run_missed_jobs(scheduler), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+
+from base import DatabaseTestCase
+
+from sqlalchemy import event
+from app import app, db
+from app.models import User, Property, PropertyManager, Room, ServiceRequest, Task, TaskAssignment, History
+from app.services.ticket_routing import routing_cache
+
+class TestCreateServiceRequest(DatabaseTestCase):
+    def setUp(self):
+        """A property with a room, a housekeeping group of 12 and a super admin client"""
+        super().setUp()
+        routing_cache.invalidate()
+
+        self.property = Property(name='Bayview', hotel_code='BAY', address='1 Bay Rd')
+        admin = User(username='admin', email='admin@example.com', password='secret', role='super_admin')
+        self.staff = [
+            User(username=f'housekeeper{n}', email=f'housekeeper{n}@example.com', password='secret',
+                 group='Housekeeping', phone=f'+1555000{n:04d}' if n % 2 else None)
+            for n in range(12)
+        ]
+        db.session.add_all([self.property, admin] + self.staff)
+        db.session.flush()
+        self.room = Room(name='204', property_id=self.property.property_id)
+        db.session.add(self.room)
+        db.session.add_all([PropertyManager(property_id=self.property.property_id, user_id=user.user_id) for user in self.staff])
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        self.client = app.test_client()
+
+        notifier = patch('app.routes.send_service_request_notification_async')
+        self.notify = notifier.start()
+        self.addCleanup(notifier.stop)
+
+    def _create(self, group='Housekeeping'):
+        return self.client.post('/service-requests', headers=self.headers, json={
+            'room_id': self.room.room_id, 'property_id': self.property.property_id,
+            'request_group': group, 'request_type': 'Towels', 'priority': 'Low'
+        })
+
+    def test_texts_the_group_and_assigns_the_least_loaded(self):
+        """The whole group is texted after commit; the assignment goes to whoever has the least open work"""
+        db.session.add(Task(title='Busy', priority='Low', status='pending', property_id=self.property.property_id,
+                            assigned_to_id=self.staff[0].user_id))
+        db.session.commit()
+        response = self._create()
+        self.assertEqual(response.status_code, 201)
+        service_request = db.session.get(ServiceRequest, response.json['request']['request_id'])
+
+        assignment = TaskAssignment.query.filter_by(task_id=service_request.assigned_task_id).one()
+        self.assertTrue(assignment.is_service_request)
+        self.assertEqual((assignment.ticket_id, assignment.assigned_to_user_id), (service_request.request_id, self.staff[1].user_id))
+        self.assertEqual(service_request.assigned_task.assigned_to_id, self.staff[1].user_id)
+        self.assertEqual(History.query.count(), 3)
+
+        recipients, room_name, details = self.notify.call_args.args
+        self.assertEqual((len(recipients), room_name, details), (6, '204', 'Housekeeping - Towels'))
+
+    def test_statements_do_not_grow_with_group_size(self):
+        """A group of 12 costs the same number of statements as a group of one"""
+        lone = User(username='valet', email='valet@example.com', password='secret', group='Valet')
+        db.session.add(lone)
+        db.session.flush()
+        db.session.add(PropertyManager(property_id=self.property.property_id, user_id=lone.user_id))
+        db.session.commit()
+
+        # Warm the identity and routing caches first
+        self._create('Valet')
+        self._create()
+
+        statements = []
+        def count(*args):
+            statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            self._create('Valet')
+            small = len(statements)
+            statements.clear()
+            self._create()
+            large = len(statements)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        self.assertEqual(small, large)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from sqlalchemy import event
+from app import app, db
+from app.models import GeneralSettings, SettingsVersion
+from app.services.settings_cache import SettingsCache, settings_cache, get_settings
+
+class TestSettingsCache(DatabaseTestCase):
+    def setUp(self):
+        """Set up a general settings row and an empty cache"""
+        super().setUp()
+        settings_cache.invalidate()
+        self.poll_seconds = app.config.get('SETTINGS_CACHE_POLL_SECONDS')
+
+        db.session.add(GeneralSettings(system_name='Cached System'))
+        db.session.commit()
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count)
+        app.config['SETTINGS_CACHE_POLL_SECONDS'] = self.poll_seconds
+        super().tearDown()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_reads_served_from_memory(self):
+        """Repeated reads within the poll interval issue no SQL"""
+        app.config['SETTINGS_CACHE_POLL_SECONDS'] = 60
+        self.assertEqual(get_settings(GeneralSettings).system_name, 'Cached System')
+
+        self.statements.clear()
+        for _ in range(3):
+            self.assertEqual(get_settings(GeneralSettings).system_name, 'Cached System')
+        self.assertEqual(self.statements, [])
+
+    def test_local_edit_visible_immediately(self):
+        """Committing a settings change bumps the version and clears this worker's cache"""
+        app.config['SETTINGS_CACHE_POLL_SECONDS'] = 60
+        get_settings(GeneralSettings)
+        version = SettingsVersion.query.get(1).version
+
+        settings = GeneralSettings.query.first()
+        settings.system_name = 'Renamed'
+        db.session.commit()
+
+        self.assertEqual(get_settings(GeneralSettings).system_name, 'Renamed')
+        self.assertEqual(SettingsVersion.query.get(1).version, version + 1)
+
+    def test_other_worker_reloads_on_version_change(self):
+        """A second cache notices the bumped version on its next poll"""
+        app.config['SETTINGS_CACHE_POLL_SECONDS'] = 0
+        other_worker = SettingsCache()
+        self.assertEqual(other_worker.get(GeneralSettings).system_name, 'Cached System')
+
+        settings = GeneralSettings.query.first()
+        settings.system_name = 'Edited Elsewhere'
+        db.session.commit()
+
+        self.assertEqual(other_worker.get(GeneralSettings).system_name, 'Edited Elsewhere')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from datetime import datetime, timedelta
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, Ticket, Task, TaskAssignment, History, SlaRecord, SlaSyncState
+from app.services.sla_service import SlaService
+
+class TestSlaService(DatabaseTestCase):
+    def setUp(self):
+        """Set up a property with one ticket and its auto-generated task"""
+        super().setUp()
+
+        self.user = User(username='sla_user', email='sla@test.com', password='secret')
+        self.property = Property(name='SLA Hotel', hotel_code='SLA1')
+        db.session.add_all([self.user, self.property])
+        db.session.commit()
+
+        self.opened = datetime.utcnow() - timedelta(hours=10)
+        self.ticket = Ticket(title='Leak', description='Water leak', priority='High',
+                             category='Maintenance', user_id=self.user.user_id,
+                             property_id=self.property.property_id, created_at=self.opened)
+        self.task = Task(title='Fix leak', priority='High', property_id=self.property.property_id,
+                         created_at=self.opened)
+        db.session.add_all([self.ticket, self.task])
+        db.session.flush()
+        db.session.add(TaskAssignment(task_id=self.task.task_id, ticket_id=self.ticket.ticket_id,
+                                      assigned_to_user_id=self.user.user_id))
+        db.session.commit()
+
+    def add_history(self, entity_type, entity_id, action, minutes, field_name=None, new_value=None):
+        db.session.add(History(entity_type=entity_type, entity_id=entity_id, action=action,
+                               field_name=field_name, new_value=new_value, user_id=self.user.user_id,
+                               created_at=self.opened + timedelta(minutes=minutes)))
+        db.session.commit()
+
+    def test_intervals_derived_from_history(self):
+        """Assignment, start and completion times are derived from history rows"""
+        self.add_history('ticket', self.ticket.ticket_id, 'created', 0)
+        self.add_history('task', self.task.task_id, 'created', 0)
+        self.add_history('task', self.task.task_id, 'assigned', 20, 'assigned_to', 'sla_user')
+        self.add_history('task', self.task.task_id, 'updated', 60, 'status', 'in progress')
+        self.add_history('task', self.task.task_id, 'completed', 600)
+
+        SlaService().sync()
+
+        ticket_record = SlaRecord.query.filter_by(entity_type='ticket', entity_id=self.ticket.ticket_id).one()
+        self.assertEqual(ticket_record.time_to_assign, 20 * 60)
+        self.assertEqual(ticket_record.time_to_start, 60 * 60)
+        self.assertEqual(ticket_record.time_to_complete, 600 * 60)
+        # High priority targets: assign 30 min, start 2h, complete 8h
+        self.assertFalse(ticket_record.assign_breached)
+        self.assertFalse(ticket_record.start_breached)
+        self.assertTrue(ticket_record.complete_breached)
+        self.assertTrue(ticket_record.breached)
+
+    def test_sync_is_incremental(self):
+        """Only rows past the watermark are applied on each sync"""
+        self.add_history('ticket', self.ticket.ticket_id, 'created', 0)
+        service = SlaService()
+        self.assertEqual(service.sync(), 1)
+        self.assertEqual(service.sync(), 0)
+
+        self.add_history('ticket', self.ticket.ticket_id, 'updated', 5, 'status', 'in progress')
+        self.assertEqual(service.sync(), 1)
+        self.assertEqual(SlaSyncState.query.first().last_history_id, History.query.count())
+
+    def test_late_commits_are_picked_up(self):
+        """A row committed after a higher ID was applied is found through the gap it left"""
+        def add(history_id, action, field_name=None, new_value=None):
+            db.session.add(History(history_id=history_id, entity_type='ticket', entity_id=self.ticket.ticket_id,
+                                   action=action, field_name=field_name, new_value=new_value,
+                                   user_id=self.user.user_id, created_at=self.opened))
+            db.session.commit()
+
+        add(1, 'created')
+        add(3, 'updated', 'priority', 'Low')
+        service = SlaService()
+        self.assertEqual(service.sync(), 2)
+        self.assertEqual(list(SlaSyncState.query.one().gaps), ['2'])
+
+        add(2, 'updated', 'status', 'in progress')
+        self.assertEqual(service.sync(), 1)
+        self.assertIsNone(SlaSyncState.query.one().gaps)
+        record = SlaRecord.query.filter_by(entity_type='ticket').one()
+        self.assertEqual((record.priority, record.started_at), ('Low', self.opened))
+
+    def test_large_id_jump_keeps_bounded_gaps(self):
+        """A jump far past the watermark only records the last batch_size IDs as gaps"""
+        db.session.add(History(history_id=10_000_000, entity_type='ticket', entity_id=self.ticket.ticket_id,
+                               action='created', user_id=self.user.user_id, created_at=self.opened))
+        db.session.commit()
+        service = SlaService()
+        service.batch_size = 10
+
+        self.assertEqual(service.sync(), 1)
+        gaps = sorted(int(history_id) for history_id in SlaSyncState.query.one().gaps)
+        self.assertEqual(gaps, list(range(9_999_990, 10_000_000)))
+
+    def test_open_records_flagged_when_overdue(self):
+        """Open records past their targets are flagged in the breach index"""
+        self.add_history('ticket', self.ticket.ticket_id, 'created', 0)
+        SlaService().sync()
+
+        record = SlaRecord.query.filter_by(entity_type='ticket').one()
+        self.assertIsNone(record.completed_at)
+        self.assertTrue(record.complete_breached)
+
+        report = SlaService().get_report(self.opened - timedelta(days=1), datetime.utcnow(),
+                                         property_ids=[self.property.property_id])
+        self.assertEqual(report['total'], 1)
+        self.assertEqual(report['breached'], 1)
+        self.assertEqual(len(report['breaches']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Task, SlowQuery
+from app.slow_query_log import slow_query_log, normalize_sql, describe_parameters
+
+class TestSlowQueryLog(DatabaseTestCase):
+    def setUp(self):
+        """Set up a super admin and record every statement as slow"""
+        super().setUp()
+
+        admin = User(username='slow_admin', email='slow@test.com', password='secret', role='super_admin')
+        db.session.add(admin)
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {admin.get_token()}'}
+        self.client = app.test_client()
+
+        self.enabled, self.threshold_ms = slow_query_log.enabled, slow_query_log.threshold_ms
+        slow_query_log.enabled, slow_query_log.threshold_ms = True, 0
+
+    def tearDown(self):
+        slow_query_log.enabled, slow_query_log.threshold_ms = self.enabled, self.threshold_ms
+        slow_query_log.flush()
+        super().tearDown()
+
+    def test_normalize_sql(self):
+        """Literals and expanded IN lists share one fingerprint"""
+        self.assertEqual(
+            normalize_sql("SELECT * FROM tasks WHERE id IN (?, ?, ?) AND title = 'x'  AND priority > 3"),
+            'SELECT * FROM tasks WHERE id IN (?) AND title = ? AND priority > ?'
+        )
+
+    def test_statement_recorded_with_plan(self):
+        """A slow SELECT is aggregated with its source frame and EXPLAIN plan"""
+        for _ in range(2):
+            Task.query.filter(Task.assigned_to_id == 1).all()
+        slow_query_log.enabled = False
+        slow_query_log.flush()
+
+        entry = SlowQuery.query.filter(SlowQuery.statement.like('%FROM tasks%assigned_to_id%')).one()
+        self.assertEqual(entry.count, 2)
+        self.assertIn('tests/test_slow_query_log.py', entry.source)
+        self.assertTrue(entry.explain_plan)
+
+    def test_parameter_values_are_not_stored(self):
+        """Only the types of a statement's parameters are kept, never emails or hashes"""
+        User.query.filter(User.email == 'guest@example.com', User.user_id > 5).all()
+        slow_query_log.enabled = False
+        slow_query_log.flush()
+
+        entry = SlowQuery.query.filter(SlowQuery.statement.like('%FROM users%email%')).one()
+        self.assertEqual(entry.sample_parameters, '(str, int)')
+        self.assertNotIn('guest@example.com', str(entry.to_dict()))
+        self.assertEqual(describe_parameters({'token': 'abc'}), '{token: str}')
+        self.assertEqual(describe_parameters([(1, 'a'), (2, 'b')], executemany=True), '2 x (int, str)')
+
+    def test_admin_endpoint(self):
+        """Super admins can list the top offenders"""
+        self.client.get('/properties', headers=self.headers)
+        slow_query_log.enabled = False
+        slow_query_log.flush()
+
+        data = self.client.get('/api/admin/slow-queries?order_by=count', headers=self.headers).get_json()
+        self.assertTrue(data['queries'])
+        self.assertIn('GET /properties', {q['route'] for q in data['queries']})
+
+if __name__ == '__main__':
+    unittest.main()
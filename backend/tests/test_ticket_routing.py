@@ -0,0 +1,61 @@
+import unittest
+
+from base import DatabaseTestCase
+
+from app import app, db
+from app.models import User, Property, PropertyManager, Task
+from app.services.ticket_routing import TicketRouter, routing_cache
+
+class TestTicketRouting(DatabaseTestCase):
+    def setUp(self):
+        """A property with two engineering managers and an executive"""
+        super().setUp()
+        routing_cache.invalidate()
+
+        self.property = Property(name='Pines', hotel_code='PNS', address='1 Forest Rd')
+        self.first = User(username='first', email='first@example.com', password='secret', role='manager', group='Engineering')
+        self.second = User(username='second', email='second@example.com', password='secret', role='manager', group='Engineering')
+        self.executive = User(username='executive', email='executive@example.com', password='secret', role='manager', group='Executive')
+        db.session.add_all([self.property, self.first, self.second, self.executive])
+        db.session.flush()
+        db.session.add_all([
+            PropertyManager(property_id=self.property.property_id, user_id=user.user_id)
+            for user in (self.first, self.second, self.executive)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        app.config['ROUTING_STRATEGY'] = 'least_loaded'
+        super().tearDown()
+
+    def _route(self, count, category='Maintenance'):
+        router = TicketRouter([self.property.property_id])
+        return [router.assignee(self.property.property_id, category).username for _ in range(count)]
+
+    def test_least_loaded_balances_open_work(self):
+        """The manager with fewer open tasks goes first, then assignments alternate"""
+        db.session.add_all([
+            Task(title='Open', priority='Low', status='pending', property_id=self.property.property_id, assigned_to_id=self.first.user_id),
+            Task(title='Done', priority='Low', status='completed', property_id=self.property.property_id, assigned_to_id=self.second.user_id)
+        ])
+        db.session.commit()
+        self.assertEqual(self._route(3), ['second', 'first', 'second'])
+        # Counters carry over to the next request
+        self.assertEqual(self._route(1), ['first'])
+        self.assertEqual(self._route(1, 'IT'), ['executive'])
+
+    def test_round_robin(self):
+        """Round robin takes turns regardless of open work"""
+        app.config['ROUTING_STRATEGY'] = 'round_robin'
+        self.assertEqual(self._route(4), ['first', 'second', 'first', 'second'])
+
+    def test_staffing_changes_rebuild_the_table(self):
+        """Deactivated managers stop receiving tickets once the change commits"""
+        self._route(1)
+        self.first.is_active = False
+        self.second.is_active = False
+        db.session.commit()
+        self.assertEqual(self._route(2), ['executive', 'executive'])
+
+if __name__ == '__main__':
+    unittest.main()
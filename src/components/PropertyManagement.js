@@ -163,8 +163,8 @@ const PropertyManagement = () => {
       setError('');
       setSuccess('');
       
-      await apiClient.delete(`/properties/${propertyId}`);
-      setSuccess('Property and all associated data deleted successfully');
+      const response = await apiClient.delete(`/properties/${propertyId}`);
+      setSuccess(response.data?.message || 'Property deletion started');
       await fetchData();
     } catch (error) {
       console.error('Failed to delete property:', error);
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import apiClient from "./apiClient";
 import { useAuth } from '../context/AuthContext';
+import { useChangeStream } from '../hooks/useChangeStream';
 import {
   Box,
   Typography,
@@ -112,6 +113,9 @@ const ServiceRequests = () => {
     }
   }, [selectedProperty]);
 
+  // Reload when service requests change instead of polling
+  useChangeStream(selectedProperty, ['service_request'], () => fetchRequests());
+
   useEffect(() => {
     // Check if we have state from navigation
     if (location.state?.createRequest) {
@@ -47,6 +47,7 @@ import { AdapterDateFns } from '@mui/x-date-pickers/AdapterDateFns';
 import { StaticDatePicker } from '@mui/x-date-pickers/StaticDatePicker';
 import { format } from 'date-fns';
 import { useIsMobile } from '../hooks/useIsMobile';
+import { useChangeStream } from '../hooks/useChangeStream';
 import CloseIcon from '@mui/icons-material/Close';
 import ViewWeekIcon from '@mui/icons-material/ViewWeek';
 import TableViewIcon from '@mui/icons-material/TableView';
@@ -123,6 +124,9 @@ const ViewTasks = () => {
     }
   }, [selectedProperty]);
 
+  // Reload when tasks or their tickets change instead of polling
+  useChangeStream(selectedProperty, ['task', 'ticket'], () => fetchTasks());
+
   useEffect(() => {
     if (location.state?.createTask) {
       const { ticketId, propertyId } = location.state;
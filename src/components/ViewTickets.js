@@ -44,6 +44,7 @@ import EditIcon from '@mui/icons-material/Edit';
 import DeleteIcon from '@mui/icons-material/Delete';
 import PropertySwitcher from './PropertySwitcher';
 import { useIsMobile } from '../hooks/useIsMobile';
+import { useChangeStream } from '../hooks/useChangeStream';
 import CloseIcon from '@mui/icons-material/Close';
 import ViewWeekIcon from '@mui/icons-material/ViewWeek';
 import TableViewIcon from '@mui/icons-material/TableView';
@@ -149,6 +150,9 @@ const ViewTickets = () => {
     }
   }, [selectedProperty]);
 
+  // Reload when tickets or tasks change instead of polling
+  useChangeStream(selectedProperty, ['ticket', 'task'], () => fetchTickets());
+
   // Add properties fetching
   useEffect(() => {
     fetchProperties();
@@ -0,0 +1,43 @@
+import { useEffect, useRef } from 'react';
+import apiClient from '../components/apiClient';
+import { useAuth } from '../context/AuthContext';
+
+// Calls onChange when a ticket, task, service request or room of one of entityTypes
+// changes at the property, or when the stream reports missed changes. Bursts of changes
+// are folded into a single call after delay ms. The browser reconnects on its own and
+// resumes from the last event it saw.
+export const useChangeStream = (propertyId, entityTypes, onChange, delay = 500) => {
+  const { auth } = useAuth();
+  const handler = useRef(onChange);
+  handler.current = onChange;
+  const types = entityTypes.join(',');
+
+  useEffect(() => {
+    if (!propertyId || !auth?.token || typeof EventSource === 'undefined') {
+      return undefined;
+    }
+    // EventSource cannot send an Authorization header
+    const token = auth.token.replace(/^Bearer /, '');
+    const source = new EventSource(
+      `${apiClient.defaults.baseURL}/events?property_id=${propertyId}&jwt=${encodeURIComponent(token)}`
+    );
+    let timer = null;
+    const refresh = () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => handler.current(), delay);
+    };
+
+    source.addEventListener('change', (event) => {
+      const change = JSON.parse(event.data);
+      if (types.split(',').includes(change.entity_type)) {
+        refresh();
+      }
+    });
+    source.addEventListener('reset', refresh);
+
+    return () => {
+      clearTimeout(timer);
+      source.close();
+    };
+  }, [propertyId, auth?.token, types, delay]);
+};